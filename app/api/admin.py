@@ -0,0 +1,72 @@
+# app/api/admin.py
+
+from typing       import Any, Dict, Literal, Optional
+from fastapi      import APIRouter, Query
+
+from services.audit     import get_audit_writer
+from services.query_log import QUERY_LOG
+from services.sql       import execute_query
+
+router = APIRouter()
+
+_ORDER = {"total": "total_ms", "max": "max_ms", "count": "count", "avg": "avg_ms"}
+
+
+@router.get("/slow-queries")
+def slow_queries(
+    since: Optional[str] = Query(None, description="Only entries at or after this UTC timestamp"),
+    order: Literal["total", "max", "count", "avg"] = "total",
+    limit: int = Query(50, ge=1, le=500),
+) -> Dict[str, Any]:
+    """
+    Logged slow queries grouped by fingerprint, slowest in total first,
+    each with its latest SQL text, caller and query plan.
+    """
+    # Write out what's still queued; a batch the flusher already holds lands
+    # within ERP_AUDIT_FLUSH_INTERVAL_MS
+    get_audit_writer().flush()
+    where, params = "", ()
+    if since:
+        where, params = "WHERE created_at >= ?", (since,)
+    rows = execute_query(
+        f"""
+        WITH agg AS (
+            SELECT fingerprint,
+                   COUNT(*)                   AS count,
+                   ROUND(SUM(duration_ms), 2) AS total_ms,
+                   ROUND(AVG(duration_ms), 2) AS avg_ms,
+                   ROUND(MAX(duration_ms), 2) AS max_ms,
+                   ROUND(AVG(row_count), 1)   AS avg_rows,
+                   MIN(created_at)            AS first_seen,
+                   MAX(created_at)            AS last_seen,
+                   MAX(id)                    AS latest_id,
+                   COUNT(DISTINCT caller)     AS callers
+              FROM slow_queries
+              {where}
+             GROUP BY fingerprint
+        )
+        SELECT agg.*, s.sql, s.caller, s.plan
+          FROM agg JOIN slow_queries s ON s.id = agg.latest_id
+         ORDER BY {_ORDER[order]} DESC
+         LIMIT ?
+        """,
+        params + (limit,),
+    ) or []
+    columns = ["fingerprint", "count", "total_ms", "avg_ms", "max_ms", "avg_rows",
+               "first_seen", "last_seen", "latest_id", "callers", "sql", "caller", "plan"]
+    return {
+        "threshold_ms": QUERY_LOG.slow_ms,
+        "fingerprints": [
+            {k: v for k, v in zip(columns, row) if k != "latest_id"}
+            for row in rows
+        ],
+    }
+
+
+@router.get("/queries")
+def query_stats(
+    order: Literal["total", "max", "count", "avg"] = "total",
+    limit: int = Query(50, ge=1, le=500),
+) -> Dict[str, Any]:
+    """Every query since startup, by fingerprint, from the in-memory log."""
+    return {**QUERY_LOG.stats(), "fingerprints": QUERY_LOG.top(limit, by=_ORDER[order])}
@@ -0,0 +1,98 @@
+# app/api/bulk.py
+
+from typing   import Any, Callable, Dict, List, Optional
+from fastapi  import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from core.config import BULK_MAX_ITEMS
+from core.db     import run_db
+from domain.finance.tools import create_invoices, post_payments
+from domain.sales.tools   import create_leads, create_orders
+from services.governance  import request_approval, requires_approval
+
+router = APIRouter()
+
+
+class BulkRequest(BaseModel):
+    # Raw dicts: each item is validated on its own so one bad item
+    # is reported in its result instead of rejecting the whole request
+    items: List[Dict[str, Any]]
+    requested_by: str = "bulk_api"
+
+
+def _invoice_amount(item: Dict[str, Any]) -> float:
+    try:
+        return sum(float(l["quantity"]) * float(l["unit_price"]) for l in item.get("lines") or [])
+    except Exception:
+        return 0.0  # malformed; validation will report it
+
+
+def _payment_amount(item: Dict[str, Any]) -> float:
+    try:
+        return float(item.get("amount") or 0)
+    except Exception:
+        return 0.0
+
+
+def _gated(
+    req: BulkRequest,
+    module: str,
+    action: str,
+    amount: Optional[Callable[[Dict[str, Any]], float]],
+    write: Callable[[List[Dict[str, Any]]], Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Send items over the approval threshold to the approvals queue (same
+    policy as the chat path), write the rest as one batch and merge results
+    back into input order.
+    """
+    held: List[Dict[str, Any]] = []
+    passed: List[int] = []
+    for i, item in enumerate(req.items):
+        needs, reason = (False, None)
+        if amount is not None:
+            needs, reason = requires_approval(module, action, {"amount": amount(item)})
+        if needs:
+            approval_id = request_approval(module, {"action": action, "payload": item}, requested_by=req.requested_by)
+            held.append({"index": i, "status": "pending_approval", "approval_id": approval_id, "reason": reason})
+        else:
+            passed.append(i)
+
+    out = write([req.items[i] for i in passed]) if passed else {"total": 0, "counts": {}, "results": []}
+    for r in out["results"]:
+        r["index"] = passed[r["index"]]
+    results = sorted(out["results"] + held, key=lambda r: r["index"])
+    counts = dict(out["counts"])
+    if held:
+        counts["pending_approval"] = len(held)
+    return {"total": len(results), "counts": counts, "results": results}
+
+
+async def _run(req: BulkRequest, module: str, action: str, amount, write) -> Dict[str, Any]:
+    if len(req.items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ITEMS} items per request")
+    return await run_db(_gated, req, module, action, amount, write)
+
+
+@router.post("/invoices")
+async def bulk_create_invoices(req: BulkRequest) -> Dict[str, Any]:
+    """Create invoices: ``{"items": [{customer_id, invoice_number, lines: [...]}, ...]}``."""
+    return await _run(req, "finance", "create_invoice", _invoice_amount, create_invoices)
+
+
+@router.post("/payments")
+async def bulk_post_payments(req: BulkRequest) -> Dict[str, Any]:
+    """Post payments: ``{"items": [{customer_id, amount, method, allocations: [...]}, ...]}``."""
+    return await _run(req, "finance", "post_payment", _payment_amount, post_payments)
+
+
+@router.post("/orders")
+async def bulk_create_orders(req: BulkRequest) -> Dict[str, Any]:
+    """Create orders: ``{"items": [{customer_id, items: [{product_id, quantity, price}], status}, ...]}``."""
+    return await _run(req, "sales", "create_order", None, create_orders)
+
+
+@router.post("/leads")
+async def bulk_create_leads(req: BulkRequest) -> Dict[str, Any]:
+    """Create leads: ``{"items": [{customer_name, contact_email, message, score}, ...]}``."""
+    return await _run(req, "sales", "create_lead", None, create_leads)
@@ -1,34 +1,217 @@
 # app/api/chat.py
 
-from typing import Dict
-from fastapi import APIRouter, HTTPException
+import threading
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 
+from core.config import CHAT_ENCODE_OFFLOAD_ROWS, CHAT_MAX_INFLIGHT, CHAT_RETRY_AFTER_S
+from core.db import run_db
+from core.tracing import span
 from orchestrator.router_agent import RouterAgent
+from services.encoding import available, dumps_json, encode, negotiate
+from services.pagination import CursorError, iter_pages, resume
 
 router = APIRouter()
-agents_by_user: Dict[str, RouterAgent] = {}
+# Shared by all users; per-conversation state lives in router_agent.SESSIONS
+router_agent = RouterAgent()
+
+
+class Admission:
+    """
+    Caps in-flight chat turns. Over the limit a request is refused at once
+    with 429 + Retry-After instead of queueing behind the LLM.
+    """
+
+    def __init__(self, limit: int, retry_after_s: int):
+        self.limit = limit
+        self.retry_after_s = retry_after_s
+        self._lock = threading.Lock()
+        self.inflight = 0
+        self.rejected = 0
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self.inflight >= self.limit:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=429,
+                    detail="Too many requests in flight, retry shortly.",
+                    headers={"Retry-After": str(self.retry_after_s)},
+                )
+            self.inflight += 1
+
+    def release(self) -> None:
+        with self._lock:
+            self.inflight -= 1
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {"inflight": self.inflight, "limit": self.limit, "rejected": self.rejected}
+
+
+ADMISSION = Admission(CHAT_MAX_INFLIGHT, CHAT_RETRY_AFTER_S)
 
 
 class ChatRequest(BaseModel):
     user_id: str = "anon"
-    message: str
+    message: str = ""
+    # next_cursor from a previous table payload; fetches the following page
+    cursor: Optional[str] = None
 
 
-@router.post("/chat")
-def chat(req: ChatRequest):
-    """
-    Main chat endpoint. Delegates to RouterAgent.route_request(),
-    which will call process_request() on the appropriate domain agent.
-    """
+def _resume(cursor: str) -> Dict[str, Any]:
+    try:
+        return resume(cursor)
+    except CursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+def _handle(req: ChatRequest) -> Dict[str, Any]:
+    if req.cursor:
+        return _resume(req.cursor)
+
     uid = req.user_id or "anon"
-    agent = agents_by_user.setdefault(uid, RouterAgent())
 
     try:
         # route_request returns a dict like {"type": "text", "content": ...}
         # or {"type": "table", ...}
-        return agent.route_request(req.message, uid)
+        return router_agent.route_request(req.message, uid)
     except Exception as exc:
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Error processing request: {exc}")
+
+
+def _media_type(request: Request) -> str:
+    media_type = negotiate(request.headers.get("accept"))
+    if media_type is None:
+        raise HTTPException(status_code=406, detail=f"Acceptable response types: {', '.join(available())}")
+    return media_type
+
+
+def _encode(payload: Any, media_type: str) -> Response:
+    # Encoded here rather than by FastAPI's jsonable_encoder + json.dumps
+    with span("encode"):
+        body, media_type = encode(payload, media_type)
+    return Response(body, media_type=media_type, headers={"Vary": "Accept"})
+
+
+def _is_large(payload: Any) -> bool:
+    return (
+        isinstance(payload, dict)
+        and payload.get("type") == "table"
+        and len(payload.get("rows") or ()) >= CHAT_ENCODE_OFFLOAD_ROWS
+    )
+
+
+async def _respond(payload: Any, media_type: str) -> Response:
+    # Encoding a big table takes long enough to stall every other request
+    # on the event loop; it goes to the DB executor past ERP_CHAT_ENCODE_OFFLOAD_ROWS
+    if _is_large(payload):
+        return await run_db(_encode, payload, media_type)
+    return _encode(payload, media_type)
+
+
+@router.post("/chat")
+async def chat(req: ChatRequest, request: Request):
+    """
+    Main chat endpoint. Delegates to RouterAgent.aroute_request(): DB work
+    runs on the bounded DB executor and the agent's LLM call is awaited,
+    so a worker can hold many turns open at once. Past ERP_CHAT_MAX_INFLIGHT
+    concurrent turns it answers 429 with Retry-After.
+    Table payloads carry a ``next_cursor``; post it back as ``cursor``
+    to get the next page.
+    The response encoding follows ``Accept``: JSON (default), columnar
+    JSON, msgpack or Arrow IPC (see services/encoding.py).
+    """
+    media_type = _media_type(request)
+    with ADMISSION.slot():
+        if req.cursor:
+            return await _respond(await run_db(_resume, req.cursor), media_type)
+        try:
+            payload = await router_agent.aroute_request(req.message, req.user_id or "anon")
+        except Exception as exc:
+            import traceback
+            traceback.print_exc()
+            raise HTTPException(status_code=500, detail=f"Error processing request: {exc}")
+    return await _respond(payload, media_type)
+
+
+def _ndjson_lines(first: Dict[str, Any]) -> Iterator[bytes]:
+    for i, page in enumerate(iter_pages(first)):
+        if i and page.get("type") == "table":
+            # headers were already sent with the first page
+            page = {"type": "rows", "rows": page["rows"], "next_cursor": page.get("next_cursor")}
+        yield dumps_json(page) + b"\n"
+
+
+@router.post("/chat/ndjson")
+def chat_ndjson(req: ChatRequest):
+    """
+    Same as /chat, but a paged table is streamed to the end as
+    newline-delimited JSON: the first line is the usual table payload,
+    each following line is ``{"type": "rows", "rows": [...], "next_cursor": ...}``.
+    Only one page is held in memory at a time.
+    """
+    with ADMISSION.slot():
+        first = _handle(req)
+    return StreamingResponse(_ndjson_lines(first), media_type="application/x-ndjson")
+
+
+def _sse(event: str, data: Any) -> bytes:
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + dumps_json(data) + b"\n\n"
+
+
+async def _sse_events(req: ChatRequest) -> AsyncIterator[bytes]:
+    try:
+        # first bytes go out before any DB or LLM work
+        yield b": stream open\n\n"
+        async for event, data in router_agent.astream_request(req.message, req.user_id or "anon"):
+            yield await run_db(_sse, event, data) if _is_large(data) else _sse(event, data)
+    except Exception as exc:
+        import traceback
+        traceback.print_exc()
+        yield _sse("error", {"type": "error", "message": f"Error processing request: {exc}"})
+
+
+class _AdmittedStream(StreamingResponse):
+    """
+    Holds an admission slot until the response is over, however it ends.
+    Releasing in the body generator is not enough: if the client goes away
+    before the body starts, the generator is never entered.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            ADMISSION.release()
+
+
+@router.post("/chat/stream")
+async def chat_stream(req: ChatRequest):
+    """
+    Server-Sent Events version of /chat. Events, in order:
+    ``classification`` ({module, access, action}), then for agent turns any
+    of ``tool_start`` ({tool, input}), ``tool_end`` ({tool}) and ``token``
+    ({text}, partial LLM output), and finally ``final`` with the usual
+    payload, or ``error``. Each event's data line is JSON.
+    """
+    if req.cursor:
+        raise HTTPException(status_code=400, detail="Use /chat or /chat/ndjson to resume a cursor.")
+    ADMISSION.acquire()
+    return _AdmittedStream(
+        _sse_events(req),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
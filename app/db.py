@@ -5,6 +5,8 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 
+from core.lazy import Lazy
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 default_db_path = BASE_DIR / "db" / "erp_v2.db"
 DB_PATH = Path(os.getenv("DATABASE_PATH", default_db_path))
@@ -18,3 +20,25 @@ engine = create_engine(
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
+
+
+def _create_tables() -> bool:
+    # Importing the models registers them on Base
+    import app.models.customer
+    import app.models.order
+    import app.models.order_item
+    import app.models.invoice
+    import app.models.invoice_line
+    import app.models.payment
+    import app.models.payment_allocation
+
+    Base.metadata.create_all(bind=engine)
+    return True
+
+
+_tables = Lazy(_create_tables)
+
+
+def ensure_tables() -> None:
+    """Create the ORM tables once per process (no-op after the first call)."""
+    _tables.get()
@@ -3,7 +3,9 @@
 import os
 import sys
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from dotenv import load_dotenv
 
 # 1) Configure logging to stdout so Docker sees it
@@ -16,34 +18,80 @@ logging.basicConfig(
 # 2) Load environment
 load_dotenv()
 
-# 3) Create all tables
-from app.db import engine, Base
-import app.models.customer
-import app.models.order
-import app.models.order_item
-import app.models.invoice
-import app.models.invoice_line
-import app.models.payment
-import app.models.payment_allocation
-
-Base.metadata.create_all(bind=engine)
+# 3) ORM tables are created at startup (lifespan), not on import
 
 # 4) Create app and mount your routers
-from app.api.chat      import router as chat_router
+from app.api.chat      import ADMISSION, router as chat_router
 from app.api.approvals import router as approvals_router
 from app.api.tools     import router as tools_router
+from app.api.bulk      import router as bulk_router
+from app.api.admin     import router as admin_router
+from db.migrate        import ensure_migrations
+from core.db           import close_all as close_db_connections, shutdown_db_executor
+from services.audit    import get_audit_writer, shutdown_audit_writer
+from services.result_cache import RESULT_CACHE
+from services.query_log import QUERY_LOG
+from services.sql_translations import TRANSLATIONS
+from orchestrator.dispatch import PATH_STATS
+from orchestrator.router_agent import SESSIONS
+from domain.finance.receivables import REBUCKET_JOB, start_rebucket_job, shutdown_rebucket_job
+from core.tracing import TracingMiddleware, register_gauge, render_metrics
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # SQLAlchemy is only needed for this, so it is imported here too.
+    # LLM clients and agents stay unbuilt until a request needs them.
+    from app.db import ensure_tables
+    ensure_tables()
+    ensure_migrations()
+    # Start the audit flusher up front; drain it before connections close
+    get_audit_writer()
+    # Re-buckets AR aging now and then nightly
+    start_rebucket_job()
+    yield
+    shutdown_rebucket_job()
+    shutdown_db_executor()
+    shutdown_audit_writer()
+    close_db_connections()
+
 
-app = FastAPI(title="ERP Agents API")
+app = FastAPI(title="ERP Agents API", lifespan=lifespan)
+# Spans per request -> Server-Timing header and /metrics histograms
+app.add_middleware(TracingMiddleware)
 
 # Mount your routers under /api
 app.include_router(chat_router,      prefix="/api", tags=["chat"])
 app.include_router(approvals_router, prefix="/api/approvals", tags=["approvals"])
 app.include_router(tools_router,     prefix="/api/tools", tags=["tools"])
+app.include_router(bulk_router,      prefix="/api/bulk", tags=["bulk"])
+app.include_router(admin_router,     prefix="/api/admin", tags=["admin"])
 
 # 5) Health-check
 @app.get("/health")
 async def health_check():
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "audit": get_audit_writer().stats(),
+        "result_cache": RESULT_CACHE.stats(),
+        "sql_translations": TRANSLATIONS.stats(),
+        "routing": PATH_STATS.stats(),
+        "sessions": SESSIONS.stats(),
+        "chat_admission": ADMISSION.stats(),
+        "ar_rebucket": REBUCKET_JOB.stats(),
+        "queries": QUERY_LOG.stats(),
+    }
+
+
+register_gauge("erp_chat_inflight", "Chat turns currently in flight.", lambda: ADMISSION.inflight)
+register_gauge("erp_chat_rejected", "Chat turns refused with 429 since start.", lambda: ADMISSION.rejected)
+register_gauge("erp_result_cache_entries", "Entries in the query result cache.", lambda: RESULT_CACHE.stats()["entries"])
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Span and request-duration histograms in the Prometheus text format."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,90 @@
+# benchmarks/bench_bulk.py
+"""
+Write throughput: N calls of the single-item write tools vs one call of the
+bulk variant, for invoices, payments, orders and leads. Runs against a
+throwaway copy of the sample database.
+
+    python -m benchmarks.bench_bulk --items 2000
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+SAMPLE_DB = Path(__file__).resolve().parent.parent / "db" / "erp_v2.db"
+
+
+def _invoice(tag: str, i: int) -> dict:
+    return {
+        "customer_id": 1 + i % 100,
+        "invoice_number": f"BENCH-{tag}-{i}",
+        "lines": [{"description": f"line {k}", "quantity": 1 + k, "unit_price": 12.5} for k in range(3)],
+    }
+
+
+def _payment(invoice_id: int, i: int) -> dict:
+    return {"customer_id": 1 + i % 100, "amount": 25.0, "allocations": [{"invoice_id": invoice_id, "amount": 25.0}]}
+
+
+def _order(i: int) -> dict:
+    return {"customer_id": 1 + i % 100, "items": [{"product_id": 1 + k, "quantity": 2, "price": 9.99} for k in range(3)]}
+
+
+def _lead(i: int) -> dict:
+    return {"customer_name": f"Lead {i}", "contact_email": f"lead{i}@example.com", "message": "hi", "score": 0.5}
+
+
+def rate(n: int, seconds: float) -> str:
+    return f"{n / seconds:10.0f} items/s  ({seconds * 1000:8.1f} ms)"
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--items", type=int, default=2000)
+    args = ap.parse_args()
+    n = args.items
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "bulk.db")
+        shutil.copy(SAMPLE_DB, path)
+        os.environ["ERP_DB_PATH"] = path
+        from db.migrate import apply_migrations
+        from domain.finance.tools import create_invoices, finance_sql_write, post_payments
+        from domain.sales.tools import create_leads, create_orders, sales_sql_write
+
+        apply_migrations(path)
+
+        def single(fn) -> float:
+            t0 = time.perf_counter()
+            out = [fn(i) for i in range(n)]
+            return time.perf_counter() - t0, out
+
+        def bulk(fn, items) -> float:
+            t0 = time.perf_counter()
+            out = fn(items)
+            assert out["total"] == len(items) and "error" not in out["counts"], out["counts"]
+            return time.perf_counter() - t0, out
+
+        t_single, created = single(lambda i: finance_sql_write("create_invoice", _invoice("s", i)))
+        t_bulk, bulk_created = bulk(create_invoices, [_invoice("b", i) for i in range(n)])
+        print(f"invoices  single {rate(n, t_single)}   bulk {rate(n, t_bulk)}   x{t_single / t_bulk:5.1f}")
+
+        single_ids = [r["invoice_id"] for r in created]
+        bulk_ids = [r["invoice_id"] for r in bulk_created["results"]]
+        t_single, _ = single(lambda i: finance_sql_write("post_payment", _payment(single_ids[i], i)))
+        t_bulk, _ = bulk(post_payments, [_payment(bulk_ids[i], i) for i in range(n)])
+        print(f"payments  single {rate(n, t_single)}   bulk {rate(n, t_bulk)}   x{t_single / t_bulk:5.1f}")
+
+        t_single, _ = single(lambda i: sales_sql_write("create_order", _order(i)))
+        t_bulk, _ = bulk(create_orders, [_order(i) for i in range(n)])
+        print(f"orders    single {rate(n, t_single)}   bulk {rate(n, t_bulk)}   x{t_single / t_bulk:5.1f}")
+
+        t_single, _ = single(lambda i: sales_sql_write("create_lead", _lead(i)))
+        t_bulk, _ = bulk(create_leads, [_lead(i) for i in range(n)])
+        print(f"leads     single {rate(n, t_single)}   bulk {rate(n, t_bulk)}   x{t_single / t_bulk:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
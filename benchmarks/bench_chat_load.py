@@ -0,0 +1,321 @@
+# benchmarks/bench_chat_load.py
+"""
+End-to-end load test of POST /api/chat with the local stub LLM
+(services/stub_llm.py), so no OpenAI calls are made.
+
+By default it starts ``uvicorn app.main:app`` in a subprocess with
+ERP_LLM_PROVIDER=stub on a throwaway copy of the sample database. With
+``--url`` it drives an already running server instead; that server should
+run with ERP_LLM_PROVIDER=stub.
+
+Load is either open-loop at a fixed rate (``--rps``; latency counts from the
+scheduled send time, so a stalled server can't hide queueing) or closed-loop
+with ``--concurrency`` clients. Utterances are drawn from a weighted mix of
+greetings, direct-dispatch reads, agent/text-to-SQL questions and writes.
+
+Reports p50/p95/p99 latency, throughput, error rate and "database is
+locked" errors, overall and per utterance kind, and writes them as JSON.
+Pass an earlier file as ``--compare`` to print the differences.
+
+    python -m benchmarks.bench_chat_load --rps 50 --duration 30 --out run.json
+    python -m benchmarks.bench_chat_load --concurrency 64 --llm-latency-ms 800 --compare run.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+SAMPLE_DB = ROOT / "db" / "erp_v2.db"
+
+# (kind, weight, utterances); the agent questions are those of test_text_to_sql.py
+MIX: List[Tuple[str, int, List[str]]] = [
+    ("greeting", 5, ["hello", "hi there", "good morning"]),
+    ("direct", 40, [
+        "List all unpaid invoices",
+        "Show me the aging report for receivables",
+        "List all customers",
+        "show paid invoices",
+        "check stock levels",
+        "how many customers do we have",
+    ]),
+    ("agent", 45, [
+        "Who are our top 5 customers by revenue this quarter",
+        "What’s our average order value this month",
+        "Show me orders placed in the last 30 days",
+        "List all products below their reorder point",
+        "What is the total revenue by product",
+        "Total sales by customer",
+        "Generate a KPI report for August",
+        "Which customers haven’t ordered in 6 months",
+        "Show me sales and finance data for customer ID 102",
+        "List all invoices for customers who ordered inventory last week",
+    ]),
+    ("write", 10, [
+        "Post a payment of 5,000 AED to invoice INV-2025-003",
+        "Receive 50 units of product P-204 from supplier S-11",
+        "Create an invoice for customer 3",
+    ]),
+]
+
+_LOCK_MARKERS = ("database is locked", "database table is locked", "sqlite_busy")
+
+
+def _pct(sorted_ms: List[float], p: float) -> Optional[float]:
+    if not sorted_ms:
+        return None
+    k = max(0, min(len(sorted_ms) - 1, int(round(p / 100 * len(sorted_ms) + 0.5)) - 1))
+    return round(sorted_ms[k], 2)
+
+
+def _latency(ms: List[float]) -> Dict[str, Optional[float]]:
+    ms = sorted(ms)
+    return {
+        "p50": _pct(ms, 50), "p95": _pct(ms, 95), "p99": _pct(ms, 99),
+        "max": round(ms[-1], 2) if ms else None,
+        "mean": round(sum(ms) / len(ms), 2) if ms else None,
+    }
+
+
+class Recorder:
+    def __init__(self):
+        self.samples: List[Tuple[str, float, str]] = []  # (kind, latency_ms, outcome)
+        self.server: Optional[Dict[str, Any]] = None  # /health after the run
+
+    def add(self, kind: str, latency_ms: float, outcome: str) -> None:
+        self.samples.append((kind, latency_ms, outcome))
+
+    def summary(self, elapsed_s: float) -> Dict[str, Any]:
+        def block(samples):
+            outcomes: Dict[str, int] = {}
+            for _, _, o in samples:
+                outcomes[o] = outcomes.get(o, 0) + 1
+            errors = len(samples) - outcomes.get("ok", 0)
+            return {
+                "requests": len(samples),
+                "errors": errors,
+                "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+                "db_lock_errors": outcomes.get("db_locked", 0),
+                "outcomes": outcomes,
+                "latency_ms": _latency([ms for _, ms, o in samples if o == "ok"]),
+            }
+
+        overall = block(self.samples)
+        overall["throughput_rps"] = round(overall["requests"] / elapsed_s, 2) if elapsed_s else 0.0
+        overall["ok_rps"] = round((overall["requests"] - overall["errors"]) / elapsed_s, 2) if elapsed_s else 0.0
+        kinds = sorted({k for k, _, _ in self.samples})
+        overall["by_kind"] = {k: block([s for s in self.samples if s[0] == k]) for k in kinds}
+        return overall
+
+
+def _outcome(status: int, body: str) -> str:
+    lowered = body.lower()
+    if any(m in lowered for m in _LOCK_MARKERS):
+        return "db_locked"
+    if status == 429:
+        return "rejected_429"
+    if status != 200:
+        return f"http_{status}"
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return "bad_json"
+    if payload.get("type") == "error" or str(payload.get("content", "")).startswith("Error processing"):
+        return "payload_error"
+    return "ok"
+
+
+async def _send(client, rec: Recorder, rng: random.Random, users: int, scheduled: float) -> None:
+    kinds, weights = [m[0] for m in MIX], [m[1] for m in MIX]
+    i = rng.choices(range(len(MIX)), weights)[0]
+    kind, message = kinds[i], rng.choice(MIX[i][2])
+    body = {"user_id": f"load-{rng.randrange(users)}", "message": message}
+    try:
+        resp = await client.post("/api/chat", json=body)
+        outcome = _outcome(resp.status_code, resp.text)
+    except Exception as e:
+        outcome = f"transport_{type(e).__name__}"
+    rec.add(kind, (time.perf_counter() - scheduled) * 1000, outcome)
+
+
+async def run_load(url: str, rps: Optional[float], concurrency: int, duration: float, warmup: float,
+                   users: int, seed: int, timeout: float) -> Tuple[Recorder, float]:
+    import httpx
+
+    rng = random.Random(seed)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+        # Warm-up builds the agents and fills caches; not recorded
+        warm = Recorder()
+        end = time.perf_counter() + warmup
+        while time.perf_counter() < end:
+            await asyncio.gather(*(_send(client, warm, rng, users, time.perf_counter()) for _ in range(8)))
+
+        rec = Recorder()
+        start = time.perf_counter()
+        deadline = start + duration
+        if rps:
+            tasks = []
+            n = 0
+            while True:
+                scheduled = start + n / rps
+                if scheduled >= deadline:
+                    break
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                tasks.append(asyncio.create_task(_send(client, rec, rng, users, scheduled)))
+                n += 1
+            await asyncio.gather(*tasks)
+        else:
+            async def worker():
+                while time.perf_counter() < deadline:
+                    await _send(client, rec, rng, users, time.perf_counter())
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        try:
+            server = (await client.get("/health")).json()
+        except Exception:
+            server = None
+    rec.server = server
+    return rec, elapsed
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(db_path: str, latency_ms: float, jitter_ms: float, workers: int) -> Tuple[subprocess.Popen, str]:
+    import httpx
+
+    port = _free_port()
+    env = dict(
+        os.environ,
+        ERP_DB_PATH=db_path,
+        DATABASE_PATH=db_path,
+        ERP_LLM_PROVIDER="stub",
+        ERP_STUB_LLM_LATENCY_MS=str(latency_ms),
+        ERP_STUB_LLM_JITTER_MS=str(jitter_ms),
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT, env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(600):
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with {proc.returncode}")
+        try:
+            if httpx.get(url + "/health", timeout=1).status_code == 200:
+                return proc, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("server did not become healthy within 60 s")
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any]) -> None:
+    b, n = base["summary"], new["summary"]
+    print(f"\nvs {base.get('label') or base.get('started_at')}:")
+    rows = [("throughput_rps", b["throughput_rps"], n["throughput_rps"]),
+            ("error_rate", b["error_rate"], n["error_rate"]),
+            ("db_lock_errors", b["db_lock_errors"], n["db_lock_errors"])]
+    rows += [(f"latency {p}", b["latency_ms"][p], n["latency_ms"][p]) for p in ("p50", "p95", "p99")]
+    for name, old, cur in rows:
+        if old is None or cur is None:
+            print(f"  {name:16s} {old!s:>10} -> {cur!s:>10}")
+            continue
+        change = f"{(cur - old) / old * 100:+7.1f}%" if old else ""
+        print(f"  {name:16s} {old:10.2f} -> {cur:10.2f}  {change}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    load = ap.add_mutually_exclusive_group()
+    load.add_argument("--rps", type=float, help="open loop: requests per second")
+    load.add_argument("--concurrency", type=int, default=32, help="closed loop: concurrent clients")
+    ap.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    ap.add_argument("--warmup", type=float, default=3.0, help="unrecorded seconds first")
+    ap.add_argument("--users", type=int, default=200, help="distinct user_ids")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--timeout", type=float, default=60.0, help="per-request timeout, s")
+    ap.add_argument("--url", help="drive this server instead of starting one")
+    ap.add_argument("--db", default=str(SAMPLE_DB), help="database the started server copies")
+    ap.add_argument("--workers", type=int, default=1, help="uvicorn workers of the started server")
+    ap.add_argument("--llm-latency-ms", type=float, default=300.0)
+    ap.add_argument("--llm-jitter-ms", type=float, default=100.0)
+    ap.add_argument("--label", default="")
+    ap.add_argument("--out", default="chat_load.json", help="results file")
+    ap.add_argument("--compare", help="earlier results file to diff against")
+    args = ap.parse_args()
+
+    proc, tmp = None, None
+    url = args.url
+    try:
+        if url is None:
+            tmp = tempfile.mkdtemp()
+            db = str(Path(tmp) / "load.db")
+            shutil.copy(args.db, db)
+            proc, url = start_server(db, args.llm_latency_ms, args.llm_jitter_ms, args.workers)
+        started_at = datetime.now().isoformat(timespec="seconds")
+        rec, elapsed = asyncio.run(run_load(
+            url, args.rps, args.concurrency, args.duration, args.warmup, args.users, args.seed, args.timeout,
+        ))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(10)
+        if tmp is not None:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    summary = rec.summary(elapsed)
+    result = {
+        "label": args.label,
+        "started_at": started_at,
+        "config": {
+            "mode": "rps" if args.rps else "concurrency",
+            "rps": args.rps,
+            "concurrency": None if args.rps else args.concurrency,
+            "duration_s": args.duration,
+            "users": args.users,
+            "seed": args.seed,
+            "url": args.url,
+            "workers": None if args.url else args.workers,
+            "llm_latency_ms": None if args.url else args.llm_latency_ms,
+            "llm_jitter_ms": None if args.url else args.llm_jitter_ms,
+            "mix": {kind: weight for kind, weight, _ in MIX},
+        },
+        "summary": summary,
+        "server": rec.server,
+    }
+    Path(args.out).write_text(json.dumps(result, indent=2))
+
+    lat = summary["latency_ms"]
+    print(f"{summary['requests']} requests in {elapsed:.1f} s = {summary['throughput_rps']} req/s"
+          f" ({summary['ok_rps']} ok/s), error rate {summary['error_rate']:.2%},"
+          f" db locked {summary['db_lock_errors']}")
+    print(f"latency ms  p50 {lat['p50']}  p95 {lat['p95']}  p99 {lat['p99']}  max {lat['max']}")
+    for kind, b in summary["by_kind"].items():
+        print(f"  {kind:9s} {b['requests']:6d} req  p50 {b['latency_ms']['p50']!s:>8}  p95 {b['latency_ms']['p95']!s:>8}"
+              f"  p99 {b['latency_ms']['p99']!s:>8}  errors {b['errors']} {b['outcomes']}")
+    print(f"results -> {args.out}")
+    if args.compare:
+        compare(json.loads(Path(args.compare).read_text()), result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# benchmarks/bench_db_pool.py
+"""
+Per-call sqlite3.connect vs the pooled ConnectionManager under concurrent
+chat-like load.
+
+Each simulated chat turn does what RouterAgent.process_request does today:
+look up the conversation, save the user message, run a canned read, log the
+tool call and save the reply.
+
+    python -m benchmarks.bench_db_pool --threads 16 --turns 200
+"""
+import argparse
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from core.db import ConnectionManager
+
+SRC_DB = Path(__file__).resolve().parent.parent / "db" / "erp_v2.db"
+
+READ_SQL = """
+SELECT i.id, c.name, i.invoice_number, i.total_amount, i.status
+FROM invoices i JOIN customers c ON c.id = i.customer_id
+WHERE i.status = 'unpaid' ORDER BY i.due_date
+"""
+
+
+class PerCallConnect:
+    """The pre-pool behaviour: a fresh connection for every statement."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @contextmanager
+    def reader(self):
+        with sqlite3.connect(self.path, timeout=5) as conn:
+            yield conn
+        conn.close()
+
+    @contextmanager
+    def writer(self):
+        with sqlite3.connect(self.path, timeout=5) as conn:
+            yield conn
+        conn.close()
+
+    def close(self):
+        pass
+
+
+def chat_turn(db, user_id: str) -> None:
+    with db.writer() as conn:
+        row = conn.execute(
+            "SELECT id FROM conversations WHERE user_id = ? ORDER BY started_at DESC LIMIT 1",
+            (user_id,),
+        ).fetchone()
+        conv_id = row[0] if row else conn.execute(
+            "INSERT INTO conversations (user_id, started_at) VALUES (?, datetime('now'))", (user_id,)
+        ).lastrowid
+    with db.writer() as conn:
+        conn.execute(
+            "INSERT INTO messages (conversation_id, sender, content, created_at) VALUES (?, 'user', 'list unpaid invoices', datetime('now'))",
+            (conv_id,),
+        )
+    with db.reader() as conn:
+        rows = conn.execute(READ_SQL).fetchall()
+    with db.writer() as conn:
+        conn.execute(
+            "INSERT INTO tool_calls (agent, tool_name, input_json, output_json, created_at) VALUES ('finance', 'finance_read', '{}', ?, datetime('now'))",
+            (str(len(rows)),),
+        )
+    with db.writer() as conn:
+        conn.execute(
+            "INSERT INTO messages (conversation_id, sender, content, created_at) VALUES (?, 'finance', ?, datetime('now'))",
+            (conv_id, str(len(rows))),
+        )
+
+
+def run(db, threads: int, turns: int) -> dict:
+    latencies = []
+    errors = []
+    lat_lock = threading.Lock()
+
+    def worker(n: int):
+        local = []
+        for i in range(turns):
+            t0 = time.perf_counter()
+            try:
+                chat_turn(db, f"bench-{n}-{i % 5}")
+            except sqlite3.Error as e:
+                errors.append(str(e))
+            local.append(time.perf_counter() - t0)
+        with lat_lock:
+            latencies.extend(local)
+
+    ts = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    t0 = time.perf_counter()
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    wall = time.perf_counter() - t0
+    latencies.sort()
+    return {
+        "turns_per_s": len(latencies) / wall,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "errors": len(errors),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--threads", type=int, default=16)
+    ap.add_argument("--turns", type=int, default=200, help="chat turns per thread")
+    ap.add_argument("--db", default=str(SRC_DB), help="database to copy for the run")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, factory in (("per-call connect", PerCallConnect), ("pooled (WAL)", ConnectionManager)):
+            path = str(Path(tmp) / f"{label.split()[0]}.db")
+            shutil.copyfile(args.db, path)
+            db = factory(path)
+            try:
+                res = run(db, args.threads, args.turns)
+            finally:
+                db.close()
+            print(
+                f"{label:<18} {res['turns_per_s']:8.0f} turns/s  "
+                f"p50 {res['p50_ms']:6.2f} ms  p95 {res['p95_ms']:6.2f} ms  errors {res['errors']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# benchmarks/bench_encoding.py
+"""
+Encode time and size of a wide table payload in each response encoding
+(services/encoding.py), against what FastAPI did before: jsonable_encoder
+plus stdlib json.dumps. Encodings whose module isn't installed are skipped.
+
+    python -m benchmarks.bench_encoding --rows 100000 --repeat 3
+"""
+import argparse
+import gzip
+import json
+import random
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from services.encoding import ARROW, COLUMNAR, JSON, MSGPACK, available, encode
+
+HEADERS = ["Invoice ID", "Customer", "Invoice #", "Amount", "Paid", "Balance",
+           "Status", "Issue Date", "Due Date", "Days Overdue", "Region", "Notes"]
+
+
+def table(rows: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    data = []
+    for i in range(rows):
+        amount = round(rng.uniform(50, 50_000), 2)
+        paid = round(amount * rng.choice((0, 0, 0.5, 1)), 2)
+        data.append([
+            i + 1,
+            f"Customer {rng.randrange(5000):04d} LLC",
+            f"INV-2025-{i + 1:06d}",
+            amount,
+            paid,
+            round(amount - paid, 2),
+            rng.choice(("unpaid", "partial", "paid")),
+            f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            rng.randrange(0, 120),
+            rng.choice(("UAE", "KSA", "Qatar", "Oman")),
+            None if rng.random() < 0.8 else "disputed",
+        ])
+    return {"type": "table", "headers": HEADERS, "rows": data, "next_cursor": None}
+
+
+def _time(fn, repeat: int):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    payload = table(args.rows)
+    cases = [("fastapi default (jsonable_encoder + json)",
+              lambda: json.dumps(jsonable_encoder(payload), ensure_ascii=False).encode("utf-8"))]
+    for media in (JSON, COLUMNAR, MSGPACK, ARROW):
+        if media in available():
+            cases.append((media, lambda m=media: encode(payload, m)[0]))
+        else:
+            print(f"{media}: skipped, module not installed")
+
+    print(f"{args.rows} rows x {len(HEADERS)} columns, best of {args.repeat}")
+    print(f"{'encoding':45} {'encode ms':>10} {'bytes':>12} {'gzip bytes':>12}")
+    base = None
+    for name, fn in cases:
+        seconds, body = _time(fn, args.repeat)
+        base = base or seconds
+        print(f"{name:45} {seconds * 1000:10.1f} {len(body):12,} {len(gzip.compress(body, 6)):12,}"
+              f"  ({base / seconds:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# benchmarks/bench_import.py
+"""
+Throughput and memory of the streaming importer (db/importer.py). Writes
+synthetic customers/products/orders/order_items/invoices/invoice_lines/
+payments/payment_allocations files (CSV and JSONL, alternating) and imports
+them into a throwaway copy of the sample database, twice: the second run is
+all updates and child replacements, the re-import path.
+
+    python -m benchmarks.bench_import --orders 100000 --chunk 10000 --trace-memory
+"""
+import argparse
+import csv
+import json
+import shutil
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+SAMPLE_DB = Path(__file__).resolve().parent.parent / "db" / "erp_v2.db"
+
+
+def _write(path: Path, rows) -> Path:
+    rows = iter(rows)
+    first = next(rows)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if path.suffix == ".jsonl":
+            for row in (first, *rows):
+                f.write(json.dumps(row) + "\n")
+        else:
+            w = csv.DictWriter(f, fieldnames=list(first))
+            w.writeheader()
+            w.writerow(first)
+            w.writerows(rows)
+    return path
+
+
+def generate(tmp: Path, orders: int) -> dict:
+    customers = max(1, orders // 10)
+    products = 500
+    invoices = orders // 2
+    ck = lambda i: f"C{i % customers}"
+    return {
+        "customers": _write(tmp / "customers.csv", (
+            {"key": f"C{i}", "name": f"Customer {i}", "email": f"c{i}@example.com", "phone": "555-0100"}
+            for i in range(customers))),
+        "products": _write(tmp / "products.csv", (
+            {"sku": f"BENCH-SKU-{i}", "name": f"Product {i}", "price": 5 + i % 50, "description": ""}
+            for i in range(products))),
+        "orders": _write(tmp / "orders.jsonl", (
+            {"key": f"O{i}", "customer_key": ck(i), "total": 29.97, "status": "completed",
+             "created_at": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d} 10:00:00"}
+            for i in range(orders))),
+        "order_items": _write(tmp / "order_items.csv", (
+            {"order_key": f"O{i // 3}", "product_sku": f"BENCH-SKU-{i % products}", "quantity": 1, "price": 9.99}
+            for i in range(orders * 3))),
+        "invoices": _write(tmp / "invoices.jsonl", (
+            {"invoice_number": f"BENCH-INV-{i}", "customer_key": ck(i), "issue_date": "2024-01-01",
+             "due_date": "2024-01-31", "total_amount": 100.0}
+            for i in range(invoices))),
+        "invoice_lines": _write(tmp / "invoice_lines.csv", (
+            {"invoice_number": f"BENCH-INV-{i // 2}", "description": "Service", "quantity": 1, "unit_price": 50.0}
+            for i in range(invoices * 2))),
+        "payments": _write(tmp / "payments.csv", (
+            {"key": f"P{i}", "customer_key": ck(i), "amount": 40.0, "method": "bank_transfer",
+             "received_at": "2024-02-01 09:00:00"}
+            for i in range(invoices))),
+        "payment_allocations": _write(tmp / "payment_allocations.csv", (
+            {"payment_key": f"P{i}", "invoice_number": f"BENCH-INV-{i}", "amount": 40.0}
+            for i in range(invoices))),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--orders", type=int, default=50000, help="orders; other entities scale from this")
+    ap.add_argument("--chunk", type=int, default=10000)
+    ap.add_argument("--trace-memory", action="store_true", help="report peak Python heap (slower)")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        path = str(tmp / "import.db")
+        shutil.copy(SAMPLE_DB, path)
+        files = generate(tmp, args.orders)
+        size_mb = sum(p.stat().st_size for p in files.values()) / 1e6
+
+        from db.importer import Importer
+        from db.migrate import apply_migrations
+
+        apply_migrations(path)
+        importer = Importer(path, chunk_size=args.chunk)
+        for label in ("initial", "re-import"):
+            if args.trace_memory:
+                tracemalloc.start()
+            t0 = time.perf_counter()
+            results = importer.run({k: str(v) for k, v in files.items()})
+            elapsed = time.perf_counter() - t0
+            peak = tracemalloc.get_traced_memory()[1] / 1e6 if args.trace_memory else None
+            tracemalloc.stop()
+            rows = sum(r["rows"] for r in results)
+            print(f"{label:10s} {rows:9d} rows ({size_mb:.1f} MB) in {elapsed:6.2f} s"
+                  f" = {rows / elapsed * 60:11,.0f} rows/min"
+                  + (f"   peak heap {peak:6.1f} MB" if peak is not None else ""))
+            for r in results:
+                print(f"  {r['entity']:20s} {r['rows'] / r['seconds'] * 60:11,.0f} rows/min"
+                      f"   inserted {r['inserted']:8d}  updated {r['updated']:8d}  rejected {r['rejected']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# benchmarks/bench_intent.py
+"""
+Intent classification: the old substring cascade vs the compiled matcher.
+
+Reports accuracy of both on the labeled CORPUS in
+orchestrator/intent_corpus.py and the per-call latency over it.
+
+    python -m benchmarks.bench_intent --rounds 2000
+"""
+import argparse
+import re
+import time
+from typing import Tuple
+
+from orchestrator.intent_corpus import CORPUS
+from orchestrator.intents import classify_intent
+
+
+def legacy_classify_intent(text: str) -> Tuple[str, str, str]:
+    """The substring cascade the compiled matcher replaced, kept for comparison."""
+    tl = text.lower().strip()
+    if any(g in tl for g in ["hi", "hello", "hey", "thanks", "thank you"]):
+        return "general", "none", "greeting"
+    if any(k in tl for k in ["customer", "lead", "order", "ticket", "crm", "sales"]):
+        if any(k in tl for k in ["create", "add", "open", "insert", "update", "new"]):
+            return "sales", "write", "sales_write"
+        return "sales", "read", "sales_read"
+    if (
+        any(k in tl for k in ["invoice", "ledger", "payment", "account", "policy", "finance"])
+        or re.search(r"\b(cash[- ]flow|aging|aging report|aging buckets)\b", tl)
+    ):
+        if any(k in tl for k in ["create", "add", "post", "allocate", "update", "record"]):
+            return "finance", "write", "finance_write"
+        return "finance", "read", "finance_read"
+    if any(k in tl for k in [
+        "stock", "inventory", "supplier", "purchase order", "po", "reorder",
+        "product", "products", "quantity"
+    ]):
+        if any(k in tl for k in ["create", "add", "receive", "update"]):
+            return "inventory", "write", "inventory_write"
+        return "inventory", "read", "inventory_read"
+    if any(k in tl for k in ["report", "kpi", "analytics", "chart", "trend", "glossary"]):
+        return "analytics", "read", "analytics_read"
+    return "unknown", "none", "fallback"
+
+
+def accuracy(fn) -> float:
+    ok = sum(fn(text)[:2] == (module, access) for text, module, access in CORPUS)
+    return ok / len(CORPUS)
+
+
+def per_call_us(fn, rounds: int) -> float:
+    texts = [t for t, _, _ in CORPUS]
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for t in texts:
+            fn(t)
+    return (time.perf_counter() - t0) / (rounds * len(texts)) * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rounds", type=int, default=2000)
+    args = ap.parse_args()
+    for label, fn in (("substring cascade", legacy_classify_intent), ("compiled matcher", classify_intent)):
+        print(f"{label:<18} accuracy {accuracy(fn):6.1%}   {per_call_us(fn, args.rounds):6.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# benchmarks/bench_rag_fts.py
+"""
+Glossary/document lookup: the old LIKE '%q%' scan vs the FTS5 index.
+
+Builds a throwaway database with --rows glossary terms and documents, then
+times rag_definition_tool / policy_rag_tool against the equivalent LIKE
+queries.
+
+    python -m benchmarks.bench_rag_fts --rows 100000
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+MODULES = ["sales", "finance", "inventory", "analytics"]
+SAMPLE_DB = Path(__file__).resolve().parent.parent / "db" / "erp_v2.db"
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice("bcdfghjklmnprstvz") + rng.choice("aeiou") for _ in range(rng.randint(2, 4)))
+
+
+def build(path: str, rows: int, seed: int = 7) -> list:
+    # Start from the sample schema so every migration applies
+    rng = random.Random(seed)
+    vocab = sorted({_word(rng) for _ in range(20000)})
+    shutil.copy(SAMPLE_DB, path)
+    conn = sqlite3.connect(path)
+    conn.executescript("DELETE FROM glossary; DELETE FROM documents;")
+    conn.executemany(
+        "INSERT OR IGNORE INTO glossary VALUES (?, ?, ?)",
+        ((f"{rng.choice(vocab)} {rng.choice(vocab)} {i}", " ".join(rng.choices(vocab, k=12)), rng.choice(MODULES))
+         for i in range(rows)),
+    )
+    conn.executemany(
+        "INSERT INTO documents (module, path, tags) VALUES (?, ?, ?)",
+        ((rng.choice(MODULES), f"data/docs/{rng.choice(vocab)}/{rng.choice(vocab)}_{i}.pdf",
+          ",".join(rng.choices(vocab, k=3) + (["policy"] if i % 20 == 0 else [])))
+         for i in range(rows)),
+    )
+    conn.commit()
+    conn.close()
+    return vocab
+
+
+def timed(fn, queries) -> float:
+    samples = []
+    for q in queries:
+        t0 = time.perf_counter()
+        fn(q)
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--queries", type=int, default=200)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "rag.db")
+        vocab = build(path, args.rows)
+        os.environ["ERP_DB_PATH"] = path
+        from services.rag import _ensure_schema, policy_rag_tool, rag_definition_tool
+
+        t0 = time.perf_counter()
+        _ensure_schema()
+        print(f"index build ({args.rows} rows each): {time.perf_counter() - t0:.2f} s")
+
+        rng = random.Random(1)
+        queries = [rng.choice(vocab) for _ in range(args.queries)]
+        raw = sqlite3.connect(path)
+
+        def like_glossary(q):
+            return raw.execute(
+                "SELECT term, definition, module FROM glossary WHERE module = ? AND "
+                "(LOWER(term) LIKE ? OR LOWER(definition) LIKE ?) LIMIT 5",
+                ("finance", f"%{q}%", f"%{q}%"),
+            ).fetchall()
+
+        def like_policy(q):
+            return raw.execute(
+                "SELECT module, path, tags FROM documents WHERE LOWER(tags) LIKE '%policy%' "
+                "AND LOWER(path) LIKE ? ORDER BY created_at DESC LIMIT 10",
+                (f"%{q}%",),
+            ).fetchall()
+
+        rows = [
+            ("glossary LIKE scan", timed(like_glossary, queries)),
+            ("glossary FTS5 bm25", timed(lambda q: rag_definition_tool(q, module_filter="finance"), queries)),
+            ("glossary FTS5 prefix", timed(lambda q: rag_definition_tool(q[:3], module_filter="finance"), queries)),
+            ("policy LIKE scan", timed(like_policy, queries)),
+            ("policy FTS5 bm25", timed(policy_rag_tool, queries)),
+        ]
+        for label, ms in rows:
+            print(f"{label:<22} p50 {ms:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
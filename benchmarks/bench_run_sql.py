@@ -0,0 +1,109 @@
+# benchmarks/bench_run_sql.py
+"""
+The text-to-SQL result path: the old _run_sql (dedup set of tuples, rows
+copied into lists, intent-guessed headers) vs the QueryResult one (rows as
+fetched, cursor headers), with and without DISTINCT in SQL. Reports time
+per call and memory (tracemalloc peak while building, and what the
+payload keeps) over a wide table in a throwaway database.
+
+    python -m benchmarks.bench_run_sql --rows 100000 --repeat 3
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+SQL = "SELECT * FROM report ORDER BY id"
+
+
+def build(path: str, rows: int) -> None:
+    rng = random.Random(0)
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE report (id INTEGER PRIMARY KEY, customer TEXT, invoice_number TEXT, amount REAL,"
+        " paid REAL, status TEXT, issue_date TEXT, due_date TEXT, days_overdue INTEGER, region TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO report VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            (i, f"Customer {rng.randrange(5000):04d} LLC", f"INV-{i:07d}", round(rng.uniform(50, 5e4), 2),
+             round(rng.uniform(0, 5e4), 2), rng.choice(("paid", "unpaid", "partial")),
+             f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+             f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", rng.randrange(120),
+             rng.choice(("UAE", "KSA", "Qatar", "Oman")))
+            for i in range(1, rows + 1)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def old_run_sql(sql: str, intent: str = ""):
+    # services/text_to_sql._run_sql before QueryResult
+    from services.sql import execute_query
+
+    raw_rows = execute_query(sql) or []
+    seen = set()
+    rows = []
+    for r in raw_rows:
+        row_tuple = tuple(r.values()) if isinstance(r, dict) else tuple(r)
+        if row_tuple not in seen:
+            seen.add(row_tuple)
+            if isinstance(r, dict):
+                rows.append(list(r.values()))
+            elif isinstance(r, (list, tuple)):
+                rows.append(list(r))
+            else:
+                rows.append(list(r))
+    headers = [f"col_{i}" for i in range(len(rows[0]))] if rows else []
+    return {"type": "table", "headers": headers, "rows": rows}
+
+
+def _measure(fn, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    payload = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    kept = sum(s.size_diff for s in tracemalloc.take_snapshot().compare_to(before, "filename"))
+    tracemalloc.stop()
+    return best, peak, kept, payload
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "report.db")
+        build(path, args.rows)
+        os.environ["ERP_DB_PATH"] = path
+        # Not an ERP schema: no slow_queries table to log into
+        os.environ["ERP_SLOW_QUERY_MS"] = "1e12"
+        from services.text_to_sql import _run_sql
+
+        cases = [
+            ("old: python dedup + list rows", lambda: old_run_sql(SQL)),
+            ("new: QueryResult", lambda: _run_sql(SQL)),
+            ("new: QueryResult + DISTINCT in SQL", lambda: _run_sql(SQL, distinct=True)),
+        ]
+        print(f"{args.rows} rows x 10 columns, best of {args.repeat}")
+        print(f"{'path':38} {'ms':>9} {'peak MB':>9} {'kept MB':>9}")
+        for name, fn in cases:
+            seconds, peak, kept, payload = _measure(fn, args.repeat)
+            assert len(payload["rows"]) == args.rows, name
+            print(f"{name:38} {seconds * 1000:9.1f} {peak / 2**20:9.1f} {kept / 2**20:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
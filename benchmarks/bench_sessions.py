@@ -0,0 +1,68 @@
+# benchmarks/bench_sessions.py
+"""
+Memory per user: four LangChain executors per user (the old RouterAgent)
+vs shared per-domain executors plus one bounded memory per conversation.
+
+A fake LLM answers every call, so no API key or network is used.
+
+    python -m benchmarks.bench_sessions --users 2000
+"""
+import argparse
+import os
+import tracemalloc
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+from langchain_community.llms.fake import FakeListLLM  # noqa: E402
+
+import orchestrator.router_agent as ra  # noqa: E402
+from services.llm import get_llm, set_llm  # noqa: E402
+from core.memory import SessionStore  # noqa: E402
+from langchain.agents import AgentType, initialize_agent  # noqa: E402
+
+
+def measure(label: str, fn, users: int) -> None:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    keep = fn(users)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    grown = sum(s.size_diff for s in after.compare_to(before, "filename"))
+    print(f"{label:<28} {users} users: {grown / 1e6:8.1f} MB  ({grown / users / 1024:6.1f} KiB/user)")
+    del keep
+
+
+def per_user_executors(users: int):
+    agents = {}
+    for u in range(users):
+        agents[u] = {
+            module: initialize_agent(
+                tools=build(), llm=get_llm(), agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+                memory=ra._new_memory(), verbose=False, handle_parsing_errors=True,
+            )
+            for module, build in ra._DOMAIN_TOOLS.items()
+        }
+    return agents
+
+
+def shared_executors(users: int):
+    store = SessionStore(ra._new_memory, max_sessions=users)
+    for module in ra._DOMAIN_TOOLS:
+        ra.get_domain_agent(module)
+    for u in range(users):
+        memory = store.get((u, "sales"))
+        memory.save_context({"input": "top customers by revenue"}, {"output": "done"})
+    return store
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--users", type=int, default=2000)
+    args = ap.parse_args()
+    set_llm(FakeListLLM(responses=["Final Answer: done"]))
+    measure("per-user executors (old)", per_user_executors, args.users)
+    measure("shared executors + sessions", shared_executors, args.users)
+
+
+if __name__ == "__main__":
+    main()
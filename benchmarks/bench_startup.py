@@ -0,0 +1,58 @@
+# benchmarks/bench_startup.py
+"""
+Cold start: import app.main, run the lifespan startup and answer /health,
+each in a fresh interpreter (what a new or recycled uvicorn worker pays).
+
+    python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_CHILD = r"""
+import json, time
+t0 = time.perf_counter()
+import app.main
+t_import = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    t_startup = time.perf_counter()
+    client.get("/health").raise_for_status()
+    t_ready = time.perf_counter()
+print(json.dumps({"import": t_import - t0, "startup": t_startup - t_import, "ready": t_ready - t0}))
+"""
+
+
+def run_once(env: dict) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--no-key", action="store_true", help="unset OPENAI_API_KEY in the child")
+    args = ap.parse_args()
+
+    env = dict(os.environ)
+    if args.no_key:
+        env.pop("OPENAI_API_KEY", None)
+    else:
+        env.setdefault("OPENAI_API_KEY", "sk-bench")
+    run_once(env)  # warm the OS page cache / bytecode
+    samples = [run_once(env) for _ in range(args.runs)]
+    for key in ("import", "startup", "ready"):
+        values = [s[key] * 1000 for s in samples]
+        print(f"{key:<8} p50 {statistics.median(values):8.1f} ms   min {min(values):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
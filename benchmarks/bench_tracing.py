@@ -0,0 +1,79 @@
+# benchmarks/bench_tracing.py
+"""
+Cost of the in-process tracing (core/tracing.py): nanoseconds per span,
+spans per /api/chat turn, and the resulting share of a direct-route turn
+against the sample database.
+
+    python -m benchmarks.bench_tracing --spans 200000 --turns 200
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+SAMPLE_DB = Path(__file__).resolve().parent.parent / "db" / "erp_v2.db"
+
+
+def per_span_ns(n: int) -> float:
+    from core.tracing import Trace, _current, traced
+
+    def noop():
+        return None
+
+    wrapped = traced("bench.noop")(noop)
+    token = _current.set(Trace())
+    try:
+        t0 = time.perf_counter()
+        for _ in range(n):
+            noop()
+        plain = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for _ in range(n):
+            wrapped()
+        spanned = time.perf_counter() - t0
+    finally:
+        _current.reset(token)
+    return (spanned - plain) / n * 1e9
+
+
+def chat_turns(turns: int):
+    """(mean turn seconds, mean spans per turn) for a direct-route request."""
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    client = TestClient(app)
+    body = {"user_id": "bench", "message": "show unpaid invoices"}
+    client.post("/api/chat", json=body)  # warm up
+    spans = 0
+    t0 = time.perf_counter()
+    for _ in range(turns):
+        resp = client.post("/api/chat", json=body)
+        for part in resp.headers.get("server-timing", "").split(", "):
+            name, _, rest = part.partition(";")
+            if name and name != "total":
+                spans += int(rest.split('desc="x', 1)[1].rstrip('"')) if 'desc="x' in rest else 1
+    return (time.perf_counter() - t0) / turns, spans / turns
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--spans", type=int, default=200_000)
+    ap.add_argument("--turns", type=int, default=200)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "erp.db")
+        shutil.copy(SAMPLE_DB, path)
+        os.environ["ERP_DB_PATH"] = path
+        ns = per_span_ns(args.spans)
+        print(f"span overhead: {ns:.0f} ns")
+        turn, spans = chat_turns(args.turns)
+    share = spans * ns / 1e9 / turn * 100
+    print(f"chat turn: {turn * 1000:.2f} ms, {spans:.1f} spans -> tracing {share:.3f}% of the turn")
+
+
+if __name__ == "__main__":
+    main()
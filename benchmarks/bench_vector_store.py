@@ -0,0 +1,80 @@
+# benchmarks/bench_vector_store.py
+"""
+VectorStore at scale: flat batched scan vs the IVF index.
+
+Fills a memory-mapped store with --rows clustered unit vectors, times a
+flat top-k scan, builds the IVF index and reports its p50 query latency
+and recall@k against the flat result. Also times an incremental
+upsert/delete batch after the build.
+
+    python -m benchmarks.bench_vector_store --rows 1000000
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from services.vector_store import VectorStore
+
+
+def clustered(rng: np.random.Generator, centers: np.ndarray, n: int, noise: float = 0.35) -> np.ndarray:
+    vecs = centers[rng.integers(0, len(centers), n)] + noise * rng.standard_normal((n, centers.shape[1]), dtype=np.float32)
+    vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+    return vecs
+
+
+def timed(fn, queries) -> list:
+    out, samples = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        out.append(fn(q))
+        samples.append(time.perf_counter() - t0)
+    return out, statistics.median(samples) * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--dim", type=int, default=256)
+    ap.add_argument("--queries", type=int, default=100)
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--nprobe", type=int, default=8)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((2000, args.dim), dtype=np.float32)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = VectorStore(args.dim, path=tmp, capacity=args.rows)
+        t0 = time.perf_counter()
+        for s in range(0, args.rows, 100_000):
+            n = min(100_000, args.rows - s)
+            store.upsert([str(i) for i in range(s, s + n)], clustered(rng, centers, n))
+        print(f"load {args.rows} x {args.dim}: {time.perf_counter() - t0:.1f} s")
+
+        queries = clustered(rng, centers, args.queries)
+        flat, flat_ms = timed(lambda q: store.search(q, k=args.k)[0], queries[:10])
+        print(f"flat scan          p50 {flat_ms:8.2f} ms")
+
+        t0 = time.perf_counter()
+        store.build_index()
+        print(f"IVF build ({len(store._centroids)} lists): {time.perf_counter() - t0:.1f} s")
+
+        exact = [store._search_flat(q[None, :], args.k, None)[0] for q in queries]
+        ivf, ivf_ms = timed(lambda q: store.search(q, k=args.k, nprobe=args.nprobe)[0], queries)
+        recall = np.mean([
+            len({k for k, _ in a} & {k for k, _ in b}) / args.k for a, b in zip(ivf, exact)
+        ])
+        print(f"IVF nprobe={args.nprobe:<3}     p50 {ivf_ms:8.2f} ms   recall@{args.k} {recall:.3f}")
+
+        t0 = time.perf_counter()
+        store.delete([str(i) for i in range(0, 1000)])
+        store.upsert([f"new-{i}" for i in range(1000)], clustered(rng, centers, 1000))
+        print(f"incremental 1k delete + 1k upsert: {(time.perf_counter() - t0) * 1000:.1f} ms")
+        _, ivf_ms = timed(lambda q: store.search(q, k=args.k, nprobe=args.nprobe)[0], queries)
+        print(f"IVF after update   p50 {ivf_ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+# conftest.py
+"""
+Tests run against a scratch copy of the sample database, never the tracked
+db/erp_v2.db: opening it switches it to WAL, migrations add tables and the
+audit writer inserts conversations and messages.
+
+Modules read ``ERP_DB_PATH`` (and app/db.py ``DATABASE_PATH``) once, at
+import, so the copy is made and the variables set here, before any test
+module is collected.
+"""
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+SAMPLE_DB = Path(__file__).resolve().parent / "db" / "erp_v2.db"
+
+_TMP_DIR = tempfile.mkdtemp(prefix="erp-test-")
+TEST_DB = os.path.join(_TMP_DIR, "erp_v2.db")
+shutil.copyfile(SAMPLE_DB, TEST_DB)
+os.environ["ERP_DB_PATH"] = TEST_DB
+os.environ["DATABASE_PATH"] = TEST_DB
+
+
+@pytest.fixture(scope="session", autouse=True)
+def scratch_db():
+    """The scratch database path; removed, with its -wal/-shm, after the run."""
+    yield TEST_DB
+    from core.db import close_all
+    from services.audit import shutdown_audit_writer
+
+    shutdown_audit_writer()
+    close_all()
+    shutil.rmtree(_TMP_DIR, ignore_errors=True)
@@ -8,3 +8,70 @@ DB_PATH = os.getenv("ERP_DB_PATH", "db/erp_v2.db")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
 OPENAI_TEMPERATURE = float(os.getenv("OPENAI_TEMPERATURE", "0"))
+# "stub": scripted local model with a simulated delay (see services/stub_llm.py)
+LLM_PROVIDER = os.getenv("ERP_LLM_PROVIDER", "openai")
+STUB_LLM_LATENCY_MS = float(os.getenv("ERP_STUB_LLM_LATENCY_MS", "300"))
+STUB_LLM_JITTER_MS = float(os.getenv("ERP_STUB_LLM_JITTER_MS", "100"))
+
+# In-process spans, /metrics and Server-Timing (see core/tracing.py)
+TRACING_ENABLED = os.getenv("ERP_TRACING_ENABLED", "1") == "1"
+
+# SQLite connection manager tuning (see core/db.py)
+DB_READ_POOL_SIZE = int(os.getenv("ERP_DB_READ_POOL_SIZE", "8"))
+DB_BUSY_TIMEOUT_MS = int(os.getenv("ERP_DB_BUSY_TIMEOUT_MS", "5000"))
+# How long reader() waits for a pooled connection before giving up
+DB_POOL_TIMEOUT_MS = int(os.getenv("ERP_DB_POOL_TIMEOUT_MS", "10000"))
+DB_CACHED_STATEMENTS = int(os.getenv("ERP_DB_CACHED_STATEMENTS", "256"))
+DB_MMAP_SIZE = int(os.getenv("ERP_DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+DB_EXECUTOR_WORKERS = int(os.getenv("ERP_DB_EXECUTOR_WORKERS", str(DB_READ_POOL_SIZE)))
+
+# Query timing and the slow-query log (see services/query_log.py)
+SLOW_QUERY_MS = float(os.getenv("ERP_SLOW_QUERY_MS", "250"))
+QUERY_LOG_MAX_FINGERPRINTS = int(os.getenv("ERP_QUERY_LOG_MAX_FINGERPRINTS", "2000"))
+
+# Limits for LLM-generated and passthrough SQL (see services/sql_governor.py)
+SQL_MAX_VM_STEPS = int(os.getenv("ERP_SQL_MAX_VM_STEPS", "200000000"))
+SQL_TIMEOUT_MS = float(os.getenv("ERP_SQL_TIMEOUT_MS", "5000"))
+SQL_MAX_ROWS = int(os.getenv("ERP_SQL_MAX_ROWS", "10000"))
+
+# Background audit writer (see services/audit.py)
+AUDIT_QUEUE_SIZE = int(os.getenv("ERP_AUDIT_QUEUE_SIZE", "10000"))
+AUDIT_FLUSH_INTERVAL_MS = int(os.getenv("ERP_AUDIT_FLUSH_INTERVAL_MS", "200"))
+AUDIT_BATCH_SIZE = int(os.getenv("ERP_AUDIT_BATCH_SIZE", "500"))
+
+# text_to_sql result cache (see services/result_cache.py)
+RESULT_CACHE_TTL_S = float(os.getenv("ERP_RESULT_CACHE_TTL_S", "300"))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("ERP_RESULT_CACHE_MAX_ENTRIES", "1024"))
+RESULT_CACHE_MAX_BYTES = int(os.getenv("ERP_RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Keyset pagination of table payloads (see services/pagination.py)
+TABLE_PAGE_SIZE = int(os.getenv("ERP_TABLE_PAGE_SIZE", "500"))
+TABLE_PAGE_SIZE_MAX = int(os.getenv("ERP_TABLE_PAGE_SIZE_MAX", "5000"))
+
+# Semantic retrieval for RAG tools (see services/vector_store.py)
+RAG_VECTOR_ENABLED = os.getenv("ERP_RAG_VECTOR_ENABLED", "1") == "1"
+RAG_EMBEDDER = os.getenv("ERP_RAG_EMBEDDER", "hashing")
+RAG_VECTOR_DIR = os.getenv("ERP_RAG_VECTOR_DIR", "")  # empty: rebuilt per process
+RAG_VECTOR_MIN_SCORE = float(os.getenv("ERP_RAG_VECTOR_MIN_SCORE", "0.2"))
+# Synced vector_changes rows are kept this long so other processes can catch up
+RAG_VECTOR_CHANGES_RETENTION_S = float(os.getenv("ERP_RAG_VECTOR_CHANGES_RETENTION_S", "3600"))
+
+# Per-conversation agent memory (see core/memory.py)
+SESSION_MAX = int(os.getenv("ERP_SESSION_MAX", "50000"))
+SESSION_IDLE_TTL_S = float(os.getenv("ERP_SESSION_IDLE_TTL_S", "1800"))
+
+# Async chat admission control (see app/api/chat.py)
+CHAT_MAX_INFLIGHT = int(os.getenv("ERP_CHAT_MAX_INFLIGHT", "512"))
+CHAT_RETRY_AFTER_S = int(os.getenv("ERP_CHAT_RETRY_AFTER_S", "2"))
+# Tables with at least this many rows are encoded on the DB executor, not the event loop
+CHAT_ENCODE_OFFLOAD_ROWS = int(os.getenv("ERP_CHAT_ENCODE_OFFLOAD_ROWS", "1000"))
+
+# Accounts-receivable aging (see domain/finance/receivables.py)
+AR_REBUCKET_ENABLED = os.getenv("ERP_AR_REBUCKET_ENABLED", "1") == "1"
+AR_REBUCKET_AT = os.getenv("ERP_AR_REBUCKET_AT", "02:00")  # local HH:MM, daily
+
+# Bulk write endpoints (see app/api/bulk.py)
+BULK_MAX_ITEMS = int(os.getenv("ERP_BULK_MAX_ITEMS", "5000"))
+
+# Streaming CSV/JSONL importer (see db/importer.py)
+IMPORT_CHUNK_SIZE = int(os.getenv("ERP_IMPORT_CHUNK_SIZE", "10000"))
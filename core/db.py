@@ -1,22 +1,253 @@
 # core/db.py
+import asyncio
+import contextvars
+import functools
 import os
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from core import config
+from core.config import (
+    DB_BUSY_TIMEOUT_MS,
+    DB_CACHED_STATEMENTS,
+    DB_EXECUTOR_WORKERS,
+    DB_MMAP_SIZE,
+    DB_POOL_TIMEOUT_MS,
+    DB_READ_POOL_SIZE,
+)
 
 # Same env‑driven path as app/db.py
 DB_PATH = os.getenv("DATABASE_PATH", "/app/db/erp_v2.db")
 
+
+class PoolTimeout(sqlite3.OperationalError):
+    """No pooled read connection came free in time."""
+
+
+class ConnectionManager:
+    """
+    Shared SQLite access for one database file.
+
+    - one writer connection (WAL mode), serialized by a lock
+    - a bounded pool of read-only connections for SELECTs
+
+    Connections are opened lazily and reused for the life of the process.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        read_pool_size: int = DB_READ_POOL_SIZE,
+        busy_timeout_ms: int = DB_BUSY_TIMEOUT_MS,
+        cached_statements: int = DB_CACHED_STATEMENTS,
+        mmap_size: int = DB_MMAP_SIZE,
+        pool_timeout_ms: int = DB_POOL_TIMEOUT_MS,
+    ):
+        self.db_path = str(db_path)
+        self.read_pool_size = max(1, read_pool_size)
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        self.mmap_size = mmap_size
+        self.pool_timeout_ms = pool_timeout_ms
+
+        self._lock = threading.Lock()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._write_lock = threading.RLock()
+        self._write_depth = 0
+        self._readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._readers_opened = 0
+        self._closed = False
+
+    # ---------- connection setup ----------
+    def _configure(self, conn: sqlite3.Connection) -> sqlite3.Connection:
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        return conn
+
+    def _writer_conn(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("ConnectionManager is closed")
+            if self._writer is None:
+                conn = sqlite3.connect(
+                    self.db_path,
+                    timeout=self.busy_timeout_ms / 1000,
+                    check_same_thread=False,
+                    cached_statements=self.cached_statements,
+                )
+                # journal_mode is persistent; readers rely on it being set first
+                conn.execute("PRAGMA journal_mode = WAL")
+                self._writer = self._configure(conn)
+            return self._writer
+
+    def _open_reader(self) -> sqlite3.Connection:
+        self._writer_conn()
+        uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+        conn = sqlite3.connect(
+            uri,
+            uri=True,
+            timeout=self.busy_timeout_ms / 1000,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        return self._configure(conn)
+
+    # ---------- public API ----------
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a read-only connection from the pool. With all of them in use,
+        waits up to ``pool_timeout_ms`` for one and then raises ``PoolTimeout``
+        rather than hanging the thread behind a leaked or stuck reader.
+        """
+        conn = None
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._readers_opened < self.read_pool_size
+                if can_open:
+                    self._readers_opened += 1
+            if can_open:
+                try:
+                    conn = self._open_reader()
+                except Exception:
+                    with self._lock:
+                        self._readers_opened -= 1
+                    raise
+            else:
+                try:
+                    conn = self._readers.get(timeout=self.pool_timeout_ms / 1000)
+                except queue.Empty:
+                    raise PoolTimeout(
+                        f"No read connection came free within {self.pool_timeout_ms / 1000:g} s "
+                        f"(all {self.read_pool_size} in use); a reader may be leaked or stuck."
+                    ) from None
+        try:
+            yield conn
+        finally:
+            if self._closed:
+                conn.close()
+            else:
+                self._readers.put(conn)
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """
+        Exclusive access to the writer connection. Commits on success and
+        rolls back on error, like ``with sqlite3.connect(...)`` did. Nested
+        use on the same thread joins the outer transaction.
+        """
+        conn = self._writer_conn()
+        with self._write_lock:
+            self._write_depth += 1
+            try:
+                yield conn
+            except BaseException:
+                if self._write_depth == 1:
+                    conn.rollback()
+                raise
+            else:
+                if self._write_depth == 1:
+                    conn.commit()
+            finally:
+                self._write_depth -= 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "readers_open": self._readers_opened,
+            "readers_idle": self._readers.qsize(),
+            "read_pool_size": self.read_pool_size,
+        }
+
+    def close(self) -> None:
+        # lock order matches writer(): write lock first, then the state lock
+        with self._write_lock, self._lock:
+            self._closed = True
+            while True:
+                try:
+                    self._readers.get_nowait().close()
+                except queue.Empty:
+                    break
+            self._readers_opened = 0
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+
+_managers: Dict[str, ConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_manager(db_path: Optional[str] = None) -> ConnectionManager:
+    """Return the process-wide ConnectionManager for ``db_path``."""
+    if db_path is None:
+        db_path = config.DB_PATH
+    key = str(Path(db_path).resolve())
+    mgr = _managers.get(key)
+    if mgr is None:
+        with _managers_lock:
+            mgr = _managers.get(key)
+            if mgr is None:
+                mgr = ConnectionManager(db_path)
+                _managers[key] = mgr
+    return mgr
+
+
+def close_all() -> None:
+    with _managers_lock:
+        for mgr in _managers.values():
+            mgr.close()
+        _managers.clear()
+
+
+# Blocking DB work from async handlers runs here, not on the event loop or
+# the shared default executor; sized like the read pool so it can't oversubscribe it.
+_db_executor: Optional[ThreadPoolExecutor] = None
+_db_executor_lock = threading.Lock()
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    global _db_executor
+    if _db_executor is None:
+        with _db_executor_lock:
+            if _db_executor is None:
+                _db_executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="erp-db")
+    return _db_executor
+
+
+async def run_db(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Await ``fn(*args, **kwargs)`` on the bounded DB executor, in a copy of
+    the caller's context (so the request's trace follows the work).
+    """
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(get_db_executor(), functools.partial(ctx.run, fn, *args, **kwargs))
+
+
+def shutdown_db_executor() -> None:
+    global _db_executor
+    with _db_executor_lock:
+        if _db_executor is not None:
+            _db_executor.shutdown(wait=True)
+            _db_executor = None
+
+
 def execute_query(query):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    mgr = get_manager(DB_PATH)
     try:
-        cursor.execute(query)
         if query.strip().lower().startswith("select"):
-            result = cursor.fetchall()
-        else:
-            conn.commit()
-            result = "Query executed successfully"
-        return result
+            with mgr.reader() as conn:
+                return conn.execute(query).fetchall()
+        with mgr.writer() as conn:
+            conn.execute(query)
+        return "Query executed successfully"
     except Exception as e:
         return f"Error executing query: {str(e)}"
-    finally:
-        conn.close()
@@ -0,0 +1,40 @@
+# core/lazy.py
+import threading
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Lazy(Generic[T]):
+    """
+    Builds a value on first ``get()`` and returns the same one afterwards.
+    Thread-safe: concurrent first callers wait for a single build. A failed
+    build is not cached, so the next call retries.
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._value: Optional[T] = None
+        self._built = False
+
+    @property
+    def built(self) -> bool:
+        return self._built
+
+    def get(self) -> T:
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self._value = self._factory()
+                    self._built = True
+        return self._value
+
+    def set(self, value: T) -> None:
+        """Use ``value`` instead of building one (tests, benchmarks, stubs)."""
+        with self._lock:
+            self._value, self._built = value, True
+
+    def reset(self) -> None:
+        with self._lock:
+            self._value, self._built = None, False
@@ -1,14 +1,19 @@
 # core/memory.py
-from collections import deque
-from typing import Dict, List
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from core.config import SESSION_IDLE_TTL_S, SESSION_MAX
 
 class MemoryStore:
     def __init__(self, k: int = 5):
+        self.k = k
         self.buffers: Dict[str, deque] = {}
         self.last_domain: Dict[str, str] = {}
 
     def add_message(self, conv_id: str, sender: str, content: str):
-        buf = self.buffers.setdefault(conv_id, deque(maxlen=2*k))
+        buf = self.buffers.setdefault(conv_id, deque(maxlen=2*self.k))
         buf.append({"sender": sender, "content": content})
 
     def get_window(self, conv_id: str) -> List[dict]:
@@ -19,3 +24,90 @@ class MemoryStore:
 
     def get_last_domain(self, conv_id: str) -> str:
         return self.last_domain.get(conv_id)
+
+
+def _message_bytes(memory: Any) -> int:
+    # Rough payload size of a LangChain chat memory: the text of its messages
+    messages = getattr(getattr(memory, "chat_memory", None), "messages", None) or []
+    return sum(len(str(getattr(m, "content", m)).encode("utf-8")) for m in messages)
+
+
+class SessionStore:
+    """
+    Per-conversation memory objects, bounded two ways: at most ``max_sessions``
+    live (least recently used evicted first) and none idle for longer than
+    ``idle_ttl_s``. ``factory`` builds the memory for a new session.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        max_sessions: int = SESSION_MAX,
+        idle_ttl_s: float = SESSION_IDLE_TTL_S,
+        sizer: Callable[[Any], int] = _message_bytes,
+    ):
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.idle_ttl_s = idle_ttl_s
+        self.sizer = sizer
+        self._lock = threading.Lock()
+        # key -> (memory, last_used); oldest first
+        self._sessions: "OrderedDict[Hashable, list]" = OrderedDict()
+        self.created = 0
+        self.evicted_lru = 0
+        self.evicted_idle = 0
+
+    def _expire(self, now: float) -> None:
+        while self._sessions:
+            key, (_, last_used) = next(iter(self._sessions.items()))
+            if now - last_used <= self.idle_ttl_s:
+                break
+            self._sessions.popitem(last=False)
+            self.evicted_idle += 1
+
+    def get(self, key: Hashable) -> Any:
+        """The memory for ``key``, created on first use; marks it most recently used."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            entry = self._sessions.get(key)
+            if entry is not None:
+                entry[1] = now
+                self._sessions.move_to_end(key)
+                return entry[0]
+            memory = self.factory()
+            self._sessions[key] = [memory, now]
+            self.created += 1
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evicted_lru += 1
+            return memory
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._sessions.get(key)
+            return entry[0] if entry else None
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._sessions.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._expire(time.monotonic())
+            memories = [entry[0] for entry in self._sessions.values()]
+            live = len(memories)
+            created, lru, idle = self.created, self.evicted_lru, self.evicted_idle
+        total = sum(self.sizer(m) for m in memories)
+        return {
+            "live_sessions": live,
+            "max_sessions": self.max_sessions,
+            "bytes_total": total,
+            "bytes_per_session": round(total / live, 1) if live else 0.0,
+            "created": created,
+            "evicted_lru": lru,
+            "evicted_idle": idle,
+        }
@@ -0,0 +1,223 @@
+# core/tracing.py
+"""
+In-process request tracing: named spans aggregated into Prometheus
+histograms (served at /metrics) and, per HTTP request, summed into a
+``Server-Timing`` header. Nothing is exported; no collector is needed.
+
+A span costs two ``perf_counter`` calls, a bisect over the bucket bounds and
+two uncontended locks: a few microseconds, well under 1% of a chat turn
+(benchmarks/bench_tracing.py). The current request's trace lives in a
+context variable, which ``core.db.run_db`` carries into the DB executor, so
+spans in tools and queries count toward the request that caused them.
+
+    with span("db.query"):
+        ...
+
+    @traced("classify_intent")
+    def classify_intent(text): ...
+"""
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from core.config import TRACING_ENABLED
+
+# Seconds; the last bucket is +Inf
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Prometheus-style histogram, one series per label tuple."""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str], buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, values: Tuple[str, ...], seconds: float) -> None:
+        i = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(values)
+            if series is None:
+                series = self._series[values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += seconds
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(k, list(v[0]), v[1]) for k, v in sorted(self._series.items())]
+        for values, counts, total in snapshot:
+            base = ",".join(f'{l}="{_escape(v)}"' for l, v in zip(self.labels, values))
+            sep = "," if base else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{le}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{base}}} {total:.6f}")
+            lines.append(f"{self.name}_count{{{base}}} {cumulative}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+SPAN_SECONDS = Histogram("erp_span_duration_seconds", "Time spent in traced operations.", ["span"])
+REQUEST_SECONDS = Histogram(
+    "erp_http_request_duration_seconds", "HTTP request duration until the response starts.",
+    ["method", "route", "status"],
+)
+
+# Extra gauges for /metrics: name -> (help, callable returning a number)
+_GAUGES: Dict[str, Tuple[str, Callable[[], float]]] = {}
+
+
+def register_gauge(name: str, help: str, fn: Callable[[], float]) -> None:
+    _GAUGES[name] = (help, fn)
+
+
+class Trace:
+    """Per-request totals: span name -> [count, seconds]."""
+
+    __slots__ = ("spans", "_lock")
+
+    def __init__(self):
+        self.spans: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            entry = self.spans.get(name)
+            if entry is None:
+                self.spans[name] = [1, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+
+    def server_timing(self, total: Optional[float] = None) -> str:
+        with self._lock:
+            items = list(self.spans.items())
+        parts = [
+            f'{name};dur={seconds * 1000:.2f}' + (f';desc="x{int(count)}"' if count > 1 else "")
+            for name, (count, seconds) in items
+        ]
+        if total is not None:
+            parts.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[Optional[Trace]] = ContextVar("erp_trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    if not TRACING_ENABLED:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t0
+        SPAN_SECONDS.observe((name,), dt)
+        trace = _current.get()
+        if trace is not None:
+            trace.add(name, dt)
+
+
+def traced(name: str):
+    """Decorator: run the function inside ``span(name)``."""
+    def wrap(fn):
+        if not TRACING_ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                dt = time.perf_counter() - t0
+                SPAN_SECONDS.observe((name,), dt)
+                trace = _current.get()
+                if trace is not None:
+                    trace.add(name, dt)
+        return inner
+    return wrap
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format (0.0.4)."""
+    lines = SPAN_SECONDS.expose() + REQUEST_SECONDS.expose()
+    for name, (help, fn) in sorted(_GAUGES.items()):
+        try:
+            value = float(fn())
+        except Exception:
+            continue
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} gauge", f"{name} {value}"]
+    return "\n".join(lines) + "\n"
+
+
+def _route_template(scope) -> str:
+    # "/api/chat", not the raw path: keeps label cardinality bounded
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    template = getattr(route, "path", "")
+    # An included router's route only knows its own path ("/leads"), not the
+    # prefix; take that from the request path, one segment per template segment
+    if ":path}" in template:
+        return template
+    depth = template.count("/")
+    path = scope.get("path", "")
+    if depth and path.count("/") > depth:
+        return path.rsplit("/", depth)[0] + template
+    return template
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware: gives each HTTP request a Trace, records its duration
+    by route template, and adds ``Server-Timing`` with the span totals so
+    far when the response starts. For streamed responses that is before the
+    body, so later spans only reach the histograms.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not TRACING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        trace = Trace()
+        token = _current.set(trace)
+        t0 = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                dt = time.perf_counter() - t0
+                REQUEST_SECONDS.observe((scope["method"], _route_template(scope), str(message["status"])), dt)
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", trace.server_timing(dt).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
@@ -0,0 +1,346 @@
+# db/datagen.py
+"""
+Deterministic synthetic ERP data for benchmarking, in the spirit of TPC-H
+scale factors. Scale factor 1 is ~2M rows. The output is a fresh database
+with the sample database's schema plus all migrations: customers, suppliers,
+products, supplier_products, orders/order_items, invoices/invoice_lines/
+invoice_orders, payments/payment_allocations, purchase_orders/po_items/
+po_receipts, stock_movements and stock.
+
+The same ``--seed``, ``--scale`` and ``--end`` always produce the same rows.
+
+Distributions, roughly:
+- a few customers place most orders and products sell unevenly (power law);
+- prices are log-normal, order volume grows over the date range;
+- each customer has payment terms (15-60 days) and pays late by a
+  customer-specific amount; ~3% of invoices are cancelled, some are paid in
+  two instalments, recent ones are still open;
+- stock_movements hold one sale per order item and one purchase per PO
+  receipt; stock.qty_on_hand is their running total.
+
+    python -m db.datagen --scale 5 --out /tmp/erp_sf5.db     # ~10M rows
+"""
+import argparse
+import math
+import random
+import sqlite3
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from core.logging import logger
+from db.migrate import apply_migrations
+
+SAMPLE_DB = Path(__file__).resolve().parent / "erp_v2.db"
+
+# Rows per table at scale factor 1 (children follow from their parents)
+BASE_COUNTS = {
+    "customers": 15_000,
+    "suppliers": 300,
+    "products": 5_000,
+    "orders": 150_000,
+    "purchase_orders": 7_500,
+}
+
+FIRST_NAMES = [
+    "Ahmed", "Sara", "Laila", "Omar", "Huda", "Ali", "Mona", "Youssef", "Nour", "Karim",
+    "Dina", "Tarek", "Rania", "Hassan", "Salma", "Mahmoud", "Yasmin", "Khaled", "Farah", "Amr",
+]
+LAST_NAMES = [
+    "Nabil", "Fathy", "Samir", "Mostafa", "Ibrahim", "Hassan", "Adel", "Saad", "Zaki", "Kamal",
+    "Fouad", "Lotfy", "Gamal", "Hamdy", "Sherif", "Younis", "Rashad", "Farouk", "Naguib", "Mansour",
+]
+COMPANY_SUFFIXES = ["Ltd", "Solutions", "Trading", "Group", "Co", "Industries"]
+PRODUCT_NOUNS = ["Module", "Tool", "Package", "Sensor", "Cable", "Panel", "Valve", "Kit", "Unit", "Adapter"]
+PRODUCT_GRADES = ["A", "B", "C", "Pro", "Lite", "Max"]
+PAYMENT_METHODS = ["bank_transfer", "bank_transfer", "card", "cash"]
+TERMS_DAYS = [15, 30, 30, 30, 45, 60]
+
+_FLUSH_ROWS = 50_000
+
+
+def _skewed(rng: random.Random, n: int, power: float = 3.0) -> int:
+    # Index in [0, n) with low indexes much more likely (power-law-ish)
+    return min(n - 1, int(n * rng.random() ** power))
+
+
+def _ts(d: datetime) -> str:
+    return d.strftime("%Y-%m-%d %H:%M:%S")
+
+
+class _Writer:
+    """Buffers rows per table and writes them with executemany."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.buffers: Dict[str, List[tuple]] = {}
+        self.sql: Dict[str, str] = {}
+        self.counts: Dict[str, int] = {}
+
+    def table(self, name: str, columns: Sequence[str]) -> None:
+        self.sql[name] = f"INSERT INTO {name} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+        self.buffers[name] = []
+        self.counts[name] = 0
+
+    def add(self, name: str, row: tuple) -> None:
+        buf = self.buffers[name]
+        buf.append(row)
+        if len(buf) >= _FLUSH_ROWS:
+            self.flush(name)
+
+    def flush(self, name: Optional[str] = None) -> None:
+        for table in [name] if name else list(self.buffers):
+            buf = self.buffers[table]
+            if buf:
+                self.conn.executemany(self.sql[table], buf)
+                self.counts[table] += len(buf)
+                buf.clear()
+
+
+class Generator:
+    def __init__(self, scale: float = 1.0, seed: int = 42, end: date = date(2025, 6, 30), years: int = 3):
+        self.scale = scale
+        self.seed = seed
+        self.end = datetime.combine(end, datetime.min.time())
+        self.start = self.end - timedelta(days=365 * years)
+        self.counts = {k: max(1, int(round(v * scale))) for k, v in BASE_COUNTS.items()}
+
+    # ---------- helpers ----------
+    def _when(self, rng: random.Random) -> datetime:
+        # sqrt: volume grows linearly over the range
+        span = (self.end - self.start).total_seconds()
+        return self.start + timedelta(seconds=int(span * math.sqrt(rng.random())))
+
+    def _company(self, rng: random.Random, i: int, suffix: str) -> Tuple[str, str, str]:
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        name = f"{first} {last} {suffix}"
+        email = f"{first.lower()}.{last.lower()}{i}@example.com"
+        phone = f"+20{rng.randrange(10**9, 10**10)}"
+        return name, email, phone
+
+    # ---------- generation ----------
+    def _masters(self, w: _Writer, rng: random.Random) -> None:
+        n_cust, n_sup, n_prod = self.counts["customers"], self.counts["suppliers"], self.counts["products"]
+        w.table("customers", ["id", "name", "email", "phone", "created_at"])
+        # Per customer: payment terms and how late they usually pay
+        self.terms: List[int] = []
+        self.lateness: List[float] = []
+        for i in range(1, n_cust + 1):
+            name, email, phone = self._company(rng, i, rng.choice(COMPANY_SUFFIXES))
+            w.add("customers", (i, name, email, phone, _ts(self.start - timedelta(days=rng.randrange(1, 700)))))
+            self.terms.append(rng.choice(TERMS_DAYS))
+            self.lateness.append(rng.expovariate(1 / 12))
+
+        w.table("suppliers", ["id", "name", "email", "phone"])
+        for i in range(1, n_sup + 1):
+            name, email, phone = self._company(rng, i, "Supplies")
+            w.add("suppliers", (i, name, email, phone))
+
+        w.table("products", ["id", "sku", "name", "price", "description"])
+        w.table("supplier_products", ["supplier_id", "product_id", "lead_time_days", "default_cost"])
+        self.prices: List[float] = []
+        self.product_names: List[str] = []
+        self.product_suppliers: List[List[int]] = []
+        for i in range(1, n_prod + 1):
+            price = round(min(5000.0, rng.lognormvariate(4.0, 0.9)) + 1, 2)
+            name = f"{rng.choice(PRODUCT_NOUNS)} {rng.choice(PRODUCT_GRADES)}{i % 97}"
+            w.add("products", (i, f"SKU-{i:07d}", name, price, rng.choice(["Local product", "Imported product"])))
+            self.prices.append(price)
+            self.product_names.append(name)
+            suppliers = rng.sample(range(1, n_sup + 1), min(n_sup, rng.randint(1, 3)))
+            for s in suppliers:
+                w.add("supplier_products", (s, i, rng.randint(3, 45), round(price * rng.uniform(0.45, 0.75), 2)))
+            self.product_suppliers.append(suppliers)
+        self.qty_on_hand = [rng.randint(50, 500) for _ in range(n_prod)]
+
+    def _sales(self, w: _Writer, rng: random.Random) -> None:
+        n_cust, n_prod = self.counts["customers"], self.counts["products"]
+        w.table("orders", ["id", "customer_id", "total", "status", "created_at"])
+        w.table("order_items", ["order_id", "product_id", "quantity", "price"])
+        w.table("stock_movements", ["product_id", "change_qty", "reason", "ref_id", "created_at"])
+        w.table("invoices", ["id", "customer_id", "invoice_number", "issue_date", "due_date",
+                             "total_amount", "status", "created_at"])
+        w.table("invoice_lines", ["invoice_id", "description", "quantity", "unit_price"])
+        w.table("invoice_orders", ["invoice_id", "order_id"])
+        w.table("payments", ["id", "customer_id", "amount", "method", "received_at"])
+        w.table("payment_allocations", ["payment_id", "invoice_id", "amount"])
+        invoice_id = payment_id = 0
+        end = self.end
+        for order_id in range(1, self.counts["orders"] + 1):
+            customer = _skewed(rng, n_cust, 2.5) + 1
+            created = self._when(rng)
+            age_days = (end - created).days
+            items = []
+            for _ in range(min(12, 1 + int(rng.expovariate(1 / 2.5)))):
+                product = _skewed(rng, n_prod, 2.0)
+                qty = 1 + int(rng.expovariate(1 / 3))
+                price = round(self.prices[product] * rng.choice((1.0, 1.0, 1.0, 0.95, 0.9)), 2)
+                items.append((product, qty, price))
+            total = round(sum(q * p for _, q, p in items), 2)
+            r = rng.random()
+            if r < 0.04:
+                status = "cancelled"
+            elif age_days < 7:
+                status = "pending" if r < 0.6 else "shipped"
+            elif age_days < 30:
+                status = "shipped" if r < 0.7 else "paid"
+            else:
+                status = "paid" if r < 0.9 else "shipped"
+            w.add("orders", (order_id, customer, total, status, _ts(created)))
+            for product, qty, price in items:
+                w.add("order_items", (order_id, product + 1, qty, price))
+                if status != "cancelled":
+                    w.add("stock_movements", (product + 1, -qty, "sale", order_id, _ts(created)))
+                    self.qty_on_hand[product] -= qty
+
+            # ~80% of orders are invoiced, a few days after the order
+            if status == "pending" or rng.random() > 0.8:
+                continue
+            invoice_id += 1
+            issued = created + timedelta(days=rng.randint(0, 3))
+            due = issued + timedelta(days=self.terms[customer - 1])
+            inv_status = "cancelled" if status == "cancelled" else "unpaid"
+            # Payment: terms plus this customer's usual lateness, if that is before `end`
+            paid_at = due + timedelta(days=int(rng.gauss(self.lateness[customer - 1], 5)))
+            instalments: List[Tuple[datetime, float]] = []
+            if inv_status != "cancelled" and rng.random() < 0.93:
+                if rng.random() < 0.1:
+                    first = round(total * rng.choice((0.3, 0.5)), 2)
+                    instalments = [(issued + (paid_at - issued) / 2, first), (paid_at, round(total - first, 2))]
+                else:
+                    instalments = [(paid_at, total)]
+                instalments = [(at, amt) for at, amt in instalments if at <= end and amt > 0]
+                if instalments and sum(a for _, a in instalments) >= total - 0.005:
+                    inv_status = "paid"
+            w.add("invoices", (invoice_id, customer, f"INV-{invoice_id:08d}", issued.strftime("%Y-%m-%d"),
+                               due.strftime("%Y-%m-%d"), total, inv_status, _ts(issued)))
+            w.add("invoice_orders", (invoice_id, order_id))
+            for product, qty, price in items:
+                w.add("invoice_lines", (invoice_id, self.product_names[product], qty, price))
+            for at, amount in instalments:
+                payment_id += 1
+                w.add("payments", (payment_id, customer, amount, rng.choice(PAYMENT_METHODS), _ts(at)))
+                w.add("payment_allocations", (payment_id, invoice_id, amount))
+
+    def _purchasing(self, w: _Writer, rng: random.Random) -> None:
+        n_prod = self.counts["products"]
+        w.table("purchase_orders", ["id", "supplier_id", "status", "created_at"])
+        w.table("po_items", ["po_id", "product_id", "quantity", "unit_cost"])
+        w.table("po_receipts", ["po_id", "product_id", "received_qty", "received_at"])
+        for po_id in range(1, self.counts["purchase_orders"] + 1):
+            product = _skewed(rng, n_prod, 2.0)
+            supplier = rng.choice(self.product_suppliers[product])
+            created = self._when(rng)
+            age_days = (self.end - created).days
+            r = rng.random()
+            if r < 0.03:
+                status = "cancelled"
+            elif age_days < 10:
+                status = "draft" if r < 0.4 else "sent"
+            else:
+                status = "received" if r < 0.95 else "sent"
+            products = {product} | {_skewed(rng, n_prod, 2.0) for _ in range(rng.randint(0, 6))}
+            for p in sorted(products):
+                qty = rng.randint(10, 300)
+                w.add("po_items", (po_id, p + 1, qty, round(self.prices[p] * rng.uniform(0.45, 0.75), 2)))
+                if status == "received":
+                    at = created + timedelta(days=rng.randint(3, 30))
+                    w.add("po_receipts", (po_id, p + 1, qty, _ts(at)))
+                    w.add("stock_movements", (p + 1, qty, "purchase", po_id, _ts(at)))
+                    self.qty_on_hand[p] += qty
+            w.add("purchase_orders", (po_id, supplier, status, _ts(created)))
+
+        w.table("stock", ["product_id", "qty_on_hand", "reorder_point"])
+        for p in range(n_prod):
+            w.add("stock", (p + 1, max(0, self.qty_on_hand[p]), rng.choice((10, 20, 25, 50))))
+
+    def run(self, conn: sqlite3.Connection) -> Dict[str, int]:
+        # One RNG per section: adding rows to one doesn't shift the others
+        w = _Writer(conn)
+        self._masters(w, random.Random(f"{self.seed}:masters"))
+        self._sales(w, random.Random(f"{self.seed}:sales"))
+        self._purchasing(w, random.Random(f"{self.seed}:purchasing"))
+        w.flush()
+        return w.counts
+
+
+def _schema(sample: Path) -> Tuple[List[str], List[str]]:
+    """CREATE TABLE and CREATE INDEX statements of the sample database, minus FTS/virtual tables."""
+    src = sqlite3.connect(f"{sample.resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        plain = {name for name, kind in src.execute("SELECT name, type FROM pragma_table_list WHERE schema = 'main'")
+                 if kind == "table"}
+        rows = src.execute(
+            "SELECT type, tbl_name, sql FROM sqlite_master"
+            " WHERE type IN ('table', 'index') AND sql IS NOT NULL AND name NOT LIKE 'sqlite_%'"
+        ).fetchall()
+    finally:
+        src.close()
+    tables = [sql for kind, tbl, sql in rows if kind == "table" and tbl in plain]
+    indexes = [sql for kind, tbl, sql in rows if kind == "index" and tbl in plain]
+    return tables, indexes
+
+
+def generate(out: str, scale: float = 1.0, seed: int = 42, end: date = date(2025, 6, 30),
+             overwrite: bool = False) -> Dict[str, Any]:
+    """Build a synthetic database at ``out``; returns row counts and timings."""
+    path = Path(out)
+    if path.exists():
+        if not overwrite:
+            raise FileExistsError(f"{out} exists (pass overwrite=True / --force)")
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{out}{suffix}").unlink(missing_ok=True)
+    tables, indexes = _schema(SAMPLE_DB)
+    started = time.perf_counter()
+    conn = sqlite3.connect(out, isolation_level=None)
+    try:
+        # A half-written file is thrown away, so no journal or fsync while loading
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA cache_size = -262144")
+        conn.execute("BEGIN")
+        for sql in tables:
+            conn.execute(sql)
+        counts = Generator(scale, seed, end).run(conn)
+        conn.execute("COMMIT")
+        loaded = time.perf_counter()
+        # Indexes once the data is in: one sort each instead of per-row updates
+        for sql in indexes:
+            conn.execute(sql)
+        conn.execute("PRAGMA journal_mode = WAL")
+    finally:
+        conn.close()
+    # AR balances backfill, query indexes and ANALYZE
+    apply_migrations(out)
+    finished = time.perf_counter()
+    return {
+        "path": out,
+        "scale": scale,
+        "seed": seed,
+        "rows": sum(counts.values()),
+        "counts": counts,
+        "load_seconds": round(loaded - started, 2),
+        "total_seconds": round(finished - started, 2),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--scale", type=float, default=1.0, help="scale factor; 1 is ~2M rows")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--end", type=date.fromisoformat, default=date(2025, 6, 30),
+                    help="last day of generated activity (YYYY-MM-DD)")
+    ap.add_argument("--out", required=True, help="database file to create")
+    ap.add_argument("--force", action="store_true", help="overwrite --out if it exists")
+    args = ap.parse_args()
+    result = generate(args.out, args.scale, args.seed, args.end, overwrite=args.force)
+    for table, n in sorted(result["counts"].items()):
+        print(f"{table:22s} {n:12,d}")
+    print(f"{'total':22s} {result['rows']:12,d} rows, loaded in {result['load_seconds']} s,"
+          f" ready (indexes, AR backfill, ANALYZE) in {result['total_seconds']} s")
+    logger.info(f"[datagen] {result['rows']} rows at scale {args.scale} -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
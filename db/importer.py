@@ -0,0 +1,381 @@
+# db/importer.py
+"""
+Streaming import of historical data from CSV or JSONL files (optionally
+gzipped) into customers, products, orders, order_items, invoices,
+invoice_lines, payments and payment_allocations.
+
+Files are read row by row and written in chunks of ``--chunk`` rows, one
+transaction per chunk, with ``executemany`` upserts. Memory is bounded by
+the chunk size plus one ``key -> id`` map per parent entity, independent of
+file size.
+
+Keys: products are identified by ``sku`` and invoices by ``invoice_number``;
+customers, orders and payments by a source-system ``key`` column, which is
+remembered in ``import_keys`` so re-importing a file updates instead of
+duplicating. A customer whose key is new but whose email is already in the
+table (a row that didn't come through the importer) takes over that row. References use those keys (``customer_key``, ``order_key``,
+``product_sku``, ``invoice_number``, ``payment_key``); a plain
+``customer_id``/``order_id``/... column is taken as-is. Child rows (order
+items, invoice lines, allocations) replace the parent's existing children
+the first time that parent is seen in a run.
+
+    python -m db.importer --customers customers.csv --products products.csv \\
+        --orders orders.jsonl --order-items order_items.csv.gz --chunk 20000
+"""
+import argparse
+import csv
+import gzip
+import io
+import json
+import time
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from core.config import DB_PATH, IMPORT_CHUNK_SIZE
+from core.db import get_manager
+from core.logging import logger
+from db.migrate import ensure_migrations
+from services.bulk import chunks
+from services.result_cache import ANY_TABLE, TABLE_VERSIONS
+
+
+def _text(v: Any) -> Optional[str]:
+    return None if v is None else str(v)
+
+
+def _num(v: Any) -> Optional[float]:
+    if v is None:
+        return None
+    f = float(v)
+    return int(f) if f.is_integer() else f
+
+
+class Column(NamedTuple):
+    name: str                       # file field and table column
+    convert: Callable[[Any], Any]
+    required: bool = False
+    default_sql: Optional[str] = None  # used when the field is empty
+
+
+class Ref(NamedTuple):
+    field: str    # file field holding the referenced entity's key
+    entity: str   # referenced entity
+    column: str   # table column receiving its id; also accepted verbatim in the file
+
+
+class Entity(NamedTuple):
+    name: str
+    table: str
+    columns: Sequence[Column]
+    refs: Sequence[Ref] = ()
+    key: Optional[str] = None          # parents: file field with the row's key
+    natural_key: bool = False          # key is a UNIQUE table column (else import_keys)
+    match: Sequence[str] = ()          # columns finding a row with no import key yet
+    parent: Optional[str] = None       # children: ref column replaced per parent
+
+
+ENTITIES: Dict[str, Entity] = {e.name: e for e in (
+    Entity("customers", "customers", [
+        Column("name", _text, required=True),
+        Column("email", _text),
+        Column("phone", _text),
+        Column("created_at", _text, default_sql="datetime('now')"),
+    ], key="key", match=("email",)),
+    Entity("products", "products", [
+        Column("sku", _text, required=True),
+        Column("name", _text, required=True),
+        Column("price", _num, required=True),
+        Column("description", _text),
+    ], key="sku", natural_key=True),
+    Entity("orders", "orders", [
+        Column("total", _num, required=True),
+        Column("status", _text, default_sql="'pending'"),
+        Column("created_at", _text, default_sql="datetime('now')"),
+    ], refs=[Ref("customer_key", "customers", "customer_id")], key="key"),
+    Entity("order_items", "order_items", [
+        Column("quantity", _num, required=True),
+        Column("price", _num, required=True),
+    ], refs=[Ref("order_key", "orders", "order_id"), Ref("product_sku", "products", "product_id")],
+        parent="order_id"),
+    Entity("invoices", "invoices", [
+        Column("invoice_number", _text, required=True),
+        Column("issue_date", _text, default_sql="date('now')"),
+        Column("due_date", _text, required=True),
+        Column("total_amount", _num, required=True),
+        Column("status", _text, default_sql="'unpaid'"),
+        Column("created_at", _text, default_sql="datetime('now')"),
+    ], refs=[Ref("customer_key", "customers", "customer_id")], key="invoice_number", natural_key=True),
+    Entity("invoice_lines", "invoice_lines", [
+        Column("description", _text),
+        Column("quantity", _num, required=True),
+        Column("unit_price", _num, required=True),
+    ], refs=[Ref("invoice_number", "invoices", "invoice_id")], parent="invoice_id"),
+    Entity("payments", "payments", [
+        Column("amount", _num, required=True),
+        Column("method", _text, default_sql="'cash'"),
+        Column("received_at", _text, default_sql="datetime('now')"),
+    ], refs=[Ref("customer_key", "customers", "customer_id")], key="key"),
+    Entity("payment_allocations", "payment_allocations", [
+        Column("amount", _num, required=True),
+    ], refs=[Ref("payment_key", "payments", "payment_id"), Ref("invoice_number", "invoices", "invoice_id")],
+        parent="payment_id"),
+)}
+
+# Parents before the children that reference them
+IMPORT_ORDER = list(ENTITIES)
+
+_BULK_PRAGMAS = {"synchronous": "OFF", "cache_size": "-65536", "temp_store": "MEMORY"}
+
+
+def read_rows(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield ``(line_number, row)`` from a .csv or .jsonl/.ndjson file, gzipped or not."""
+    p = Path(path)
+    suffixes = [s.lower() for s in p.suffixes]
+    if suffixes and suffixes[-1] == ".gz":
+        suffixes.pop()
+        stream = io.TextIOWrapper(gzip.open(p, "rb"), encoding="utf-8", newline="")
+    else:
+        stream = open(p, "r", encoding="utf-8", newline="")
+    with stream:
+        if suffixes and suffixes[-1] in (".jsonl", ".ndjson"):
+            for lineno, line in enumerate(stream, 1):
+                if line.strip():
+                    yield lineno, json.loads(line)
+        else:
+            # Header is line 1; empty CSV cells mean "not given"
+            for lineno, row in enumerate(csv.DictReader(stream), 2):
+                yield lineno, {k: (v if v != "" else None) for k, v in row.items()}
+
+
+@contextmanager
+def bulk_load_pragmas(mgr):
+    """
+    Relax durability on the writer connection for the duration of an import
+    and restore it afterwards. Each chunk still commits on its own; a crash
+    mid-import can lose the last chunks, never corrupt earlier ones in WAL.
+    """
+    with mgr.writer() as conn:
+        saved = {name: conn.execute(f"PRAGMA {name}").fetchone()[0] for name in _BULK_PRAGMAS}
+        for name, value in _BULK_PRAGMAS.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+    try:
+        yield
+    finally:
+        with mgr.writer() as conn:
+            for name, value in saved.items():
+                conn.execute(f"PRAGMA {name} = {value}")
+
+
+class Importer:
+    """
+    Loads entity files into one database. Keeps a ``key -> id`` map per
+    parent entity for the lifetime of the importer, so references resolve
+    without a query per row.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, chunk_size: int = IMPORT_CHUNK_SIZE, max_errors: int = 100):
+        self.db_path = db_path
+        self.chunk_size = max(1, chunk_size)
+        self.max_errors = max_errors
+        self._maps: Dict[str, Dict[str, int]] = {}
+        self._matches: Dict[str, Dict[tuple, int]] = {}
+        self._replaced: Dict[str, Set[int]] = {}
+
+    # ---------- key maps ----------
+    def _map(self, conn, entity: str) -> Dict[str, int]:
+        keys = self._maps.get(entity)
+        if keys is None:
+            spec = ENTITIES[entity]
+            if spec.natural_key:
+                sql, params = f"SELECT {spec.key}, id FROM {spec.table}", ()
+            else:
+                sql, params = "SELECT key, id FROM import_keys WHERE entity = ?", (entity,)
+            keys = self._maps[entity] = {str(k): i for k, i in conn.execute(sql, params)}
+        return keys
+
+    def _match_map(self, conn, spec: Entity, match: Sequence[str]) -> Dict[tuple, int]:
+        """``match`` column values -> id of rows no import key points at yet (lowest id wins)."""
+        found = self._matches.get(spec.name)
+        if found is None:
+            found = self._matches[spec.name] = {}
+            claimed = "SELECT id FROM import_keys WHERE entity = ?"
+            for *values, row_id in conn.execute(
+                f"SELECT {', '.join(match)}, id FROM {spec.table} WHERE id NOT IN ({claimed}) ORDER BY id",
+                (spec.name,),
+            ):
+                if None not in values:
+                    found.setdefault(tuple(values), row_id)
+        return found
+
+    # ---------- rows -> tuples ----------
+    def _convert(self, conn, spec: Entity, row: Dict[str, Any]) -> Tuple[Optional[str], list]:
+        values = []
+        for col in spec.columns:
+            v = row.get(col.name)
+            if v is None and col.required:
+                raise ValueError(f"missing {col.name}")
+            values.append(col.convert(v))
+        for ref in spec.refs:
+            if row.get(ref.column) is not None:
+                values.append(int(row[ref.column]))
+                continue
+            k = row.get(ref.field)
+            if k is None:
+                raise ValueError(f"missing {ref.field} (or {ref.column})")
+            ref_id = self._map(conn, ref.entity).get(str(k))
+            if ref_id is None:
+                raise ValueError(f"unknown {ref.field} {k!r}")
+            values.append(ref_id)
+        key = None
+        if spec.key:
+            key = row.get(spec.key)
+            if key is None:
+                raise ValueError(f"missing {spec.key}")
+            key = str(key)
+        return key, values
+
+    # ---------- SQL ----------
+    # Plain INSERT / UPDATE rather than an upsert: the outer statement's
+    # conflict policy would override the AR triggers' INSERT OR IGNORE.
+    @staticmethod
+    def _insert_sql(spec: Entity, with_id: bool) -> str:
+        cols = [c.name for c in spec.columns] + [r.column for r in spec.refs]
+        marks = [f"COALESCE(?, {c.default_sql})" if c.default_sql else "?" for c in spec.columns]
+        marks += ["?"] * len(spec.refs)
+        if with_id:
+            cols, marks = ["id"] + cols, ["?"] + marks
+        return f"INSERT INTO {spec.table} ({', '.join(cols)}) VALUES ({', '.join(marks)})"
+
+    @staticmethod
+    def _update_sql(spec: Entity) -> str:
+        # An empty defaulted field keeps the row's value (created_at, status)
+        sets = [f"{c.name} = COALESCE(?, {c.name})" if c.default_sql else f"{c.name} = ?" for c in spec.columns]
+        sets += [f"{r.column} = ?" for r in spec.refs]
+        return f"UPDATE {spec.table} SET {', '.join(sets)} WHERE id = ?"
+
+    def _write_parents(
+        self, conn, spec: Entity, rows: List[Tuple[str, list]], stats: Dict[str, Any], match: Sequence[str]
+    ) -> None:
+        keys = self._map(conn, spec.name)
+        names = [c.name for c in spec.columns] + [r.column for r in spec.refs]
+        match_at = [names.index(m) for m in match]
+        # Claim ids for unseen keys while holding the write lock
+        next_id = conn.execute(
+            f"SELECT MAX(IFNULL((SELECT MAX(id) FROM {spec.table}), 0),"
+            f" IFNULL((SELECT seq FROM sqlite_sequence WHERE name = ?), 0)) + 1",
+            (spec.table,),
+        ).fetchone()[0]
+        inserts, updates, new_keys = [], [], []
+        for key, values in rows:
+            row_id = keys.get(key)
+            if row_id is None and match_at:
+                # Already in the table, just not through the importer: adopt it
+                row_id = self._match_map(conn, spec, match).pop(tuple(values[i] for i in match_at), None)
+                if row_id is not None:
+                    keys[key] = row_id
+                    new_keys.append((spec.name, key, row_id))
+                    updates.append(values + [row_id])
+                    continue
+            if row_id is None:
+                row_id = keys[key] = next_id
+                next_id += 1
+                new_keys.append((spec.name, key, row_id))
+                inserts.append([row_id] + values)
+            else:
+                # Also a key repeated within the chunk: inserts run first
+                updates.append(values + [row_id])
+        conn.executemany(self._insert_sql(spec, with_id=True), inserts)
+        conn.executemany(self._update_sql(spec), updates)
+        if new_keys and not spec.natural_key:
+            conn.executemany("INSERT OR REPLACE INTO import_keys (entity, key, id) VALUES (?, ?, ?)", new_keys)
+        stats["inserted"] += len(inserts)
+        stats["updated"] += len(updates)
+
+    def _write_children(self, conn, spec: Entity, rows: List[Tuple[str, list]], stats: Dict[str, Any]) -> None:
+        parent_at = len(spec.columns) + [r.column for r in spec.refs].index(spec.parent)
+        replaced = self._replaced.setdefault(spec.name, set())
+        fresh = sorted({values[parent_at] for _, values in rows} - replaced)
+        for chunk in chunks(fresh):
+            conn.execute(
+                f"DELETE FROM {spec.table} WHERE {spec.parent} IN ({', '.join('?' for _ in chunk)})", chunk
+            )
+        replaced.update(fresh)
+        conn.executemany(self._insert_sql(spec, with_id=False), [values for _, values in rows])
+        stats["inserted"] += len(rows)
+
+    # ---------- public API ----------
+    def import_rows(
+        self, entity: str, rows: Iterable[Tuple[int, Dict[str, Any]]], match: Optional[Sequence[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Import ``(line_number, row)`` pairs for ``entity``; returns counts and
+        the first errors. ``match`` overrides the entity's columns for finding
+        existing rows that have no import key.
+        """
+        spec = ENTITIES[entity]
+        match = spec.match if match is None else tuple(match)
+        ensure_migrations(self.db_path)
+        stats: Dict[str, Any] = {"entity": entity, "rows": 0, "inserted": 0, "updated": 0, "rejected": 0, "errors": []}
+        started = time.perf_counter()
+        mgr = get_manager(self.db_path)
+        it = iter(rows)
+        while True:
+            batch = list(islice(it, self.chunk_size))
+            if not batch:
+                break
+            with mgr.writer() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                converted = []
+                for lineno, row in batch:
+                    try:
+                        converted.append(self._convert(conn, spec, row))
+                    except (ValueError, TypeError) as e:
+                        stats["rejected"] += 1
+                        if len(stats["errors"]) < self.max_errors:
+                            stats["errors"].append({"line": lineno, "error": str(e)})
+                if converted:
+                    if spec.parent:
+                        self._write_children(conn, spec, converted, stats)
+                    else:
+                        self._write_parents(conn, spec, converted, stats, match)
+            stats["rows"] += len(batch)
+        stats["seconds"] = round(time.perf_counter() - started, 3)
+        TABLE_VERSIONS.bump(ANY_TABLE)
+        return stats
+
+    def import_file(self, entity: str, path: str) -> Dict[str, Any]:
+        return self.import_rows(entity, read_rows(path))
+
+    def run(self, files: Dict[str, str]) -> List[Dict[str, Any]]:
+        """Import ``{entity: path}`` in dependency order."""
+        results = []
+        with bulk_load_pragmas(get_manager(self.db_path)):
+            for entity in IMPORT_ORDER:
+                if entity in files:
+                    stats = self.import_file(entity, files[entity])
+                    logger.info(
+                        f"[import] {entity}: {stats['rows']} rows, {stats['inserted']} inserted, "
+                        f"{stats['updated']} updated, {stats['rejected']} rejected in {stats['seconds']} s"
+                    )
+                    results.append(stats)
+        return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    for entity in IMPORT_ORDER:
+        ap.add_argument("--" + entity.replace("_", "-"), dest=entity, metavar="PATH")
+    ap.add_argument("--db", default=DB_PATH)
+    ap.add_argument("--chunk", type=int, default=IMPORT_CHUNK_SIZE)
+    args = ap.parse_args()
+    files = {e: getattr(args, e) for e in IMPORT_ORDER if getattr(args, e)}
+    if not files:
+        ap.error("nothing to import")
+    for stats in Importer(args.db, args.chunk).run(files):
+        print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# db/migrate.py
+"""
+Versioned migrations: every ``db/migrations/NNN_*.sql`` not yet recorded in
+``schema_migrations`` is applied in file-name order, each in its own
+transaction together with its bookkeeping row.
+
+Scripts must stay idempotent (IF NOT EXISTS, INSERT OR IGNORE, ...): a
+database created before this runner existed has no ``schema_migrations``
+rows, so its first run replays every script over the existing tables.
+
+    python -m db.migrate            # apply pending migrations to ERP_DB_PATH
+"""
+import threading
+from pathlib import Path
+from typing import Dict, List
+
+from core.config import DB_PATH
+from core.db import get_manager
+from core.logging import logger
+from services.result_cache import ANY_TABLE, TABLE_VERSIONS
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+
+_CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+  version TEXT PRIMARY KEY,
+  applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+_ready: Dict[str, bool] = {}
+_ready_lock = threading.Lock()
+
+
+def available() -> List[Path]:
+    return sorted(MIGRATIONS_DIR.glob("[0-9][0-9][0-9]_*.sql"))
+
+
+def apply_migrations(db_path: str = DB_PATH) -> List[str]:
+    """Apply pending migrations to ``db_path``; returns the versions applied."""
+    applied: List[str] = []
+    with get_manager(db_path).writer() as conn:
+        conn.execute(_CREATE_SQL)
+        done = {row[0] for row in conn.execute("SELECT version FROM schema_migrations")}
+        for script in available():
+            version = script.stem
+            if version in done:
+                continue
+            # executescript commits whatever is open first, so the script and
+            # its version row form their own transaction
+            conn.executescript(
+                "BEGIN;\n"
+                + script.read_text()
+                + f"\n;INSERT INTO schema_migrations (version) VALUES ('{version}');\nCOMMIT;"
+            )
+            applied.append(version)
+            logger.info(f"[migrate] applied {version}")
+    if applied:
+        # Backfills may have changed rows behind cached results
+        TABLE_VERSIONS.bump(ANY_TABLE)
+    return applied
+
+
+def ensure_migrations(db_path: str = DB_PATH) -> None:
+    """``apply_migrations`` once per process and database."""
+    if _ready.get(db_path):
+        return
+    with _ready_lock:
+        if not _ready.get(db_path):
+            apply_migrations(db_path)
+            _ready[db_path] = True
+
+
+if __name__ == "__main__":
+    print(apply_migrations() or "up to date")
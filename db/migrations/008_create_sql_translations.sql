@@ -0,0 +1,11 @@
+-- db/migrations/008_create_sql_translations.sql
+
+CREATE TABLE IF NOT EXISTS sql_translations (
+  fingerprint TEXT PRIMARY KEY,
+  question TEXT NOT NULL,
+  sql TEXT NOT NULL,
+  schema_version INTEGER NOT NULL,
+  hit_count INTEGER NOT NULL DEFAULT 0,
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  last_used_at DATETIME
+);
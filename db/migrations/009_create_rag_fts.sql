@@ -0,0 +1,51 @@
+-- db/migrations/009_create_rag_fts.sql
+-- Full-text indexes over glossary and documents, kept in sync by triggers.
+
+CREATE VIRTUAL TABLE IF NOT EXISTS glossary_fts USING fts5(
+  term, definition, module UNINDEXED,
+  content='glossary', content_rowid='rowid',
+  tokenize='porter unicode61', prefix='2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS glossary_fts_ai AFTER INSERT ON glossary BEGIN
+  INSERT INTO glossary_fts(rowid, term, definition, module)
+  VALUES (new.rowid, new.term, new.definition, new.module);
+END;
+
+CREATE TRIGGER IF NOT EXISTS glossary_fts_ad AFTER DELETE ON glossary BEGIN
+  INSERT INTO glossary_fts(glossary_fts, rowid, term, definition, module)
+  VALUES ('delete', old.rowid, old.term, old.definition, old.module);
+END;
+
+CREATE TRIGGER IF NOT EXISTS glossary_fts_au AFTER UPDATE ON glossary BEGIN
+  INSERT INTO glossary_fts(glossary_fts, rowid, term, definition, module)
+  VALUES ('delete', old.rowid, old.term, old.definition, old.module);
+  INSERT INTO glossary_fts(rowid, term, definition, module)
+  VALUES (new.rowid, new.term, new.definition, new.module);
+END;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+  path, tags, module UNINDEXED,
+  content='documents', content_rowid='id',
+  tokenize='porter unicode61', prefix='2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS documents_fts_ai AFTER INSERT ON documents BEGIN
+  INSERT INTO documents_fts(rowid, path, tags, module)
+  VALUES (new.id, new.path, new.tags, new.module);
+END;
+
+CREATE TRIGGER IF NOT EXISTS documents_fts_ad AFTER DELETE ON documents BEGIN
+  INSERT INTO documents_fts(documents_fts, rowid, path, tags, module)
+  VALUES ('delete', old.id, old.path, old.tags, old.module);
+END;
+
+CREATE TRIGGER IF NOT EXISTS documents_fts_au AFTER UPDATE ON documents BEGIN
+  INSERT INTO documents_fts(documents_fts, rowid, path, tags, module)
+  VALUES ('delete', old.id, old.path, old.tags, old.module);
+  INSERT INTO documents_fts(rowid, path, tags, module)
+  VALUES (new.id, new.path, new.tags, new.module);
+END;
+
+INSERT INTO glossary_fts(glossary_fts) VALUES ('rebuild');
+INSERT INTO documents_fts(documents_fts) VALUES ('rebuild');
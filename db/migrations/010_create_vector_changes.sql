@@ -0,0 +1,38 @@
+-- db/migrations/010_create_vector_changes.sql
+-- Change log consumed by the RAG vector index (services/rag.py) so it can
+-- re-embed only the glossary/document rows that changed.
+
+CREATE TABLE IF NOT EXISTS vector_changes (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  source TEXT NOT NULL,
+  row_key TEXT NOT NULL,
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TRIGGER IF NOT EXISTS glossary_vec_ai AFTER INSERT ON glossary BEGIN
+  INSERT INTO vector_changes (source, row_key) VALUES ('glossary', new.term);
+END;
+
+CREATE TRIGGER IF NOT EXISTS glossary_vec_ad AFTER DELETE ON glossary BEGIN
+  INSERT INTO vector_changes (source, row_key) VALUES ('glossary', old.term);
+END;
+
+CREATE TRIGGER IF NOT EXISTS glossary_vec_au AFTER UPDATE ON glossary BEGIN
+  INSERT INTO vector_changes (source, row_key) VALUES ('glossary', old.term);
+  INSERT INTO vector_changes (source, row_key)
+  SELECT 'glossary', new.term WHERE new.term IS NOT old.term;
+END;
+
+CREATE TRIGGER IF NOT EXISTS documents_vec_ai AFTER INSERT ON documents BEGIN
+  INSERT INTO vector_changes (source, row_key) VALUES ('documents', new.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS documents_vec_ad AFTER DELETE ON documents BEGIN
+  INSERT INTO vector_changes (source, row_key) VALUES ('documents', old.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS documents_vec_au AFTER UPDATE ON documents BEGIN
+  INSERT INTO vector_changes (source, row_key) VALUES ('documents', old.id);
+  INSERT INTO vector_changes (source, row_key)
+  SELECT 'documents', new.id WHERE new.id IS NOT old.id;
+END;
@@ -0,0 +1,169 @@
+-- db/migrations/011_create_ar_balances.sql
+-- Accounts-receivable balances kept current by triggers, so aging and
+-- balance questions read one row per customer instead of re-joining
+-- invoices and payment_allocations. See domain/finance/receivables.py.
+--
+-- outstanding: 0 for paid/cancelled invoices, else total minus allocations.
+-- bucket: days past due at the last (re)bucketing; 0 = 0-30 (including not
+-- yet due), 1 = 31-60, 2 = 61-90, 3 = 90+. Buckets shift with the calendar,
+-- so a nightly job re-buckets (receivables.rebucket) and reconciles.
+
+CREATE TABLE IF NOT EXISTS ar_invoice_balances (
+  invoice_id INTEGER PRIMARY KEY,
+  customer_id INTEGER NOT NULL,
+  due_date TEXT NOT NULL,
+  outstanding REAL NOT NULL DEFAULT 0,
+  bucket INTEGER NOT NULL DEFAULT 0,
+  FOREIGN KEY(invoice_id) REFERENCES invoices(id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_ar_invoice_balances_customer
+  ON ar_invoice_balances (customer_id);
+
+CREATE TABLE IF NOT EXISTS ar_customer_balances (
+  customer_id INTEGER PRIMARY KEY,
+  balance REAL NOT NULL DEFAULT 0,
+  bucket_0_30 REAL NOT NULL DEFAULT 0,
+  bucket_31_60 REAL NOT NULL DEFAULT 0,
+  bucket_61_90 REAL NOT NULL DEFAULT 0,
+  bucket_90_plus REAL NOT NULL DEFAULT 0,
+  open_invoices INTEGER NOT NULL DEFAULT 0,
+  updated_at TEXT NOT NULL DEFAULT (datetime('now')),
+  FOREIGN KEY(customer_id) REFERENCES customers(id)
+);
+
+-- Allocation sums per invoice are taken on every payment
+CREATE INDEX IF NOT EXISTS idx_payment_allocations_invoice
+  ON payment_allocations (invoice_id);
+
+-- ---------- per-invoice row -> per-customer summary ----------
+
+CREATE TRIGGER IF NOT EXISTS ar_invoice_balances_ai AFTER INSERT ON ar_invoice_balances BEGIN
+  INSERT OR IGNORE INTO ar_customer_balances (customer_id) VALUES (new.customer_id);
+  UPDATE ar_customer_balances SET
+    balance = ROUND(balance + new.outstanding, 2),
+    bucket_0_30 = ROUND(bucket_0_30 + (new.bucket = 0) * new.outstanding, 2),
+    bucket_31_60 = ROUND(bucket_31_60 + (new.bucket = 1) * new.outstanding, 2),
+    bucket_61_90 = ROUND(bucket_61_90 + (new.bucket = 2) * new.outstanding, 2),
+    bucket_90_plus = ROUND(bucket_90_plus + (new.bucket = 3) * new.outstanding, 2),
+    open_invoices = open_invoices + (new.outstanding > 0),
+    updated_at = datetime('now')
+  WHERE customer_id = new.customer_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS ar_invoice_balances_ad AFTER DELETE ON ar_invoice_balances BEGIN
+  UPDATE ar_customer_balances SET
+    balance = ROUND(balance - old.outstanding, 2),
+    bucket_0_30 = ROUND(bucket_0_30 - (old.bucket = 0) * old.outstanding, 2),
+    bucket_31_60 = ROUND(bucket_31_60 - (old.bucket = 1) * old.outstanding, 2),
+    bucket_61_90 = ROUND(bucket_61_90 - (old.bucket = 2) * old.outstanding, 2),
+    bucket_90_plus = ROUND(bucket_90_plus - (old.bucket = 3) * old.outstanding, 2),
+    open_invoices = open_invoices - (old.outstanding > 0),
+    updated_at = datetime('now')
+  WHERE customer_id = old.customer_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS ar_invoice_balances_au AFTER UPDATE ON ar_invoice_balances BEGIN
+  UPDATE ar_customer_balances SET
+    balance = ROUND(balance - old.outstanding, 2),
+    bucket_0_30 = ROUND(bucket_0_30 - (old.bucket = 0) * old.outstanding, 2),
+    bucket_31_60 = ROUND(bucket_31_60 - (old.bucket = 1) * old.outstanding, 2),
+    bucket_61_90 = ROUND(bucket_61_90 - (old.bucket = 2) * old.outstanding, 2),
+    bucket_90_plus = ROUND(bucket_90_plus - (old.bucket = 3) * old.outstanding, 2),
+    open_invoices = open_invoices - (old.outstanding > 0),
+    updated_at = datetime('now')
+  WHERE customer_id = old.customer_id;
+  INSERT OR IGNORE INTO ar_customer_balances (customer_id) VALUES (new.customer_id);
+  UPDATE ar_customer_balances SET
+    balance = ROUND(balance + new.outstanding, 2),
+    bucket_0_30 = ROUND(bucket_0_30 + (new.bucket = 0) * new.outstanding, 2),
+    bucket_31_60 = ROUND(bucket_31_60 + (new.bucket = 1) * new.outstanding, 2),
+    bucket_61_90 = ROUND(bucket_61_90 + (new.bucket = 2) * new.outstanding, 2),
+    bucket_90_plus = ROUND(bucket_90_plus + (new.bucket = 3) * new.outstanding, 2),
+    open_invoices = open_invoices + (new.outstanding > 0),
+    updated_at = datetime('now')
+  WHERE customer_id = new.customer_id;
+END;
+
+-- ---------- invoices -> per-invoice row ----------
+
+CREATE TRIGGER IF NOT EXISTS invoices_ar_ai AFTER INSERT ON invoices BEGIN
+  INSERT INTO ar_invoice_balances (invoice_id, customer_id, due_date, outstanding, bucket)
+  VALUES (
+    new.id, new.customer_id, new.due_date,
+    CASE WHEN new.status IN ('paid', 'cancelled') THEN 0
+         ELSE max(ROUND(new.total_amount - IFNULL(
+           (SELECT SUM(amount) FROM payment_allocations WHERE invoice_id = new.id), 0), 2), 0) END,
+    CASE WHEN julianday(date('now')) - julianday(date(new.due_date)) <= 30 THEN 0
+         WHEN julianday(date('now')) - julianday(date(new.due_date)) <= 60 THEN 1
+         WHEN julianday(date('now')) - julianday(date(new.due_date)) <= 90 THEN 2
+         ELSE 3 END
+  );
+END;
+
+CREATE TRIGGER IF NOT EXISTS invoices_ar_au
+AFTER UPDATE OF customer_id, due_date, total_amount, status ON invoices BEGIN
+  UPDATE ar_invoice_balances SET
+    customer_id = new.customer_id,
+    due_date = new.due_date,
+    outstanding = CASE WHEN new.status IN ('paid', 'cancelled') THEN 0
+         ELSE max(ROUND(new.total_amount - IFNULL(
+           (SELECT SUM(amount) FROM payment_allocations WHERE invoice_id = new.id), 0), 2), 0) END,
+    bucket = CASE WHEN julianday(date('now')) - julianday(date(new.due_date)) <= 30 THEN 0
+         WHEN julianday(date('now')) - julianday(date(new.due_date)) <= 60 THEN 1
+         WHEN julianday(date('now')) - julianday(date(new.due_date)) <= 90 THEN 2
+         ELSE 3 END
+  WHERE invoice_id = new.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS invoices_ar_ad AFTER DELETE ON invoices BEGIN
+  DELETE FROM ar_invoice_balances WHERE invoice_id = old.id;
+END;
+
+-- ---------- payment_allocations -> invoice status + per-invoice row ----------
+
+CREATE TRIGGER IF NOT EXISTS payment_allocations_ar_ai AFTER INSERT ON payment_allocations BEGIN
+  -- Fully allocated: mark paid (invoices_ar_au then zeroes the balance)
+  UPDATE invoices SET status = 'paid'
+  WHERE id = new.invoice_id AND status = 'unpaid'
+    AND total_amount - (SELECT SUM(amount) FROM payment_allocations WHERE invoice_id = new.invoice_id) < 0.005;
+  UPDATE ar_invoice_balances SET outstanding = (
+    SELECT CASE WHEN i.status IN ('paid', 'cancelled') THEN 0
+           ELSE max(ROUND(i.total_amount - IFNULL(
+             (SELECT SUM(amount) FROM payment_allocations WHERE invoice_id = i.id), 0), 2), 0) END
+    FROM invoices i WHERE i.id = new.invoice_id)
+  WHERE invoice_id = new.invoice_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS payment_allocations_ar_ad AFTER DELETE ON payment_allocations BEGIN
+  UPDATE ar_invoice_balances SET outstanding = (
+    SELECT CASE WHEN i.status IN ('paid', 'cancelled') THEN 0
+           ELSE max(ROUND(i.total_amount - IFNULL(
+             (SELECT SUM(amount) FROM payment_allocations WHERE invoice_id = i.id), 0), 2), 0) END
+    FROM invoices i WHERE i.id = old.invoice_id)
+  WHERE invoice_id = old.invoice_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS payment_allocations_ar_au
+AFTER UPDATE OF invoice_id, amount ON payment_allocations BEGIN
+  UPDATE ar_invoice_balances SET outstanding = (
+    SELECT CASE WHEN i.status IN ('paid', 'cancelled') THEN 0
+           ELSE max(ROUND(i.total_amount - IFNULL(
+             (SELECT SUM(amount) FROM payment_allocations WHERE invoice_id = i.id), 0), 2), 0) END
+    FROM invoices i WHERE i.id = ar_invoice_balances.invoice_id)
+  WHERE invoice_id IN (old.invoice_id, new.invoice_id);
+END;
+
+-- ---------- backfill existing invoices (the triggers above fill the summary) ----------
+
+INSERT OR IGNORE INTO ar_invoice_balances (invoice_id, customer_id, due_date, outstanding, bucket)
+SELECT
+  i.id, i.customer_id, i.due_date,
+  CASE WHEN i.status IN ('paid', 'cancelled') THEN 0
+       ELSE max(ROUND(i.total_amount - IFNULL(
+         (SELECT SUM(amount) FROM payment_allocations WHERE invoice_id = i.id), 0), 2), 0) END,
+  CASE WHEN julianday(date('now')) - julianday(date(i.due_date)) <= 30 THEN 0
+       WHEN julianday(date('now')) - julianday(date(i.due_date)) <= 60 THEN 1
+       WHEN julianday(date('now')) - julianday(date(i.due_date)) <= 90 THEN 2
+       ELSE 3 END
+FROM invoices i;
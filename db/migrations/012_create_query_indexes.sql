@@ -0,0 +1,47 @@
+-- db/migrations/012_create_query_indexes.sql
+-- Indexes for the canned queries (paged tool queries, dispatch lookups,
+-- conversation bookkeeping, text-to-SQL templates). Expression indexes
+-- repeat the exact IFNULL(...) keys PagedQuery orders and seeks by, so the
+-- planner can walk them instead of sorting. test_query_plans.py fails when
+-- one of those queries falls back to an unexpected full-table scan.
+
+-- get_unpaid_invoices / paid / cancelled: status filter, date-ordered pages
+CREATE INDEX IF NOT EXISTS idx_invoices_status_due
+  ON invoices (status, IFNULL(due_date, ''));
+CREATE INDEX IF NOT EXISTS idx_invoices_status_issue
+  ON invoices (status, IFNULL(issue_date, ''));
+-- get_all_invoices / get_invoices_by_customer ordering
+CREATE INDEX IF NOT EXISTS idx_invoices_issue
+  ON invoices (IFNULL(issue_date, ''));
+
+-- Customer lookups by name (dispatch, invoices/balance by customer)
+CREATE INDEX IF NOT EXISTS idx_customers_name_nocase
+  ON customers (name COLLATE NOCASE);
+
+-- Order lines by order (order_items_for_order) and by product (revenue reports)
+CREATE INDEX IF NOT EXISTS idx_order_items_order
+  ON order_items (order_id);
+CREATE INDEX IF NOT EXISTS idx_order_items_product
+  ON order_items (product_id);
+
+-- Date-windowed order reports ("last 30 days", "this month", "6 months")
+CREATE INDEX IF NOT EXISTS idx_orders_created
+  ON orders (created_at);
+CREATE INDEX IF NOT EXISTS idx_orders_customer_created
+  ON orders (customer_id, created_at);
+
+-- Allocation sums per invoice (also created by 011)
+CREATE INDEX IF NOT EXISTS idx_payment_allocations_invoice
+  ON payment_allocations (invoice_id);
+
+-- AR aging pages, largest balance first
+CREATE INDEX IF NOT EXISTS idx_ar_customer_balances_balance
+  ON ar_customer_balances (balance, customer_id);
+
+-- ensure_conversation: latest conversation for a user
+CREATE INDEX IF NOT EXISTS idx_conversations_user_started
+  ON conversations (user_id, started_at);
+CREATE INDEX IF NOT EXISTS idx_messages_conv
+  ON messages (conversation_id);
+
+ANALYZE;
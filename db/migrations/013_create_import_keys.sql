@@ -0,0 +1,11 @@
+-- db/migrations/013_create_import_keys.sql
+-- Source-system keys of imported rows (db/importer.py), so re-importing a
+-- file updates the rows it created instead of duplicating them. Products
+-- and invoices use their own unique sku / invoice_number instead.
+
+CREATE TABLE IF NOT EXISTS import_keys (
+  entity TEXT NOT NULL,
+  key TEXT NOT NULL,
+  id INTEGER NOT NULL,
+  PRIMARY KEY (entity, key)
+) WITHOUT ROWID;
@@ -0,0 +1,11 @@
+-- db/migrations/014_create_child_indexes.sql
+-- Parent-id lookups on child tables that had no index: an invoice's lines,
+-- a payment's allocations (both replaced by db/importer.py on re-import)
+-- and a purchase order's items. Without them each lookup scans the table,
+-- which only shows once the data is at db/datagen.py scale.
+
+CREATE INDEX IF NOT EXISTS idx_invoice_lines_invoice ON invoice_lines (invoice_id);
+CREATE INDEX IF NOT EXISTS idx_payment_allocations_payment ON payment_allocations (payment_id);
+CREATE INDEX IF NOT EXISTS idx_po_items_po ON po_items (po_id);
+
+ANALYZE;
@@ -0,0 +1,17 @@
+-- db/migrations/015_create_slow_queries.sql
+-- Queries slower than ERP_SLOW_QUERY_MS with their plan (services/query_log.py),
+-- written by the background audit writer.
+
+CREATE TABLE IF NOT EXISTS slow_queries (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  fingerprint TEXT NOT NULL,
+  sql TEXT NOT NULL,
+  caller TEXT,
+  duration_ms REAL NOT NULL,
+  row_count INTEGER,
+  plan TEXT,
+  created_at DATETIME NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_slow_queries_fingerprint ON slow_queries(fingerprint, created_at);
+CREATE INDEX IF NOT EXISTS idx_slow_queries_created ON slow_queries(created_at);
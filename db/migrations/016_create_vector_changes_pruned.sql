@@ -0,0 +1,10 @@
+-- db/migrations/016_create_vector_changes_pruned.sql
+-- How far each source's vector_changes log has been pruned (services/rag.py).
+-- An index that last synced below this mark has missed changes and rebuilds.
+
+CREATE TABLE IF NOT EXISTS vector_changes_pruned (
+  source TEXT PRIMARY KEY,
+  through_id INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_vector_changes_source ON vector_changes(source, id);
@@ -0,0 +1,54 @@
+-- db/migrations/017_ar_undated_invoices.sql
+-- invoices.due_date is nullable in erp_v2.db, but ar_invoice_balances.due_date
+-- is NOT NULL: the 011 triggers made any insert without a due date fail, and
+-- its backfill (INSERT OR IGNORE) skipped such invoices.
+--
+-- An invoice without a due date is treated as due on its issue date, or
+-- today when that is missing too, and aged (bucketed) from there.
+
+DROP TRIGGER IF EXISTS invoices_ar_ai;
+DROP TRIGGER IF EXISTS invoices_ar_au;
+
+CREATE TRIGGER invoices_ar_ai AFTER INSERT ON invoices BEGIN
+  INSERT INTO ar_invoice_balances (invoice_id, customer_id, due_date, outstanding, bucket)
+  SELECT new.id, new.customer_id, d.due,
+    CASE WHEN new.status IN ('paid', 'cancelled') THEN 0
+         ELSE max(ROUND(new.total_amount - IFNULL(
+           (SELECT SUM(amount) FROM payment_allocations WHERE invoice_id = new.id), 0), 2), 0) END,
+    CASE WHEN julianday(date('now')) - julianday(d.due) <= 30 THEN 0
+         WHEN julianday(date('now')) - julianday(d.due) <= 60 THEN 1
+         WHEN julianday(date('now')) - julianday(d.due) <= 90 THEN 2
+         ELSE 3 END
+  FROM (SELECT COALESCE(date(new.due_date), date(new.issue_date), date('now')) AS due) d;
+END;
+
+CREATE TRIGGER invoices_ar_au
+AFTER UPDATE OF customer_id, due_date, issue_date, total_amount, status ON invoices BEGIN
+  UPDATE ar_invoice_balances SET
+    customer_id = new.customer_id,
+    due_date = d.due,
+    outstanding = CASE WHEN new.status IN ('paid', 'cancelled') THEN 0
+         ELSE max(ROUND(new.total_amount - IFNULL(
+           (SELECT SUM(amount) FROM payment_allocations WHERE invoice_id = new.id), 0), 2), 0) END,
+    bucket = CASE WHEN julianday(date('now')) - julianday(d.due) <= 30 THEN 0
+         WHEN julianday(date('now')) - julianday(d.due) <= 60 THEN 1
+         WHEN julianday(date('now')) - julianday(d.due) <= 90 THEN 2
+         ELSE 3 END
+  FROM (SELECT COALESCE(date(new.due_date), date(new.issue_date), date('now')) AS due) d
+  WHERE invoice_id = new.id;
+END;
+
+-- Invoices the 011 backfill skipped
+INSERT OR IGNORE INTO ar_invoice_balances (invoice_id, customer_id, due_date, outstanding, bucket)
+SELECT
+  i.id, i.customer_id, d.due,
+  CASE WHEN i.status IN ('paid', 'cancelled') THEN 0
+       ELSE max(ROUND(i.total_amount - IFNULL(
+         (SELECT SUM(amount) FROM payment_allocations WHERE invoice_id = i.id), 0), 2), 0) END,
+  CASE WHEN julianday(date('now')) - julianday(d.due) <= 30 THEN 0
+       WHEN julianday(date('now')) - julianday(d.due) <= 60 THEN 1
+       WHEN julianday(date('now')) - julianday(d.due) <= 90 THEN 2
+       ELSE 3 END
+FROM invoices i
+JOIN (SELECT id, COALESCE(date(due_date), date(issue_date), date('now')) AS due FROM invoices) d ON d.id = i.id
+WHERE i.id NOT IN (SELECT invoice_id FROM ar_invoice_balances);
@@ -217,6 +217,15 @@ CREATE TABLE saved_reports (
   sql TEXT NOT NULL,
   created_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
+CREATE TABLE sql_translations (
+  fingerprint TEXT PRIMARY KEY,
+  question TEXT NOT NULL,
+  sql TEXT NOT NULL,
+  schema_version INTEGER NOT NULL,
+  hit_count INTEGER NOT NULL DEFAULT 0,
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  last_used_at DATETIME
+);
 CREATE TABLE glossary (
   term TEXT PRIMARY KEY,
   definition TEXT,
@@ -1,7 +1,8 @@
 # domain/analytics/agent.py
 from langchain.agents import initialize_agent, Tool
 from langchain.prompts import ChatPromptTemplate
-from services.llm import llm
+from services.llm import get_llm
+from core.lazy import Lazy
 from domain.analytics.tools import analytics_text_to_sql, analytics_rag_definition
 from core.logging import logger
 
@@ -51,19 +52,19 @@ If it's about definitions, use the Analytics Glossary Tool.
 Otherwise, use the Analytics SQL Tool.
 """)
 
-# Initialize the LangChain agent
-analytics_agent_executor = initialize_agent(
+# Initialize the LangChain agent on first use, not at import
+analytics_agent_executor = Lazy(lambda: initialize_agent(
     tools=analytics_tools,
-    llm=llm,
+    llm=get_llm(),
     agent="zero-shot-react-description",
     verbose=True
-)
+))
 
 class AnalyticsAgent:
     def process_request(self, prompt: str):
         logger.info(f"[AnalyticsAgent] Received prompt: {prompt}")
         try:
-            return analytics_agent_executor.run(prompt)
+            return analytics_agent_executor.get().run(prompt)
         except Exception as e:
             logger.error(f"[AnalyticsAgent] Error: {e}")
             return {"type": "text", "content": "Sorry, there was an error processing your analytics query."}
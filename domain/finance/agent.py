@@ -1,7 +1,8 @@
 # domain/finance/agent.py
 from langchain.agents import initialize_agent, Tool
 from langchain.prompts import ChatPromptTemplate
-from services.llm import llm
+from services.llm import get_llm
+from core.lazy import Lazy
 from domain.finance import tools as finance_tools
 from core.logging import logger
 
@@ -32,6 +33,16 @@ finance_tool_list = [
         func=finance_tools.get_invoices_by_customer,
         description="List all invoices for a given customer name."
     ),
+    Tool(
+        name="AR Aging Tool",
+        func=lambda _: finance_tools.get_ar_aging(),
+        description="Receivables aging report: open balance per customer in 0-30/31-60/61-90/90+ day buckets."
+    ),
+    Tool(
+        name="Customer Balance Tool",
+        func=finance_tools.get_customer_balance,
+        description="Outstanding receivable balance and aging for a given customer name."
+    ),
     Tool(
         name="Finance SQL Tool",
         func=finance_tools.finance_sql_read,
@@ -51,25 +62,26 @@ You can answer questions about invoices, payments, and finance reports.
 Use the provided tools to get the correct data or perform write actions.
 If the question is about unpaid, paid, cancelled, or all invoices, use the matching tool.
 If it's about invoices for a specific customer, use the Invoices By Customer Tool.
+For receivables aging or customer balances, use the AR Aging Tool or the Customer Balance Tool.
 If it's a custom finance query, use the Finance SQL Tool.
 If it's a write action like creating an invoice or posting a payment, use the Finance Write Tool.
 Always return results in the structured dict format: 
 {{"type": "table", "headers": [...], "rows": [...]}} or {{"type": "text", "content": "..."}}
 """)
 
-# Initialize the LangChain agent
-finance_agent_executor = initialize_agent(
+# Initialize the LangChain agent on first use, not at import
+finance_agent_executor = Lazy(lambda: initialize_agent(
     tools=finance_tool_list,
-    llm=llm,
+    llm=get_llm(),
     agent="zero-shot-react-description",
     verbose=True
-)
+))
 
 class FinanceAgent:
     def process_request(self, prompt: str):
         logger.info(f"[FinanceAgent] Received prompt: {prompt}")
         try:
-            result = finance_agent_executor.run(prompt)
+            result = finance_agent_executor.get().run(prompt)
             # Ensure result is a dict for UI compatibility
             if isinstance(result, dict):
                 return result
@@ -0,0 +1,156 @@
+# domain/finance/receivables.py
+"""
+Accounts-receivable balances and aging buckets.
+
+Migration 011 keeps ``ar_invoice_balances`` (outstanding amount per invoice)
+and ``ar_customer_balances`` (balance and 0-30/31-60/61-90/90+ buckets per
+customer) current with triggers, inside the same transaction as the invoice
+or payment-allocation write. Only the passage of time moves money between
+buckets, which is what the nightly ``rebucket`` job is for.
+
+    python -m domain.finance.receivables     # re-bucket once (cron)
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from core.config import AR_REBUCKET_AT, AR_REBUCKET_ENABLED, DB_PATH
+from core.db import get_manager
+from core.logging import logger
+from db.migrate import ensure_migrations
+from services.result_cache import TABLE_VERSIONS
+
+AR_TABLES = ("ar_invoice_balances", "ar_customer_balances")
+
+# Same expression as the triggers in migrations 011/017 (over a due_date
+# that is never NULL: 017 stores the issue date, or today, in its place)
+_BUCKET_SQL = """CASE WHEN julianday(date('now')) - julianday(date(due_date)) <= 30 THEN 0
+         WHEN julianday(date('now')) - julianday(date(due_date)) <= 60 THEN 1
+         WHEN julianday(date('now')) - julianday(date(due_date)) <= 90 THEN 2
+         ELSE 3 END"""
+
+_REBUCKET_SQL = f"""
+UPDATE ar_invoice_balances SET bucket = {_BUCKET_SQL}
+WHERE outstanding > 0 AND bucket <> {_BUCKET_SQL}
+"""
+
+# Rebuilds the summary from the per-invoice rows, dropping any drift from
+# the incremental REAL arithmetic
+_RECONCILE_SQL = """
+INSERT INTO ar_customer_balances
+  (customer_id, balance, bucket_0_30, bucket_31_60, bucket_61_90, bucket_90_plus, open_invoices, updated_at)
+SELECT customer_id,
+       ROUND(SUM(outstanding), 2),
+       ROUND(SUM((bucket = 0) * outstanding), 2),
+       ROUND(SUM((bucket = 1) * outstanding), 2),
+       ROUND(SUM((bucket = 2) * outstanding), 2),
+       ROUND(SUM((bucket = 3) * outstanding), 2),
+       SUM(outstanding > 0),
+       datetime('now')
+FROM ar_invoice_balances
+GROUP BY customer_id
+"""
+
+
+def ensure_ar_schema() -> None:
+    """Create the AR tables and triggers (migration 011, with backfill) on first use."""
+    ensure_migrations(DB_PATH)
+
+
+def rebucket() -> Dict[str, Any]:
+    """
+    Move open invoices into the bucket their age calls for today and rebuild
+    the per-customer summary. One write transaction; O(invoices).
+    """
+    ensure_ar_schema()
+    started = time.perf_counter()
+    with get_manager(DB_PATH).writer() as conn:
+        moved = conn.execute(_REBUCKET_SQL).rowcount
+        conn.execute("DELETE FROM ar_customer_balances")
+        customers = conn.execute(_RECONCILE_SQL).rowcount
+    TABLE_VERSIONS.bump(*AR_TABLES)
+    return {
+        "rebucketed_invoices": moved,
+        "customers": customers,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def _seconds_until(at: str, now: Optional[datetime] = None) -> float:
+    # Seconds until the next local HH:MM
+    now = now or datetime.now()
+    hour, minute = (int(x) for x in at.split(":"))
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+class RebucketJob:
+    """
+    Background thread that runs ``rebucket`` once at start (catching up on
+    days the process was down) and then every day at ``at`` local time.
+    """
+
+    def __init__(self, at: str = AR_REBUCKET_AT):
+        self.at = at
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.runs = 0
+        self.failed = 0
+        self.last_run: Optional[Dict[str, Any]] = None
+        self.last_run_at: Optional[str] = None
+
+    def run_once(self) -> None:
+        try:
+            self.last_run = rebucket()
+            self.runs += 1
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"[AR] re-bucketing failed: {e}")
+        self.last_run_at = datetime.now().isoformat(timespec="seconds")
+
+    def _run(self) -> None:
+        self.run_once()
+        while not self._stop.wait(_seconds_until(self.at)):
+            self.run_once()
+
+    # ---------- lifecycle ----------
+    def start(self) -> "RebucketJob":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="ar-rebucket", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "schedule": self.at,
+            "runs": self.runs,
+            "failed": self.failed,
+            "last_run_at": self.last_run_at,
+            "last_run": self.last_run,
+        }
+
+
+REBUCKET_JOB = RebucketJob()
+
+
+def start_rebucket_job() -> None:
+    if AR_REBUCKET_ENABLED:
+        REBUCKET_JOB.start()
+
+
+def shutdown_rebucket_job() -> None:
+    REBUCKET_JOB.stop()
+
+
+if __name__ == "__main__":
+    print(rebucket())
@@ -1,95 +1,246 @@
 # domain/finance/tools.py
-from langchain.agents import Tool
-from services.text_to_sql import text_to_sql_tool
+from services.text_to_sql import atext_to_sql_tool, text_to_sql_tool
 from services.sql import execute_query
 from core.config import DB_PATH
-import sqlite3
-from typing import Any, Dict, List
+from core.db import get_manager
+from core.lazy import Lazy
+from domain.finance.receivables import ensure_ar_schema
+from services.result_cache import invalidates
+from services.pagination import PagedQuery
+from services.bulk import bulk_write, chunks, error_results, inserted_ids, summarize, validate_batch
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field
 
 def _conn():
-    return sqlite3.connect(DB_PATH)
+    return get_manager(DB_PATH).writer()
+
+class InvoiceLineInput(BaseModel):
+    description: str
+    quantity: float
+    unit_price: float
 
 class CreateInvoiceInput(BaseModel):
     customer_id: int
     invoice_number: str
-    lines: List[Dict[str, Any]]
+    lines: List[InvoiceLineInput]
     status: str = Field(default="unpaid")
 
+class AllocationInput(BaseModel):
+    invoice_id: int
+    amount: float
+
 class RecordPaymentInput(BaseModel):
     customer_id: int
     amount: float
     method: str = "bank_transfer"
-    allocations: List[Dict[str, Any]] = Field(default_factory=list)
+    allocations: List[AllocationInput] = Field(default_factory=list)
 
 def finance_sql_read(nl_query: str):
     return text_to_sql_tool(nl_query)
 
+async def afinance_sql_read(nl_query: str):
+    return await atext_to_sql_tool(nl_query)
+
+def _insert_invoices(conn, invoices: List[CreateInvoiceInput]) -> List[Dict[str, Any]]:
+    totals = [sum(l.quantity * l.unit_price for l in inv.lines) for inv in invoices]
+    conn.executemany(
+        """INSERT INTO invoices (customer_id, invoice_number, issue_date, due_date, total_amount, status, created_at)
+           VALUES (?, ?, date('now'), date('now','+30 day'), ?, ?, datetime('now'))""",
+        [(inv.customer_id, inv.invoice_number, total, inv.status) for inv, total in zip(invoices, totals)],
+    )
+    ids = inserted_ids(conn, len(invoices))
+    conn.executemany(
+        "INSERT INTO invoice_lines (invoice_id, description, quantity, unit_price) VALUES (?, ?, ?, ?)",
+        [(invoice_id, l.description, l.quantity, l.unit_price)
+         for invoice_id, inv in zip(ids, invoices) for l in inv.lines],
+    )
+    return [
+        {"invoice_id": invoice_id, "total_amount": total, "status": inv.status}
+        for invoice_id, inv, total in zip(ids, invoices, totals)
+    ]
+
+def _insert_payments(conn, payments: List[RecordPaymentInput]) -> List[Dict[str, Any]]:
+    conn.executemany(
+        "INSERT INTO payments (customer_id, amount, method, received_at) VALUES (?, ?, ?, datetime('now'))",
+        [(p.customer_id, p.amount, p.method) for p in payments],
+    )
+    ids = inserted_ids(conn, len(payments))
+    # The AR triggers mark fully allocated invoices 'paid' as these go in
+    conn.executemany(
+        "INSERT INTO payment_allocations (payment_id, invoice_id, amount) VALUES (?, ?, ?)",
+        [(payment_id, a.invoice_id, a.amount) for payment_id, p in zip(ids, payments) for a in p.allocations],
+    )
+    touched = sorted({a.invoice_id for p in payments for a in p.allocations})
+    paid = set()
+    for chunk in chunks(touched):
+        paid.update(row[0] for row in conn.execute(
+            f"SELECT id FROM invoices WHERE status = 'paid' AND id IN ({', '.join('?' for _ in chunk)})", chunk,
+        ))
+    return [
+        {"payment_id": payment_id, "status": "posted",
+         "paid_invoices": sorted({a.invoice_id for a in p.allocations} & paid)}
+        for payment_id, p in zip(ids, payments)
+    ]
+
+@invalidates("invoices", "invoice_lines", "payments", "payment_allocations",
+             "ar_invoice_balances", "ar_customer_balances")
 def finance_sql_write(action: str, payload: Dict[str, Any]):
-    with _conn() as conn:
-        if action == "create_invoice":
-            data = CreateInvoiceInput(**payload)
-            total = sum(float(l["quantity"]) * float(l["unit_price"]) for l in data.lines)
-            cur = conn.execute(
-                """INSERT INTO invoices (customer_id, invoice_number, issue_date, due_date, total_amount, status, created_at)
-                   VALUES (?, ?, date('now'), date('now','+30 day'), ?, ?, datetime('now'))""",
-                (data.customer_id, data.invoice_number, total, data.status),
-            )
-            invoice_id = cur.lastrowid
-            for l in data.lines:
-                conn.execute(
-                    "INSERT INTO invoice_lines (invoice_id, description, quantity, unit_price) VALUES (?, ?, ?, ?)",
-                    (invoice_id, l["description"], float(l["quantity"]), float(l["unit_price"])),
-                )
-            return {"invoice_id": invoice_id, "total_amount": total, "status": data.status}
-
-        if action == "post_payment":
-            data = RecordPaymentInput(**payload)
-            cur = conn.execute(
-                "INSERT INTO payments (customer_id, amount, method, received_at) VALUES (?, ?, ?, datetime('now'))",
-                (data.customer_id, float(data.amount), data.method),
-            )
-            payment_id = cur.lastrowid
-            for alloc in data.allocations:
-                conn.execute(
-                    "INSERT INTO payment_allocations (payment_id, invoice_id, amount) VALUES (?, ?, ?)",
-                    (payment_id, alloc["invoice_id"], float(alloc["amount"])),
-                )
-            return {"payment_id": payment_id, "status": "posted"}
+    # AR balances are kept by triggers, in this same transaction
+    ensure_ar_schema()
+    if action == "create_invoice":
+        data = CreateInvoiceInput(**payload)
+        with _conn() as conn:
+            return _insert_invoices(conn, [data])[0]
+    if action == "post_payment":
+        data = RecordPaymentInput(**payload)
+        with _conn() as conn:
+            return _insert_payments(conn, [data])[0]
     return {"error": "unknown_action"}
 
-def get_unpaid_invoices():
-    rows = execute_query("""SELECT id, (SELECT name FROM customers WHERE customers.id = invoices.customer_id) AS customer,
-                            invoice_number, total_amount, status FROM invoices WHERE status = 'unpaid' ORDER BY due_date ASC""")
-    return {"type": "table", "headers": ["Invoice ID", "Customer", "Invoice #", "Amount", "Status"], "rows": rows}
-
-def get_paid_invoices():
-    rows = execute_query("""SELECT id, (SELECT name FROM customers WHERE customers.id = invoices.customer_id) AS customer,
-                            invoice_number, total_amount, status FROM invoices WHERE status = 'paid' ORDER BY issue_date DESC""")
-    return {"type": "table", "headers": ["Invoice ID", "Customer", "Invoice #", "Amount", "Status"], "rows": rows}
-
-def get_cancelled_invoices():
-    rows = execute_query("""SELECT id, (SELECT name FROM customers WHERE customers.id = invoices.customer_id) AS customer,
-                            invoice_number, total_amount, status FROM invoices WHERE status = 'cancelled' ORDER BY issue_date DESC""")
-    return {"type": "table", "headers": ["Invoice ID", "Customer", "Invoice #", "Amount", "Status"], "rows": rows}
-
-def get_all_invoices():
-    rows = execute_query("""SELECT id, (SELECT name FROM customers WHERE customers.id = invoices.customer_id) AS customer,
-                            invoice_number, total_amount, status FROM invoices ORDER BY issue_date DESC""")
-    return {"type": "table", "headers": ["Invoice ID", "Customer", "Invoice #", "Amount", "Status"], "rows": rows}
-
-def get_invoices_by_customer(customer_name: str):
-    rows = execute_query("""SELECT i.id, c.name, i.invoice_number, i.total_amount, i.status
-                            FROM invoices i JOIN customers c ON c.id = i.customer_id
-                            WHERE c.name = ? ORDER BY i.issue_date DESC""", (customer_name,))
-    return {"type": "table", "headers": ["Invoice ID", "Customer", "Invoice #", "Amount", "Status"], "rows": rows}
-
-finance_tool_list = [
-    Tool(name="Unpaid Invoices Tool", func=lambda _: get_unpaid_invoices(), description="List all unpaid invoices."),
-    Tool(name="Paid Invoices Tool", func=lambda _: get_paid_invoices(), description="List all paid invoices."),
-    Tool(name="Cancelled Invoices Tool", func=lambda _: get_cancelled_invoices(), description="List all cancelled invoices."),
-    Tool(name="All Invoices Tool", func=lambda _: get_all_invoices(), description="List all invoices."),
-    Tool(name="Invoices By Customer Tool", func=get_invoices_by_customer, description="List all invoices for a given customer name."),
-    Tool(name="Finance SQL Tool", func=finance_sql_read, description="Run SQL for finance-related questions not covered by other tools."),
-    Tool(name="Finance Write Tool", func=finance_sql_write, description="Perform finance write actions like creating invoices or posting payments.")
+@invalidates("invoices", "invoice_lines", "ar_invoice_balances", "ar_customer_balances")
+def create_invoices(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Create many invoices in one transaction. Items that fail validation, or
+    whose invoice_number is already taken (or repeated in the batch), are
+    reported per item and the rest are written.
+    """
+    ensure_ar_schema()
+    valid, errors = validate_batch(CreateInvoiceInput, items)
+    results = []
+    with _conn() as conn:
+        numbers = [inv.invoice_number for _, inv in valid]
+        taken = set()
+        for chunk in chunks(numbers):
+            taken.update(row[0] for row in conn.execute(
+                f"SELECT invoice_number FROM invoices WHERE invoice_number IN ({', '.join('?' for _ in chunk)})", chunk,
+            ))
+        accepted = []
+        for i, inv in valid:
+            if inv.invoice_number in taken:
+                errors[i] = [{"loc": ["invoice_number"], "msg": "invoice_number already exists"}]
+            else:
+                taken.add(inv.invoice_number)
+                accepted.append((i, inv))
+        if accepted:
+            created = _insert_invoices(conn, [inv for _, inv in accepted])
+            results = [
+                {"index": i, **r, "status": "created", "invoice_status": r["status"]}
+                for (i, _), r in zip(accepted, created)
+            ]
+    return summarize(results + error_results(errors))
+
+@invalidates("payments", "payment_allocations", "invoices", "ar_invoice_balances", "ar_customer_balances")
+def post_payments(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Post many payments (with their allocations) in one transaction."""
+    ensure_ar_schema()
+    return bulk_write(RecordPaymentInput, items, _insert_payments, _conn)
+
+_INVOICE_HEADERS = ["Invoice ID", "Customer", "Invoice #", "Amount", "Status"]
+_INVOICE_COLUMNS = [
+    "id",
+    "(SELECT name FROM customers WHERE customers.id = invoices.customer_id) AS customer",
+    "invoice_number",
+    "total_amount",
+    "status",
 ]
+
+_unpaid_invoices = PagedQuery(
+    "finance.unpaid_invoices", _INVOICE_HEADERS, _INVOICE_COLUMNS, "invoices",
+    order_by=["IFNULL(due_date, '')", "id"], filters=["status = 'unpaid'"],
+)
+_paid_invoices = PagedQuery(
+    "finance.paid_invoices", _INVOICE_HEADERS, _INVOICE_COLUMNS, "invoices",
+    order_by=["IFNULL(issue_date, '')", "id"], filters=["status = 'paid'"], descending=True,
+)
+_cancelled_invoices = PagedQuery(
+    "finance.cancelled_invoices", _INVOICE_HEADERS, _INVOICE_COLUMNS, "invoices",
+    order_by=["IFNULL(issue_date, '')", "id"], filters=["status = 'cancelled'"], descending=True,
+)
+_all_invoices = PagedQuery(
+    "finance.all_invoices", _INVOICE_HEADERS, _INVOICE_COLUMNS, "invoices",
+    order_by=["IFNULL(issue_date, '')", "id"], descending=True,
+)
+_invoices_by_customer = PagedQuery(
+    "finance.invoices_by_customer", _INVOICE_HEADERS,
+    ["i.id", "c.name", "i.invoice_number", "i.total_amount", "i.status"],
+    "invoices i JOIN customers c ON c.id = i.customer_id",
+    order_by=["IFNULL(i.issue_date, '')", "i.id"], filters=["c.name = ? COLLATE NOCASE"], descending=True,
+)
+
+_AGING_HEADERS = ["Customer ID", "Customer", "Balance", "0-30", "31-60", "61-90", "90+", "Open Invoices"]
+_ar_aging = PagedQuery(
+    "finance.ar_aging", _AGING_HEADERS,
+    ["b.customer_id", "c.name", "b.balance", "b.bucket_0_30", "b.bucket_31_60",
+     "b.bucket_61_90", "b.bucket_90_plus", "b.open_invoices"],
+    "ar_customer_balances b JOIN customers c ON c.id = b.customer_id",
+    order_by=["b.balance", "b.customer_id"], filters=["b.balance > 0"], descending=True,
+)
+_customer_balance = PagedQuery(
+    "finance.customer_balance", _AGING_HEADERS,
+    ["c.id", "c.name", "IFNULL(b.balance, 0)", "IFNULL(b.bucket_0_30, 0)", "IFNULL(b.bucket_31_60, 0)",
+     "IFNULL(b.bucket_61_90, 0)", "IFNULL(b.bucket_90_plus, 0)", "IFNULL(b.open_invoices, 0)"],
+    # LEFT JOIN: a customer who was never invoiced has a zero balance, not no row
+    "customers c LEFT JOIN ar_customer_balances b ON b.customer_id = c.id",
+    order_by=["c.id"], filters=["c.name = ? COLLATE NOCASE"],
+)
+
+def get_unpaid_invoices(limit: Optional[int] = None):
+    return _unpaid_invoices.page(limit=limit)
+
+def get_paid_invoices(limit: Optional[int] = None):
+    return _paid_invoices.page(limit=limit)
+
+def get_cancelled_invoices(limit: Optional[int] = None):
+    return _cancelled_invoices.page(limit=limit)
+
+def get_all_invoices(limit: Optional[int] = None):
+    return _all_invoices.page(limit=limit)
+
+def get_invoices_by_customer(customer_name: str, limit: Optional[int] = None):
+    return _invoices_by_customer.page((customer_name,), limit=limit)
+
+def get_ar_aging(limit: Optional[int] = None):
+    """Receivables aging per customer with an open balance, largest first."""
+    ensure_ar_schema()
+    return _ar_aging.page(limit=limit)
+
+def get_ar_totals():
+    """Company-wide receivables balance per aging bucket (one row)."""
+    ensure_ar_schema()
+    rows = execute_query(
+        """SELECT ROUND(IFNULL(SUM(balance), 0), 2), ROUND(IFNULL(SUM(bucket_0_30), 0), 2),
+                  ROUND(IFNULL(SUM(bucket_31_60), 0), 2), ROUND(IFNULL(SUM(bucket_61_90), 0), 2),
+                  ROUND(IFNULL(SUM(bucket_90_plus), 0), 2), IFNULL(SUM(open_invoices), 0)
+           FROM ar_customer_balances"""
+    )
+    return {"type": "table", "headers": ["Balance", "0-30", "31-60", "61-90", "90+", "Open Invoices"],
+            "rows": [list(r) for r in rows]}
+
+def get_customer_balance(customer_name: str, limit: Optional[int] = None):
+    ensure_ar_schema()
+    return _customer_balance.page((customer_name.strip(" '\""),), limit=limit)
+
+def _build_tool_list():
+    from langchain_core.tools import Tool
+
+    return [
+        Tool(name="Unpaid Invoices Tool", func=lambda _: get_unpaid_invoices(), description="List all unpaid invoices."),
+        Tool(name="Paid Invoices Tool", func=lambda _: get_paid_invoices(), description="List all paid invoices."),
+        Tool(name="Cancelled Invoices Tool", func=lambda _: get_cancelled_invoices(), description="List all cancelled invoices."),
+        Tool(name="All Invoices Tool", func=lambda _: get_all_invoices(), description="List all invoices."),
+        Tool(name="Invoices By Customer Tool", func=get_invoices_by_customer, description="List all invoices for a given customer name."),
+        Tool(name="AR Aging Tool", func=lambda _: get_ar_aging(), description="Receivables aging report: open balance per customer in 0-30/31-60/61-90/90+ day buckets."),
+        Tool(name="Customer Balance Tool", func=get_customer_balance, description="Outstanding receivable balance and aging for a given customer name."),
+        Tool(name="Finance SQL Tool", func=finance_sql_read, description="Run SQL for finance-related questions not covered by other tools."),
+        Tool(name="Finance Write Tool", func=finance_sql_write, description="Perform finance write actions like creating invoices or posting payments.")
+    ]
+
+
+# Built on first access: importing langchain_core.tools costs most of a second
+_tool_list = Lazy(_build_tool_list)
+
+
+def __getattr__(name):
+    if name == "finance_tool_list":
+        return _tool_list.get()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,13 +2,15 @@
 from langchain.agents import Tool
 from services.text_to_sql import text_to_sql_tool
 from services.sql import execute_query
-import sqlite3
 from typing import Any, Dict, List
 from pydantic import BaseModel
 from core.config import DB_PATH
+from core.db import get_manager
+from services.result_cache import invalidates
+from domain.inventory.tools import get_stock_levels
 
 def _conn():
-    return sqlite3.connect(DB_PATH)
+    return get_manager(DB_PATH).writer()
 
 class CreatePOInput(BaseModel):
     supplier_id: int
@@ -22,6 +24,7 @@ class ReceivePOInput(BaseModel):
 def inventory_sql_read(nl_query: str):
     return text_to_sql_tool(nl_query)
 
+@invalidates("purchase_orders", "po_items", "po_receipts", "stock", "stock_movements")
 def inventory_sql_write(action: str, payload: Dict[str, Any]):
     with _conn() as conn:
         if action == "create_po":
@@ -45,10 +48,6 @@ def inventory_sql_write(action: str, payload: Dict[str, Any]):
             return {"po_id": data.po_id, "product_id": data.product_id, "received_qty": data.received_qty}
     return {"error": "unknown_action"}
 
-def get_stock_levels():
-    return {"type": "table", "headers": ["Product ID", "Qty On Hand", "Reorder Point"],
-            "rows": execute_query("SELECT product_id, qty_on_hand, reorder_point FROM stock")}
-
 def log_stock_movement(product_id: int, change: int, reason: str, ref_id: int):
     return execute_query("INSERT INTO stock_movements (product_id, change_qty, reason, ref_id, created_at) VALUES (?, ?, ?, ?, datetime('now'))",
                          (product_id, change, reason, ref_id))
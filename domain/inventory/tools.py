@@ -1,14 +1,16 @@
 # domain/inventory/tools.py
-from langchain.agents import Tool
-from services.text_to_sql import text_to_sql_tool
+from services.text_to_sql import atext_to_sql_tool, text_to_sql_tool
 from services.sql import execute_query
-import sqlite3
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel
 from core.config import DB_PATH
+from core.db import get_manager
+from core.lazy import Lazy
+from services.result_cache import invalidates
+from services.pagination import PagedQuery
 
 def _conn():
-    return sqlite3.connect(DB_PATH)
+    return get_manager(DB_PATH).writer()
 
 class CreatePOInput(BaseModel):
     supplier_id: int
@@ -22,6 +24,10 @@ class ReceivePOInput(BaseModel):
 def inventory_sql_read(nl_query: str):
     return text_to_sql_tool(nl_query)
 
+async def ainventory_sql_read(nl_query: str):
+    return await atext_to_sql_tool(nl_query)
+
+@invalidates("purchase_orders", "po_items", "po_receipts", "stock", "stock_movements")
 def inventory_sql_write(action: str, payload: Dict[str, Any]):
     with _conn() as conn:
         if action == "create_po":
@@ -45,17 +51,34 @@ def inventory_sql_write(action: str, payload: Dict[str, Any]):
             return {"po_id": data.po_id, "product_id": data.product_id, "received_qty": data.received_qty}
     return {"error": "unknown_action"}
 
-def get_stock_levels():
-    return {"type": "table", "headers": ["Product ID", "Qty On Hand", "Reorder Point"],
-            "rows": execute_query("SELECT product_id, qty_on_hand, reorder_point FROM stock")}
+_stock_levels = PagedQuery(
+    "inventory.stock_levels", ["Product ID", "Qty On Hand", "Reorder Point"],
+    ["product_id", "qty_on_hand", "reorder_point"], "stock", order_by=["id"],
+)
+
+def get_stock_levels(limit: Optional[int] = None):
+    return _stock_levels.page(limit=limit)
 
 def log_stock_movement(product_id: int, change: int, reason: str, ref_id: int):
     return execute_query("INSERT INTO stock_movements (product_id, change_qty, reason, ref_id, created_at) VALUES (?, ?, ?, ?, datetime('now'))",
                          (product_id, change, reason, ref_id))
 
-inventory_tool_list = [
-    Tool(name="Inventory SQL Read Tool", func=inventory_sql_read, description="Run SQL queries for inventory-related questions."),
-    Tool(name="Inventory SQL Write Tool", func=inventory_sql_write, description="Perform inventory write actions like creating purchase orders or receiving stock."),
-    Tool(name="Get Stock Levels Tool", func=lambda _: get_stock_levels(), description="List current stock levels for all products."),
-    Tool(name="Log Stock Movement Tool", func=lambda args: log_stock_movement(**args), description="Log a stock movement for a given product.")
-]
+def _build_tool_list():
+    from langchain_core.tools import Tool
+
+    return [
+        Tool(name="Inventory SQL Read Tool", func=inventory_sql_read, description="Run SQL queries for inventory-related questions."),
+        Tool(name="Inventory SQL Write Tool", func=inventory_sql_write, description="Perform inventory write actions like creating purchase orders or receiving stock."),
+        Tool(name="Get Stock Levels Tool", func=lambda _: get_stock_levels(), description="List current stock levels for all products."),
+        Tool(name="Log Stock Movement Tool", func=lambda args: log_stock_movement(**args), description="Log a stock movement for a given product.")
+    ]
+
+
+# Built on first access: importing langchain_core.tools costs most of a second
+_tool_list = Lazy(_build_tool_list)
+
+
+def __getattr__(name):
+    if name == "inventory_tool_list":
+        return _tool_list.get()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,27 +1,13 @@
 # domain/sales/agent.py
 from langchain.agents import initialize_agent, Tool
 from langchain.prompts import ChatPromptTemplate
-from services.llm import llm
-from services.sql import execute_query
+from services.llm import get_llm
+from core.lazy import Lazy
 from services.text_to_sql import text_to_sql_tool
 from domain.finance import tools as finance_tools
+from domain.sales.tools import list_all_customers, count_customers, order_items_for_order
 from core.logging import logger
 
-# Tool wrappers for Sales-specific queries
-def list_all_customers(_):
-    rows = execute_query("SELECT id, name, email, phone FROM customers")
-    return {"type": "table", "headers": ["id", "name", "email", "phone"], "rows": rows}
-
-def count_customers(_):
-    rows = execute_query("SELECT COUNT(*) FROM customers")
-    count = rows[0][0] if rows else 0
-    return {"type": "text", "content": f"We have {count} customers."}
-
-def order_items_for_order(order_id: str):
-    sql = "SELECT id, product_id, quantity, price FROM order_items WHERE order_id = ?"
-    rows = execute_query(sql, (order_id,))
-    return {"type": "table", "headers": ["id", "product_id", "quantity", "price"], "rows": rows}
-
 # Wrap functions as LangChain Tools
 sales_tool_list = [
     Tool(name="List All Customers Tool", func=list_all_customers,
@@ -57,19 +43,19 @@ Always return results in the structured dict format:
 {{"type": "table", "headers": [...], "rows": [...]}} or {{"type": "text", "content": "..."}}
 """)
 
-# Initialize the LangChain agent
-sales_agent_executor = initialize_agent(
+# Initialize the LangChain agent on first use, not at import
+sales_agent_executor = Lazy(lambda: initialize_agent(
     tools=sales_tool_list,
-    llm=llm,
+    llm=get_llm(),
     agent="zero-shot-react-description",
     verbose=True
-)
+))
 
 class SalesAgent:
     def process_request(self, prompt: str):
         logger.info(f"[SalesAgent] Received prompt: {prompt}")
         try:
-            result = sales_agent_executor.run(prompt)
+            result = sales_agent_executor.get().run(prompt)
             if isinstance(result, dict):
                 return result
             return {"type": "text", "content": str(result)}
@@ -1,14 +1,17 @@
 # domain/sales/tools.py
-import sqlite3
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field
 from core.config import DB_PATH
-from services.text_to_sql import text_to_sql_tool
+from core.db import get_manager
+from core.lazy import Lazy
+from services.result_cache import invalidates
+from services.pagination import PagedQuery
+from services.text_to_sql import atext_to_sql_tool, text_to_sql_tool
 from services.sql import execute_query
-from langchain.agents import Tool
+from services.bulk import bulk_write, inserted_ids
 
 def _conn():
-    return sqlite3.connect(DB_PATH)
+    return get_manager(DB_PATH).writer()
 
 # ---------- Pydantic models for write actions ----------
 class CreateLeadInput(BaseModel):
@@ -18,9 +21,14 @@ class CreateLeadInput(BaseModel):
     score: float = 0.0
     status: str = Field(default="new")
 
+class OrderItemInput(BaseModel):
+    product_id: int
+    quantity: float
+    price: float
+
 class CreateOrderInput(BaseModel):
     customer_id: int
-    items: List[Dict[str, Any]]  # [{product_id, quantity, price}]
+    items: List[OrderItemInput]
     status: str = "pending"
 
 # ---------- Core functions ----------
@@ -28,46 +36,66 @@ def sales_sql_read(nl_query: str):
     """Run sales-related natural language queries via text-to-SQL."""
     return text_to_sql_tool(nl_query)
 
+async def asales_sql_read(nl_query: str):
+    return await atext_to_sql_tool(nl_query)
+
+def _insert_leads(conn, leads: List[CreateLeadInput]) -> List[Dict[str, Any]]:
+    conn.executemany(
+        """
+        INSERT INTO leads (customer_name, contact_email, message, score, status, created_at)
+        VALUES (?, ?, ?, ?, ?, datetime('now'))
+        """,
+        [(l.customer_name, l.contact_email, l.message, l.score, l.status) for l in leads],
+    )
+    return [{"lead_id": lead_id, "status": "created"} for lead_id in inserted_ids(conn, len(leads))]
+
+def _insert_orders(conn, orders: List[CreateOrderInput]) -> List[Dict[str, Any]]:
+    # Totals are known up front, so orders go in complete (no follow-up UPDATE)
+    totals = [sum(it.quantity * it.price for it in o.items) for o in orders]
+    conn.executemany(
+        "INSERT INTO orders (customer_id, total, status, created_at) VALUES (?, ?, ?, datetime('now'))",
+        [(o.customer_id, total, o.status) for o, total in zip(orders, totals)],
+    )
+    ids = inserted_ids(conn, len(orders))
+    conn.executemany(
+        "INSERT INTO order_items (order_id, product_id, quantity, price) VALUES (?, ?, ?, ?)",
+        [(order_id, it.product_id, it.quantity, it.price) for order_id, o in zip(ids, orders) for it in o.items],
+    )
+    return [{"order_id": order_id, "total": total, "status": "created"} for order_id, total in zip(ids, totals)]
+
+@invalidates("leads", "orders", "order_items")
 def sales_sql_write(action: str, payload: Dict[str, Any]):
     """Perform sales-related write actions like creating leads or orders."""
     if action == "create_lead":
         data = CreateLeadInput(**payload)
         with _conn() as conn:
-            cur = conn.execute(
-                """
-                INSERT INTO leads (customer_name, contact_email, message, score, status, created_at)
-                VALUES (?, ?, ?, ?, ?, datetime('now'))
-                """,
-                (data.customer_name, data.contact_email, data.message, data.score, data.status),
-            )
-            return {"lead_id": cur.lastrowid, "status": "created"}
+            return _insert_leads(conn, [data])[0]
 
     if action == "create_order":
         data = CreateOrderInput(**payload)
         with _conn() as conn:
-            cur = conn.execute(
-                "INSERT INTO orders (customer_id, total, status, created_at) VALUES (?, 0, ?, datetime('now'))",
-                (data.customer_id, data.status),
-            )
-            order_id = cur.lastrowid
-            total = 0.0
-            for it in data.items:
-                qty = float(it["quantity"])
-                price = float(it["price"])
-                total += qty * price
-                conn.execute(
-                    "INSERT INTO order_items (order_id, product_id, quantity, price) VALUES (?, ?, ?, ?)",
-                    (order_id, it["product_id"], qty, price),
-                )
-            conn.execute("UPDATE orders SET total = ? WHERE id = ?", (total, order_id))
-            return {"order_id": order_id, "total": total, "status": "created"}
+            return _insert_orders(conn, [data])[0]
 
     return {"error": "unknown_action"}
 
+@invalidates("leads")
+def create_leads(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Create many leads in one transaction; invalid items are reported per item."""
+    return bulk_write(CreateLeadInput, items, _insert_leads, _conn)
+
+@invalidates("orders", "order_items")
+def create_orders(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Create many orders (with their items) in one transaction; invalid items are reported per item."""
+    return bulk_write(CreateOrderInput, items, _insert_orders, _conn)
+
 # ---------- Extra helper functions for Sales ----------
-def list_all_customers(_):
-    rows = execute_query("SELECT id, name, email, phone FROM customers")
-    return {"type": "table", "headers": ["id", "name", "email", "phone"], "rows": rows}
+_customers = PagedQuery(
+    "sales.customers", ["id", "name", "email", "phone"], ["id", "name", "email", "phone"], "customers",
+    order_by=["id"],
+)
+
+def list_all_customers(_=None, limit: Optional[int] = None):
+    return _customers.page(limit=limit)
 
 def count_customers(_):
     rows = execute_query("SELECT COUNT(*) FROM customers")
@@ -80,15 +108,28 @@ def order_items_for_order(order_id: str):
     return {"type": "table", "headers": ["id", "product_id", "quantity", "price"], "rows": rows}
 
 # ---------- LangChain Tool list ----------
-sales_tool_list = [
-    Tool(name="List All Customers Tool", func=list_all_customers,
-         description="List all customers with their ID, name, email, and phone."),
-    Tool(name="Count Customers Tool", func=count_customers,
-         description="Count the total number of customers."),
-    Tool(name="Order Items For Order Tool", func=order_items_for_order,
-         description="List all items for a given order ID."),
-    Tool(name="Sales SQL Read Tool", func=sales_sql_read,
-         description="Run SQL for sales-related questions not covered by other tools."),
-    Tool(name="Sales SQL Write Tool", func=sales_sql_write,
-         description="Perform sales write actions like creating leads or orders.")
-]
+def _build_tool_list():
+    from langchain_core.tools import Tool
+
+    return [
+        Tool(name="List All Customers Tool", func=list_all_customers,
+             description="List all customers with their ID, name, email, and phone."),
+        Tool(name="Count Customers Tool", func=count_customers,
+             description="Count the total number of customers."),
+        Tool(name="Order Items For Order Tool", func=order_items_for_order,
+             description="List all items for a given order ID."),
+        Tool(name="Sales SQL Read Tool", func=sales_sql_read,
+             description="Run SQL for sales-related questions not covered by other tools."),
+        Tool(name="Sales SQL Write Tool", func=sales_sql_write,
+             description="Perform sales write actions like creating leads or orders.")
+    ]
+
+
+# Built on first access: importing langchain_core.tools costs most of a second
+_tool_list = Lazy(_build_tool_list)
+
+
+def __getattr__(name):
+    if name == "sales_tool_list":
+        return _tool_list.get()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,166 @@
+# orchestrator/dispatch.py
+"""
+Direct dispatch: requests whose whole wording maps to exactly one read tool
+run that tool without the LangChain agent (and its LLM round trip).
+
+A route matches only when its pattern covers the entire utterance, so
+"unpaid invoices" is dispatched but "unpaid invoices over 5,000 by region"
+still goes to the agent. Extracted parameters are checked before a route
+is taken; a customer name or order id that is not in the database is
+treated as ambiguous and left to the agent as well.
+"""
+import re
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional
+
+from domain.finance.tools import (
+    get_all_invoices,
+    get_ar_aging,
+    get_ar_totals,
+    get_customer_balance,
+    get_cancelled_invoices,
+    get_invoices_by_customer,
+    get_paid_invoices,
+    get_unpaid_invoices,
+)
+from domain.inventory.tools import get_stock_levels
+from domain.sales.tools import count_customers, list_all_customers, order_items_for_order
+from services.sql import execute_query
+
+# Optional politeness/verb prefix and trailing punctuation shared by all routes
+_LEAD = r"^\s*(?:please\s+)?(?:(?:can|could)\s+you\s+)?(?:list|show|get|display|give|fetch|check)?\s*(?:me\s+)?(?:all\s+|all\s+of\s+)?(?:the\s+|our\s+|my\s+)?"
+_TAIL = r"\s*(?:please)?\s*[.?!]*\s*$"
+
+
+class DirectRoute(NamedTuple):
+    name: str
+    module: str
+    pattern: "re.Pattern[str]"
+    # match -> payload, or None when the extracted parameters don't check out
+    handler: Callable[["re.Match[str]"], Optional[Dict[str, Any]]]
+
+
+def _route(name: str, module: str, body: str, handler) -> DirectRoute:
+    return DirectRoute(name, module, re.compile(_LEAD + body + _TAIL, re.IGNORECASE), handler)
+
+
+def _customer_name(raw: str) -> Optional[str]:
+    # Canonical spelling of a known customer, or None
+    rows = execute_query(
+        "SELECT name FROM customers WHERE name = ? COLLATE NOCASE LIMIT 1", (raw.strip(" '\""),)
+    )
+    return rows[0][0] if rows else None
+
+
+def _invoices_by_customer(m: "re.Match[str]") -> Optional[Dict[str, Any]]:
+    name = _customer_name(m.group("customer"))
+    return get_invoices_by_customer(name) if name else None
+
+
+def _customer_balance(m: "re.Match[str]") -> Optional[Dict[str, Any]]:
+    name = _customer_name(m.group("customer"))
+    return get_customer_balance(name) if name else None
+
+
+def _order_id(raw: str) -> Optional[int]:
+    # The id of an existing order, or None
+    rows = execute_query("SELECT id FROM orders WHERE id = ?", (int(raw),))
+    return rows[0][0] if rows else None
+
+
+def _order_items(m: "re.Match[str]") -> Optional[Dict[str, Any]]:
+    order_id = _order_id(m.group("order_id") or m.group("order_id2"))
+    return order_items_for_order(order_id) if order_id is not None else None
+
+
+_INVOICE_STATUS = {
+    "unpaid": get_unpaid_invoices,
+    "outstanding": get_unpaid_invoices,
+    "open": get_unpaid_invoices,
+    "paid": get_paid_invoices,
+    "cancelled": get_cancelled_invoices,
+    "canceled": get_cancelled_invoices,
+}
+
+ROUTES: List[DirectRoute] = [
+    _route("finance_get_invoices_by_status", "finance",
+           r"(?P<status>unpaid|outstanding|open|paid|cancelled|canceled)\s+invoices?",
+           lambda m: _INVOICE_STATUS[m.group("status").lower()]()),
+    _route("finance_get_all_invoices", "finance", r"invoices", lambda m: get_all_invoices()),
+    _route("finance_get_invoices_by_customer", "finance",
+           r"invoices?\s+(?:for|of|from|billed\s+to)\s+(?:customer\s+)?(?P<customer>[\w&.,' -]+?)",
+           _invoices_by_customer),
+    _route("finance_get_ar_aging", "finance",
+           r"(?:(?:(?:ar|a/r|accounts\s+receivable|receivables?)\s+)?aging(?:\s+report)?(?:\s+(?:for|of)\s+(?:the\s+)?receivables)?"
+           r"|(?:customer|ar|a/r)\s+balances)",
+           lambda m: get_ar_aging()),
+    _route("finance_get_ar_totals", "finance",
+           r"(?:total\s+)?(?:ar|a/r|accounts\s+receivable|receivables)(?:\s+(?:balance|total|summary))?",
+           lambda m: get_ar_totals()),
+    _route("finance_get_customer_balance", "finance",
+           r"(?:outstanding\s+)?balance\s+(?:for|of)\s+(?:customer\s+)?(?P<customer>[\w&.,' -]+?)",
+           _customer_balance),
+    _route("sales_count_customers", "sales",
+           r"(?:how\s+many\s+customers(?:\s+(?:do\s+we\s+have|are\s+there|have\s+we\s+got))?"
+           r"|(?:count|number\s+of)\s+(?:the\s+)?customers|customer\s+count)",
+           lambda m: count_customers(None)),
+    _route("sales_list_customers", "sales", r"customers(?:\s+list)?", lambda m: list_all_customers()),
+    _route("sales_order_items", "sales",
+           r"(?:(?:items|lines|line\s+items|products)\s+(?:in|for|of|on)\s+order\s*(?:id\s*)?#?\s*(?P<order_id>\d+)"
+           r"|order\s*(?:id\s*)?#?\s*(?P<order_id2>\d+)(?:'s)?\s+(?:items|lines|line\s+items))",
+           _order_items),
+    _route("inventory_get_stock_levels", "inventory",
+           r"(?:current\s+)?(?:stock|inventory)(?:\s+levels?|\s+on\s+hand)?",
+           lambda m: get_stock_levels()),
+]
+
+
+def match_route(text: str) -> Optional[tuple]:
+    """(route, payload) for the first route that fully matches ``text``, else None."""
+    for route in ROUTES:
+        m = route.pattern.match(text)
+        if m is None:
+            continue
+        payload = route.handler(m)
+        if payload is not None:
+            return route, payload
+    return None
+
+
+class PathStats:
+    """Request counts and recent latencies per routing path (direct:<route>, agent, ...)."""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, path: str, seconds: float) -> None:
+        with self._lock:
+            self._counts[path] = self._counts.get(path, 0) + 1
+            self._samples.setdefault(path, deque(maxlen=self.window)).append(seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            paths = {}
+            for path, count in self._counts.items():
+                s = sorted(self._samples[path])
+                paths[path] = {
+                    "count": count,
+                    "p50_ms": round(s[len(s) // 2] * 1000, 2),
+                    "p95_ms": round(s[min(len(s) - 1, int(len(s) * 0.95))] * 1000, 2),
+                }
+            total = sum(self._counts.values())
+            agent = self._counts.get("agent", 0)
+        return {
+            "total": total,
+            # share of requests answered without an LLM call
+            "llm_skipped_ratio": round((total - agent) / total, 3) if total else 0.0,
+            "paths": paths,
+        }
+
+
+PATH_STATS = PathStats()
+
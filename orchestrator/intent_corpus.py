@@ -0,0 +1,69 @@
+# orchestrator/intent_corpus.py
+"""
+Labelled utterances for the intent rules in orchestrator/intents.py, shared
+by test_intent_classifier.py and benchmarks/bench_intent.py.
+"""
+
+# (utterance, module, access)
+CORPUS = [
+    # greetings
+    ("hi", "general", "none"),
+    ("Hello there", "general", "none"),
+    ("hey", "general", "none"),
+    ("thanks!", "general", "none"),
+    ("thank you so much", "general", "none"),
+    # sales
+    ("List all customers", "sales", "read"),
+    ("How many customers do we have?", "sales", "read"),
+    ("Show me orders placed in the last 30 days", "sales", "read"),
+    ("What's our average order value this month", "sales", "read"),
+    ("Which customers haven't ordered in 6 months", "sales", "read"),
+    ("show open tickets", "sales", "read"),
+    ("Score the lead Acme Corp", "sales", "read"),
+    ("Create a new customer called Globex", "sales", "write"),
+    ("Add a lead for Initech", "sales", "write"),
+    ("update order 42 status to shipped", "sales", "write"),
+    ("Total sales by customer", "sales", "read"),
+    ("show this week's sales", "sales", "read"),
+    ("Hi, list my customers", "sales", "read"),
+    # finance
+    ("List all unpaid invoices", "finance", "read"),
+    ("show paid invoices", "finance", "read"),
+    ("Show me the aging report for receivables", "finance", "read"),
+    ("cash-flow forecast for next quarter", "finance", "read"),
+    ("What is our refund policy?", "finance", "read"),
+    ("ledger balance for account 4000", "finance", "read"),
+    ("Post a payment of 5,000 AED to invoice INV-2025-003", "finance", "write"),
+    ("Record a payment for invoice 17", "finance", "write"),
+    ("allocate the payment to the oldest invoices", "finance", "write"),
+    ("posting payments for this month", "finance", "write"),
+    ("thanks, now show cancelled invoices", "finance", "read"),
+    ("accounts payable summary", "finance", "read"),
+    # inventory
+    ("Check stock levels for product P-102", "inventory", "read"),
+    ("List all products below their reorder point", "inventory", "read"),
+    ("Receive 50 units of product P-204 from supplier S-11", "inventory", "write"),
+    ("Create a purchase order for 100 widgets", "inventory", "write"),
+    ("list open purchase orders", "inventory", "read"),
+    ("status of PO-778", "inventory", "read"),
+    ("which suppliers deliver fastest", "inventory", "read"),
+    ("update stock quantity for SKU 9", "inventory", "write"),
+    ("quantities on hand in the main warehouse", "inventory", "read"),
+    ("received goods from the supplier yesterday", "inventory", "write"),
+    # analytics
+    ("Generate a KPI report for August", "analytics", "read"),
+    ("show the revenue trend chart", "analytics", "read"),
+    ("what does churn mean in the glossary", "analytics", "read"),
+    ("monthly metrics dashboard", "analytics", "read"),
+    ("analytics for Q3", "analytics", "read"),
+    ("export the weekly report", "analytics", "read"),
+    # unknown / substring traps
+    ("what is the weather like", "unknown", "none"),
+    ("this is important", "unknown", "none"),
+    ("ship it", "unknown", "none"),
+    ("tell me a joke", "unknown", "none"),
+    ("whichever you prefer", "unknown", "none"),
+    ("export the weekly reports", "analytics", "read"),
+    ("the deposition transcript", "unknown", "none"),
+    ("borderline cases", "unknown", "none"),
+]
@@ -0,0 +1,144 @@
+# orchestrator/intents.py
+"""
+Keyword intent rules, compiled once into a single-pass matcher.
+
+Every keyword in RULES/GREETINGS is expanded into its inflected forms and
+stored in one phrase table keyed by lowercase word tuples. Matching
+tokenizes the text once and walks it left to right, trying the longest
+phrase first, so "purchase order" wins over "order" and "hi" no longer
+fires inside "this". The collected tags are then read off by rule priority.
+"""
+import re
+from typing import Dict, FrozenSet, List, NamedTuple, Set, Tuple
+
+from core.tracing import traced
+
+
+class Rule(NamedTuple):
+    module: str
+    # nouns: also match their plural ("invoice" -> "invoices")
+    keywords: Tuple[str, ...]
+    # verbs that make the request a write: also match -s/-ed/-ing
+    write_verbs: Tuple[str, ...] = ()
+    # matched as written, no inflection
+    exact: Tuple[str, ...] = ()
+
+
+# Highest priority first
+RULES: Tuple[Rule, ...] = (
+    Rule("sales",
+         keywords=("customer", "lead", "order", "ticket", "crm", "sale"),
+         write_verbs=("create", "add", "open", "insert", "update"),
+         exact=("new",)),
+    Rule("finance",
+         keywords=("invoice", "ledger", "payment", "account", "policy", "finance",
+                   "cash flow", "aging", "aging report", "aging bucket", "receivable", "payable"),
+         write_verbs=("create", "add", "post", "allocate", "update", "record")),
+    Rule("inventory",
+         keywords=("stock", "inventory", "supplier", "purchase order", "purchase", "po",
+                   "reorder", "product", "quantity", "warehouse"),
+         write_verbs=("create", "add", "receive", "update")),
+    Rule("analytics",
+         keywords=("report", "kpi", "analytics", "chart", "trend", "glossary", "metric", "dashboard")),
+)
+
+GREETINGS: Tuple[str, ...] = ("hi", "hello", "hey", "thanks", "thank you")
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _noun(word: str) -> List[str]:
+    if word.endswith("y") and word[-2:-1] not in "aeiou":
+        return [word, word[:-1] + "ies"]
+    return [word, word + "s", word + "es"]
+
+
+def _verb(word: str) -> List[str]:
+    if word.endswith("e"):
+        return [word, word + "s", word + "d", word[:-1] + "ing"]
+    return [word, word + "s", word + "ed", word + "ing"]
+
+
+def _exact(word: str) -> List[str]:
+    return [word]
+
+
+def _phrases(words: str, inflect) -> List[Tuple[str, ...]]:
+    # inflect the last word only; "cash-flow" and "cash flow" tokenize alike
+    parts = _TOKEN_RE.findall(words.lower())
+    return [tuple(parts[:-1]) + (form,) for form in inflect(parts[-1])]
+
+
+class IntentMatcher:
+    """Classifies text against a rule table in one pass over its words."""
+
+    def __init__(self, rules: Tuple[Rule, ...] = RULES, greetings: Tuple[str, ...] = GREETINGS):
+        self.modules = [r.module for r in rules]
+        # word tuple -> tags it sets; a verb shared by several modules sets all of them
+        table: Dict[Tuple[str, ...], Set[str]] = {}
+
+        def add(words: str, inflect, tag: str) -> None:
+            for phrase in _phrases(words, inflect):
+                table.setdefault(phrase, set()).add(tag)
+
+        for rule in rules:
+            for w in rule.keywords:
+                add(w, _noun, rule.module)
+            for w in rule.write_verbs:
+                add(w, _verb, "write:" + rule.module)
+            for w in rule.exact:
+                add(w, _exact, "write:" + rule.module)
+        for w in greetings:
+            add(w, _exact, "greeting")
+
+        self._table: Dict[Tuple[str, ...], FrozenSet[str]] = {k: frozenset(v) for k, v in table.items()}
+        self._single: Dict[str, FrozenSet[str]] = {k[0]: v for k, v in self._table.items() if len(k) == 1}
+        self._longest = max(len(k) for k in self._table)
+        # first words of multi-word phrases; only these need a longer lookahead
+        self._starts: FrozenSet[str] = frozenset(k[0] for k in self._table if len(k) > 1)
+
+    def tags(self, text: str) -> Set[str]:
+        words = _TOKEN_RE.findall(text.lower())
+        found: Set[str] = set()
+        table, single, starts = self._table, self._single, self._starts
+        i, n = 0, len(words)
+        while i < n:
+            w = words[i]
+            i += 1
+            if w in starts:
+                for size in range(min(self._longest, n - i + 1), 1, -1):
+                    hit = table.get(tuple(words[i - 1:i - 1 + size]))
+                    if hit:
+                        found |= hit
+                        i += size - 1
+                        break
+                else:
+                    hit = single.get(w)
+                    if hit:
+                        found |= hit
+                continue
+            hit = single.get(w)
+            if hit:
+                found |= hit
+        return found
+
+    def classify(self, text: str) -> Tuple[str, str, str]:
+        """(module, access, action), e.g. ("finance", "write", "finance_write")."""
+        found = self.tags(text)
+        for module in self.modules:
+            if module in found:
+                if "write:" + module in found:
+                    return module, "write", f"{module}_write"
+                return module, "read", f"{module}_read"
+        if "greeting" in found:
+            return "general", "none", "greeting"
+        return "unknown", "none", "fallback"
+
+
+MATCHER = IntentMatcher()
+
+
+@traced("classify_intent")
+def classify_intent(text: str) -> Tuple[str, str, str]:
+    return MATCHER.classify(text)
@@ -1,8 +1,9 @@
 # orchestrator/router_agent.py
-import re
 import json
 import ast
-from typing import Any, Dict, Tuple
+import functools
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 from services.governance import (
     log_tool_call,
@@ -11,7 +12,7 @@ from services.governance import (
     ensure_conversation,
     save_message,
 )
-from services.llm import llm
+from services.llm import get_llm
 from services.rag import rag_definition_tool, policy_rag_tool
 from services.ml import lead_score_tool as _lead_score_tool, anomaly_detector_tool as _anomaly_detector_tool
 
@@ -21,50 +22,32 @@ from domain.finance.tools import (
     get_cancelled_invoices,
     get_all_invoices,
     get_invoices_by_customer,
+    get_ar_aging,
+    get_customer_balance,
     finance_sql_read as _finance_sql_read,
+    afinance_sql_read as _afinance_sql_read,
     finance_sql_write as _finance_sql_write,
 )
 from domain.sales.tools import (
     sales_sql_read as _sales_sql_read,
+    asales_sql_read as _asales_sql_read,
     sales_sql_write as _sales_sql_write,
 )
 from domain.inventory.tools import (
     inventory_sql_read as _inventory_sql_read,
+    ainventory_sql_read as _ainventory_sql_read,
     inventory_sql_write as _inventory_sql_write,
     get_stock_levels as _get_stock_levels,
 )
-from services.text_to_sql import text_to_sql_tool as _text_to_sql
-
-from langchain.tools import Tool
-from langchain.agents import initialize_agent, AgentType
-from langchain.memory import ConversationBufferWindowMemory
-
-
-def classify_intent(text: str) -> Tuple[str, str, str]:
-    tl = text.lower().strip()
-    if any(g in tl for g in ["hi", "hello", "hey", "thanks", "thank you"]):
-        return "general", "none", "greeting"
-    if any(k in tl for k in ["customer", "lead", "order", "ticket", "crm", "sales"]):
-        if any(k in tl for k in ["create", "add", "open", "insert", "update", "new"]):
-            return "sales", "write", "sales_write"
-        return "sales", "read", "sales_read"
-    if (
-        any(k in tl for k in ["invoice", "ledger", "payment", "account", "policy", "finance"])
-        or re.search(r"\b(cash[- ]flow|aging|aging report|aging buckets)\b", tl)
-    ):
-        if any(k in tl for k in ["create", "add", "post", "allocate", "update", "record"]):
-            return "finance", "write", "finance_write"
-        return "finance", "read", "finance_read"
-    if any(k in tl for k in [
-        "stock", "inventory", "supplier", "purchase order", "po", "reorder",
-        "product", "products", "quantity"
-    ]):
-        if any(k in tl for k in ["create", "add", "receive", "update"]):
-            return "inventory", "write", "inventory_write"
-        return "inventory", "read", "inventory_read"
-    if any(k in tl for k in ["report", "kpi", "analytics", "chart", "trend", "glossary"]):
-        return "analytics", "read", "analytics_read"
-    return "unknown", "none", "fallback"
+from services.text_to_sql import atext_to_sql_tool as _atext_to_sql, text_to_sql_tool as _text_to_sql
+from orchestrator.intents import classify_intent
+from orchestrator.dispatch import PATH_STATS, match_route
+from core.db import run_db
+from core.lazy import Lazy
+from core.tracing import span, traced
+from core.memory import SessionStore
+from orchestrator.tool_results import collect, resolve, stash, summarize
+from services.query_log import trace_reads
 
 
 def _json_dumps(obj: Any) -> str:
@@ -74,6 +57,26 @@ def _json_dumps(obj: Any) -> str:
         return json.dumps({"type": "text", "content": str(obj)}, ensure_ascii=False)
 
 
+# Reads of one turn kept in its audit rows (an agent can run many)
+AUDIT_MAX_QUERIES = 10
+
+
+def _audit_content(result: Any, reads: List[Dict[str, Any]] = ()) -> str:
+    """
+    What ``messages`` and ``tool_calls`` keep for a payload, as JSON. A table
+    keeps its one-line summary and the queries (SQL and params) the turn read
+    it with, enough to run them again, instead of its rows: serializing every
+    row cost ~0.5 s and ~10 MB per turn for a 100k-row result. Anything else
+    is kept whole.
+    """
+    if isinstance(result, dict) and result.get("type") == "table":
+        record = {"type": "table", "summary": summarize(result), "queries": list(reads)[-AUDIT_MAX_QUERIES:]}
+        if result.get("next_cursor"):
+            record["next_cursor"] = result["next_cursor"]
+        return _json_dumps(record)
+    return _json_dumps(result)
+
+
 def _parse_possible_json(s: str) -> Dict[str, Any]:
     try:
         obj = json.loads(s)
@@ -98,111 +101,289 @@ def text_payload(text: str) -> Dict[str, Any]:
     return {"type": "text", "content": text}
 
 
+def _sql_read_coroutine(name: str, fn):
+    # Text-to-SQL under ainvoke: the LLM call stays on the event loop and
+    # only its DB work goes to the DB executor (see atext_to_sql_tool)
+    async def run(input):
+        with span(f"tool.{name}"):
+            return stash(await fn(str(input)))
+    return run
+
+
 def _build_finance_tools():
+    from langchain_core.tools import Tool
+
     return [
-        Tool.from_function(func=lambda input: _json_dumps(get_unpaid_invoices()), name="finance_get_unpaid_invoices", description="List unpaid invoices", return_direct=True),
-        Tool.from_function(func=lambda input: _json_dumps(get_paid_invoices()), name="finance_get_paid_invoices", description="List paid invoices", return_direct=True),
-        Tool.from_function(func=lambda input: _json_dumps(get_cancelled_invoices()), name="finance_get_cancelled_invoices", description="List cancelled invoices", return_direct=True),
-        Tool.from_function(func=lambda input: _json_dumps(get_all_invoices()), name="finance_get_all_invoices", description="List all invoices", return_direct=True),
-        Tool.from_function(func=lambda input: _json_dumps(get_invoices_by_customer(str(input))), name="finance_get_invoices_by_customer", description="Invoices for a customer", return_direct=True),
-        Tool.from_function(func=lambda input: _json_dumps(_finance_sql_read(str(input))), name="finance_sql_read", description="Finance read via text-to-SQL", return_direct=True),
-        Tool.from_function(func=lambda input: _json_dumps(_finance_sql_write(**(input if isinstance(input, dict) else json.loads(input)))), name="finance_sql_write", description="Finance write actions", return_direct=True),
-        Tool.from_function(func=lambda input: _json_dumps(policy_rag_tool(str(input))), name="policy_rag_tool", description="Search finance policy docs", return_direct=True),
-        Tool.from_function(func=lambda input: _json_dumps({"type": "text", "content": str(_anomaly_detector_tool(input if isinstance(input, dict) else json.loads(input)))}), name="finance_anomaly_detector_tool", description="Anomaly risk score", return_direct=True),
+        Tool.from_function(func=lambda input: stash(get_unpaid_invoices()), name="finance_get_unpaid_invoices", description="List unpaid invoices", return_direct=True),
+        Tool.from_function(func=lambda input: stash(get_paid_invoices()), name="finance_get_paid_invoices", description="List paid invoices", return_direct=True),
+        Tool.from_function(func=lambda input: stash(get_cancelled_invoices()), name="finance_get_cancelled_invoices", description="List cancelled invoices", return_direct=True),
+        Tool.from_function(func=lambda input: stash(get_all_invoices()), name="finance_get_all_invoices", description="List all invoices", return_direct=True),
+        Tool.from_function(func=lambda input: stash(get_invoices_by_customer(str(input))), name="finance_get_invoices_by_customer", description="Invoices for a customer", return_direct=True),
+        Tool.from_function(func=lambda input: stash(get_ar_aging()), name="finance_get_ar_aging", description="Receivables aging per customer (0-30/31-60/61-90/90+ days)", return_direct=True),
+        Tool.from_function(func=lambda input: stash(get_customer_balance(str(input))), name="finance_get_customer_balance", description="Receivable balance and aging for a customer", return_direct=True),
+        Tool.from_function(func=lambda input: stash(_finance_sql_read(str(input))), coroutine=_sql_read_coroutine("finance_sql_read", _afinance_sql_read), name="finance_sql_read", description="Finance read via text-to-SQL", return_direct=True),
+        Tool.from_function(func=lambda input: stash(_finance_sql_write(**(input if isinstance(input, dict) else json.loads(input)))), name="finance_sql_write", description="Finance write actions", return_direct=True),
+        Tool.from_function(func=lambda input: stash(policy_rag_tool(str(input))), name="policy_rag_tool", description="Search finance policy docs", return_direct=True),
+        Tool.from_function(func=lambda input: stash({"type": "text", "content": str(_anomaly_detector_tool(input if isinstance(input, dict) else json.loads(input)))}), name="finance_anomaly_detector_tool", description="Anomaly risk score", return_direct=True),
     ]
 
 
 def _build_sales_tools():
+    from langchain_core.tools import Tool
+
     return [
-        Tool.from_function(func=lambda input: _json_dumps(_sales_sql_read(str(input))), name="sales_sql_read", description="Sales read via text-to-SQL", return_direct=True),
-        Tool.from_function(func=lambda input: _json_dumps(_sales_sql_write(**(input if isinstance(input, dict) else json.loads(input)))), name="sales_sql_write", description="Sales write actions", return_direct=True),
-        Tool.from_function(func=lambda input: _json_dumps({"type": "text", "content": str(_lead_score_tool(str(input)))}), name="lead_score_tool", description="Score a lead 0..1", return_direct=True),
-        Tool.from_function(func=lambda input: _json_dumps(rag_definition_tool(str(input), module_filter="sales")), name="glossary_rag_definition_tool", description="Search sales glossary", return_direct=True),
+        Tool.from_function(func=lambda input: stash(_sales_sql_read(str(input))), coroutine=_sql_read_coroutine("sales_sql_read", _asales_sql_read), name="sales_sql_read", description="Sales read via text-to-SQL", return_direct=True),
+        Tool.from_function(func=lambda input: stash(_sales_sql_write(**(input if isinstance(input, dict) else json.loads(input)))), name="sales_sql_write", description="Sales write actions", return_direct=True),
+        Tool.from_function(func=lambda input: stash({"type": "text", "content": str(_lead_score_tool(str(input)))}), name="lead_score_tool", description="Score a lead 0..1", return_direct=True),
+        Tool.from_function(func=lambda input: stash(rag_definition_tool(str(input), module_filter="sales")), name="glossary_rag_definition_tool", description="Search sales glossary", return_direct=True),
     ]
 
 
 def _build_inventory_tools():
+    from langchain_core.tools import Tool
+
     return [
-        Tool.from_function(func=lambda input: _json_dumps(_inventory_sql_read(str(input))), name="inventory_sql_read", description="Inventory read via text-to-SQL", return_direct=True),
-        Tool.from_function(func=lambda input: _json_dumps(_inventory_sql_write(**(input if isinstance(input, dict) else json.loads(input)))), name="inventory_sql_write", description="Inventory write actions", return_direct=True),
-        Tool.from_function(func=lambda input: _json_dumps({"type": "table", "headers": ["product_id", "qty_on_hand", "reorder_point"], "rows": _get_stock_levels()}), name="inventory_get_stock_levels", description="Current stock levels", return_direct=True),
+        Tool.from_function(func=lambda input: stash(_inventory_sql_read(str(input))), coroutine=_sql_read_coroutine("inventory_sql_read", _ainventory_sql_read), name="inventory_sql_read", description="Inventory read via text-to-SQL", return_direct=True),
+        Tool.from_function(func=lambda input: stash(_inventory_sql_write(**(input if isinstance(input, dict) else json.loads(input)))), name="inventory_sql_write", description="Inventory write actions", return_direct=True),
+        Tool.from_function(func=lambda input: stash(_get_stock_levels()), name="inventory_get_stock_levels", description="Current stock levels", return_direct=True),
     ]
 
 
 def _build_analytics_tools():
+    from langchain_core.tools import Tool
+
     return [
-        Tool.from_function(func=lambda input: _json_dumps(_text_to_sql(str(input))), name="analytics_text_to_sql", description="Analytics/reporting via text-to-SQL", return_direct=True),
-        Tool.from_function(func=lambda input: _json_dumps(rag_definition_tool(str(input), module_filter="analytics")), name="glossary_rag_definition_tool", description="Search analytics glossary", return_direct=True),
+        Tool.from_function(func=lambda input: stash(_text_to_sql(str(input))), coroutine=_sql_read_coroutine("analytics_text_to_sql", _atext_to_sql), name="analytics_text_to_sql", description="Analytics/reporting via text-to-SQL", return_direct=True),
+        Tool.from_function(func=lambda input: stash(rag_definition_tool(str(input), module_filter="analytics")), name="glossary_rag_definition_tool", description="Search analytics glossary", return_direct=True),
     ]
 
 
+_DOMAIN_TOOLS = {
+    "sales": _build_sales_tools,
+    "finance": _build_finance_tools,
+    "inventory": _build_inventory_tools,
+    "analytics": _build_analytics_tools,
+}
+
+
+# The stock zero-shot suffix plus the conversation's recent turns
+_AGENT_SUFFIX = "Begin!\n\n{chat_history}Question: {input}\nThought:{agent_scratchpad}"
+
+# Turns of a conversation kept per domain and shown to the agent
+MEMORY_TURNS = 5
+
+
 def _make_agent(tools):
-    memory = ConversationBufferWindowMemory(k=5, memory_key="chat_history", return_messages=True)
-    return initialize_agent(tools=tools, llm=llm, agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION, memory=memory, verbose=False, handle_parsing_errors=True)
+    # Under ainvoke, tool bodies (SQLite, pandas) run on the bounded DB
+    # executor, unless the tool brings its own coroutine (text-to-SQL)
+    for tool in tools:
+        if not getattr(tool.func, "_erp_traced", False):
+            tool.func = traced(f"tool.{tool.name}")(tool.func)
+            tool.func._erp_traced = True
+        if getattr(tool, "coroutine", None) is None:
+            tool.coroutine = functools.partial(run_db, tool.func)
+    # Imported here: langchain.agents is slow to import and only needed once
+    from langchain.agents import initialize_agent, AgentType
+
+    # No memory on the executor: it is shared by every conversation, so the
+    # router passes each conversation's history in as chat_history
+    return initialize_agent(
+        tools=tools, llm=get_llm(), agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION, verbose=False,
+        handle_parsing_errors=True,
+        agent_kwargs={"suffix": _AGENT_SUFFIX, "input_variables": ["input", "chat_history", "agent_scratchpad"]},
+    )
+
+
+def _new_memory():
+    from langchain.memory import ConversationBufferWindowMemory
+
+    return ConversationBufferWindowMemory(k=MEMORY_TURNS, memory_key="chat_history", return_messages=True)
+
+
+def _remember(memory, user_input: str, output: str) -> None:
+    memory.save_context({"input": user_input}, {"output": output})
+    # The window only applies on read; trim what is stored as well
+    messages = memory.chat_memory.messages
+    if len(messages) > 2 * memory.k:
+        del messages[:len(messages) - 2 * memory.k]
+
+
+def _chat_history(memory) -> str:
+    messages = memory.chat_memory.messages
+    if not messages:
+        return ""
+    lines = [f"{'User' if m.type == 'human' else 'Assistant'}: {m.content}" for m in messages]
+    return "Earlier in this conversation:\n" + "\n".join(lines) + "\n\n"
+
+
+# One executor per domain for the whole process, built on first use;
+# per-conversation memory is looked up by (conversation_id, module) in a
+# bounded LRU/idle-TTL store.
+_executors: Dict[str, Lazy] = {
+    module: Lazy(functools.partial(lambda build: _make_agent(build()), build))
+    for module, build in _DOMAIN_TOOLS.items()
+}
+SESSIONS = SessionStore(_new_memory)
+
+
+def get_domain_agent(module: str):
+    executor = _executors.get(module)
+    return executor.get() if executor is not None else None
 
 
 class RouterAgent:
-    def __init__(self):
-        self._per_user_agents = {}
-
-    def _ensure_user_agents(self, user_id: str):
-        if user_id not in self._per_user_agents:
-            self._per_user_agents[user_id] = {
-                "sales": _make_agent(_build_sales_tools()),
-                "finance": _make_agent(_build_finance_tools()),
-                "inventory": _make_agent(_build_inventory_tools()),
-                "analytics": _make_agent(_build_analytics_tools()),
-            }
+    """Stateless router; safe to share across users and threads."""
 
     def process_request(self, user_id: str, user_input: str) -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        path, result = self._process(user_id, user_input)
+        PATH_STATS.record(path, time.perf_counter() - t0)
+        return result
+
+    async def aprocess_request(self, user_id: str, user_input: str) -> Dict[str, Any]:
+        """
+        Async variant: DB work runs on the bounded DB executor and the agent
+        is awaited with ``ainvoke``, so the event loop is never blocked on
+        the LLM round trip.
+        """
+        t0 = time.perf_counter()
+        path, out = await run_db(self._prepare, user_id, user_input)
+        if path is None:
+            raw, error = None, None
+            with collect(), trace_reads() as reads:
+                try:
+                    with span("agent"):
+                        response = await out[3].ainvoke(self._agent_input(out, user_input))
+                    raw = response.get("output", "") if isinstance(response, dict) else response
+                except Exception as e:
+                    error = e
+                path, out = "agent", await run_db(self._finish, out, user_input, raw, error, reads)
+        PATH_STATS.record(path, time.perf_counter() - t0)
+        return out
+
+    async def astream_request(self, message: str, user_id: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Same turn as aprocess_request, yielded as (event, data) progress
+        events: "classification", then for agent turns any number of
+        "tool_start"/"tool_end"/"token", and finally "final" with the payload
+        (or "error").
+        """
+        t0 = time.perf_counter()
+        module, access, action = classify_intent(message)
+        yield "classification", {"module": module, "access": access, "action": action}
+
+        path, out = await run_db(self._prepare, user_id, message)
+        if path is None:
+            raw, error = None, None
+            with collect(), trace_reads() as reads:
+                try:
+                    with span("agent"):
+                        async for ev in out[3].astream_events(self._agent_input(out, message), version="v2"):
+                            kind, data = ev["event"], ev.get("data", {})
+                            if kind == "on_chat_model_stream":
+                                text = getattr(data.get("chunk"), "content", "")
+                                if text:
+                                    yield "token", {"text": text}
+                            elif kind == "on_tool_start":
+                                yield "tool_start", {"tool": ev["name"], "input": _json_dumps(data.get("input"))[:500]}
+                            elif kind == "on_tool_end":
+                                yield "tool_end", {"tool": ev["name"]}
+                            elif kind == "on_chain_end" and not ev.get("parent_ids"):
+                                output = data.get("output")
+                                raw = output.get("output", "") if isinstance(output, dict) else output
+                except Exception as e:
+                    error = e
+                path, out = "agent", await run_db(self._finish, out, message, raw, error, reads)
+        PATH_STATS.record(path, time.perf_counter() - t0)
+        yield "final", out
+
+    def _process(self, user_id: str, user_input: str) -> Tuple[str, Dict[str, Any]]:
+        """Returns (routing path, payload); the path feeds PATH_STATS."""
+        path, out = self._prepare(user_id, user_input)
+        if path is not None:
+            return path, out
+        raw, error = None, None
+        with collect(), trace_reads() as reads:
+            try:
+                with span("agent"):
+                    response = out[3].invoke(self._agent_input(out, user_input))
+                raw = response.get("output", "") if isinstance(response, dict) else response
+            except Exception as e:
+                error = e
+            return "agent", self._finish(out, user_input, raw, error, reads)
+
+    def _prepare(self, user_id: str, user_input: str) -> Tuple[Optional[str], Any]:
+        """
+        Everything before the LLM agent. Returns (path, payload) when the turn
+        is already answered, else (None, (conversation_id, module, action, agent)).
+        """
         module, access, action = classify_intent(user_input)
         conversation_id = ensure_conversation(user_id)
         save_message(conversation_id, sender="user", content=user_input)
 
         if module == "general":
-            return text_payload("Hello! How can I help you today?")
+            return "greeting", text_payload("Hello! How can I help you today?")
+
+        # A request that is exactly one read tool skips the LLM agent
+        with span("dispatch"), trace_reads() as reads:
+            direct = match_route(user_input)
+        if direct is not None:
+            route, result = direct
+            content = _audit_content(result, reads)
+            log_tool_call(agent=route.module, tool_name=route.name, inputs={"query": user_input}, outputs=content)
+            save_message(conversation_id, sender=route.module, content=content)
+            return f"direct:{route.name}", result
+
         if module == "unknown":
-            return text_payload("Sorry, I’m not sure which module to use for that request.")
+            return "unknown", text_payload("Sorry, I’m not sure which module to use for that request.")
 
-        if access == "write":
-            needs_approval, reason = requires_
         # Approval check for write actions
         if access == "write":
             needs_approval, reason = requires_approval(module, action, {"raw_input": user_input})
             if needs_approval:
                 approval_id = request_approval(module, {"raw_input": user_input}, requested_by=user_id)
-                return text_payload(f"⚠️ {reason} Approval request #{approval_id} has been created.")
+                return "approval", text_payload(f"⚠️ {reason} Approval request #{approval_id} has been created.")
 
-        # Ensure we have LC agents for this user
-        self._ensure_user_agents(user_id)
-        agent = self._per_user_agents[user_id].get(module)
+        agent = get_domain_agent(module)
 
         if not agent:
             result = text_payload("Module not implemented yet.")
-            log_tool_call(agent=module, tool_name=action, inputs={"query": user_input}, outputs=result)
-            save_message(conversation_id, sender=module, content=str(result))
-            return result
-
-        # Direct handling for specific sales queries that SalesAgent can handle directly
-        if module == "sales" and action == "sales_read" and "how many customers" in user_input.lower():
-
-            from domain.sales.agent import SalesAgent
-            return SalesAgent().process_request(user_input)
-            sales_agent = SalesAgent()
-            result = sales_agent.process_request(user_input)
+            content = _audit_content(result)
+            log_tool_call(agent=module, tool_name=action, inputs={"query": user_input}, outputs=content)
+            save_message(conversation_id, sender=module, content=content)
+            return "unknown", result
+
+        return None, (conversation_id, module, action, agent)
+
+    @staticmethod
+    def _agent_input(turn: tuple, user_input: str) -> Dict[str, str]:
+        conversation_id, module, _, _ = turn
+        return {"input": user_input, "chat_history": _chat_history(SESSIONS.get((conversation_id, module)))}
+
+    def _finish(
+        self, turn: tuple, user_input: str, raw: Any, error: Optional[Exception], reads: List[Dict[str, Any]] = ()
+    ) -> Dict[str, Any]:
+        """Record the agent's answer (or error) and return its payload."""
+        conversation_id, module, action, _ = turn
+        if error is not None:
+            result = text_payload(f"Error processing with agent: {error}")
         else:
-            # Run the LC agent — it will decide which tool to call
-            try:
-                raw = agent.run(user_input)
-                result = _parse_possible_json(raw if isinstance(raw, str) else str(raw))
-            except Exception as e:
-                result = text_payload(f"Error processing with agent: {e}")
-
-        # Log the tool call
-        log_tool_call(agent=module, tool_name=action, inputs={"query": user_input}, outputs=result)
-
-        # Save bot response to conversation
-        save_message(conversation_id, sender=module, content=_json_dumps(result))
+            raw = raw if isinstance(raw, str) else str(raw)
+            result = resolve(raw)
+            if result is None:
+                # The agent's own answer, or a tool outside the side channel
+                result = _parse_possible_json(raw)
+                remembered = raw
+            else:
+                # A one-line summary, not the whole table; without the tag,
+                # which would name a different result in a later turn
+                remembered = summarize(result)
+            _remember(SESSIONS.get((conversation_id, module)), user_input, remembered)
+
+        # Log the tool call and save the bot response, tables as their summary and queries
+        content = _audit_content(result, reads)
+        log_tool_call(agent=module, tool_name=action, inputs={"query": user_input}, outputs=content)
+        save_message(conversation_id, sender=module, content=content)
 
         return result
 
@@ -212,3 +393,6 @@ class RouterAgent:
         """
         return self.process_request(user_id, message)
 
+    async def aroute_request(self, message: str, user_id: str) -> Dict[str, Any]:
+        return await self.aprocess_request(user_id, message)
+
@@ -0,0 +1,95 @@
+# orchestrator/tool_results.py
+"""
+Side channel for structured tool results.
+
+Agent tools used to return their payload as a JSON string, which the
+router then parsed back (``json.loads``, then ``ast.literal_eval``), a
+round trip over the whole table for every turn. Now a tool hands its
+payload to ``stash()``, which keeps it, by reference, in the current
+turn's ``ToolResults`` and gives the agent a one-line summary tagged
+with a key:
+
+    [tool_result r1] table: 114 rows x 5 columns (Invoice ID, Customer, ...)
+
+Tools are ``return_direct``, so that line comes back as the agent's output
+and ``resolve()`` swaps it for the stashed payload. Only the summary
+passes through the LLM loop and conversation memory.
+
+The turn's ``ToolResults`` lives in a context variable set by
+``collect()``. ``core.db.run_db`` carries it into the DB executor where
+the tools run. Outside a turn, ``stash()`` falls back to the JSON string.
+"""
+import json
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+_TAG_RE = re.compile(r"\[tool_result (r\d+)\]")
+
+# Summary lines keep the first few headers of a table
+_SUMMARY_HEADERS = 8
+
+
+class ToolResults:
+    """Payloads stashed during one turn, by key."""
+
+    __slots__ = ("results",)
+
+    def __init__(self):
+        self.results: Dict[str, Any] = {}
+
+    def put(self, result: Any) -> str:
+        key = f"r{len(self.results) + 1}"
+        self.results[key] = result
+        return key
+
+
+_current: ContextVar[Optional[ToolResults]] = ContextVar("erp_tool_results", default=None)
+
+
+@contextmanager
+def collect() -> Iterator[ToolResults]:
+    """Give the enclosed turn its own ``ToolResults``."""
+    results = ToolResults()
+    token = _current.set(results)
+    try:
+        yield results
+    finally:
+        _current.reset(token)
+
+
+def summarize(result: Any) -> str:
+    """One line describing a payload, for the agent's text loop."""
+    if isinstance(result, dict):
+        kind = result.get("type")
+        if kind == "table":
+            headers = [str(h) for h in result.get("headers") or []]
+            rows = result.get("rows") or []
+            width = len(headers) or (len(rows[0]) if rows else 0)
+            shown = ", ".join(headers[:_SUMMARY_HEADERS]) + (", ..." if len(headers) > _SUMMARY_HEADERS else "")
+            more = " (more pages)" if result.get("next_cursor") else ""
+            return f"table: {len(rows)} rows x {width} columns ({shown}){more}"
+        if kind in ("text", "error"):
+            text = str(result.get("content", result.get("message", "")))
+            return f"{kind}: {text[:200]}"
+    return f"{type(result).__name__}: {str(result)[:200]}"
+
+
+def stash(result: Any) -> str:
+    """What a tool returns to the agent for ``result``."""
+    results = _current.get()
+    if results is None:
+        return json.dumps(result, ensure_ascii=False, default=str)
+    return f"[tool_result {results.put(result)}] {summarize(result)}"
+
+
+def resolve(raw: Any) -> Optional[Any]:
+    """The stashed payload a tagged agent output refers to, else None."""
+    results = _current.get()
+    if results is None or not isinstance(raw, str):
+        return None
+    match = _TAG_RE.match(raw.lstrip())
+    if match is None:
+        return None
+    return results.results.get(match.group(1))
@@ -1,37 +1,20 @@
-
 # seed_customers.py
-from sqlalchemy.orm import Session
-from app.db import SessionLocal, engine, Base
-from app.models.customer import Customer
-
-def seed_customers():
-    # Ensure tables exist
-    Base.metadata.create_all(bind=engine)
+from core.config import DB_PATH
+from db.importer import Importer
 
-    db: Session = SessionLocal()
-    try:
-        sample_customers = [
-            {"name": "Acme Corp", "email": "contact@acme.com", "phone": "123-456-7890"},
-            {"name": "Globex",   "email": "info@globex.com",    "phone": "098-765-4321"},
-        ]
+sample_customers = [
+    {"key": "contact@acme.com", "name": "Acme Corp", "email": "contact@acme.com", "phone": "123-456-7890"},
+    {"key": "info@globex.com",  "name": "Globex",    "email": "info@globex.com",  "phone": "098-765-4321"},
+]
 
-        for cust in sample_customers:
-            exists = (
-                db.query(Customer)
-                  .filter(Customer.email == cust["email"])
-                  .first()
-            )
-            if not exists:
-                db.add(Customer(**cust))
 
-        db.commit()
-        print("Seeding complete: customers table populated.")
-    except Exception as e:
-        db.rollback()
-        print(f"Error seeding customers: {e}")
-        raise
-    finally:
-        db.close()
+def seed_customers(db_path: str = DB_PATH):
+    # Keyed by email: re-running updates these rows instead of adding new ones,
+    # and a customer already there with that email is reused
+    stats = Importer(db_path).import_rows("customers", enumerate(sample_customers, 1))
+    if stats["rejected"]:
+        raise RuntimeError(f"Error seeding customers: {stats['errors']}")
+    print("Seeding complete: customers table populated.")
 
 
 if __name__ == "__main__":
@@ -1,77 +1,30 @@
 # seed_orders.py
+from core.config import DB_PATH
+from db.importer import Importer
 
-from sqlalchemy.orm import Session
-from app.db import SessionLocal, engine, Base
-import app.models.customer      # ensure Customer is registered
-import app.models.order         # ensure Order is registered
-import app.models.order_item    # ensure OrderItem is registered
+sample_orders = [
+    {"key": "ORD-001", "customer_id": 1, "total": 150.0, "status": "pending"},
+    {"key": "ORD-002", "customer_id": 2, "total":  75.0, "status": "pending"},
+]
 
-from app.models.order import Order
-from app.models.order_item import OrderItem
+sample_order_items = [
+    {"order_key": "ORD-001", "product_id": 1, "quantity": 3, "price": 50.0},
+    {"order_key": "ORD-002", "product_id": 2, "quantity": 1, "price": 75.0},
+]
 
-def seed_orders():
-    # Ensure tables exist
-    Base.metadata.create_all(bind=engine)
 
-    db: Session = SessionLocal()
-    try:
-        sample_orders = [
-            {
-                "order_number": "ORD-001",
-                "customer_id": 1,
-                "total": 150.0,
-                "status": "pending",
-                "items": [
-                    {"product_id": 1, "quantity": 3, "price": 50.0},
-                ],
-            },
-            {
-                "order_number": "ORD-002",
-                "customer_id": 2,
-                "total":  75.0,
-                "status": "pending",
-                "items": [
-                    {"product_id": 2, "quantity": 1, "price": 75.0},
-                ],
-            },
-        ]
+# orders has no order number column: an order already in the database with
+# the same customer, total and status is taken to be the seeded one
+ORDER_MATCH = ("customer_id", "total", "status")
 
-        for o in sample_orders:
-            exists = (
-                db.query(Order)
-                  .filter(Order.order_number == o["order_number"])
-                  .first()
-            )
-            if exists:
-                print(f"Skipping existing order {o['order_number']}")
-                continue
 
-            order = Order(
-                order_number=o["order_number"],
-                customer_id=o["customer_id"],
-                total=o["total"],
-                status=o["status"]
-            )
-            db.add(order)
-            db.flush()  # populate order.id
-
-            for itm in o["items"]:
-                order_item = OrderItem(
-                    order_id=order.id,
-                    product_id=itm["product_id"],
-                    quantity=itm["quantity"],
-                    price=itm["price"]
-                )
-                db.add(order_item)
-
-        db.commit()
-        print("Seeding complete: orders and order_items populated.")
-    except Exception as e:
-        db.rollback()
-        print(f"Error seeding orders: {e}")
-        raise
-    finally:
-        db.close()
+def seed_orders(db_path: str = DB_PATH):
+    importer = Importer(db_path)
+    for entity, rows, match in (("orders", sample_orders, ORDER_MATCH), ("order_items", sample_order_items, None)):
+        stats = importer.import_rows(entity, enumerate(rows, 1), match=match)
+        if stats["rejected"]:
+            raise RuntimeError(f"Error seeding {entity}: {stats['errors']}")
+    print("Seeding complete: orders and order_items populated.")
 
 
 if __name__ == "__main__":
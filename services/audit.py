@@ -0,0 +1,218 @@
+# services/audit.py
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from core.config import (
+    AUDIT_BATCH_SIZE,
+    AUDIT_FLUSH_INTERVAL_MS,
+    AUDIT_QUEUE_SIZE,
+    DB_PATH,
+)
+from core.db import get_manager
+from core.logging import logger
+from services.result_cache import TABLE_VERSIONS
+
+_TABLES = {
+    "tool_call": "tool_calls",
+    "message": "messages",
+    "translation_hit": "sql_translations",
+    "slow_query": "slow_queries",
+}
+
+_INSERTS = {
+    "tool_call": """
+        INSERT INTO tool_calls (agent, tool_name, input_json, output_json, created_at)
+        VALUES (?, ?, ?, ?, ?)
+    """,
+    "message": """
+        INSERT INTO messages (conversation_id, sender, content, created_at)
+        VALUES (?, ?, ?, ?)
+    """,
+    "translation_hit": """
+        UPDATE sql_translations
+           SET hit_count = hit_count + 1, last_used_at = ?
+         WHERE fingerprint = ?
+    """,
+    "slow_query": """
+        INSERT INTO slow_queries (fingerprint, sql, caller, duration_ms, row_count, plan, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """,
+}
+
+
+class AuditWriter:
+    """
+    Bounded in-memory queue of audit rows drained by a background thread.
+
+    Rows are written with one ``executemany`` per table inside a single
+    transaction, every ``flush_interval_ms`` or as soon as ``batch_size``
+    rows are waiting, whichever comes first. When the queue is full new
+    rows are dropped (and counted) rather than blocking the request.
+
+    A batch that fails is retried row by row, so only the bad rows are
+    lost. Once the writer is stopped, ``submit`` writes on the caller's
+    thread: there is no flusher left to drain the queue.
+    """
+
+    def __init__(
+        self,
+        db_path: str = DB_PATH,
+        max_queue: int = AUDIT_QUEUE_SIZE,
+        flush_interval_ms: int = AUDIT_FLUSH_INTERVAL_MS,
+        batch_size: int = AUDIT_BATCH_SIZE,
+    ):
+        self.db_path = db_path
+        self.flush_interval = flush_interval_ms / 1000
+        self.batch_size = max(1, batch_size)
+        self._queue: "queue.Queue[Tuple[str, tuple]]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._dropped_lock = threading.Lock()
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.flushes = 0
+
+    # ---------- producer side ----------
+    def submit(self, kind: str, row: tuple) -> bool:
+        if kind not in _INSERTS:
+            raise ValueError(f"Unknown audit record kind: {kind}")
+        if self._stop.is_set():
+            with self._flush_lock:
+                self._write([(kind, row)])
+            return True
+        try:
+            self._queue.put_nowait((kind, row))
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+            return False
+        if self._stop.is_set():
+            # stop() may have drained the queue just before this row landed
+            self.flush()
+        return True
+
+    # ---------- consumer side ----------
+    def _take_batch(self, block: bool) -> List[Tuple[str, tuple]]:
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if block and timeout > 0:
+                    batch.append(self._queue.get(timeout=timeout))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Tuple[str, tuple]]) -> None:
+        if not batch:
+            return
+        grouped: Dict[str, List[tuple]] = {}
+        for kind, row in batch:
+            grouped.setdefault(kind, []).append(row)
+        try:
+            with get_manager(self.db_path).writer() as conn:
+                for kind, rows in grouped.items():
+                    conn.executemany(_INSERTS[kind], rows)
+            self.written += len(batch)
+            TABLE_VERSIONS.bump(*(_TABLES[kind] for kind in grouped))
+        except Exception as e:
+            logger.warning(f"[AuditWriter] Batch of {len(batch)} failed ({e}); retrying row by row")
+            self._write_rows(grouped)
+        finally:
+            self.flushes += 1
+
+    def _write_rows(self, grouped: Dict[str, List[tuple]]) -> None:
+        total = sum(len(rows) for rows in grouped.values())
+        written, bad, kinds = 0, 0, set()
+        try:
+            with get_manager(self.db_path).writer() as conn:
+                for kind, rows in grouped.items():
+                    for row in rows:
+                        try:
+                            conn.execute(_INSERTS[kind], row)
+                        except (sqlite3.Error, ValueError, TypeError) as e:
+                            # A failed statement is undone on its own; the rest of the transaction stands
+                            bad += 1
+                            logger.error(f"[AuditWriter] Dropped {kind} row: {e}")
+                        else:
+                            written += 1
+                            kinds.add(kind)
+        except Exception as e:
+            # Auditing must never crash the app
+            self.failed += total
+            logger.error(f"[AuditWriter] Dropped batch of {total}: {e}")
+            return
+        self.written += written
+        self.failed += bad
+        if kinds:
+            TABLE_VERSIONS.bump(*(_TABLES[kind] for kind in kinds))
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch = self._take_batch(block=True)
+            with self._flush_lock:
+                self._write(batch)
+
+    def flush(self) -> None:
+        """Write everything queued so far on the calling thread."""
+        with self._flush_lock:
+            while True:
+                batch = self._take_batch(block=False)
+                if not batch:
+                    break
+                self._write(batch)
+
+    # ---------- lifecycle ----------
+    def start(self) -> "AuditWriter":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the flusher and drain whatever is still queued."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "dropped": self.dropped,
+            "written": self.written,
+            "failed": self.failed,
+            "flushes": self.flushes,
+        }
+
+
+_writer: Optional[AuditWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_audit_writer() -> AuditWriter:
+    """Return the process-wide AuditWriter, starting its flusher on first use."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = AuditWriter().start()
+                atexit.register(_writer.stop)
+    return _writer
+
+
+def shutdown_audit_writer() -> None:
+    if _writer is not None:
+        _writer.stop()
@@ -0,0 +1,81 @@
+# services/bulk.py
+"""
+Helpers shared by the bulk write functions (create_invoices, post_payments,
+create_orders, create_leads): one Pydantic pass over the whole batch,
+per-item results, and recovering row ids after an ``executemany``.
+"""
+import sqlite3
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Sequence, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+M = TypeVar("M", bound=BaseModel)
+
+_ADAPTERS: Dict[type, TypeAdapter] = {}
+
+
+def validate_batch(model: Type[M], items: Sequence[Any]) -> Tuple[List[Tuple[int, M]], Dict[int, list]]:
+    """
+    Validate ``items`` as ``List[model]`` in one call. Returns the valid
+    ``(index, instance)`` pairs and ``{index: errors}`` for the rest.
+    """
+    adapter = _ADAPTERS.get(model)
+    if adapter is None:
+        adapter = _ADAPTERS[model] = TypeAdapter(List[model])
+    try:
+        return list(enumerate(adapter.validate_python(list(items)))), {}
+    except ValidationError as e:
+        errors: Dict[int, list] = {}
+        for err in e.errors(include_url=False, include_context=False):
+            loc = err["loc"]
+            errors.setdefault(loc[0], []).append({"loc": list(loc[1:]), "msg": err["msg"]})
+    # Only the items without errors are validated again
+    valid = [(i, model.model_validate(item)) for i, item in enumerate(items) if i not in errors]
+    return valid, errors
+
+
+def inserted_ids(conn: sqlite3.Connection, count: int) -> range:
+    """
+    Row ids of the ``count`` rows a just-finished ``executemany`` INSERT added.
+
+    Inside one write transaction nobody else can insert, so SQLite hands out
+    consecutive rowids (max + 1 each time); ``last_insert_rowid()`` is the
+    last of them. Rows inserted by triggers don't disturb it.
+    """
+    last = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+    return range(last - count + 1, last + 1)
+
+
+def chunks(seq: Sequence[Any], size: int = 500) -> Iterator[Sequence[Any]]:
+    # Keeps IN (...) lists under SQLite's bound-parameter limit
+    for start in range(0, len(seq), size):
+        yield seq[start:start + size]
+
+
+def error_results(errors: Dict[int, list]) -> List[Dict[str, Any]]:
+    return [{"index": i, "status": "error", "errors": errs} for i, errs in errors.items()]
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """``{"total", "counts": {status: n}, "results"}`` with results in input order."""
+    results.sort(key=lambda r: r["index"])
+    counts: Dict[str, int] = {}
+    for r in results:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    return {"total": len(results), "counts": counts, "results": results}
+
+
+def bulk_write(
+    model: Type[M],
+    items: Sequence[Any],
+    insert: Callable[[sqlite3.Connection, List[M]], List[Dict[str, Any]]],
+    writer: Callable[[], ContextManager[sqlite3.Connection]],
+) -> Dict[str, Any]:
+    """Validate ``items``, ``insert`` the valid ones in one transaction, summarize."""
+    valid, errors = validate_batch(model, items)
+    results: List[Dict[str, Any]] = []
+    if valid:
+        with writer() as conn:
+            written = insert(conn, [v for _, v in valid])
+        results = [{"index": i, **r} for (i, _), r in zip(valid, written)]
+    return summarize(results + error_results(errors))
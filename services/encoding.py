@@ -0,0 +1,171 @@
+# services/encoding.py
+"""
+Wire encodings for chat payloads, chosen from the request's ``Accept``:
+
+- ``application/json`` (default): the payload as-is, encoded with orjson
+  when it is installed (stdlib ``json`` otherwise);
+- ``application/vnd.erp.columnar+json``: table payloads with
+  ``"columns": {header: [values...]}`` in place of ``"rows"``; other
+  payloads unchanged;
+- ``application/msgpack``: the payload as-is, as MessagePack (``msgpack``);
+- ``application/vnd.apache.arrow.stream``: a table payload as one Arrow IPC
+  record batch (``pyarrow``), with ``type``/``next_cursor``/... in the
+  schema metadata. Other payloads fall back to JSON.
+
+msgpack and pyarrow are optional; an encoding whose module is missing is
+not offered, and asking only for it gets 406.
+"""
+import importlib
+import importlib.util
+import json
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+JSON = "application/json"
+COLUMNAR = "application/vnd.erp.columnar+json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+
+# Also accepted in Accept, mapped to the canonical type
+_ALIASES = {"application/x-msgpack": MSGPACK, "application/vnd.apache.arrow.file": ARROW}
+
+_REQUIRES = {MSGPACK: "msgpack", ARROW: "pyarrow"}
+
+
+def _default(obj: Any) -> Any:
+    # Pydantic models, then whatever str() makes of it (Decimal, Path, ...)
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    return str(obj)
+
+
+if importlib.util.find_spec("orjson") is not None:
+    import orjson
+
+    _ORJSON_OPTS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps_json(payload: Any) -> bytes:
+        """UTF-8 JSON for ``payload``; orjson when available."""
+        return orjson.dumps(payload, default=_default, option=_ORJSON_OPTS)
+else:
+    def dumps_json(payload: Any) -> bytes:
+        """UTF-8 JSON for ``payload``; orjson when available."""
+        return json.dumps(payload, ensure_ascii=False, default=_default).encode("utf-8")
+
+
+@lru_cache(maxsize=None)
+def _importable(module: str) -> bool:
+    # Actually import it: an installed but broken module (pyarrow built
+    # for a newer NumPy, say) must not be offered and then fail with a 500
+    try:
+        importlib.import_module(module)
+    except ImportError:
+        return False
+    return True
+
+
+def available() -> List[str]:
+    """Media types this process can produce, preferred first."""
+    return [m for m in (JSON, COLUMNAR, MSGPACK, ARROW)
+            if m not in _REQUIRES or _importable(_REQUIRES[m])]
+
+
+def negotiate(accept: Optional[str]) -> Optional[str]:
+    """
+    The media type to answer with for an ``Accept`` header value: the
+    highest-q type we can produce, JSON for none or ``*/*``, or None
+    when nothing acceptable is available (answer 406).
+    """
+    if not accept:
+        return JSON
+    offered = available()
+    best: Tuple[float, int, Optional[str]] = (0.0, 0, None)
+    for part in accept.split(","):
+        media, *params = [p.strip() for p in part.split(";")]
+        media = _ALIASES.get(media.lower(), media.lower())
+        q = 1.0
+        for p in params:
+            if p.startswith("q="):
+                try:
+                    q = float(p[2:])
+                except ValueError:
+                    q = 0.0
+        if media in ("*/*", "application/*"):
+            candidate, specificity = JSON, 0
+        elif media in offered:
+            candidate, specificity = media, 1
+        else:
+            continue
+        if q > 0 and (q, specificity) > best[:2]:
+            best = (q, specificity, candidate)
+    return best[2]
+
+
+def _is_table(payload: Any) -> bool:
+    return isinstance(payload, dict) and payload.get("type") == "table" and "rows" in payload
+
+
+def column_names(headers: List[Any], width: int) -> List[str]:
+    """Unique column keys: the headers, de-duplicated with ``_2``, ``_3``..."""
+    names, seen = [], {}
+    for i in range(width):
+        base = str(headers[i]) if i < len(headers) else f"col_{i}"
+        n = seen.get(base, 0) + 1
+        seen[base] = n
+        names.append(base if n == 1 else f"{base}_{n}")
+    return names
+
+
+def to_columnar(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """A table payload with ``columns`` (name -> values) instead of ``rows``."""
+    if not _is_table(payload):
+        return payload
+    rows = payload["rows"]
+    headers = list(payload.get("headers") or [])
+    width = len(rows[0]) if rows else len(headers)
+    names = column_names(headers, width)
+    # One pass per column: zip(*rows) is several times slower on big tables
+    columns = [[row[i] for row in rows] for i in range(width)]
+    out = {k: v for k, v in payload.items() if k != "rows"}
+    out["headers"] = names
+    out["columns"] = dict(zip(names, columns))
+    return out
+
+
+def _encode_msgpack(payload: Any) -> bytes:
+    import msgpack
+
+    return msgpack.packb(payload, default=_default, use_bin_type=True)
+
+
+def _arrow_array(pa, values: List[Any]):
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed types in one column: send it as text
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+
+def _encode_arrow(payload: Dict[str, Any]) -> bytes:
+    import pyarrow as pa
+
+    columnar = to_columnar(payload)
+    arrays = [_arrow_array(pa, values) for values in columnar["columns"].values()]
+    meta = {k: v for k, v in payload.items() if k not in ("rows", "headers")}
+    table = pa.Table.from_arrays(arrays, names=columnar["headers"], metadata={b"erp": dumps_json(meta)})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode(payload: Any, media_type: str) -> Tuple[bytes, str]:
+    """``(body, media type)`` for ``payload``; the media type can fall back to JSON."""
+    if media_type == COLUMNAR:
+        return dumps_json(to_columnar(payload)), COLUMNAR
+    if media_type == MSGPACK:
+        return _encode_msgpack(payload), MSGPACK
+    if media_type == ARROW and _is_table(payload):
+        return _encode_arrow(payload), ARROW
+    return dumps_json(payload), JSON
+
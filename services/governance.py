@@ -1,30 +1,31 @@
 # services/governance.py
 import json
-import sqlite3
 from datetime import datetime
 from typing import Any, Dict, Optional, Tuple
 
 from core.config import DB_PATH
+from core.db import get_manager
+from core.tracing import traced
+from services.audit import get_audit_writer
+from services.result_cache import invalidates
 
 def _conn():
-    return sqlite3.connect(DB_PATH)
+    return get_manager(DB_PATH).writer()
 
+@traced("log_tool_call")
 def log_tool_call(agent: str, tool_name: str, inputs: Dict[str, Any], outputs: Any, status: str = "ok"):
+    # Queued for the background audit writer; never blocks the request path
     try:
-        with _conn() as conn:
-            conn.execute(
-                """
-                INSERT INTO tool_calls (agent, tool_name, input_json, output_json, created_at)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (
-                    agent,
-                    tool_name,
-                    json.dumps(inputs, ensure_ascii=False),
-                    json.dumps(outputs, ensure_ascii=False, default=str),
-                    datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
-                ),
-            )
+        get_audit_writer().submit(
+            "tool_call",
+            (
+                agent,
+                tool_name,
+                json.dumps(inputs, ensure_ascii=False),
+                json.dumps(outputs, ensure_ascii=False, default=str),
+                datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+            ),
+        )
     except Exception:
         # Auditing must never crash the app
         pass
@@ -41,6 +42,7 @@ def requires_approval(module: str, action: str, payload: Dict[str, Any]) -> Tupl
             return True, "Large purchase order requires approval."
     return False, None
 
+@invalidates("approvals")
 def request_approval(module: str, payload: Dict[str, Any], requested_by: str) -> int:
     with _conn() as conn:
         cur = conn.execute(
@@ -57,21 +59,19 @@ def request_approval(module: str, payload: Dict[str, Any], requested_by: str) ->
         )
         return cur.lastrowid
 
+@traced("save_message")
 def save_message(conversation_id: int, sender: str, content: str):
-    with _conn() as conn:
-        conn.execute(
-            """
-            INSERT INTO messages (conversation_id, sender, content, created_at)
-            VALUES (?, ?, ?, ?)
-            """,
-            (
-                conversation_id,
-                sender,
-                content,
-                datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
-            ),
-        )
+    get_audit_writer().submit(
+        "message",
+        (
+            conversation_id,
+            sender,
+            content,
+            datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+        ),
+    )
 
+@traced("ensure_conversation")
 def ensure_conversation(user_id: str) -> int:
     with _conn() as conn:
         cur = conn.execute(
@@ -1,18 +1,48 @@
 # services/llm.py
 import os
-from langchain_openai import ChatOpenAI
 
-# Read the API key from environment variable for security
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+from core.config import LLM_PROVIDER, STUB_LLM_JITTER_MS, STUB_LLM_LATENCY_MS
+from core.lazy import Lazy
 
-if not OPENAI_API_KEY:
-    raise RuntimeError(
-        "Missing OpenAI API key. Please set OPENAI_API_KEY in your environment."
+
+def _build_llm():
+    if LLM_PROVIDER == "stub":
+        # Local scripted model for load tests; no key or network
+        from services.stub_llm import StubLLM
+
+        return StubLLM(latency_ms=STUB_LLM_LATENCY_MS, jitter_ms=STUB_LLM_JITTER_MS)
+
+    # Read the API key from environment variable for security
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError(
+            "Missing OpenAI API key. Please set OPENAI_API_KEY in your environment."
+        )
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        model=os.getenv("OPENAI_MODEL", "gpt-3.5-turbo"),
+        temperature=float(os.getenv("OPENAI_TEMPERATURE", "0")),
+        openai_api_key=api_key
     )
 
-# Single shared LLM instance
-llm = ChatOpenAI(
-    model=os.getenv("OPENAI_MODEL", "gpt-3.5-turbo"),
-    temperature=float(os.getenv("OPENAI_TEMPERATURE", "0")),
-    openai_api_key=OPENAI_API_KEY
-)
+
+# Single shared LLM instance, built on first use so importing this module
+# neither needs a key nor pays for langchain_openai.
+_llm = Lazy(_build_llm)
+
+
+def get_llm():
+    return _llm.get()
+
+
+def set_llm(llm) -> None:
+    """Replace the shared LLM (e.g. a fake model in tests or benchmarks)."""
+    _llm.set(llm)
+
+
+def __getattr__(name):
+    # `from services.llm import llm` keeps working, but builds the client then
+    if name == "llm":
+        return get_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,150 @@
+# services/pagination.py
+import base64
+import json
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from core.config import TABLE_PAGE_SIZE, TABLE_PAGE_SIZE_MAX
+from services.sql import execute_query
+
+
+class CursorError(ValueError):
+    """Raised for a malformed cursor or one naming an unknown query."""
+
+
+def encode_cursor(state: Dict[str, Any]) -> str:
+    raw = json.dumps(state, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception as e:
+        raise CursorError(f"Invalid cursor: {e}")
+    if not isinstance(state, dict) or "q" not in state:
+        raise CursorError("Invalid cursor: missing query name")
+    return state
+
+
+_SCALARS = (str, int, float, type(None))
+
+
+def _scalars(value: Any, arity: int) -> bool:
+    return (
+        isinstance(value, list)
+        and len(value) == arity
+        and all(isinstance(v, _SCALARS) and not isinstance(v, bool) for v in value)
+    )
+
+
+def _clamp(limit: Optional[int]) -> int:
+    if not limit:
+        return TABLE_PAGE_SIZE
+    return max(1, min(int(limit), TABLE_PAGE_SIZE_MAX))
+
+
+# name -> PagedQuery, so a cursor can be resumed without the original caller
+PAGED_QUERIES: Dict[str, "PagedQuery"] = {}
+
+
+class PagedQuery:
+    """
+    A table query that is read one keyset page at a time.
+
+    The SELECT is assembled from ``columns``/``from_sql``/``filters`` and the
+    ``order_by`` key expressions, which are fetched as hidden trailing columns
+    so the last row of a page can seed the next one. All keys must sort in the
+    same direction and be non-NULL (wrap nullable ones in IFNULL).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        headers: Sequence[str],
+        columns: Sequence[str],
+        from_sql: str,
+        order_by: Sequence[str],
+        filters: Sequence[str] = (),
+        descending: bool = False,
+    ):
+        self.name = name
+        self.headers = list(headers)
+        self.columns = list(columns)
+        self.from_sql = from_sql
+        self.order_by = list(order_by)
+        self.filters = list(filters)
+        self.descending = descending
+        # Bound parameters of the first page (the trailing ? is the LIMIT)
+        self.param_count = self._sql(after=False).count("?") - 1
+        PAGED_QUERIES[name] = self
+
+    def _sql(self, after: bool) -> str:
+        keys = ", ".join(self.order_by)
+        where = list(self.filters)
+        if after:
+            op = "<" if self.descending else ">"
+            marks = ", ".join("?" for _ in self.order_by)
+            where.append(f"({keys}) {op} ({marks})")
+        direction = " DESC" if self.descending else ""
+        sql = f"SELECT {', '.join(self.columns)}, {keys} FROM {self.from_sql}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY " + ", ".join(k + direction for k in self.order_by)
+        return sql + " LIMIT ?"
+
+    def fetch(
+        self, params: Sequence[Any] = (), after: Optional[Sequence[Any]] = None, limit: Optional[int] = None
+    ) -> Tuple[List[list], Optional[List[Any]]]:
+        """One page of visible rows plus the key of its last row (None when exhausted)."""
+        limit = _clamp(limit)
+        args = tuple(params) + (tuple(after) if after else ()) + (limit + 1,)
+        raw = execute_query(self._sql(after is not None), args) or []
+        n_visible = len(self.columns)
+        more = len(raw) > limit
+        if more:
+            raw = raw[:limit]
+        rows = [list(r[:n_visible]) for r in raw]
+        last_key = list(raw[-1][n_visible:]) if more else None
+        return rows, last_key
+
+    def page(
+        self, params: Sequence[Any] = (), after: Optional[Sequence[Any]] = None, limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """A ``{"type": "table"}`` payload with ``next_cursor`` for the following page."""
+        rows, last_key = self.fetch(params, after, limit)
+        next_cursor = None
+        if last_key is not None:
+            next_cursor = encode_cursor({"q": self.name, "p": list(params), "k": last_key, "n": _clamp(limit)})
+        return {"type": "table", "headers": self.headers, "rows": rows, "next_cursor": next_cursor}
+
+
+def resume(cursor: str) -> Dict[str, Any]:
+    """Fetch the page a ``next_cursor`` points at."""
+    state = decode_cursor(cursor)
+    # Cursors come back from clients: check every field before it reaches SQL
+    query = PAGED_QUERIES.get(state["q"]) if isinstance(state["q"], str) else None
+    if query is None:
+        raise CursorError(f"Unknown paged query: {state['q']!r}")
+    params = state.get("p", [])
+    if not _scalars(params, query.param_count):
+        raise CursorError("Invalid cursor: parameters do not match query")
+    after = state.get("k")
+    if after is not None and not _scalars(after, len(query.order_by)):
+        raise CursorError("Invalid cursor: key does not match query")
+    limit = state.get("n")
+    if limit is not None and (not isinstance(limit, int) or isinstance(limit, bool)):
+        raise CursorError("Invalid cursor: page size is not an integer")
+    return query.page(params, after, limit)
+
+
+def iter_pages(first: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield ``first`` and then every following page of the same query. Each page
+    is a separate short read, so memory stays proportional to the page size.
+    """
+    page = first
+    yield page
+    while page.get("type") == "table" and page.get("next_cursor"):
+        page = resume(page["next_cursor"])
+        yield page
@@ -0,0 +1,211 @@
+# services/query_log.py
+"""
+Per-query instrumentation for ``services.sql.execute_query``.
+
+Every query is recorded in memory by fingerprint: the SQL with literals
+replaced by ``?`` and whitespace/case folded, so ``WHERE id = 7`` and
+``WHERE id = 8`` count together. A record holds call count, total and max
+duration, rows returned and the callers seen.
+
+Queries slower than ``SLOW_QUERY_MS`` also get their ``EXPLAIN QUERY PLAN``
+captured. They are queued for the ``slow_queries`` table through the
+background audit writer, so capture never blocks on the write lock.
+``GET /api/admin/slow-queries`` aggregates that table by fingerprint.
+
+Inside ``trace_reads()`` the SQL and parameters of each successful read
+are also collected, so a chat turn can record which queries its answer
+came from.
+"""
+import functools
+import hashlib
+import re
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from core.config import SLOW_QUERY_MS, QUERY_LOG_MAX_FINGERPRINTS
+from core.logging import logger
+from services.audit import get_audit_writer
+
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?\b", re.IGNORECASE)
+_PARAM_RE = re.compile(r"(?<![\w])(?:\?\d*|[:@$][A-Za-z_]\w*)")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+# Reads of the block inside trace_reads(), if any
+_reads: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("erp_query_reads", default=None)
+
+
+@contextmanager
+def trace_reads() -> Iterator[List[Dict[str, Any]]]:
+    """
+    Collect ``{"sql", "params"[, "distinct"]}`` for every read that succeeds
+    in the enclosed block, in this context and copies of it (``run_db``).
+    """
+    reads: List[Dict[str, Any]] = []
+    token = _reads.set(reads)
+    try:
+        yield reads
+    finally:
+        _reads.reset(token)
+
+
+def note_read(sql: str, params: tuple = (), distinct: bool = False) -> None:
+    """Add a read to the current ``trace_reads()`` block; a no-op outside one."""
+    reads = _reads.get()
+    if reads is not None:
+        read = {"sql": sql, "params": list(params)}
+        if distinct:
+            read["distinct"] = True
+        reads.append(read)
+
+
+# Frames in these files are the query path itself, not the caller
+_INTERNAL_FILES = ("services/sql.py", "services/query_log.py", "core/tracing.py")
+
+
+def normalize_sql(sql: str) -> str:
+    """``sql`` with comments dropped, literals and parameters as ``?``, lower-cased."""
+    s = _COMMENT_RE.sub(" ", sql)
+    s = _STRING_RE.sub("?", s)
+    s = _NUMBER_RE.sub("?", s)
+    s = _PARAM_RE.sub("?", s)
+    s = _IN_LIST_RE.sub("(?+)", s)
+    return _SPACE_RE.sub(" ", s).strip().rstrip(";").strip().lower()
+
+
+@functools.lru_cache(maxsize=4096)
+def fingerprint_sql(sql: str) -> Tuple[str, str]:
+    """(fingerprint, normalized SQL); the fingerprint is 16 hex chars."""
+    normalized = normalize_sql(sql)
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16], normalized
+
+
+def caller_of_query(depth: int = 1) -> str:
+    """``module.function`` of the first frame outside the query path."""
+    frame = sys._getframe(depth)
+    while frame is not None:
+        filename = frame.f_code.co_filename.replace("\\", "/")
+        if not filename.endswith(_INTERNAL_FILES):
+            module = frame.f_globals.get("__name__", "?")
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "?"
+
+
+def explain_plan(conn: sqlite3.Connection, sql: str, params: tuple = ()) -> str:
+    """``EXPLAIN QUERY PLAN`` as indented lines, like the sqlite3 shell prints it."""
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    depth: Dict[int, int] = {0: -1}
+    lines = []
+    for node_id, parent, _notused, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return "\n".join(lines)
+
+
+class QueryLog:
+    """In-memory totals per query fingerprint, bounded to ``max_fingerprints``."""
+
+    def __init__(self, slow_ms: float = SLOW_QUERY_MS, max_fingerprints: int = QUERY_LOG_MAX_FINGERPRINTS):
+        self.slow_ms = slow_ms
+        self.max_fingerprints = max(1, max_fingerprints)
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self.total = 0
+        self.slow = 0
+        self.errors = 0
+        self.overflow = 0
+
+    def record(self, sql: str, seconds: float, rows: Optional[int], caller: str, error: bool = False) -> str:
+        fp, normalized = fingerprint_sql(sql)
+        ms = seconds * 1000
+        with self._lock:
+            self.total += 1
+            self.errors += error
+            entry = self._stats.get(fp)
+            if entry is None:
+                if len(self._stats) >= self.max_fingerprints:
+                    # Keep the totals; stop tracking new shapes
+                    self.overflow += 1
+                    return fp
+                entry = self._stats[fp] = {
+                    "sql": normalized, "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                    "rows": 0, "errors": 0, "slow": 0, "callers": set(),
+                }
+            entry["count"] += 1
+            entry["total_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+            entry["rows"] += rows or 0
+            entry["errors"] += error
+            entry["callers"].add(caller)
+            if ms >= self.slow_ms:
+                entry["slow"] += 1
+                self.slow += 1
+        return fp
+
+    def is_slow(self, seconds: float) -> bool:
+        return seconds * 1000 >= self.slow_ms
+
+    def top(self, limit: int = 20, by: str = "total_ms") -> List[Dict[str, Any]]:
+        with self._lock:
+            items = [(fp, dict(e, callers=sorted(e["callers"]))) for fp, e in self._stats.items()]
+        items.sort(key=lambda kv: kv[1][by], reverse=True)
+        return [
+            {
+                "fingerprint": fp,
+                **e,
+                "total_ms": round(e["total_ms"], 2),
+                "max_ms": round(e["max_ms"], 2),
+                "avg_ms": round(e["total_ms"] / e["count"], 2),
+            }
+            for fp, e in items[:limit]
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "queries": self.total,
+                "slow": self.slow,
+                "errors": self.errors,
+                "fingerprints": len(self._stats),
+                "untracked": self.overflow,
+                "slow_ms": self.slow_ms,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self.total = self.slow = self.errors = self.overflow = 0
+
+
+QUERY_LOG = QueryLog()
+
+
+def log_slow_query(
+    conn: sqlite3.Connection, sql: str, params: tuple, seconds: float, rows: Optional[int], caller: str, fp: str
+) -> None:
+    """Capture the plan of a slow query and queue it for ``slow_queries``."""
+    try:
+        plan = explain_plan(conn, sql, params)
+    except sqlite3.Error as e:
+        plan = f"(no plan: {e})"
+    logger.warning(f"[slow query] {seconds * 1000:.1f} ms {fp} from {caller}: {_SPACE_RE.sub(' ', sql)[:200]}")
+    get_audit_writer().submit(
+        "slow_query",
+        (
+            fp,
+            sql,
+            caller,
+            round(seconds * 1000, 3),
+            rows,
+            plan,
+            datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+        ),
+    )
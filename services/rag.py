@@ -1,33 +1,273 @@
 # services/rag.py
-from typing import List, Dict
+import os
+import re
 import sqlite3
-from core.config import DB_PATH
+import threading
+from typing import List, Dict, Optional, Sequence, Tuple
+from core.config import (
+    DB_PATH,
+    RAG_EMBEDDER,
+    RAG_VECTOR_CHANGES_RETENTION_S,
+    RAG_VECTOR_DIR,
+    RAG_VECTOR_ENABLED,
+    RAG_VECTOR_MIN_SCORE,
+)
+from core.db import get_manager
+from db.migrate import ensure_migrations
 
 def _conn():
-    return sqlite3.connect(DB_PATH)
+    return get_manager(DB_PATH).reader()
+
+def _ensure_schema():
+    """Create the FTS5 indexes, vector change log and their triggers on first use."""
+    ensure_migrations(DB_PATH)
+
+def fts_query(text: str) -> str:
+    """
+    Turn free text into a safe FTS5 MATCH expression: every word is quoted,
+    words are OR-ed so BM25 does the ranking, and the last word is a prefix.
+    """
+    words = [w for w in re.findall(r"\w+", text.lower()) if len(w) > 1]
+    if not words:
+        return ""
+    terms = [f'"{w}"' for w in words[:-1]] + [f'"{words[-1]}"*']
+    return " OR ".join(terms)
+
+# ---------- semantic retrieval ----------
+# source -> SELECT key, text to embed, group; the key matches vector_changes.row_key
+_CORPORA = {
+    "glossary": (
+        "term",
+        "SELECT term, term || '. ' || IFNULL(definition, ''), IFNULL(module, '') FROM glossary",
+    ),
+    "documents": (
+        "CAST(id AS TEXT)",
+        "SELECT CAST(id AS TEXT), REPLACE(REPLACE(IFNULL(path, ''), '/', ' '), '_', ' ') || ' ' || "
+        "REPLACE(IFNULL(tags, ''), ',', ' '), IFNULL(module, '') FROM documents",
+    ),
+}
+_BATCH = 10_000
+_embedder = None
+_embedder_lock = threading.Lock()
+
+def _get_embedder():
+    global _embedder
+    if _embedder is None:
+        with _embedder_lock:
+            if _embedder is None:
+                from services.vector_store import get_embedder
+                _embedder = get_embedder(RAG_EMBEDDER)
+    return _embedder
+
+class _VectorIndex:
+    """
+    Embeddings for one corpus, kept in step with the table through the
+    ``vector_changes`` log: each query first re-embeds only the rows whose
+    keys were logged since the last sync.
+
+    After a sync, log rows older than ``RAG_VECTOR_CHANGES_RETENTION_S`` are
+    deleted and the mark recorded in ``vector_changes_pruned``; an index in
+    another process that is still behind that mark rebuilds from the table.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.key_sql, self.select_sql = _CORPORA[source]
+        self.store = None
+        self.last_seq = 0
+        self._lock = threading.Lock()
+
+    def _rows(self, conn: sqlite3.Connection, keys: Optional[Sequence[str]] = None):
+        if keys is None:
+            yield from conn.execute(self.select_sql)
+            return
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            marks = ", ".join("?" for _ in chunk)
+            yield from conn.execute(f"{self.select_sql} WHERE {self.key_sql} IN ({marks})", chunk)
+
+    def _upsert(self, rows) -> None:
+        embedder = _get_embedder()
+        rows = list(rows)
+        for i in range(0, len(rows), _BATCH):
+            batch = rows[i:i + _BATCH]
+            self.store.upsert(
+                [r[0] for r in batch], embedder.embed([r[1] for r in batch]), [r[2] for r in batch]
+            )
+
+    def _open(self, conn: sqlite3.Connection, seq: int, pruned: int) -> None:
+        from services.vector_store import VectorStore
+
+        embedder = _get_embedder()
+        if RAG_VECTOR_DIR:
+            store, extra = VectorStore.load(os.path.join(RAG_VECTOR_DIR, self.source), embedder.dim)
+            if extra.get("embedder") == embedder.name and pruned <= extra.get("last_seq", seq + 1) <= seq:
+                # persisted index is usable; catch up from where it stopped
+                self.store, self.last_seq = store, extra["last_seq"]
+                return
+            store.delete(list(store.key_to_row))
+            store.compact()
+            self.store = store
+        else:
+            self.store = VectorStore(embedder.dim)
+        # rows changed while we read are replayed by the next sync
+        self.last_seq = seq
+        self._upsert(self._rows(conn))
+        self.store.maybe_index()
+        self._save()
+
+    def _save(self) -> None:
+        self.store.save({"embedder": _get_embedder().name, "last_seq": self.last_seq})
+
+    def _sync(self, conn: sqlite3.Connection) -> bool:
+        """Catch up with the change log; True when it had new rows."""
+        seq = conn.execute("SELECT IFNULL(MAX(id), 0) FROM vector_changes").fetchone()[0]
+        pruned = conn.execute(
+            "SELECT IFNULL(MAX(through_id), 0) FROM vector_changes_pruned WHERE source = ?", (self.source,)
+        ).fetchone()[0]
+        if self.store is not None and self.last_seq < pruned:
+            # Changes we never saw were pruned: start over
+            self.store = None
+        if self.store is None:
+            self._open(conn, seq, pruned)
+        if seq <= self.last_seq:
+            return False
+        keys = [r[0] for r in conn.execute(
+            "SELECT DISTINCT row_key FROM vector_changes WHERE source = ? AND id > ? AND id <= ?",
+            (self.source, self.last_seq, seq),
+        )]
+        if keys:
+            rows = list(self._rows(conn, keys))
+            present = {r[0] for r in rows}
+            self.store.delete([k for k in keys if k not in present])
+            self._upsert(rows)
+            self.store.maybe_index()
+        self.last_seq = seq
+        self._save()
+        return True
+
+    def _prune(self) -> None:
+        with get_manager(DB_PATH).writer() as conn:
+            through = conn.execute(
+                "SELECT IFNULL(MAX(id), 0) FROM vector_changes "
+                "WHERE source = ? AND id <= ? AND created_at <= datetime('now', ?)",
+                (self.source, self.last_seq, f"-{RAG_VECTOR_CHANGES_RETENTION_S} seconds"),
+            ).fetchone()[0]
+            if not through:
+                return
+            conn.execute("DELETE FROM vector_changes WHERE source = ? AND id <= ?", (self.source, through))
+            conn.execute(
+                "INSERT INTO vector_changes_pruned (source, through_id) VALUES (?, ?) "
+                "ON CONFLICT(source) DO UPDATE SET through_id = MAX(through_id, excluded.through_id)",
+                (self.source, through),
+            )
+
+    def search(self, text: str, k: int, group: Optional[str] = None) -> List[Tuple[str, float]]:
+        with self._lock:
+            with _conn() as conn:
+                synced = self._sync(conn)
+            if synced:
+                # The log only grows with writes, so trimming after syncs that saw some bounds it
+                self._prune()
+            query = _get_embedder().embed([text])
+            hits = self.store.search(query, k=k, group=group)[0]
+        return [(key, score) for key, score in hits if score >= RAG_VECTOR_MIN_SCORE]
+
+_INDEXES = {source: _VectorIndex(source) for source in _CORPORA}
+
+def vector_search(source: str, text: str, k: int = 10, group: Optional[str] = None) -> List[str]:
+    """Keys of the rows nearest to ``text``, best first; empty when disabled."""
+    if not RAG_VECTOR_ENABLED or not text.strip():
+        return []
+    _ensure_schema()
+    return [key for key, _ in _INDEXES[source].search(text, k, group)]
+
+def _fuse(*rankings: Sequence, k: int = 60) -> list:
+    # Reciprocal rank fusion: rank matters, raw BM25/cosine scales do not
+    scores: Dict = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores, key=lambda key: -scores[key])
 
 def rag_definition_tool(query: str, module_filter: str = "") -> List[Dict[str, str]]:
-    tl = query.lower()
-    sql = "SELECT term, definition, module FROM glossary"
-    params = []
-    clauses = []
-    if module_filter:
-        clauses.append("module = ?")
-        params.append(module_filter)
-    if tl:
-        clauses.append("LOWER(term) LIKE ? OR LOWER(definition) LIKE ?")
-        params.extend([f"%{tl}%", f"%{tl}%"])
-    if clauses:
-        sql += " WHERE " + " AND ".join(["(" + " OR ".join(clauses[-2:]) + ")"] if len(clauses) > 1 else clauses)
-    sql += " LIMIT 5"
+    _ensure_schema()
+    match = fts_query(query)
+    params: list = []
+    if match:
+        # term matches weigh 10x a match in the definition body
+        sql = ("SELECT g.term, g.definition, g.module FROM glossary_fts f "
+               "JOIN glossary g ON g.rowid = f.rowid WHERE glossary_fts MATCH ?")
+        params.append(match)
+        if module_filter:
+            sql += " AND g.module = ?"
+            params.append(module_filter)
+        sql += " ORDER BY bm25(glossary_fts, 10.0, 1.0) LIMIT 10"
+    else:
+        sql = "SELECT term, definition, module FROM glossary"
+        if module_filter:
+            sql += " WHERE module = ?"
+            params.append(module_filter)
+        sql += " LIMIT 5"
     with _conn() as conn:
-        rows = conn.execute(sql, params).fetchall()
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError:
+            # malformed MATCH expression; treat as no hits
+            rows = []
+    if not match:
         return [{"term": r[0], "definition": r[1], "module": r[2]} for r in rows]
 
+    by_term = {r[0]: r for r in rows}
+    semantic = vector_search("glossary", query, 10, module_filter or None)
+    missing = [t for t in semantic if t not in by_term]
+    if missing:
+        with _conn() as conn:
+            marks = ", ".join("?" for _ in missing)
+            for r in conn.execute(f"SELECT term, definition, module FROM glossary WHERE term IN ({marks})", missing):
+                by_term[r[0]] = r
+    ranked = [t for t in _fuse([r[0] for r in rows], semantic) if t in by_term][:5]
+    return [{"term": t, "definition": by_term[t][1], "module": by_term[t][2]} for t in ranked]
+
 def policy_rag_tool(query: str) -> List[Dict[str, str]]:
-    # Simple search over documents tagged 'policy'
+    # Documents tagged 'policy', best match for the query text first
+    _ensure_schema()
+    match = "tags:policy"
+    words = fts_query(query)
+    if words:
+        match += f" AND ({words})"
     with _conn() as conn:
         rows = conn.execute(
-            "SELECT module, path, tags FROM documents WHERE LOWER(tags) LIKE '%policy%' ORDER BY created_at DESC LIMIT 10"
+            """
+            SELECT d.id, d.module, d.path, d.tags FROM documents_fts f
+            JOIN documents d ON d.id = f.rowid
+            WHERE documents_fts MATCH ?
+            ORDER BY bm25(documents_fts, 1.0, 5.0), d.created_at DESC LIMIT 10
+            """,
+            (match,),
         ).fetchall()
-    return [{"module": r[0], "path": r[1], "tags": r[2]} for r in rows]
+    by_id = {str(r[0]): r for r in rows}
+    semantic = vector_search("documents", query, 50) if words else []
+    missing = [int(k) for k in semantic if k not in by_id]
+    with _conn() as conn:
+        if missing:
+            marks = ", ".join("?" for _ in missing)
+            for r in conn.execute(
+                f"SELECT id, module, path, tags FROM documents WHERE id IN ({marks}) "
+                "AND (',' || REPLACE(tags, ' ', '') || ',') LIKE '%,policy,%'",
+                missing,
+            ):
+                by_id[str(r[0])] = r
+        if not by_id and words:
+            # nothing matched the query words; fall back to the newest policies
+            rows = conn.execute(
+                """
+                SELECT d.id, d.module, d.path, d.tags FROM documents_fts f
+                JOIN documents d ON d.id = f.rowid
+                WHERE documents_fts MATCH 'tags:policy'
+                ORDER BY d.created_at DESC LIMIT 10
+                """
+            ).fetchall()
+            by_id = {str(r[0]): r for r in rows}
+    ranked = [i for i in _fuse([str(r[0]) for r in rows], semantic) if i in by_id][:10]
+    return [{"module": by_id[i][1], "path": by_id[i][2], "tags": by_id[i][3]} for i in ranked]
@@ -0,0 +1,296 @@
+# services/result_cache.py
+import functools
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from core.config import (
+    RESULT_CACHE_MAX_BYTES,
+    RESULT_CACHE_MAX_ENTRIES,
+    RESULT_CACHE_TTL_S,
+)
+
+# Bumped by writes whose target tables we can't tell; part of every snapshot.
+# As a read's table list: reads we can't parse depend on every table.
+ANY_TABLE = "*"
+
+# Strings and comments (matched only to be dropped), quoted identifiers,
+# words, numbers, punctuation and operators
+_TOKEN_RE = re.compile(
+    r"'(?:[^']|'')*'|--[^\n]*|/\*.*?(?:\*/|$)"
+    r'|"(?:[^"]|"")*"|`(?:[^`]|``)*`|\[[^\]]*\]'
+    r"|[A-Za-z_][\w$]*|\d[\w.]*|[(),.;]|[^\s\w(),.;'\"`\[]+",
+    re.DOTALL,
+)
+# These end a FROM list at its own depth
+_FROM_END = {"where", "group", "order", "limit", "having", "union", "except", "intersect", "window", "returning"}
+# Can't name a table where one is expected: give up rather than guess
+_NOT_A_TABLE = {"select", "values", "where", "set", "from", "join", "on", "using", "with", "or"}
+_WRITE_TARGET_RE = re.compile(
+    r"^\s*(?:insert(?:\s+or\s+\w+)?\s+into|replace\s+into|update(?:\s+or\s+\w+)?|delete\s+from)\s+[\"`\[]?([A-Za-z_]\w*)",
+    re.IGNORECASE,
+)
+
+
+def _ident(token: str) -> Optional[str]:
+    if token[0] in "\"`":
+        return token[1:-1].replace(token[0] * 2, token[0])
+    if token[0] == "[":
+        return token[1:-1]
+    if (token[0].isalpha() or token[0] == "_") and token.lower() not in _NOT_A_TABLE:
+        return token
+    return None
+
+
+def tables_in(sql: str) -> Tuple[str, ...]:
+    """
+    Lower-cased tables ``sql`` reads or writes: every item of every FROM
+    list (comma joins included), JOIN, INTO and UPDATE targets, subqueries
+    too. ``(ANY_TABLE,)`` when that can't be told for sure, so the result
+    depends on every table. CTE names can show up as extra entries; they
+    are never written, so that is harmless.
+    """
+    tokens = [t for t in _TOKEN_RE.findall(sql) if not t.startswith(("'", "--", "/*"))]
+    if not tokens or tokens[0].lower() == "pragma":
+        return (ANY_TABLE,)
+    tables = set()
+    depth = 0
+    from_depths = set()  # depths with an open FROM list
+    i = 0
+    while i < len(tokens):
+        tok, low = tokens[i], tokens[i].lower()
+        expect = None
+        if tok == "(":
+            depth += 1
+        elif tok == ")":
+            from_depths.discard(depth)
+            depth -= 1
+        elif low == "from" and not (i and tokens[i - 1].lower() == "distinct"):  # not IS DISTINCT FROM
+            from_depths.add(depth)
+            expect = "from"
+        elif low == "join" or (tok == "," and depth in from_depths):
+            expect = "from"
+        elif low in _FROM_END:
+            from_depths.discard(depth)
+        elif low == "into":
+            expect = "into"
+        elif low == "update" and i + 1 < len(tokens) and tokens[i + 1].lower() != "set":  # not DO UPDATE SET
+            if tokens[i + 1].lower() == "or":  # UPDATE OR REPLACE t
+                i += 2
+            expect = "into"
+        i += 1
+        while expect == "from" and i < len(tokens) and tokens[i] == "(":
+            if i + 1 < len(tokens) and tokens[i + 1].lower() in ("select", "with", "values"):
+                # Subquery: its own FROMs come next
+                expect = None
+            else:
+                # Parenthesized join: a FROM list of its own
+                depth += 1
+                from_depths.add(depth)
+                i += 1
+        if expect is None:
+            continue
+        if i >= len(tokens):
+            return (ANY_TABLE,)
+        name = _ident(tokens[i])
+        if name is not None and i + 2 < len(tokens) and tokens[i + 1] == ".":  # schema.table
+            i += 2
+            name = _ident(tokens[i])
+        if name is None:
+            return (ANY_TABLE,)
+        i += 1
+        if expect == "from" and i < len(tokens) and tokens[i] == "(":
+            # Table-valued function (json_each(...)), not a table
+            continue
+        tables.add(name.lower())
+    return tuple(sorted(tables))
+
+
+def write_target(sql: str) -> Optional[str]:
+    """
+    Table written by an INSERT/UPDATE/DELETE, None for statements that don't
+    touch data (PRAGMA/EXPLAIN), or ANY_TABLE if it can't be told.
+    """
+    if sql.lstrip().lower().startswith(("pragma", "explain")):
+        return None
+    m = _WRITE_TARGET_RE.match(sql)
+    return m.group(1).lower() if m else ANY_TABLE
+
+
+def normalize_question(text: str) -> str:
+    t = text.strip().lower().replace("’", "'").replace("“", '"').replace("”", '"')
+    t = re.sub(r"\s+", " ", t)
+    return t.rstrip(" ?.!;")
+
+
+class TableVersions:
+    """
+    In-process write counter per table, bumped after a write commits. The
+    snapshot of ``(ANY_TABLE,)`` changes with a write to any table.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+        self._total = 0
+
+    def bump(self, *tables: str) -> None:
+        with self._lock:
+            for t in tables:
+                t = t.lower()
+                self._versions[t] = self._versions.get(t, 0) + 1
+                self._total += 1
+
+    def snapshot(self, tables: Iterable[str]) -> Tuple[int, ...]:
+        tables = tuple(tables)
+        if ANY_TABLE in tables:
+            return (self._total,)
+        v = self._versions
+        return (v.get(ANY_TABLE, 0),) + tuple(v.get(t, 0) for t in tables)
+
+
+TABLE_VERSIONS = TableVersions()
+
+
+def invalidates(*tables: str):
+    """
+    Decorator for write functions: bump ``tables`` once the call returns,
+    i.e. after its transaction has committed.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                TABLE_VERSIONS.bump(*tables)
+        return wrapper
+    return decorator
+
+
+def _estimate_size(obj: Any) -> int:
+    # Rough byte count of a result payload; cheap enough to run on every put
+    if isinstance(obj, dict):
+        return 64 + sum(_estimate_size(k) + _estimate_size(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return 56 + 8 * len(obj) + sum(_estimate_size(x) for x in obj)
+    if isinstance(obj, str):
+        return 49 + len(obj)
+    return 32
+
+
+def _frozen(value: Dict[str, Any]) -> Dict[str, Any]:
+    # Lists as tuples, rows too, so nothing handed out can change the entry
+    out = {k: tuple(v) if isinstance(v, list) else v for k, v in value.items()}
+    if isinstance(out.get("rows"), tuple):
+        out["rows"] = tuple(r if isinstance(r, tuple) else tuple(r) for r in out["rows"])
+    return out
+
+
+class _Entry:
+    __slots__ = ("value", "tables", "snapshot", "expires", "size", "source")
+
+    def __init__(self, value, tables, snapshot, expires, size, source):
+        self.source = source
+        self.value = value
+        self.tables = tables
+        self.snapshot = snapshot
+        self.expires = expires
+        self.size = size
+
+
+class ResultCache:
+    """
+    LRU + TTL cache of query results that is also invalidated when any table
+    the result was read from has been written since it was stored.
+    """
+
+    def __init__(
+        self,
+        versions: TableVersions = TABLE_VERSIONS,
+        ttl_s: float = RESULT_CACHE_TTL_S,
+        max_entries: int = RESULT_CACHE_MAX_ENTRIES,
+        max_bytes: int = RESULT_CACHE_MAX_BYTES,
+    ):
+        self.versions = versions
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.get_with_source(key)[0]
+
+    def get_with_source(self, key: str) -> Tuple[Optional[Dict[str, Any]], Any]:
+        """``(value, source given to put)``, or ``(None, None)`` on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, None
+            if entry.expires < time.monotonic() or self.versions.snapshot(entry.tables) != entry.snapshot:
+                self._drop(key)
+                self.stale += 1
+                self.misses += 1
+                return None, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            # Fresh lists around the shared, immutable rows
+            return {k: list(v) if isinstance(v, tuple) else v for k, v in entry.value.items()}, entry.source
+
+    def put(
+        self, key: str, value: Dict[str, Any], tables: Tuple[str, ...], snapshot: Tuple[int, ...], source: Any = None
+    ) -> bool:
+        """
+        Store ``value``. ``snapshot`` must be taken *before* the query ran so
+        a write that lands mid-query leaves the entry already stale.
+        ``source`` (what the value was read with) comes back from
+        ``get_with_source``.
+        """
+        if self.max_entries <= 0 or self.ttl_s <= 0:
+            return False
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = _Entry(_frozen(value), tables, snapshot, time.monotonic() + self.ttl_s, size, source)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+RESULT_CACHE = ResultCache()
@@ -1,30 +1,140 @@
 # services/sql.py
 import sqlite3
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from core.config import DB_PATH  # single source of truth
+from core.db import get_manager
+from core.tracing import traced
+from services.query_log import QUERY_LOG, caller_of_query, log_slow_query, note_read
+from services.result_cache import TABLE_VERSIONS, write_target
+from services.sql_governor import SQLGovernor, distinct_in_sql, distinct_sql, unique_rows
 
-def execute_query(query: str, params: tuple = ()):
+
+def _is_read(query: str) -> bool:
+    return query.lstrip().lower().startswith(("select", "with"))
+
+
+class QueryResult:
+    """
+    A query's rows exactly as SQLite returned them (a list of tuples, no
+    per-row copies) with the column names from ``cursor.description``.
+    """
+
+    __slots__ = ("columns", "rows")
+
+    def __init__(self, columns: Tuple[str, ...], rows: List[tuple]):
+        self.columns = columns
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[tuple]:
+        return iter(self.rows)
+
+    def to_payload(self) -> Dict[str, Any]:
+        """A table payload sharing this result's row list."""
+        return {"type": "table", "headers": list(self.columns), "rows": self.rows}
+
+
+def _columns(description) -> Tuple[str, ...]:
+    return tuple(d[0] for d in description) if description else ()
+
+
+def _run(query: str, params: tuple, governor: Optional[SQLGovernor], distinct: bool):
+    """``(rows or None, cursor.description)``, timed into ``QUERY_LOG``."""
+    mgr = get_manager(DB_PATH)
+    caller = caller_of_query()
+    rows, failed = None, True
+    t0 = time.perf_counter()
+    try:
+        if governor is not None:
+            with mgr.reader() as conn:
+                result, description = governor.execute(conn, query, params, distinct=distinct)
+            rows, failed = len(result), False
+            note_read(query, params, distinct)
+            return result, description
+
+        if _is_read(query):
+            with mgr.reader() as conn:
+                if distinct and not distinct_in_sql(query):
+                    cursor = conn.execute(query, params)
+                    result = unique_rows(cursor)
+                else:
+                    cursor = conn.execute(distinct_sql(query) if distinct else query, params)
+                    result = cursor.fetchall()
+            rows, failed = len(result), False
+            note_read(query, params, distinct)
+            return result, cursor.description
+
+        try:
+            with mgr.writer() as conn:
+                cursor = conn.execute(query, params)
+                result = cursor.fetchall() if cursor.description is not None else None
+                rows = len(result) if result is not None else cursor.rowcount
+            failed = False
+            return result, cursor.description
+        finally:
+            # After commit, so cached reads of this table are invalidated
+            target = write_target(query)
+            if target:
+                TABLE_VERSIONS.bump(target)
+
+    except sqlite3.Error as e:
+        # Bubble up to callers so they can render a useful error payload
+        raise
+    finally:
+        _record(mgr, query, params, time.perf_counter() - t0, rows, caller, failed)
+
+
+@traced("db.query")
+def execute_query(query: str, params: tuple = (), governor: Optional[SQLGovernor] = None):
     """
     Execute raw SQL against the ERP database.
 
+    SELECT/WITH queries run on the shared read-only pool; everything else
+    goes through the single writer connection and is committed on success.
+    Every call is timed into ``QUERY_LOG``; slow ones also get their plan
+    captured into ``slow_queries`` (see services/query_log.py).
+
+    With a ``governor`` the query always runs on a reader, read-only and
+    within the governor's step, time and row limits; hitting one raises
+    ``QueryLimitError`` (see services/sql_governor.py).
+
     Args:
         query (str): SQL query to execute.
         params (tuple): Optional parameters for the query.
+        governor (SQLGovernor): Optional limits for untrusted SQL.
 
     Returns:
-        list of tuples for SELECT queries,
+        list of tuples for queries that produce rows,
         None for non-SELECT queries.
     """
-    try:
-        with sqlite3.connect(DB_PATH) as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
+    return _run(query, params, governor, distinct=False)[0]
 
-            if query.strip().lower().startswith("select"):
-                return cursor.fetchall()
 
-            # Non-SELECT queries are auto-committed by the context manager
-            return None
+@traced("db.query")
+def query_result(
+    query: str, params: tuple = (), governor: Optional[SQLGovernor] = None, distinct: bool = False
+) -> QueryResult:
+    """
+    Like ``execute_query`` for a statement that returns rows, but keeps the
+    column names: a ``QueryResult``. With ``distinct`` duplicate rows are
+    dropped by SQLite (``SELECT DISTINCT * FROM (query)``), or in Python,
+    first occurrence kept, when the query has an ORDER BY whose order the
+    wrapper wouldn't keep.
+    """
+    rows, description = _run(query, params, governor, distinct)
+    return QueryResult(_columns(description), rows or [])
 
-    except sqlite3.Error as e:
-        # Bubble up to callers so they can render a useful error payload
-        raise
+
+def _record(mgr, query: str, params: tuple, seconds: float, rows, caller: str, failed: bool) -> None:
+    try:
+        fp = QUERY_LOG.record(query, seconds, rows, caller, error=failed)
+        if QUERY_LOG.is_slow(seconds):
+            # Plans come from a reader; EXPLAIN doesn't need the write lock
+            with mgr.reader() as conn:
+                log_slow_query(conn, query, params, seconds, rows, caller, fp)
+    except Exception:
+        # Instrumentation must never fail the query
+        pass
@@ -0,0 +1,226 @@
+# services/sql_governor.py
+"""
+Resource limits for SQL we didn't write: LLM-generated queries and the
+SELECT/WITH/PRAGMA passthrough in services/text_to_sql.py.
+
+While a query runs under a ``SQLGovernor`` its reader connection has:
+- an authorizer that only allows reading (SELECT, table reads, functions,
+  recursive CTEs and a few introspection pragmas); anything else fails at
+  prepare time;
+- a progress handler that aborts after ``max_steps`` VM instructions or at
+  the deadline, whichever comes first;
+- a timer that calls ``interrupt()`` at the deadline, for the stretches
+  (big sorts) where the progress handler doesn't run.
+
+The statement is first compiled on its own (as ``EXPLAIN``) so the
+authorizer sees exactly what was sent, then run inside an outer
+``LIMIT max_rows + 1`` so too many rows are noticed without fetching them
+all (with ``distinct`` on an ORDER BY query, rows are de-duplicated as
+they are fetched and the cap counts distinct rows). Whichever limit trips, the query fails with a ``QueryLimitError``
+naming it.
+
+    rows = execute_query(sql, governor=SQLGovernor())
+    rows = SQLGovernor(max_rows=100).run(conn, sql)
+"""
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional
+
+from core.config import SQL_MAX_ROWS, SQL_MAX_VM_STEPS, SQL_TIMEOUT_MS
+
+# How many VM instructions between progress-handler calls
+_PROGRESS_INTERVAL = 10_000
+
+_ALLOWED_ACTIONS = {
+    sqlite3.SQLITE_SELECT,
+    sqlite3.SQLITE_READ,
+    sqlite3.SQLITE_FUNCTION,
+    sqlite3.SQLITE_RECURSIVE,
+}
+
+# Read-only introspection; pragmas that change settings or do work are denied.
+# Plain reads take no argument; PRAGMA x = y is a write.
+_READ_PRAGMAS = {
+    "table_list", "collation_list", "function_list",
+    "schema_version", "user_version", "page_count", "page_size",
+}
+# These take a table or index name as their argument
+_LOOKUP_PRAGMAS = {"table_info", "table_xinfo", "index_list", "index_info", "index_xinfo", "foreign_key_list"}
+
+# Authorizer action codes -> names for the error message
+_ACTION_NAMES = {
+    getattr(sqlite3, f"SQLITE_{name.upper()}"): name
+    for name in (
+        "insert", "update", "delete", "create_table", "create_index", "create_view",
+        "create_trigger", "create_temp_table", "create_temp_index", "create_temp_view",
+        "create_temp_trigger", "create_vtable", "drop_table", "drop_index", "drop_view",
+        "drop_trigger", "drop_temp_table", "drop_temp_index", "drop_temp_view",
+        "drop_temp_trigger", "drop_vtable", "alter_table", "reindex", "analyze",
+        "attach", "detach", "transaction", "savepoint", "pragma",
+    )
+}
+
+
+def _body(sql: str) -> str:
+    return sql.strip().rstrip(";").strip()
+
+
+_ORDER_BY = re.compile(r"\border\s+by\b", re.IGNORECASE)
+
+
+def distinct_in_sql(sql: str) -> bool:
+    """
+    Whether SQLite can drop ``sql``'s duplicate rows. Not for PRAGMAs (no
+    subquery) nor anything with an ORDER BY: ``SELECT DISTINCT * FROM
+    (... ORDER BY ...)`` is free to return rows in any order, and does
+    when it sorts on a column that isn't selected. Those go through
+    ``unique_rows`` instead.
+    """
+    body = _body(sql)
+    return not body.lower().startswith("pragma") and not _ORDER_BY.search(body)
+
+
+def distinct_sql(sql: str) -> str:
+    """``sql`` with duplicate rows removed by SQLite, where ``distinct_in_sql``; else unchanged."""
+    body = _body(sql)
+    if not distinct_in_sql(body):
+        return body
+    return f"SELECT DISTINCT * FROM (\n{body}\n)"
+
+
+def unique_rows(rows: Iterable[tuple], limit: Optional[int] = None) -> List[tuple]:
+    """``rows`` without repeats, first occurrence kept; stops after ``limit`` rows."""
+    seen, out = set(), []
+    for row in rows:
+        if row not in seen:
+            seen.add(row)
+            out.append(row)
+            if limit is not None and len(out) >= limit:
+                break
+    return out
+
+
+class QueryLimitError(sqlite3.OperationalError):
+    """A governed query hit a limit; ``limit`` is statement, vm_steps, timeout or rows."""
+
+    def __init__(self, limit: str, message: str):
+        super().__init__(message)
+        self.limit = limit
+
+
+class SQLGovernor:
+    def __init__(
+        self,
+        max_steps: int = SQL_MAX_VM_STEPS,
+        timeout_ms: float = SQL_TIMEOUT_MS,
+        max_rows: int = SQL_MAX_ROWS,
+    ):
+        self.max_steps = max_steps
+        self.timeout_ms = timeout_ms
+        self.max_rows = max_rows
+
+    def run(self, conn: sqlite3.Connection, sql: str, params: tuple = ()) -> list:
+        """Rows of ``sql`` on ``conn``, within the limits."""
+        return self.execute(conn, sql, params)[0]
+
+    def execute(self, conn: sqlite3.Connection, sql: str, params: tuple = (), distinct: bool = False):
+        """``(rows, cursor.description)`` of ``sql`` on ``conn``, within the limits."""
+        body = _body(sql)
+        with self.guard(conn):
+            try:
+                conn.execute(f"EXPLAIN {body}", params)
+            except sqlite3.ProgrammingError as e:
+                # More than one statement
+                raise QueryLimitError("statement", f"Only a single statement is allowed here ({e}).") from e
+            in_python = distinct and not distinct_in_sql(body)
+            if distinct and not in_python:
+                body = distinct_sql(body)
+            if not in_python and not body.lower().startswith("pragma"):
+                # A pragma can't be a subquery; fetchmany caps it instead
+                body = f"SELECT * FROM (\n{body}\n) LIMIT {int(self.max_rows) + 1}"
+            cursor = conn.execute(body, params)
+            if in_python:
+                # The cap counts distinct rows; step/time limits bound the scan
+                rows = unique_rows(cursor, self.max_rows + 1)
+            else:
+                rows = cursor.fetchmany(self.max_rows + 1)
+        if len(rows) > self.max_rows:
+            raise QueryLimitError(
+                "rows", f"Query returned more than {self.max_rows} rows; add a filter or an aggregate."
+            )
+        return rows, cursor.description
+
+    @contextmanager
+    def guard(self, conn: sqlite3.Connection) -> Iterator[None]:
+        """Install the limits on ``conn`` for the duration of the block."""
+        denied: Optional[str] = None
+        tripped: Optional[str] = None
+        steps = 0
+        deadline = time.monotonic() + self.timeout_ms / 1000
+
+        def authorizer(action, arg1, arg2, db_name, trigger):
+            nonlocal denied
+            if action in _ALLOWED_ACTIONS:
+                return sqlite3.SQLITE_OK
+            if action == sqlite3.SQLITE_PRAGMA:
+                name = (arg1 or "").lower()
+                if name in _LOOKUP_PRAGMAS or (name in _READ_PRAGMAS and arg2 is None):
+                    return sqlite3.SQLITE_OK
+            denied = _ACTION_NAMES.get(action, str(action))
+            if action == sqlite3.SQLITE_PRAGMA:
+                denied += f" {arg1}"
+            return sqlite3.SQLITE_DENY
+
+        def progress():
+            nonlocal steps, tripped
+            steps += _PROGRESS_INTERVAL
+            if steps > self.max_steps:
+                tripped = "vm_steps"
+                return 1
+            if time.monotonic() > deadline:
+                tripped = "timeout"
+                return 1
+            return 0
+
+        active = True
+        active_lock = threading.Lock()
+
+        def on_deadline():
+            nonlocal tripped
+            # Not once the connection is back in the pool with someone else
+            with active_lock:
+                if active:
+                    tripped = tripped or "timeout"
+                    conn.interrupt()
+
+        timer = threading.Timer(self.timeout_ms / 1000, on_deadline)
+        timer.daemon = True
+        conn.set_authorizer(authorizer)
+        conn.set_progress_handler(progress, _PROGRESS_INTERVAL)
+        timer.start()
+        try:
+            yield
+        except sqlite3.DatabaseError as e:
+            if denied is not None:
+                raise QueryLimitError(
+                    "statement", f"Only read-only queries are allowed here (denied: {denied})."
+                ) from e
+            if tripped == "vm_steps":
+                raise QueryLimitError(
+                    "vm_steps", f"Query exceeded its budget of {self.max_steps:,} VM steps; it is too expensive."
+                ) from e
+            if tripped == "timeout":
+                raise QueryLimitError(
+                    "timeout", f"Query did not finish within {self.timeout_ms / 1000:g} s."
+                ) from e
+            raise
+        finally:
+            with active_lock:
+                active = False
+            timer.cancel()
+            # Pooled connection: leave it as we found it
+            conn.set_progress_handler(None, 0)
+            conn.set_authorizer(None)
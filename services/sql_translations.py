@@ -0,0 +1,164 @@
+# services/sql_translations.py
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from core.config import DB_PATH
+from core.db import get_manager
+from services.audit import get_audit_writer
+from services.result_cache import normalize_question
+
+_CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS sql_translations (
+  fingerprint TEXT PRIMARY KEY,
+  question TEXT NOT NULL,
+  sql TEXT NOT NULL,
+  schema_version INTEGER NOT NULL,
+  hit_count INTEGER NOT NULL DEFAULT 0,
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  last_used_at DATETIME
+)
+"""
+
+
+def fingerprint(question: str, context: str = "") -> str:
+    """
+    Stable key for a question. ``context`` (the schema prompt) is folded in
+    so editing the prompt naturally retires old translations.
+    """
+    h = hashlib.sha256()
+    h.update(context.encode("utf-8"))
+    h.update(b"\x00")
+    h.update(normalize_question(question).encode("utf-8"))
+    return h.hexdigest()
+
+
+class TranslationCache:
+    """
+    Persistent question -> SQL map for LLM-generated queries.
+
+    Only SQL that passes ``EXPLAIN`` is stored; callers store it once it has
+    run, and ``forget`` it if it later fails. Each row remembers the
+    ``PRAGMA schema_version`` it was validated against; after a schema change
+    the SQL is re-validated on its next lookup and dropped if it no longer
+    compiles. Hit counts are bumped through the batched audit writer so a
+    cache hit never waits on a write.
+    """
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self._ready = False
+        self._ready_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.invalidated = 0
+
+    def _ensure_table(self) -> None:
+        if self._ready:
+            return
+        with self._ready_lock:
+            if not self._ready:
+                with get_manager(self.db_path).writer() as conn:
+                    conn.execute(_CREATE_SQL)
+                self._ready = True
+
+    def _schema_version(self, conn: sqlite3.Connection) -> int:
+        return conn.execute("PRAGMA schema_version").fetchone()[0]
+
+    @staticmethod
+    def _is_valid(conn: sqlite3.Connection, sql: str) -> bool:
+        if not sql.lstrip().lower().startswith(("select", "with")):
+            return False
+        try:
+            # A real read reloads this connection's schema if another one
+            # changed it, and naming the version in the text keeps the
+            # statement cache from handing back an EXPLAIN prepared before
+            conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            version = conn.execute("PRAGMA schema_version").fetchone()[0]
+            conn.execute(f"EXPLAIN {sql}\n-- schema {version}").fetchall()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def lookup(self, question: str, context: str = "") -> Optional[str]:
+        self._ensure_table()
+        fp = fingerprint(question, context)
+        mgr = get_manager(self.db_path)
+        with mgr.reader() as conn:
+            row = conn.execute(
+                "SELECT sql, schema_version FROM sql_translations WHERE fingerprint = ?", (fp,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            sql, stored_version = row
+            current_version = self._schema_version(conn)
+            still_valid = stored_version == current_version or self._is_valid(conn, sql)
+
+        if stored_version != current_version:
+            with mgr.writer() as conn:
+                if still_valid:
+                    conn.execute(
+                        "UPDATE sql_translations SET schema_version = ? WHERE fingerprint = ?",
+                        (current_version, fp),
+                    )
+                else:
+                    conn.execute("DELETE FROM sql_translations WHERE fingerprint = ?", (fp,))
+            if not still_valid:
+                self.invalidated += 1
+                self.misses += 1
+                return None
+            self.revalidated += 1
+
+        self.hits += 1
+        get_audit_writer().submit(
+            "translation_hit", (datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"), fp)
+        )
+        return sql
+
+    def store(self, question: str, sql: str, context: str = "") -> bool:
+        """Remember ``sql`` for ``question`` if it compiles; returns whether it did."""
+        self._ensure_table()
+        mgr = get_manager(self.db_path)
+        with mgr.reader() as conn:
+            if not self._is_valid(conn, sql):
+                return False
+            version = self._schema_version(conn)
+        with mgr.writer() as conn:
+            conn.execute(
+                """
+                INSERT INTO sql_translations (fingerprint, question, sql, schema_version, hit_count, created_at, last_used_at)
+                VALUES (?, ?, ?, ?, 0, datetime('now'), datetime('now'))
+                ON CONFLICT(fingerprint) DO UPDATE SET
+                  sql = excluded.sql,
+                  schema_version = excluded.schema_version,
+                  last_used_at = excluded.last_used_at
+                """,
+                (fingerprint(question, context), question, sql, version),
+            )
+        return True
+
+    def forget(self, question: str, context: str = "") -> bool:
+        """Drop the stored SQL for ``question``; returns whether there was one."""
+        self._ensure_table()
+        with get_manager(self.db_path).writer() as conn:
+            deleted = conn.execute(
+                "DELETE FROM sql_translations WHERE fingerprint = ?", (fingerprint(question, context),)
+            ).rowcount
+        if deleted:
+            self.invalidated += 1
+        return bool(deleted)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "invalidated": self.invalidated,
+        }
+
+
+TRANSLATIONS = TranslationCache()
@@ -0,0 +1,99 @@
+# services/stub_llm.py
+"""
+Local stand-in for the OpenAI model, for load tests and offline demos.
+
+It answers the two kinds of prompt the app sends:
+- the text-to-SQL prompt (services/text_to_sql.py) with a scripted SELECT;
+- ReAct agent prompts with one ``Action:`` / ``Action Input:`` step that
+  calls a read tool from the prompt's tool list. The router's tools are
+  ``return_direct``, so that is the whole turn; anything that comes back
+  with an ``Observation:`` gets a ``Final Answer``.
+
+Each call sleeps ``latency_ms`` (plus up to ``jitter_ms``) to stand in for
+the network round trip; the async path uses ``asyncio.sleep``.
+
+Enabled with ``ERP_LLM_PROVIDER=stub`` (see services/llm.py).
+"""
+import asyncio
+import random
+import re
+import time
+from typing import Any, List, Optional, Sequence, Tuple
+
+from langchain_core.language_models.llms import LLM
+
+# (keywords, preferred tool) for agent prompts; first tool present in the prompt wins
+TOOL_SCRIPT: Sequence[Tuple[Sequence[str], str]] = (
+    (("aging", "receivable"), "finance_get_ar_aging"),
+    (("unpaid", "outstanding"), "finance_get_unpaid_invoices"),
+    (("invoice",), "finance_get_all_invoices"),
+    (("stock", "reorder", "inventory"), "inventory_get_stock_levels"),
+    (("policy",), "policy_rag_tool"),
+    (("define", "definition", "meaning", "glossary"), "glossary_rag_definition_tool"),
+)
+
+# (keywords, SQL) for text-to-SQL prompts
+SQL_SCRIPT: Sequence[Tuple[Sequence[str], str]] = (
+    (("average order",), "SELECT ROUND(AVG(total), 2) FROM orders WHERE created_at >= date('now', 'start of month')"),
+    (("revenue by product", "by product"),
+     "SELECT p.id, p.name, SUM(oi.quantity * oi.price) AS revenue FROM order_items oi"
+     " JOIN products p ON p.id = oi.product_id GROUP BY p.id ORDER BY revenue DESC LIMIT 20"),
+    (("customer",),
+     "SELECT c.id, c.name, ROUND(SUM(o.total), 2) AS revenue FROM orders o"
+     " JOIN customers c ON c.id = o.customer_id GROUP BY c.id ORDER BY revenue DESC LIMIT 10"),
+    (("order",), "SELECT id, customer_id, total, status, created_at FROM orders ORDER BY created_at DESC LIMIT 50"),
+    (("invoice", "finance", "payment"),
+     "SELECT id, customer_id, invoice_number, total_amount, status FROM invoices ORDER BY issue_date DESC LIMIT 50"),
+    (("stock", "product", "inventory"),
+     "SELECT p.id, p.name, s.qty_on_hand, s.reorder_point FROM stock s JOIN products p ON p.id = s.product_id LIMIT 50"),
+)
+DEFAULT_SQL = "SELECT id, name, email FROM customers ORDER BY id LIMIT 20"
+
+_TOOLS_RE = re.compile(r"should be one of \[([^\]]*)\]")
+_QUESTION_RE = re.compile(r"Question: (.*?)\nThought:", re.DOTALL)
+
+
+def _pick(text: str, script: Sequence[Tuple[Sequence[str], str]], allowed=None) -> Optional[str]:
+    lowered = text.lower()
+    for keywords, answer in script:
+        if (allowed is None or answer in allowed) and any(k in lowered for k in keywords):
+            return answer
+    return None
+
+
+def scripted_response(prompt: str) -> str:
+    """The stub's answer to ``prompt``, without the delay."""
+    tools = _TOOLS_RE.search(prompt)
+    if tools is None:
+        # Not an agent prompt: the text-to-SQL generator
+        question = prompt.rsplit("SELECT query without explanations:", 1)[-1]
+        return _pick(question, SQL_SCRIPT) or DEFAULT_SQL
+    questions = _QUESTION_RE.findall(prompt)
+    question = questions[-1].strip() if questions else ""
+    if "Observation:" in prompt.split(f"Question: {question}", 1)[-1]:
+        return " I now know the final answer\nFinal Answer: done"
+    names = [n.strip() for n in tools.group(1).split(",") if n.strip()]
+    tool = _pick(question, TOOL_SCRIPT, set(names)) or next(
+        (n for n in names if n.endswith(("_sql_read", "text_to_sql"))), names[0] if names else ""
+    )
+    return f" I should look this up.\nAction: {tool}\nAction Input: {question}"
+
+
+class StubLLM(LLM):
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "erp-stub"
+
+    def _delay(self) -> float:
+        return (self.latency_ms + random.uniform(0, self.jitter_ms)) / 1000
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> str:
+        time.sleep(self._delay())
+        return scripted_response(prompt)
+
+    async def _acall(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> str:
+        await asyncio.sleep(self._delay())
+        return scripted_response(prompt)
@@ -1,8 +1,14 @@
 # services/text_to_sql.py
 from sqlite3 import OperationalError
-from services.sql import execute_query
-from services.llm import llm
-from langchain.schema import AIMessage
+from typing import Optional
+from core.db import run_db
+from core.logging import logger
+from services.sql import query_result
+from services.llm import get_llm
+from services.query_log import note_read
+from services.result_cache import RESULT_CACHE, TABLE_VERSIONS, normalize_question, tables_in
+from services.sql_governor import QueryLimitError, SQLGovernor
+from services.sql_translations import TRANSLATIONS
 import re
 
 # Injected schema for LLM prompt
@@ -17,8 +23,122 @@ payments(id, customer_id, amount, method, received_at)
 stock(product_id, qty_on_hand, reorder_point)
 """
 
+def _message_text(value) -> str:
+    # LangChain messages (AIMessage, ...) carry their text in .content;
+    # duck-typed so importing this module doesn't pull in langchain_core
+    content = getattr(value, "content", None)
+    return content if isinstance(content, str) else str(value)
+
 def text_to_sql_tool(user_input):
-    text = user_input.content if isinstance(user_input, AIMessage) else str(user_input)
+    text = _message_text(user_input)
+
+    # Repeated questions are served from memory until their tables change
+    key = normalize_question(text)
+    cached = _cached(key)
+    if cached is not None:
+        return cached
+    return _run_plan(text, key, _plan_query(text))
+
+
+def _cached(key: str):
+    # A hit's query goes on the turn's read trail as if it had run
+    cached, source = RESULT_CACHE.get_with_source(key)
+    if source is not None:
+        note_read(*source)
+    return cached
+
+
+async def atext_to_sql_tool(user_input):
+    """
+    ``text_to_sql_tool`` for async callers: the LLM call is awaited on the
+    event loop and only the DB work (translation lookup, the query) goes
+    to the bounded DB executor, so slow LLM fallbacks don't hold DB workers.
+    """
+    text = _message_text(user_input)
+    key = normalize_question(text)
+    cached = _cached(key)
+    if cached is not None:
+        return cached
+    plan = await run_db(_plan_local, text)
+    if plan is None:
+        try:
+            plan = _clean_sql(await get_llm().ainvoke(_sql_prompt(text))), LLM_SQL
+        except Exception as e:
+            plan = {"type": "error", "message": f"Error generating SQL: {e}"}
+    return await run_db(_run_plan, text, key, plan)
+
+
+# Plan intents for SQL we didn't write: fresh from the LLM, or an earlier
+# LLM answer from TRANSLATIONS. Passthrough SQL has the empty intent.
+LLM_SQL = "llm_sql"
+TRANSLATED_SQL = "translated_sql"
+
+
+def _run_plan(text: str, key: str, plan):
+    if isinstance(plan, dict):
+        return plan
+    sql, intent = plan
+
+    tables = tables_in(sql)
+    snapshot = TABLE_VERSIONS.snapshot(tables)
+    # Canned SQL runs as written; passthrough and LLM SQL run governed and
+    # de-duplicated (LLM joins tend to fan out)
+    governed = intent in ("", LLM_SQL, TRANSLATED_SQL)
+    if governed:
+        result = _run_sql(sql, governor=SQLGovernor(), distinct=True)
+    else:
+        result = _run_sql(sql)
+    ok = result.get("type") == "table"
+    if ok:
+        RESULT_CACHE.put(key, result, tables, snapshot, source=(sql, (), governed))
+    # Only SQL that ran becomes the question's translation, and a stored
+    # one that now fails (limits, runtime errors) is dropped
+    try:
+        if intent == LLM_SQL and ok:
+            TRANSLATIONS.store(text, sql, context=ERP_SCHEMA)
+        elif intent == TRANSLATED_SQL and not ok:
+            TRANSLATIONS.forget(text, context=ERP_SCHEMA)
+    except Exception as e:
+        logger.warning(f"[text_to_sql] Could not update the translation for {text!r}: {e}")
+    return result
+
+
+def _plan_query(text: str):
+    """
+    Map a question to either ``(sql, intent)`` or a ready-made payload dict
+    (greetings, demo actions, LLM errors).
+    """
+    plan = _plan_local(text)
+    if plan is not None:
+        return plan
+    try:
+        return _clean_sql(get_llm().invoke(_sql_prompt(text))), LLM_SQL
+    except Exception as e:
+        return {"type": "error", "message": f"Error generating SQL: {e}"}
+
+
+def _sql_prompt(text: str) -> str:
+    return (
+        "You are an expert SQL generator for a SQLite ERP database. "
+        "Here is the schema:\n"
+        f"{ERP_SCHEMA}\n\n"
+        "Return ONLY a syntactically correct SQLite SELECT query without explanations:\n"
+        f"{text}\n"
+    )
+
+
+_FENCE_RE = re.compile(r"^```(?:sql)?\s*(.*?)\s*```$", re.DOTALL | re.IGNORECASE)
+
+
+def _clean_sql(response) -> str:
+    # Unwrap a ```sql fence; str.strip("sql") also ate the end of "FROM customers"
+    text = _message_text(response).strip()
+    fenced = _FENCE_RE.match(text)
+    return (fenced.group(1) if fenced else text).strip()
+
+
+def _plan_local(text: str):
+    """``_plan_query`` without the LLM: None when only the LLM can answer."""
     tl = text.strip().lower()
 
     # Greetings
@@ -28,7 +148,7 @@ def text_to_sql_tool(user_input):
     # Customers
     if ("list" in tl or "show" in tl or "get" in tl) and "customers" in tl:
         sql = "SELECT id, name, email FROM customers;" if "email" in tl else "SELECT id, name FROM customers;"
-        return _run_sql(sql, intent="sales_read_customers")
+        return sql, "sales_read_customers"
 
     # Invoices
     if ("list" in tl or "show" in tl) and "invoices" in tl:
@@ -38,7 +158,7 @@ def text_to_sql_tool(user_input):
         FROM invoices i
         JOIN customers c ON c.id = i.customer_id;
         """
-        return _run_sql(sql, intent="finance_read_invoices")
+        return sql, "finance_read_invoices"
 
     # Stock levels
     if "check" in tl and ("stock" in tl or "inventory" in tl):
@@ -50,7 +170,7 @@ def text_to_sql_tool(user_input):
         FROM stock s
         JOIN products p ON p.id = s.product_id;
         """
-        return _run_sql(sql, intent="inventory_read_stock")
+        return sql, "inventory_read_stock"
 
     # Products below reorder point
     if "products below reorder point" in tl:
@@ -63,7 +183,7 @@ def text_to_sql_tool(user_input):
         JOIN products p ON p.id = s.product_id
         WHERE s.qty_on_hand < s.reorder_point;
         """
-        return _run_sql(sql, intent="inventory_read_stock")
+        return sql, "inventory_read_stock"
 
     # Total revenue by product
     if "total revenue by product" in tl:
@@ -76,7 +196,7 @@ def text_to_sql_tool(user_input):
         GROUP BY p.id, p.name
         ORDER BY total_revenue DESC;
         """
-        return _run_sql(sql, intent="analytics_report")
+        return sql, "analytics_report"
 
     # Total sales by customer
     if "total sales by customer" in tl:
@@ -90,7 +210,7 @@ def text_to_sql_tool(user_input):
         GROUP BY c.id, c.name
         ORDER BY total_sales DESC;
         """
-        return _run_sql(sql, intent="sales_by_customer")
+        return sql, "sales_by_customer"
 
     # Average order value this month
     if "average order value" in tl and "this month" in tl:
@@ -99,7 +219,7 @@ def text_to_sql_tool(user_input):
         FROM orders o
         WHERE o.created_at >= DATE('now', 'start of month');
         """
-        return _run_sql(sql, intent="analytics_report")
+        return sql, "analytics_report"
 
     # Orders in last 30 days
     if "orders placed in the last 30 days" in tl:
@@ -113,7 +233,7 @@ def text_to_sql_tool(user_input):
         JOIN customers c ON c.id = o.customer_id
         WHERE o.created_at >= DATE('now', '-30 days');
         """
-        return _run_sql(sql, intent="sales_read_orders")
+        return sql, "sales_read_orders"
 
     # Top N customers by revenue this quarter
     if "top" in tl and "customers" in tl and "revenue" in tl and "quarter" in tl:
@@ -131,7 +251,7 @@ def text_to_sql_tool(user_input):
         ORDER BY total_revenue DESC
         LIMIT 5;
         """
-        return _run_sql(sql, intent="sales_by_customer")
+        return sql, "sales_by_customer"
 
     # Customers who haven't ordered in 6 months
     if "haven’t ordered" in tl or "haven't ordered" in tl:
@@ -145,7 +265,7 @@ def text_to_sql_tool(user_input):
             WHERE o.created_at >= DATE('now', '-6 months')
         );
         """
-        return _run_sql(sql, intent="sales_read_customers")
+        return sql, "sales_read_customers"
 
     # Sales and finance data for a specific customer
     if "sales and finance data for customer" in tl:
@@ -165,7 +285,7 @@ def text_to_sql_tool(user_input):
             LEFT JOIN invoices i ON i.customer_id = c.id
             WHERE c.id = {cid};
             """
-            return _run_sql(sql, intent="analytics_report")
+            return sql, "analytics_report"
 
     # Stubbed action queries for demo
     if "post a payment" in tl and "invoice" in tl:
@@ -175,65 +295,26 @@ def text_to_sql_tool(user_input):
 
     # Direct SQL passthrough
     if tl.startswith(("select ", "with ", "pragma ")):
-        return _run_sql(text)
+        return text, ""
 
-    # Fallback to schema-aware LLM
+    # Fallback to schema-aware LLM, unless this question was translated before
     try:
-        prompt = (
-            "You are an expert SQL generator for a SQLite ERP database. "
-            "Here is the schema:\n"
-            f"{ERP_SCHEMA}\n\n"
-            "Return ONLY a syntactically correct SQLite SELECT query without explanations:\n"
-            f"{text}\n"
-        )
-        sql = llm.invoke(prompt)
-        if isinstance(sql, AIMessage):
-            sql = sql.content
-        sql = sql.strip().strip("```").strip("sql").strip()
-        return _run_sql(sql)
+        cached_sql = TRANSLATIONS.lookup(text, context=ERP_SCHEMA)
     except Exception as e:
         return {"type": "error", "message": f"Error generating SQL: {e}"}
+    return (cached_sql, TRANSLATED_SQL) if cached_sql else None
 
 
-def _run_sql(sql: str, intent: str = ""):
+def _run_sql(sql: str, governor: Optional[SQLGovernor] = None, distinct: bool = False):
+    """
+    Table payload for ``sql``: headers from the cursor, rows as fetched.
+    ``distinct`` drops duplicate rows, keeping the query's ORDER BY.
+    """
     try:
-        raw_rows = execute_query(sql) or []
-
-        # Deduplicate rows
-        seen = set()
-        rows = []
-        for r in raw_rows:
-            row_tuple = tuple(r.values()) if isinstance(r, dict) else tuple(r)
-            if row_tuple not in seen:
-                seen.add(row_tuple)
-                if isinstance(r, dict):
-                    rows.append(list(r.values()))
-                elif isinstance(r, (list, tuple)):
-                    rows.append(list(r))
-                else:
-                    try:
-                        rows.append(list(r))
-                    except Exception:
-                        rows.append([str(r)])
-
-        # Headers by intent
-        if intent == "sales_read_customers":
-            headers = ["Customer ID", "Name", "Email"] if rows and len(rows[0]) >= 3 else ["Customer ID", "Name"]
-        elif intent == "finance_read_invoices":
-            headers = ["Invoice ID", "Customer Name", "Invoice #", "Amount", "Status"]
-        elif intent == "inventory_read_stock":
-            headers = ["Product ID", "Product Name", "Qty On Hand", "Reorder Point"]
-        elif intent == "analytics_report":
-            headers = ["Entity ID", "Entity Name", "Metric 1", "Metric 2"]
-        elif intent == "sales_read_orders":
-            headers = ["Order ID", "Customer Name", "Total", "Status", "Created At"]
-        elif intent == "sales_by_customer":
-            headers = ["Customer ID", "Customer Name", "Total Sales"]
-        else:
-            headers = [f"col_{i}" for i in range(len(rows[0]))] if rows else []
-
-        return {"type": "table", "headers": headers, "rows": rows}
+        return query_result(sql, governor=governor, distinct=distinct).to_payload()
 
+    except QueryLimitError as le:
+        return {"type": "error", "limit": le.limit, "message": f"Query stopped: {le}"}
     except OperationalError as oe:
         return {"type": "error", "message": f"Database error: {oe}"}
     except Exception as e:
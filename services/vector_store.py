@@ -0,0 +1,392 @@
+# services/vector_store.py
+import hashlib
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_WORD_RE = re.compile(r"\w+")
+
+
+# ---------- embedders ----------
+class HashingEmbedder:
+    """
+    Offline default: signed feature hashing of words and character trigrams
+    with sublinear term frequency, L2-normalised. No model files, no network,
+    and the same text always maps to the same vector in every process.
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+        self.name = f"hashing:{dim}"
+
+    def _features(self, text: str) -> Dict[int, float]:
+        counts: Dict[int, float] = {}
+        for word in _WORD_RE.findall(text.lower()):
+            grams = [word] + [f"<{word}>"[i:i + 3] for i in range(len(word))]
+            for j, g in enumerate(grams):
+                # blake2b rather than crc32: crc32's low bits collide in
+                # regular patterns, which skews a power-of-two ``dim``
+                h = int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest(), "little")
+                idx = h % self.dim
+                sign = 1.0 if h >> 63 else -1.0
+                # whole words count more than their trigrams
+                counts[idx] = counts.get(idx, 0.0) + sign * (2.0 if j == 0 else 0.5)
+        return counts
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for idx, v in self._features(text).items():
+                out[i, idx] = math.copysign(1.0 + math.log(abs(v)), v) if v else 0.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        np.divide(out, norms, out=out, where=norms > 0)
+        return out
+
+
+class SentenceTransformerEmbedder:
+    """Optional neural embedder; the model is loaded on first use."""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self._model = SentenceTransformer(model_name)
+        self.dim = self._model.get_sentence_embedding_dimension()
+        self.name = f"sentence-transformers:{model_name}"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vecs = self._model.encode(list(texts), normalize_embeddings=True, convert_to_numpy=True)
+        return vecs.astype(np.float32, copy=False)
+
+
+def get_embedder(spec: str = "hashing"):
+    """
+    ``"hashing"``, ``"hashing:<dim>"`` or ``"sentence-transformers:<model>"``.
+    """
+    kind, _, arg = spec.partition(":")
+    if kind == "hashing":
+        return HashingEmbedder(int(arg) if arg else 256)
+    if kind == "sentence-transformers":
+        return SentenceTransformerEmbedder(arg or "all-MiniLM-L6-v2")
+    raise ValueError(f"Unknown embedder: {spec}")
+
+
+# ---------- store ----------
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    idx = np.argpartition(-scores, k - 1)[:k]
+    return idx[np.argsort(-scores[idx], kind="stable")]
+
+
+class VectorStore:
+    """
+    Unit-length float32 vectors in a memory-mapped matrix, searched by cosine
+    similarity (a dot product, since everything is normalised).
+
+    - ``upsert``/``delete`` are incremental: replaced or deleted rows become
+      tombstones and new rows are appended; ``compact`` reclaims them.
+    - Small stores are searched exhaustively in batched chunks. Past
+      ``ivf_threshold`` rows, ``build_index`` clusters the matrix (IVF) and
+      reorders it so each cluster is contiguous; a query then scans only its
+      ``nprobe`` nearest clusters plus rows appended since the build.
+    - With ``path`` set the matrix and metadata persist there; otherwise the
+      matrix lives in an anonymous temp file that is dropped on exit. Keys
+      go to an append-only ``keys.jsonl``, so a save after an incremental
+      upsert writes only the new keys; it is rewritten after a compaction
+      or index build reorders the rows.
+    """
+
+    CHUNK = 65536
+
+    def __init__(self, dim: int, path: Optional[str] = None, capacity: int = 1024, ivf_threshold: int = 50_000):
+        self.dim = dim
+        self.path = Path(path) if path else None
+        self.ivf_threshold = ivf_threshold
+        self._lock = threading.RLock()
+        self.count = 0
+        self.keys: List[Optional[str]] = []
+        self.key_to_row: Dict[str, int] = {}
+        self.group_names: List[str] = [""]
+        self._alive = np.zeros(0, dtype=bool)
+        self._groups = np.zeros(0, dtype=np.int16)
+        self._centroids: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._indexed = 0
+        # keys.jsonl holds keys[:_keys_saved] in its first _keys_bytes bytes;
+        # 0 means it must be rewritten
+        self._keys_saved = 0
+        self._keys_bytes = 0
+        self._tmp = None
+        self._vectors = self._open_matrix(max(capacity, 1))
+
+    # ---------- storage ----------
+    def _matrix_file(self) -> str:
+        if self.path is not None:
+            self.path.mkdir(parents=True, exist_ok=True)
+            return str(self.path / "vectors.f32")
+        if self._tmp is None:
+            self._tmp = tempfile.NamedTemporaryFile(prefix="erp-vectors-", suffix=".f32")
+        return self._tmp.name
+
+    def _open_matrix(self, capacity: int, copy_rows: int = 0) -> np.memmap:
+        fname = self._matrix_file()
+        old = getattr(self, "_vectors", None)
+        if old is not None:
+            old.flush()
+        size = capacity * self.dim * 4
+        with open(fname, "r+b" if os.path.exists(fname) else "w+b") as f:
+            f.truncate(size)
+        mat = np.memmap(fname, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        alive = np.zeros(capacity, dtype=bool)
+        groups = np.zeros(capacity, dtype=np.int16)
+        alive[:copy_rows] = self._alive[:copy_rows]
+        groups[:copy_rows] = self._groups[:copy_rows]
+        self._alive, self._groups = alive, groups
+        return mat
+
+    def _ensure_capacity(self, extra: int) -> None:
+        need = self.count + extra
+        cap = self._vectors.shape[0]
+        if need > cap:
+            while cap < need:
+                cap *= 2
+            self._vectors = self._open_matrix(cap, copy_rows=self.count)
+
+    def _group_id(self, group: Optional[str]) -> int:
+        group = group or ""
+        try:
+            return self.group_names.index(group)
+        except ValueError:
+            self.group_names.append(group)
+            return len(self.group_names) - 1
+
+    def __len__(self) -> int:
+        return len(self.key_to_row)
+
+    # ---------- mutation ----------
+    def upsert(self, keys: Sequence[str], vectors: np.ndarray, groups: Optional[Sequence[str]] = None) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(keys), self.dim)
+        with self._lock:
+            self.delete(keys)
+            self._ensure_capacity(len(keys))
+            start = self.count
+            self._vectors[start:start + len(keys)] = vectors
+            for i, key in enumerate(keys):
+                row = start + i
+                self.keys.append(key)
+                self.key_to_row[key] = row
+                self._alive[row] = True
+                self._groups[row] = self._group_id(groups[i] if groups else None)
+            self.count += len(keys)
+
+    def delete(self, keys: Iterable[str]) -> int:
+        removed = 0
+        with self._lock:
+            for key in keys:
+                row = self.key_to_row.pop(key, None)
+                if row is not None:
+                    self._alive[row] = False
+                    self.keys[row] = None
+                    removed += 1
+        return removed
+
+    def compact(self) -> None:
+        """Drop tombstones; also discards the IVF index (rebuild afterwards)."""
+        with self._lock:
+            live = np.flatnonzero(self._alive[:self.count])
+            self._rewrite(live)
+            self._centroids = self._offsets = None
+            self._indexed = 0
+
+    def _rewrite(self, order: np.ndarray) -> None:
+        # Rewrite rows in ``order`` to the front of the matrix, in chunks
+        vecs = np.empty((len(order), self.dim), dtype=np.float32)
+        for s in range(0, len(order), self.CHUNK):
+            vecs[s:s + self.CHUNK] = self._vectors[order[s:s + self.CHUNK]]
+        self._vectors[:len(order)] = vecs
+        groups = self._groups[order].copy()
+        keys = [self.keys[i] for i in order]
+        self._alive[:] = False
+        self._alive[:len(order)] = True
+        self._groups[:len(order)] = groups
+        self.keys = keys
+        self.key_to_row = {k: i for i, k in enumerate(keys)}
+        self.count = len(order)
+        self._keys_saved = 0
+
+    # ---------- IVF ----------
+    def build_index(self, n_lists: Optional[int] = None, iters: int = 8, sample: int = 50_000, seed: int = 0) -> None:
+        """Cluster live rows with k-means and lay each cluster out contiguously."""
+        with self._lock:
+            live = np.flatnonzero(self._alive[:self.count])
+            n = len(live)
+            if n == 0:
+                return
+            n_lists = n_lists or max(1, int(math.sqrt(n)))
+            rng = np.random.default_rng(seed)
+            train = self._vectors[np.sort(rng.choice(live, size=min(sample, n), replace=False))]
+            centroids = train[rng.choice(len(train), size=min(n_lists, len(train)), replace=False)].copy()
+            for _ in range(iters):
+                assign = np.argmax(train @ centroids.T, axis=1)
+                for c in range(len(centroids)):
+                    members = train[assign == c]
+                    if len(members):
+                        centroids[c] = members.mean(axis=0)
+                norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+                np.divide(centroids, norms, out=centroids, where=norms > 0)
+
+            assign = np.empty(n, dtype=np.int32)
+            for s in range(0, n, self.CHUNK):
+                assign[s:s + self.CHUNK] = np.argmax(self._vectors[live[s:s + self.CHUNK]] @ centroids.T, axis=1)
+            order = np.argsort(assign, kind="stable")
+            self._rewrite(live[order])
+            counts = np.bincount(assign, minlength=len(centroids))
+            self._offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+            self._centroids = centroids
+            self._indexed = self.count
+
+    def maybe_index(self, stale_ratio: float = 0.1) -> bool:
+        """(Re)build the IVF index once the store is large and the unindexed tail has grown."""
+        n = len(self)
+        if n < self.ivf_threshold:
+            return False
+        if self._centroids is not None and (self.count - self._indexed) <= stale_ratio * self._indexed:
+            return False
+        self.build_index()
+        return True
+
+    # ---------- search ----------
+    def _score_rows(self, start: int, stop: int, queries: np.ndarray, group_id: Optional[int]) -> np.ndarray:
+        scores = self._vectors[start:stop] @ queries.T
+        dead = ~self._alive[start:stop]
+        if group_id is not None:
+            dead |= self._groups[start:stop] != group_id
+        scores[dead] = -np.inf
+        return scores
+
+    def search(
+        self, queries: np.ndarray, k: int = 5, group: Optional[str] = None, nprobe: int = 8
+    ) -> List[List[Tuple[str, float]]]:
+        """Top-``k`` (key, cosine) per query row, best first."""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        with self._lock:
+            if group is not None and group not in self.group_names:
+                return [[] for _ in queries]
+            group_id = self.group_names.index(group) if group is not None else None
+            if self._centroids is not None and self._indexed >= self.ivf_threshold:
+                return [self._search_ivf(q, k, group_id, nprobe) for q in queries]
+            return self._search_flat(queries, k, group_id)
+
+    def _search_flat(self, queries: np.ndarray, k: int, group_id: Optional[int]) -> List[List[Tuple[str, float]]]:
+        best_idx = [np.empty(0, dtype=np.int64) for _ in queries]
+        best_score = [np.empty(0, dtype=np.float32) for _ in queries]
+        for s in range(0, self.count, self.CHUNK):
+            e = min(s + self.CHUNK, self.count)
+            scores = self._score_rows(s, e, queries, group_id)
+            for qi in range(len(queries)):
+                col = scores[:, qi]
+                top = _top_k(col, k)
+                idx = np.concatenate([best_idx[qi], top + s])
+                sc = np.concatenate([best_score[qi], col[top]])
+                keep = _top_k(sc, k)
+                best_idx[qi], best_score[qi] = idx[keep], sc[keep]
+        return [self._hits(i, sc) for i, sc in zip(best_idx, best_score)]
+
+    def _search_ivf(self, query: np.ndarray, k: int, group_id: Optional[int], nprobe: int) -> List[Tuple[str, float]]:
+        probes = _top_k(self._centroids @ query, nprobe)
+        idx_parts, score_parts = [], []
+        spans = [(self._offsets[c], self._offsets[c + 1]) for c in probes]
+        spans.append((self._indexed, self.count))  # rows appended since build
+        for s, e in spans:
+            if e > s:
+                sc = self._score_rows(s, e, query[None, :], group_id)[:, 0]
+                top = _top_k(sc, k)
+                idx_parts.append(top + s)
+                score_parts.append(sc[top])
+        if not idx_parts:
+            return []
+        idx = np.concatenate(idx_parts)
+        sc = np.concatenate(score_parts)
+        keep = _top_k(sc, k)
+        return self._hits(idx[keep], sc[keep])
+
+    def _hits(self, idx: np.ndarray, scores: np.ndarray) -> List[Tuple[str, float]]:
+        return [(self.keys[i], float(s)) for i, s in zip(idx, scores) if np.isfinite(s)]
+
+    # ---------- persistence ----------
+    def _save_keys(self) -> int:
+        # Deleted rows keep their key on disk; alive.npy says they are gone
+        keys_file = self.path / "keys.jsonl"
+        if self._keys_saved and keys_file.exists():
+            new = self.keys[self._keys_saved:self.count]
+            with open(keys_file, "r+b") as f:
+                # Drop anything a save that died before its meta.json left behind
+                f.truncate(self._keys_bytes)
+                f.seek(self._keys_bytes)
+                f.write("".join(json.dumps(k) + "\n" for k in new).encode("utf-8"))
+                return f.tell()
+        tmp = self.path / "keys.jsonl.tmp"
+        tmp.write_text("".join(json.dumps(k) + "\n" for k in self.keys[:self.count]), encoding="utf-8")
+        os.replace(tmp, keys_file)
+        return keys_file.stat().st_size
+
+    def save(self, extra: Optional[dict] = None) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            self._vectors.flush()
+            np.save(self.path / "alive.npy", self._alive[:self.count])
+            np.save(self.path / "groups.npy", self._groups[:self.count])
+            if self._centroids is not None:
+                np.savez(self.path / "ivf.npz", centroids=self._centroids, offsets=self._offsets)
+            keys_bytes = self._save_keys()
+            meta = {
+                "dim": self.dim,
+                "count": self.count,
+                "capacity": int(self._vectors.shape[0]),
+                "indexed": self._indexed if self._centroids is not None else 0,
+                "group_names": self.group_names,
+                "keys_bytes": keys_bytes,
+                "extra": extra or {},
+            }
+            tmp = self.path / "meta.json.tmp"
+            tmp.write_text(json.dumps(meta))
+            os.replace(tmp, self.path / "meta.json")
+            self._keys_saved, self._keys_bytes = self.count, keys_bytes
+
+    @classmethod
+    def load(cls, path: str, dim: int, **kwargs) -> Tuple["VectorStore", dict]:
+        """Open the store at ``path``; an empty one if missing or built for another dim."""
+        p = Path(path)
+        meta_file = p / "meta.json"
+        if meta_file.exists():
+            meta = json.loads(meta_file.read_text())
+            if meta.get("dim") == dim:
+                store = cls(dim, path, capacity=meta["capacity"], **kwargs)
+                store.count = meta["count"]
+                store.group_names = meta["group_names"]
+                store._alive[:store.count] = np.load(p / "alive.npy")
+                store._groups[:store.count] = np.load(p / "groups.npy")
+                with open(p / "keys.jsonl", "rb") as f:
+                    raw = f.read(meta["keys_bytes"])
+                store._keys_saved, store._keys_bytes = store.count, meta["keys_bytes"]
+                # keys.jsonl is append-only and still has deleted rows' keys
+                store.keys = [json.loads(line) if store._alive[i] else None
+                              for i, line in enumerate(raw.splitlines())]
+                store.key_to_row = {k: i for i, k in enumerate(store.keys) if k is not None}
+                if meta.get("indexed") and (p / "ivf.npz").exists():
+                    ivf = np.load(p / "ivf.npz")
+                    store._centroids, store._offsets = ivf["centroids"], ivf["offsets"]
+                    store._indexed = meta["indexed"]
+                return store, meta.get("extra", {})
+        if (p / "vectors.f32").exists():
+            (p / "vectors.f32").unlink()
+        return cls(dim, path, **kwargs), {}
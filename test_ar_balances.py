@@ -0,0 +1,113 @@
+import shutil
+import sqlite3
+from pathlib import Path
+
+from db.migrate import apply_migrations
+from domain.finance.receivables import _RECONCILE_SQL, _REBUCKET_SQL
+
+MIGRATIONS = Path(__file__).resolve().parent / "db" / "migrations"
+SAMPLE_DB = Path(__file__).resolve().parent / "db" / "erp_v2.db"
+
+
+def _db():
+    conn = sqlite3.connect(":memory:")
+    for script in ("001_create_customers.sql", "004_create_invoices.sql", "006_create_payments.sql",
+                   "007_create_payment_allocations.sql", "011_create_ar_balances.sql",
+                   "017_ar_undated_invoices.sql"):
+        conn.executescript((MIGRATIONS / script).read_text())
+    conn.execute("INSERT INTO customers (id, name, email) VALUES (1, 'Acme', 'a@example.com')")
+    return conn
+
+
+def _invoice(conn, number, total, days_overdue):
+    return conn.execute(
+        "INSERT INTO invoices (customer_id, invoice_number, due_date, total_amount) VALUES (1, ?, date('now', ?), ?)",
+        (number, f"-{days_overdue} day", total),
+    ).lastrowid
+
+
+def _pay(conn, invoice_id, amount):
+    payment_id = conn.execute("INSERT INTO payments (customer_id, amount) VALUES (1, ?)", (amount,)).lastrowid
+    conn.execute("INSERT INTO payment_allocations (payment_id, invoice_id, amount) VALUES (?, ?, ?)",
+                 (payment_id, invoice_id, amount))
+
+
+def _summary(conn):
+    return conn.execute(
+        "SELECT balance, bucket_0_30, bucket_31_60, bucket_61_90, bucket_90_plus, open_invoices "
+        "FROM ar_customer_balances WHERE customer_id = 1"
+    ).fetchone()
+
+
+def test_invoices_land_in_aging_buckets():
+    conn = _db()
+    _invoice(conn, "A", 100, 0)
+    _invoice(conn, "B", 200, 45)
+    _invoice(conn, "C", 300, 75)
+    _invoice(conn, "D", 400, 120)
+    assert _summary(conn) == (1000, 100, 200, 300, 400, 4)
+
+
+def test_allocations_reduce_balance_and_mark_paid():
+    conn = _db()
+    inv = _invoice(conn, "A", 100, 40)
+    _pay(conn, inv, 60)
+    assert _summary(conn) == (40, 0, 40, 0, 0, 1)
+    assert conn.execute("SELECT status FROM invoices WHERE id = ?", (inv,)).fetchone()[0] == "unpaid"
+    _pay(conn, inv, 40)
+    assert _summary(conn) == (0, 0, 0, 0, 0, 0)
+    assert conn.execute("SELECT status FROM invoices WHERE id = ?", (inv,)).fetchone()[0] == "paid"
+
+
+def test_cancel_and_delete_drop_balance():
+    conn = _db()
+    a = _invoice(conn, "A", 100, 0)
+    b = _invoice(conn, "B", 50, 0)
+    conn.execute("UPDATE invoices SET status = 'cancelled' WHERE id = ?", (a,))
+    assert _summary(conn)[0] == 50
+    conn.execute("DELETE FROM invoices WHERE id = ?", (b,))
+    assert _summary(conn) == (0, 0, 0, 0, 0, 0)
+
+
+def test_rebucket_moves_aged_invoices():
+    conn = _db()
+    inv = _invoice(conn, "A", 100, 10)
+    # Thirty days later, as far as the stored due date is concerned
+    conn.execute("UPDATE ar_invoice_balances SET due_date = date('now', '-40 day') WHERE invoice_id = ?", (inv,))
+    assert conn.execute(_REBUCKET_SQL).rowcount == 1
+    assert _summary(conn) == (100, 0, 100, 0, 0, 1)
+    conn.execute("DELETE FROM ar_customer_balances")
+    conn.execute(_RECONCILE_SQL)
+    assert _summary(conn) == (100, 0, 100, 0, 0, 1)
+
+
+def test_invoices_without_due_date(tmp_path):
+    # erp_v2.db, unlike migration 004, allows invoices without a due date
+    path = tmp_path / "erp.db"
+    shutil.copy(SAMPLE_DB, path)
+    apply_migrations(str(path))
+    conn = sqlite3.connect(path)
+    customer = conn.execute("SELECT id FROM customers ORDER BY id LIMIT 1").fetchone()[0]
+    before = conn.execute("SELECT balance, bucket_0_30, bucket_61_90 FROM ar_customer_balances "
+                          "WHERE customer_id = ?", (customer,)).fetchone() or (0, 0, 0)
+
+    undated = conn.execute("INSERT INTO invoices (customer_id, invoice_number, total_amount) VALUES (?, 'ND-1', 80)",
+                           (customer,)).lastrowid
+    # No issue date either: due today, so 0-30
+    assert conn.execute("SELECT due_date, bucket, outstanding FROM ar_invoice_balances WHERE invoice_id = ?",
+                        (undated,)).fetchone() == (conn.execute("SELECT date('now')").fetchone()[0], 0, 80)
+
+    # Issued 70 days ago, no due date: aged from the issue date
+    issued = conn.execute("INSERT INTO invoices (customer_id, invoice_number, issue_date, total_amount) "
+                          "VALUES (?, 'ND-2', date('now', '-70 day'), 20)", (customer,)).lastrowid
+    assert conn.execute("SELECT bucket FROM ar_invoice_balances WHERE invoice_id = ?", (issued,)).fetchone() == (2,)
+    after = conn.execute("SELECT balance, bucket_0_30, bucket_61_90 FROM ar_customer_balances WHERE customer_id = ?",
+                         (customer,)).fetchone()
+    assert [round(a - b, 2) for a, b in zip(after, before)] == [100, 80, 20]
+
+    # Clearing a due date on update falls back the same way
+    conn.execute("UPDATE invoices SET due_date = date('now', '-100 day') WHERE id = ?", (undated,))
+    assert conn.execute("SELECT bucket FROM ar_invoice_balances WHERE invoice_id = ?", (undated,)).fetchone() == (3,)
+    conn.execute("UPDATE invoices SET due_date = NULL WHERE id = ?", (undated,))
+    assert conn.execute("SELECT bucket FROM ar_invoice_balances WHERE invoice_id = ?", (undated,)).fetchone() == (0,)
+    conn.close()
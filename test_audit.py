@@ -0,0 +1,48 @@
+import shutil
+import sqlite3
+from pathlib import Path
+
+from db.migrate import apply_migrations
+from services.audit import AuditWriter
+
+SAMPLE_DB = Path(__file__).resolve().parent / "db" / "erp_v2.db"
+
+
+def _db(tmp_path) -> str:
+    path = tmp_path / "erp.db"
+    shutil.copy(SAMPLE_DB, path)
+    apply_migrations(str(path))
+    return str(path)
+
+
+def _tool_calls(path: str) -> list:
+    conn = sqlite3.connect(path)
+    try:
+        return [r[0] for r in conn.execute("SELECT tool_name FROM tool_calls WHERE agent = 'audit-test' ORDER BY id")]
+    finally:
+        conn.close()
+
+
+def test_bad_row_only_drops_itself(tmp_path):
+    path = _db(tmp_path)
+    writer = AuditWriter(db_path=path)
+    writer.submit("tool_call", ("audit-test", "first", "{}", "{}", "2026-01-01"))
+    writer.submit("tool_call", ("audit-test", "wrong arity"))
+    writer.submit("tool_call", ("audit-test", "unbindable", object(), "{}", "2026-01-01"))
+    writer.submit("tool_call", ("audit-test", "last", "{}", "{}", "2026-01-01"))
+    writer.flush()
+
+    assert _tool_calls(path) == ["first", "last"]
+    assert writer.stats()["written"] == 2 and writer.stats()["failed"] == 2
+
+
+def test_submit_after_stop_writes_synchronously(tmp_path):
+    path = _db(tmp_path)
+    writer = AuditWriter(db_path=path, flush_interval_ms=10).start()
+    writer.submit("tool_call", ("audit-test", "queued", "{}", "{}", "2026-01-01"))
+    writer.stop()
+    assert _tool_calls(path) == ["queued"]
+
+    assert writer.submit("tool_call", ("audit-test", "late", "{}", "{}", "2026-01-01"))
+    assert _tool_calls(path) == ["queued", "late"]
+    assert writer.stats()["queue_depth"] == 0
@@ -0,0 +1,81 @@
+import shutil
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+from db.migrate import apply_migrations
+from domain.finance.tools import CreateInvoiceInput, RecordPaymentInput, _insert_invoices, _insert_payments
+from domain.sales.tools import CreateOrderInput, _insert_orders
+from services.bulk import bulk_write, validate_batch
+
+SAMPLE_DB = Path(__file__).resolve().parent / "db" / "erp_v2.db"
+
+
+@pytest.fixture
+def conn(tmp_path):
+    path = tmp_path / "erp.db"
+    shutil.copy(SAMPLE_DB, path)
+    apply_migrations(str(path))
+    conn = sqlite3.connect(path)
+    yield conn
+    conn.close()
+
+
+def _writer(conn):
+    @contextmanager
+    def writer():
+        with conn:
+            yield conn
+    return writer
+
+
+def _invoice(i, **kw):
+    item = {"customer_id": 1, "invoice_number": f"T-{i}",
+            "lines": [{"description": "a", "quantity": 2, "unit_price": i}, {"description": "b", "quantity": 1, "unit_price": 1}]}
+    item.update(kw)
+    return item
+
+
+def test_validate_batch_reports_per_item_errors():
+    items = [_invoice(1), _invoice(2, lines=[{"description": "x"}]), _invoice(3, customer_id="nope")]
+    valid, errors = validate_batch(CreateInvoiceInput, items)
+    assert [i for i, _ in valid] == [0]
+    assert sorted(errors) == [1, 2]
+    assert errors[2][0]["loc"] == ["customer_id"]
+
+
+def test_bulk_invoices_link_lines_and_update_ar(conn):
+    items = [_invoice(i) for i in range(1, 51)] + [_invoice(99, lines="bad")]
+    out = bulk_write(CreateInvoiceInput, items, _insert_invoices, _writer(conn))
+    assert out["counts"] == {"unpaid": 50, "error": 1}
+    assert out["results"][-1]["index"] == 50
+    for r in out["results"][:50]:
+        lines_total = conn.execute(
+            "SELECT SUM(quantity * unit_price) FROM invoice_lines WHERE invoice_id = ?", (r["invoice_id"],)
+        ).fetchone()[0]
+        assert lines_total == r["total_amount"] == 2 * (r["index"] + 1) + 1
+    balance = conn.execute(
+        "SELECT SUM(outstanding) FROM ar_invoice_balances WHERE invoice_id IN (%s)"
+        % ",".join(str(r["invoice_id"]) for r in out["results"][:50])
+    ).fetchone()[0]
+    assert balance == sum(r["total_amount"] for r in out["results"][:50])
+
+    payments = [{"customer_id": 1, "amount": r["total_amount"],
+                 "allocations": [{"invoice_id": r["invoice_id"], "amount": r["total_amount"]}]}
+                for r in out["results"][:10]]
+    posted = bulk_write(RecordPaymentInput, payments, _insert_payments, _writer(conn))
+    assert all(p["paid_invoices"] == [r["invoice_id"]] for p, r in zip(posted["results"], out["results"]))
+
+
+def test_bulk_orders_are_written_with_totals(conn):
+    items = [{"customer_id": 1, "items": [{"product_id": 1, "quantity": k, "price": 2.5}]} for k in range(1, 21)]
+    out = bulk_write(CreateOrderInput, items, _insert_orders, _writer(conn))
+    assert out["counts"] == {"created": 20}
+    for r, item in zip(out["results"], items):
+        total, qty = conn.execute(
+            "SELECT o.total, oi.quantity FROM orders o JOIN order_items oi ON oi.order_id = o.id WHERE o.id = ?",
+            (r["order_id"],),
+        ).fetchone()
+        assert total == r["total"] == item["items"][0]["quantity"] * 2.5 and qty == item["items"][0]["quantity"]
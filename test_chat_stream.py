@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from app.api.chat import ADMISSION
+from app.main import app
+from services.llm import set_llm
+from services.stub_llm import StubLLM
+
+
+def _post_stream(send, spec_version: str) -> None:
+    body = json.dumps({"message": "show unpaid invoices"}).encode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": spec_version}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": "/api/chat/stream", "raw_path": b"/api/chat/stream",
+        "query_string": b"", "root_path": "", "headers": [(b"content-type", b"application/json")],
+        "client": ("test", 1), "server": ("test", 80),
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        # The client is already gone
+        return {"type": "http.disconnect"}
+
+    async def run():
+        try:
+            await app(scope, receive, send)
+        except Exception:
+            pass
+
+    asyncio.run(run())
+
+
+def test_dropped_stream_releases_its_slot():
+    before = ADMISSION.inflight
+
+    async def gone(message):
+        raise OSError("client disconnected")
+
+    # Disconnected before the body starts: the generator is never entered
+    _post_stream(gone, "2.4")
+    assert ADMISSION.inflight == before
+
+    async def drop(message):
+        await asyncio.sleep(0)
+
+    _post_stream(drop, "2.0")
+    assert ADMISSION.inflight == before
+
+
+def test_stream_completes_and_releases():
+    set_llm(StubLLM(latency_ms=0))
+    before = ADMISSION.inflight
+    with TestClient(app).stream("POST", "/api/chat/stream", json={"message": "show unpaid invoices"}) as resp:
+        text = "".join(resp.iter_text())
+    assert "event: classification" in text and "event: final" in text
+    assert ADMISSION.inflight == before
+
+
+def test_large_tables_are_encoded_off_the_event_loop(monkeypatch):
+    import threading
+
+    from app.api import chat
+    from services.encoding import JSON
+
+    threads = []
+
+    def encode(payload, media_type):
+        threads.append(threading.current_thread())
+        return b"{}", media_type
+
+    monkeypatch.setattr(chat, "encode", encode)
+    monkeypatch.setattr(chat, "CHAT_ENCODE_OFFLOAD_ROWS", 3)
+    small = {"type": "table", "headers": ["x"], "rows": [[1], [2]]}
+    large = {"type": "table", "headers": ["x"], "rows": [[1], [2], [3]]}
+    for payload in (small, large, {"type": "text", "content": "hi"}):
+        asyncio.run(chat._respond(payload, JSON))
+    loop_thread = threading.current_thread()
+    assert threads[0] is loop_thread and threads[1] is not loop_thread and threads[2] is loop_thread
@@ -0,0 +1,69 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from core.db import ConnectionManager, PoolTimeout
+
+
+@pytest.fixture
+def mgr(tmp_path):
+    mgr = ConnectionManager(str(tmp_path / "pool.db"), read_pool_size=2, pool_timeout_ms=200)
+    with mgr.writer() as conn:
+        conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, n INTEGER)")
+    yield mgr
+    mgr.close()
+
+
+def test_readers_are_reused(mgr):
+    with mgr.reader() as first:
+        pass
+    with mgr.reader() as again:
+        assert again is first
+        # Nested use needs a second connection, and no more than that
+        with mgr.reader() as second:
+            assert second is not first
+    assert mgr.stats() == {"readers_open": 2, "readers_idle": 2, "read_pool_size": 2}
+    with mgr.reader() as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO t (n) VALUES (1)")
+
+
+def test_writer_is_serialized(mgr):
+    inside, overlap = [0], []
+
+    def work():
+        for _ in range(20):
+            with mgr.writer() as conn:
+                inside[0] += 1
+                overlap.append(inside[0])
+                conn.execute("INSERT INTO t (n) VALUES (1)")
+                time.sleep(0.0005)
+                inside[0] -= 1
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert max(overlap) == 1
+    with mgr.reader() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone() == (80,)
+
+
+def test_exhausted_pool_times_out_instead_of_hanging(mgr):
+    with mgr.reader(), mgr.reader():
+        started = time.monotonic()
+        with pytest.raises(PoolTimeout, match="all 2 in use"):
+            with mgr.reader():
+                pass
+        assert 0.15 < time.monotonic() - started < 2
+
+        # A reader released while we wait is handed over
+        got = []
+        waiter = threading.Thread(target=lambda: got.append(mgr.reader().__enter__()))
+        waiter.start()
+        time.sleep(0.05)
+    waiter.join(1)
+    assert got and mgr.stats()["readers_open"] == 2
@@ -0,0 +1,73 @@
+import pytest
+
+from orchestrator.dispatch import ROUTES, match_route
+
+
+def _route_of(text):
+    """(route name, extracted groups) of the first pattern covering ``text``."""
+    for route in ROUTES:
+        m = route.pattern.match(text)
+        if m:
+            return route.name, {k: v for k, v in m.groupdict().items() if v is not None}
+    return None, {}
+
+
+@pytest.mark.parametrize("text,route,params", [
+    ("unpaid invoices", "finance_get_invoices_by_status", {"status": "unpaid"}),
+    ("Show me all the outstanding invoices.", "finance_get_invoices_by_status", {"status": "outstanding"}),
+    ("can you list cancelled invoices please?", "finance_get_invoices_by_status", {"status": "cancelled"}),
+    ("list all invoices", "finance_get_all_invoices", {}),
+    ("invoices for customer Ahmed Nabil Ltd", "finance_get_invoices_by_customer", {"customer": "Ahmed Nabil Ltd"}),
+    ("show invoices billed to Sara Fathy Ltd", "finance_get_invoices_by_customer", {"customer": "Sara Fathy Ltd"}),
+    ("AR aging report", "finance_get_ar_aging", {}),
+    ("aging for the receivables", "finance_get_ar_aging", {}),
+    ("customer balances", "finance_get_ar_aging", {}),
+    ("total accounts receivable", "finance_get_ar_totals", {}),
+    ("balance for Laila Samir Solutions", "finance_get_customer_balance", {"customer": "Laila Samir Solutions"}),
+    ("how many customers do we have?", "sales_count_customers", {}),
+    ("customer count", "sales_count_customers", {}),
+    ("list customers", "sales_list_customers", {}),
+    ("items in order #130", "sales_order_items", {"order_id": "130"}),
+    ("order 184's line items", "sales_order_items", {"order_id2": "184"}),
+    ("current stock levels", "inventory_get_stock_levels", {}),
+    ("check inventory on hand", "inventory_get_stock_levels", {}),
+])
+def test_utterance_routes_with_params(text, route, params):
+    assert _route_of(text) == (route, params)
+
+
+# Near misses: extra conditions, writes, or wording the routes don't cover
+@pytest.mark.parametrize("text", [
+    "unpaid invoices over 5,000 by region",
+    "create an invoice for Ahmed Nabil Ltd",
+    "unpaid invoices and stock levels",
+    "how many customers ordered last month",
+    "customers in Dubai",
+    "items in order abc",
+    "delete order 130 items",
+    "stock levels for product P-102",
+    "what is an invoice",
+])
+def test_near_misses_fall_through_to_the_agent(text):
+    assert _route_of(text) == (None, {})
+    assert match_route(text) is None
+
+
+def test_payload_and_parameter_checks():
+    route, payload = match_route("invoices for customer sara younes systems")
+    assert route.name == "finance_get_invoices_by_customer" and payload["type"] == "table"
+    assert payload["rows"] and {r[1] for r in payload["rows"]} == {"Sara Younes Systems"}
+
+    route, payload = match_route("Show unpaid invoices")
+    assert route.module == "finance" and payload["type"] == "table"
+
+    route, payload = match_route("items in order 130")
+    assert route.name == "sales_order_items" and payload["rows"]
+
+    # Matches a pattern, but the customer isn't known: left to the agent
+    assert _route_of("balance for Nobody Such Co")[0] == "finance_get_customer_balance"
+    assert match_route("balance for Nobody Such Co") is None
+
+    # Same for an order id that doesn't exist, rather than an empty table
+    assert _route_of("items in order 999999")[0] == "sales_order_items"
+    assert match_route("items in order 999999") is None
@@ -0,0 +1,76 @@
+import pytest
+
+from services.encoding import ARROW, COLUMNAR, JSON, MSGPACK, available, dumps_json, encode, negotiate, to_columnar
+
+TABLE = {"type": "table", "headers": ["id", "name", "id"], "rows": [[1, "a", 10], [2, None, 20]], "next_cursor": "c1"}
+
+
+def test_negotiate_picks_highest_q_we_can_produce():
+    assert negotiate(None) == JSON
+    assert negotiate("*/*") == JSON
+    assert negotiate(f"{COLUMNAR}, application/json;q=0.5") == COLUMNAR
+    assert negotiate(f"application/json;q=0.9, {COLUMNAR};q=0.4") == JSON
+    assert negotiate(f"*/*;q=0.1, {COLUMNAR}") == COLUMNAR
+    assert negotiate(f"{COLUMNAR};q=0") is None
+    assert negotiate("text/html") is None
+    if MSGPACK not in available():
+        assert negotiate("application/x-msgpack, application/json;q=0.2") == JSON
+
+
+def test_columnar_keeps_order_and_dedupes_headers():
+    out = to_columnar(TABLE)
+    assert out["headers"] == ["id", "name", "id_2"]
+    assert out["columns"] == {"id": [1, 2], "name": ["a", None], "id_2": [10, 20]}
+    assert out["next_cursor"] == "c1" and "rows" not in out
+    assert to_columnar({"type": "text", "content": "hi"}) == {"type": "text", "content": "hi"}
+    assert to_columnar({"type": "table", "headers": ["a"], "rows": []})["columns"] == {"a": []}
+
+
+def test_json_matches_stdlib_semantics():
+    import json
+    from decimal import Decimal
+
+    payload = {"type": "table", "headers": ["x"], "rows": [[Decimal("1.50")], ["é"]]}
+    assert json.loads(dumps_json(payload)) == {"type": "table", "headers": ["x"], "rows": [["1.50"], ["é"]]}
+    # Arrow only encodes tables
+    assert encode({"type": "text", "content": "hi"}, ARROW)[1] == JSON
+
+
+def test_msgpack_round_trip():
+    msgpack = pytest.importorskip("msgpack", exc_type=ImportError)
+    body, media = encode(TABLE, MSGPACK)
+    assert media == MSGPACK and msgpack.unpackb(body) == TABLE
+
+
+def test_arrow_round_trip():
+    pa = pytest.importorskip("pyarrow", exc_type=ImportError)
+    body, media = encode(TABLE, ARROW)
+    table = pa.ipc.open_stream(body).read_all()
+    assert media == ARROW and table.column_names == ["id", "name", "id_2"]
+    assert table.to_pydict()["name"] == ["a", None]
+
+
+def test_broken_optional_module_is_not_offered(tmp_path, monkeypatch):
+    # Installed but fails on import, like pyarrow built for a newer NumPy
+    from services import encoding
+
+    (tmp_path / "broken_codec.py").write_text("raise ImportError('needs NumPy 2')\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setitem(encoding._REQUIRES, ARROW, "broken_codec")
+    assert ARROW not in available()
+    assert negotiate(f"{ARROW}, application/json;q=0.1") == JSON
+
+
+def test_chat_endpoint_negotiates():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    client = TestClient(app)
+    body = {"message": "show unpaid invoices"}
+    resp = client.post("/api/chat", json=body, headers={"accept": COLUMNAR})
+    assert resp.headers["content-type"] == COLUMNAR and resp.headers["vary"] == "Accept"
+    data = resp.json()
+    assert data["type"] == "table" and set(data["columns"]) == set(data["headers"])
+    assert client.post("/api/chat", json=body).json()["rows"]
+    assert client.post("/api/chat", json=body, headers={"accept": "text/csv"}).status_code == 406
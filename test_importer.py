@@ -0,0 +1,103 @@
+import json
+import shutil
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from db.importer import Importer
+
+SAMPLE_DB = Path(__file__).resolve().parent / "db" / "erp_v2.db"
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = tmp_path / "erp.db"
+    shutil.copy(SAMPLE_DB, path)
+    return str(path)
+
+
+def _files(tmp_path, total=30.0):
+    (tmp_path / "customers.csv").write_text(
+        "key,name,email\nK1,Imported One,one@example.com\nK2,Imported Two,\n")
+    (tmp_path / "orders.jsonl").write_text("\n".join(json.dumps(r) for r in [
+        {"key": "O1", "customer_key": "K1", "total": total, "status": "completed"},
+        {"key": "O2", "customer_key": "K2", "total": 5.0},
+        {"key": "O3", "customer_key": "missing", "total": 1.0},
+    ]) + "\n")
+    (tmp_path / "order_items.csv").write_text(
+        "order_key,product_id,quantity,price\nO1,1,2,10\nO1,2,1,10\nO2,1,1,5\n")
+    return {e: str(tmp_path / f) for e, f in [
+        ("customers", "customers.csv"), ("orders", "orders.jsonl"), ("order_items", "order_items.csv")]}
+
+
+def test_import_resolves_keys_and_rejects_unknown_refs(db, tmp_path):
+    results = {r["entity"]: r for r in Importer(db, chunk_size=2).run(_files(tmp_path))}
+    assert results["customers"]["inserted"] == 2
+    assert results["orders"]["inserted"] == 2
+    assert results["orders"]["errors"] == [{"line": 3, "error": "unknown customer_key 'missing'"}]
+
+    conn = sqlite3.connect(db)
+    rows = conn.execute(
+        """SELECT c.name, o.total, o.status, COUNT(oi.id) FROM orders o
+           JOIN customers c ON c.id = o.customer_id JOIN order_items oi ON oi.order_id = o.id
+           WHERE c.name LIKE 'Imported%' GROUP BY o.id ORDER BY o.id"""
+    ).fetchall()
+    assert rows == [("Imported One", 30.0, "completed", 2), ("Imported Two", 5.0, "pending", 1)]
+
+
+def test_reimport_updates_instead_of_duplicating(db, tmp_path):
+    Importer(db).run(_files(tmp_path))
+    conn = sqlite3.connect(db)
+    before = conn.execute("SELECT (SELECT COUNT(*) FROM customers), (SELECT COUNT(*) FROM orders),"
+                          " (SELECT COUNT(*) FROM order_items)").fetchone()
+
+    # A new importer (new process) finds the keys again in import_keys
+    results = {r["entity"]: r for r in Importer(db).run(_files(tmp_path, total=42.0))}
+    assert results["orders"]["updated"] == 2 and results["orders"]["inserted"] == 0
+    after = conn.execute("SELECT (SELECT COUNT(*) FROM customers), (SELECT COUNT(*) FROM orders),"
+                         " (SELECT COUNT(*) FROM order_items)").fetchone()
+    assert after == before
+    assert conn.execute("SELECT total FROM orders o JOIN import_keys k ON k.id = o.id"
+                        " WHERE k.entity = 'orders' AND k.key = 'O1'").fetchone() == (42.0,)
+
+
+def test_imported_allocation_updates_ar_balance(db, tmp_path):
+    (tmp_path / "invoices.csv").write_text(
+        "invoice_number,customer_id,due_date,total_amount\nIMP-1,1,2099-01-01,100\n")
+    (tmp_path / "payments.csv").write_text("key,customer_id,amount\nP1,1,100\n")
+    (tmp_path / "alloc.csv").write_text("payment_key,invoice_number,amount\nP1,IMP-1,100\n")
+    files = {"invoices": str(tmp_path / "invoices.csv"), "payments": str(tmp_path / "payments.csv"),
+             "payment_allocations": str(tmp_path / "alloc.csv")}
+    Importer(db).run(files)
+    Importer(db).run(files)
+
+    conn = sqlite3.connect(db)
+    assert conn.execute(
+        """SELECT i.status, b.outstanding, (SELECT COUNT(*) FROM payment_allocations WHERE invoice_id = i.id)
+           FROM invoices i JOIN ar_invoice_balances b ON b.invoice_id = i.id WHERE invoice_number = 'IMP-1'"""
+    ).fetchone() == ("paid", 0, 1)
+
+
+def test_reseeding_reuses_rows_already_in_the_db(db):
+    from seed_customers import seed_customers
+    from seed_orders import seed_orders
+
+    # Seeded rows that were written without the importer (no import_keys)
+    conn = sqlite3.connect(db)
+    conn.execute("INSERT INTO customers (name, email, created_at) VALUES ('Acme Corp', 'contact@acme.com', '2020-01-01')")
+    conn.execute("INSERT INTO orders (customer_id, total, status) VALUES (1, 150.0, 'pending')")
+    conn.commit()
+    count = "SELECT (SELECT COUNT(*) FROM customers), (SELECT COUNT(*) FROM orders)"
+    before = conn.execute(count).fetchone()
+
+    for _ in range(2):
+        seed_customers(db)
+        seed_orders(db)
+    # Only Globex and ORD-002 are new
+    assert conn.execute(count).fetchone() == (before[0] + 1, before[1] + 1)
+    assert conn.execute(
+        "SELECT COUNT(*), MIN(created_at) FROM customers WHERE email = 'contact@acme.com'"
+    ).fetchone() == (1, "2020-01-01")
+    assert conn.execute("SELECT COUNT(*) FROM order_items WHERE order_id = ("
+                        "SELECT id FROM import_keys WHERE entity = 'orders' AND key = 'ORD-001')").fetchone() == (1,)
@@ -0,0 +1,98 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from core.lazy import Lazy
+
+ROOT = Path(__file__).resolve().parent
+
+_PROBE = """
+import json, sys
+import app.main
+import app.db, services.llm
+from domain.analytics import agent as analytics
+from domain.finance import agent as finance, tools as finance_tools
+from domain.inventory import tools as inventory_tools
+from domain.sales import agent as sales, tools as sales_tools
+print(json.dumps({
+    "built": [lazy.built for lazy in (
+        services.llm._llm, app.db._tables, finance.finance_agent_executor, sales.sales_agent_executor,
+        analytics.analytics_agent_executor, finance_tools._tool_list, sales_tools._tool_list,
+        inventory_tools._tool_list)],
+    "langchain_openai": "langchain_openai" in sys.modules,
+}))
+"""
+
+
+def test_nothing_is_built_at_import():
+    # A fresh interpreter, without an API key: importing must not need one
+    env = {k: v for k, v in os.environ.items() if k not in ("OPENAI_API_KEY", "ERP_LLM_PROVIDER")}
+    out = subprocess.run([sys.executable, "-c", _PROBE], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    probe = json.loads(out.stdout.strip().splitlines()[-1])
+    assert probe == {"built": [False] * 8, "langchain_openai": False}
+
+
+def test_concurrent_first_access_builds_once():
+    calls = []
+
+    def build():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    lazy = Lazy(build)
+    start = threading.Barrier(16)
+    got = []
+
+    def first_get():
+        start.wait()
+        got.append(lazy.get())
+
+    threads = [threading.Thread(target=first_get) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1 and len(got) == 16 and all(v is got[0] for v in got)
+
+
+def test_failed_build_is_retried():
+    attempts = []
+
+    def build():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("no key")
+        return "client"
+
+    lazy = Lazy(build)
+    with pytest.raises(RuntimeError):
+        lazy.get()
+    assert not lazy.built
+    assert lazy.get() == "client" and len(attempts) == 2
+
+
+def test_set_llm_overrides_the_shared_instance():
+    import services.llm as llm_module
+    from services.llm import get_llm, set_llm
+    from services.stub_llm import StubLLM
+
+    fake, other = object(), object()
+    try:
+        set_llm(fake)
+        assert get_llm() is fake and llm_module.llm is fake
+        set_llm(other)
+        assert get_llm() is other
+    finally:
+        set_llm(StubLLM(latency_ms=0))
+
+    # Set before first use: the factory never runs
+    lazy = Lazy(lambda: pytest.fail("built"))
+    lazy.set(fake)
+    assert lazy.get() is fake
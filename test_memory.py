@@ -0,0 +1,40 @@
+from core.memory import SessionStore
+from orchestrator import router_agent
+from orchestrator.router_agent import MEMORY_TURNS, RouterAgent, _chat_history, _new_memory, _remember
+from services.governance import ensure_conversation
+
+
+def test_session_memory_stays_bounded():
+    store = SessionStore(_new_memory)
+    memory = store.get(("c1", "finance"))
+    for i in range(50):
+        _remember(memory, f"question {i}", f"answer {i}")
+    messages = memory.chat_memory.messages
+    assert len(messages) == 2 * MEMORY_TURNS
+    assert messages[0].content == f"question {50 - MEMORY_TURNS}" and messages[-1].content == "answer 49"
+    assert store.stats()["bytes_total"] == sum(len(m.content) for m in messages)
+
+
+def test_agent_prompt_carries_the_conversation(monkeypatch):
+    from services import stub_llm
+    from services.llm import set_llm
+
+    set_llm(stub_llm.StubLLM(latency_ms=0))
+    prompts = []
+    scripted = stub_llm.scripted_response
+    monkeypatch.setattr(stub_llm, "scripted_response", lambda p: prompts.append(p) or scripted(p))
+
+    agent = RouterAgent()
+    first = "which invoices are outstanding for our biggest accounts"
+    agent.process_request("memory-test", first)
+    assert "Earlier in this conversation" not in prompts[0]
+
+    prompts.clear()
+    agent.process_request("memory-test", "and which of those invoices are overdue by more than 60 days")
+    agent_prompts = [p for p in prompts if "Question:" in p]
+    assert f"User: {first}\nAssistant: table: " in agent_prompts[0]
+    # The summary goes in without its tag, which would name this turn's results
+    assert "[tool_result" not in agent_prompts[0].split("Question:")[0]
+
+    conversation_id = ensure_conversation("memory-test")
+    assert _chat_history(router_agent.SESSIONS.peek((conversation_id, "finance"))).count("User: ") == 2
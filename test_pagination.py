@@ -0,0 +1,49 @@
+import pytest
+
+import domain.finance.tools  # noqa: F401  (registers PagedQuery instances)
+from services.pagination import CursorError, PAGED_QUERIES, decode_cursor, encode_cursor, resume
+
+GOOD = {"q": "finance.all_invoices", "p": [], "k": ["2099-01-01", 10**9], "n": 5}
+
+
+def test_resume_follows_a_cursor():
+    page = resume(encode_cursor(GOOD))
+    assert page["type"] == "table" and len(page["rows"]) == 5
+    assert decode_cursor(page["next_cursor"])["q"] == "finance.all_invoices"
+
+
+@pytest.mark.parametrize("tamper", [
+    {"q": ["finance.all_invoices"]},
+    {"q": "finance.nope"},
+    {"n": "x"},
+    {"n": True},
+    {"n": 2.5},
+    {"p": {}},
+    {"p": ["unexpected"]},
+    {"p": "abc"},
+    {"k": ["2099-01-01"]},
+    {"k": [{"a": 1}, 1]},
+    {"k": "2099-01-01"},
+])
+def test_tampered_cursor_is_a_cursor_error(tamper):
+    with pytest.raises(CursorError):
+        resume(encode_cursor({**GOOD, **tamper}))
+
+
+def test_parameters_must_match_the_query():
+    assert PAGED_QUERIES["finance.invoices_by_customer"].param_count == 1
+    state = {"q": "finance.invoices_by_customer", "p": [], "n": 5}
+    with pytest.raises(CursorError):
+        resume(encode_cursor(state))
+    with pytest.raises(CursorError):
+        resume(encode_cursor({**state, "p": [["Acme"]]}))
+
+
+def test_chat_rejects_tampered_cursor_with_400():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    client = TestClient(app)
+    resp = client.post("/api/chat", json={"message": "", "cursor": encode_cursor({**GOOD, "n": "x"})})
+    assert resp.status_code == 400 and "page size" in resp.json()["detail"]
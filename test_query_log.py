@@ -0,0 +1,56 @@
+import shutil
+import sqlite3
+from pathlib import Path
+
+from db.migrate import apply_migrations
+from services.audit import AuditWriter
+from services.query_log import QueryLog, explain_plan, fingerprint_sql, normalize_sql
+from services.sql import execute_query
+
+SAMPLE_DB = Path(__file__).resolve().parent / "db" / "erp_v2.db"
+
+
+def test_fingerprint_ignores_literals_and_layout():
+    a = "SELECT * FROM invoices WHERE status = 'unpaid' AND id IN (1, 2, 3) -- note"
+    b = "select *\n  from invoices where status = ? and id in (?,?)"
+    assert normalize_sql(a) == "select * from invoices where status = ? and id in (?+)"
+    assert fingerprint_sql(a)[0] == fingerprint_sql(b)[0]
+    assert fingerprint_sql(a)[0] != fingerprint_sql("SELECT * FROM orders WHERE status = 'x'")[0]
+
+
+def test_query_log_aggregates_and_stays_bounded():
+    log = QueryLog(slow_ms=10, max_fingerprints=2)
+    log.record("SELECT 1 FROM a WHERE id = 1", 0.002, 1, "x.f")
+    log.record("SELECT 1 FROM a WHERE id = 2", 0.020, 1, "y.g")
+    log.record("SELECT 1 FROM b", 0.001, 0, "x.f", error=True)
+    log.record("SELECT 1 FROM c", 0.001, 0, "x.f")
+    top = log.top()
+    assert top[0]["count"] == 2 and top[0]["slow"] == 1 and top[0]["callers"] == ["x.f", "y.g"]
+    assert top[0]["max_ms"] == 20.0
+    assert log.stats() == {"queries": 4, "slow": 1, "errors": 1, "fingerprints": 2, "untracked": 1, "slow_ms": 10}
+
+
+def test_execute_query_records_caller_and_slow_plan(tmp_path, monkeypatch):
+    import services.query_log as query_log
+    import services.sql as sql
+
+    path = tmp_path / "erp.db"
+    shutil.copy(SAMPLE_DB, path)
+    apply_migrations(str(path))
+    writer = AuditWriter(db_path=str(path))
+    log = QueryLog(slow_ms=0)
+    monkeypatch.setattr(sql, "DB_PATH", str(path))
+    monkeypatch.setattr(sql, "QUERY_LOG", log)
+    monkeypatch.setattr(query_log, "get_audit_writer", lambda: writer)
+
+    execute_query("SELECT id FROM invoices WHERE status = ?", ("unpaid",))
+    writer.flush()
+
+    (entry,) = log.top()
+    assert entry["callers"] == [f"{__name__}.test_execute_query_records_caller_and_slow_plan"]
+    conn = sqlite3.connect(path)
+    fp, caller, plan = conn.execute("SELECT fingerprint, caller, plan FROM slow_queries").fetchone()
+    assert fp == entry["fingerprint"] and caller == entry["callers"][0]
+    assert "invoices" in plan
+    assert plan == explain_plan(conn, "SELECT id FROM invoices WHERE status = ?", ("unpaid",))
+    conn.close()
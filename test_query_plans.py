@@ -0,0 +1,102 @@
+"""
+EXPLAIN QUERY PLAN for every canned query against the sample database with
+all migrations applied. A plain ``SCAN <table>`` (no index) fails the test
+unless the query is listed as legitimately reading the whole table.
+"""
+import re
+import shutil
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+import domain.finance.tools  # noqa: F401  (registers PagedQuery instances)
+import domain.inventory.tools  # noqa: F401
+import domain.sales.tools  # noqa: F401
+from db.migrate import apply_migrations
+from services.pagination import PAGED_QUERIES
+from services.text_to_sql import _plan_query
+
+SAMPLE_DB = Path(__file__).resolve().parent / "db" / "erp_v2.db"
+_FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+# Whole-table listings and aggregates: scanning these is the point (for the
+# aggregates the planner may drive the join from either side)
+EXPECTED_SCANS = {
+    "sales.customers": {"customers"},
+    "inventory.stock_levels": {"stock"},
+    "list all customers": {"customers"},
+    "list all invoices": {"i"},
+    "check stock levels": {"s"},
+    "products below reorder point": {"s"},
+    "total revenue by product": {"oi", "p"},
+    "total sales by customer": {"o", "c"},
+    # strftime() on created_at can't use an index
+    "top 5 customers by revenue this quarter": {"o", "c"},
+    "customers who haven't ordered in 6 months": {"c"},
+}
+
+# SQL written inline in the tools/services they come from
+INLINE_QUERIES = {
+    # services.governance.ensure_conversation
+    "ensure_conversation": "SELECT id FROM conversations WHERE user_id = ? ORDER BY started_at DESC LIMIT 1",
+    # orchestrator.dispatch._customer_name
+    "dispatch.customer_name": "SELECT name FROM customers WHERE name = ? COLLATE NOCASE LIMIT 1",
+    # domain.sales.tools.order_items_for_order
+    "sales.order_items_for_order": "SELECT id, product_id, quantity, price FROM order_items WHERE order_id = ?",
+    # domain.sales.tools.count_customers
+    "sales.count_customers": "SELECT COUNT(*) FROM customers",
+}
+
+TEXT_TO_SQL_QUESTIONS = [
+    "list all customers",
+    "list all invoices",
+    "check stock levels",
+    "products below reorder point",
+    "total revenue by product",
+    "total sales by customer",
+    "average order value this month",
+    "orders placed in the last 30 days",
+    "top 5 customers by revenue this quarter",
+    "customers who haven't ordered in 6 months",
+    "sales and finance data for customer 7",
+]
+
+
+def _canned_queries():
+    for name, query in sorted(PAGED_QUERIES.items()):
+        yield name, query._sql(after=False)
+        yield name + " (next page)", query._sql(after=True)
+    yield from INLINE_QUERIES.items()
+    for question in TEXT_TO_SQL_QUESTIONS:
+        sql, _ = _plan_query(question)
+        yield question, sql
+
+
+@pytest.fixture(scope="module")
+def conn(tmp_path_factory):
+    path = tmp_path_factory.mktemp("plans") / "erp.db"
+    shutil.copy(SAMPLE_DB, path)
+    apply_migrations(str(path))
+    conn = sqlite3.connect(path)
+    yield conn
+    conn.close()
+
+
+@pytest.mark.parametrize("name,sql", [pytest.param(n, s, id=n) for n, s in _canned_queries()])
+def test_no_unexpected_full_scans(conn, name, sql):
+    sql = sql.strip().rstrip(";")
+    plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, (None,) * sql.count("?"))]
+    scanned = {m.group(1) for m in map(_FULL_SCAN.match, plan) if m}
+    base = name.replace(" (next page)", "")
+    unexpected = scanned - EXPECTED_SCANS.get(base, set())
+    assert not unexpected, f"{name}: full scan of {sorted(unexpected)}\n" + "\n".join(plan)
+
+
+def test_migrations_are_recorded_once(conn, tmp_path):
+    versions = [row[0] for row in conn.execute("SELECT version FROM schema_migrations ORDER BY version")]
+    assert versions == [p.stem for p in sorted((SAMPLE_DB.parent / "migrations").glob("[0-9][0-9][0-9]_*.sql"))]
+    path = tmp_path / "again.db"
+    shutil.copy(SAMPLE_DB, path)
+    assert apply_migrations(str(path)) == versions
+    assert apply_migrations(str(path)) == []
@@ -0,0 +1,37 @@
+from services.sql import QueryResult, query_result
+from services.sql_governor import SQLGovernor
+from services.text_to_sql import _run_sql, text_to_sql_tool
+
+
+def test_headers_come_from_the_cursor():
+    result = query_result("SELECT id, name AS customer_name FROM customers ORDER BY id LIMIT 3")
+    assert isinstance(result, QueryResult) and len(result) == 3
+    assert result.columns == ("id", "customer_name")
+    payload = result.to_payload()
+    # The payload shares the fetched rows; nothing is copied per row
+    assert payload["rows"] is result.rows and payload["headers"] == ["id", "customer_name"]
+
+
+def test_canned_report_headers_match_its_columns():
+    out = text_to_sql_tool("What is the total revenue by product")
+    assert out["headers"] == ["product_id", "product_name", "total_revenue"]
+    assert all(len(row) == 3 for row in out["rows"])
+
+
+def _assert_distinct_keeps_order(sql):
+    rows = query_result(sql).rows
+    deduped = list(dict.fromkeys(rows))
+    assert len(deduped) < len(rows)
+    assert query_result(sql, distinct=True).rows == deduped
+    assert query_result(sql, governor=SQLGovernor(), distinct=True).rows == deduped
+    assert _run_sql(sql + ";", distinct=True)["rows"] == deduped
+
+
+def test_distinct_keeps_order():
+    _assert_distinct_keeps_order("SELECT status FROM invoices ORDER BY status DESC")
+    # Sorted on a column that isn't selected: SELECT DISTINCT * FROM (...)
+    # would come back in its temp b-tree's order
+    _assert_distinct_keeps_order("SELECT customer_id FROM orders ORDER BY total DESC, id")
+    assert query_result("SELECT DISTINCT status FROM invoices", distinct=True).columns == ("status",)
+    # PRAGMAs can't be wrapped; they run as they are
+    assert query_result("PRAGMA table_info(customers)", distinct=True).columns[:2] == ("cid", "name")
@@ -0,0 +1,67 @@
+import shutil
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from db.migrate import apply_migrations
+from services import rag
+
+SAMPLE_DB = Path(__file__).resolve().parent / "db" / "erp_v2.db"
+
+
+@pytest.fixture
+def rag_db(tmp_path, monkeypatch):
+    path = str(tmp_path / "erp.db")
+    shutil.copy(SAMPLE_DB, path)
+    apply_migrations(path)
+    monkeypatch.setattr(rag, "DB_PATH", path)
+    monkeypatch.setattr(rag, "_INDEXES", {source: rag._VectorIndex(source) for source in rag._CORPORA})
+    return path
+
+
+def _write(path: str, sql: str, params=()) -> None:
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute(sql, params)
+    conn.close()
+
+
+def _log(path: str) -> list:
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT source, row_key FROM vector_changes ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+def test_fuse_ranks_agreement_first():
+    assert rag._fuse(["a", "b", "c"], ["c", "d"]) == ["c", "a", "b", "d"]
+    assert rag._fuse([], ["x", "y"]) == ["x", "y"]
+
+
+def test_definition_tool_fuses_fts_and_vector_rankings(rag_db, monkeypatch):
+    _write(rag_db, "INSERT INTO glossary (term, definition, module) VALUES (?, ?, ?)",
+           ("DSO", "Days sales outstanding: average days to collect receivables", "finance"))
+    # FTS finds DSO and AR; the vector side ranks AR first and adds Revenue
+    monkeypatch.setattr(rag, "vector_search", lambda source, text, k, group=None: ["AR", "Revenue"])
+    terms = [r["term"] for r in rag.rag_definition_tool("receivables outstanding")]
+    assert terms[0] == "AR" and set(terms) == {"AR", "DSO", "Revenue"}
+    assert terms.index("DSO") < terms.index("Revenue")
+
+
+def test_vector_search_follows_changes_and_prunes_the_log(rag_db, monkeypatch):
+    monkeypatch.setattr(rag, "RAG_VECTOR_CHANGES_RETENTION_S", 0)
+    # Two processes' indexes over the same database, both synced
+    other = rag._VectorIndex("glossary")
+    other.search("customer churn rate", 3)
+    assert "Churn" not in rag.vector_search("glossary", "customer churn rate", 3)
+
+    _write(rag_db, "INSERT INTO glossary (term, definition, module) VALUES (?, ?, ?)",
+           ("Churn", "Share of customers lost per period", "sales"))
+    assert _log(rag_db) == [("glossary", "Churn")]
+    assert rag.vector_search("glossary", "customer churn rate", 3)[0] == "Churn"
+    assert _log(rag_db) == []
+
+    # The other index never saw the pruned row: it rebuilds rather than miss it
+    assert other.search("customer churn rate", 3)[0][0] == "Churn"
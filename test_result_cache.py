@@ -0,0 +1,74 @@
+import uuid
+
+import pytest
+
+from services.result_cache import ANY_TABLE, ResultCache, TableVersions, tables_in
+
+JOIN_SQL = "SELECT c.name, i.invoice_number FROM customers c, invoices i WHERE i.customer_id = c.id"
+
+
+@pytest.mark.parametrize("sql, tables", [
+    (JOIN_SQL, ("customers", "invoices")),
+    ("SELECT * FROM customers c LEFT JOIN invoices i ON i.customer_id = c.id, payments p", ("customers", "invoices", "payments")),
+    ("SELECT * FROM (SELECT customer_id FROM orders) o, main.invoices AS i", ("invoices", "orders")),
+    ("SELECT name FROM customers WHERE id IN (SELECT customer_id FROM orders) ORDER BY name", ("customers", "orders")),
+    ("SELECT * FROM (customers c JOIN orders o ON o.customer_id = c.id), invoices", ("customers", "invoices", "orders")),
+    ("SELECT 'from payments' AS s -- join stock\nFROM customers", ("customers",)),
+    ("SELECT j.value FROM json_each('[1]') j, \"products\"", ("products",)),
+    ("SELECT 1", ()),
+    # Can't be told: depends on everything
+    ("SELECT * FROM", (ANY_TABLE,)),
+    ("PRAGMA table_info(customers)", (ANY_TABLE,)),
+])
+def test_tables_in(sql, tables):
+    assert tables_in(sql) == tables
+
+
+@pytest.mark.parametrize("written", ["customers", "invoices"])
+def test_write_to_any_joined_table_invalidates(written):
+    versions = TableVersions()
+    cache = ResultCache(versions=versions)
+    tables = tables_in(JOIN_SQL)
+    cache.put("q", {"type": "table", "headers": ["name"], "rows": [("a",)]}, tables, versions.snapshot(tables))
+    versions.bump("payments")
+    assert cache.get("q") is not None
+    versions.bump(written)
+    assert cache.get("q") is None
+
+
+def test_unparsed_read_depends_on_every_table():
+    versions = TableVersions()
+    cache = ResultCache(versions=versions)
+    cache.put("q", {"type": "table", "rows": []}, (ANY_TABLE,), versions.snapshot((ANY_TABLE,)))
+    assert cache.get("q") is not None
+    versions.bump("stock")
+    assert cache.get("q") is None
+
+
+def test_callers_cannot_change_the_cached_result():
+    cache = ResultCache(versions=TableVersions())
+    rows = [[1, "a"], [2, "b"]]
+    cache.put("q", {"type": "table", "headers": ["id", "name"], "rows": rows}, (), (0,))
+    rows.append([3, "c"])
+    got = cache.get("q")
+    got["rows"].append((9, "z"))
+    got["headers"][0] = "changed"
+    assert cache.get("q") == {"type": "table", "headers": ["id", "name"], "rows": [(1, "a"), (2, "b")]}
+
+
+def test_text_to_sql_join_is_invalidated_by_a_write_to_either_table():
+    from services.sql import execute_query
+    from services.text_to_sql import text_to_sql_tool
+
+    tag = uuid.uuid4().hex[:8]
+    sql = (f"SELECT c.name, i.invoice_number FROM customers c, invoices i "
+           f"WHERE i.customer_id = c.id AND (c.name LIKE '%{tag}%' OR i.invoice_number LIKE '%{tag}%')")
+    assert text_to_sql_tool(sql)["rows"] == []
+
+    execute_query("INSERT INTO invoices (customer_id, invoice_number, due_date, total_amount) VALUES (1, ?, '2099-01-01', 1)",
+                  (f"INV-{tag}",))
+    assert len(text_to_sql_tool(sql)["rows"]) == 1
+
+    execute_query("UPDATE customers SET name = ? WHERE id = 1", (f"Renamed {tag}",))
+    rows = text_to_sql_tool(sql)["rows"]
+    assert len(rows) == 1 and rows[0][0] == f"Renamed {tag}"
@@ -0,0 +1,61 @@
+import sqlite3
+
+import pytest
+
+from services.sql_governor import QueryLimitError, SQLGovernor
+from services.text_to_sql import _run_sql
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)")
+    conn.executemany("INSERT INTO t (v) VALUES (?)", [(str(i),) for i in range(300)])
+    yield conn
+    conn.close()
+
+
+def _limit(governor, conn, sql):
+    with pytest.raises(QueryLimitError) as exc:
+        governor.run(conn, sql)
+    return exc.value.limit
+
+
+def test_reads_pass_and_keep_their_order(conn):
+    rows = SQLGovernor(max_rows=5).run(conn, "SELECT id FROM t ORDER BY id DESC LIMIT 5;")
+    assert rows == [(300,), (299,), (298,), (297,), (296,)]
+    assert SQLGovernor().run(conn, "PRAGMA table_info(t)")[0][1] == "id"
+
+
+def test_distinct_row_cap_counts_distinct_rows(conn):
+    # ORDER BY: de-duplicated while fetching, so 300 rows of 3 values fit in 5
+    sql = "SELECT id % 3 FROM t ORDER BY id DESC"
+    rows, _ = SQLGovernor(max_rows=5).execute(conn, sql, distinct=True)
+    assert rows == [(0,), (2,), (1,)]
+    assert _limit(SQLGovernor(max_rows=5), conn, sql) == "rows"
+    with pytest.raises(QueryLimitError):
+        SQLGovernor(max_rows=5).execute(conn, "SELECT id FROM t ORDER BY v", distinct=True)
+
+
+def test_each_limit_is_named(conn):
+    cartesian = "SELECT count(*) FROM t a, t b, t c"
+    assert _limit(SQLGovernor(max_steps=100_000), conn, cartesian) == "vm_steps"
+    assert _limit(SQLGovernor(timeout_ms=50), conn, cartesian + ", t d") == "timeout"
+    assert _limit(SQLGovernor(max_rows=10), conn, "SELECT * FROM t") == "rows"
+    for sql in ("DELETE FROM t", "WITH x AS (SELECT 1) UPDATE t SET v = 'x'",
+                "PRAGMA journal_mode = DELETE", "SELECT 1; DELETE FROM t"):
+        assert _limit(SQLGovernor(), conn, sql) == "statement"
+    assert conn.execute("SELECT count(*) FROM t").fetchone() == (300,)
+
+
+def test_connection_is_left_ungoverned(conn):
+    _limit(SQLGovernor(max_steps=10_000), conn, "SELECT count(*) FROM t a, t b")
+    assert conn.execute("SELECT count(*) FROM t a, t b").fetchone() == (90000,)
+    conn.execute("DELETE FROM t WHERE id > 10")
+
+
+def test_limit_hits_become_error_payloads():
+    out = _run_sql("SELECT * FROM customers", governor=SQLGovernor(max_rows=1))
+    assert out["type"] == "error" and out["limit"] == "rows"
+    out = _run_sql("DELETE FROM customers", governor=SQLGovernor())
+    assert out["type"] == "error" and out["limit"] == "statement"
@@ -0,0 +1,110 @@
+import shutil
+import sqlite3
+import uuid
+from pathlib import Path
+
+import pytest
+
+from services.llm import set_llm
+from services.sql_translations import TRANSLATIONS, TranslationCache
+from services.stub_llm import StubLLM
+from services.text_to_sql import ERP_SCHEMA, _clean_sql, text_to_sql_tool
+
+SAMPLE_DB = Path(__file__).resolve().parent / "db" / "erp_v2.db"
+
+
+class FixedLLM:
+    """Answers every prompt with the same SQL and counts the calls."""
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        return self.sql
+
+
+@pytest.fixture
+def cache(tmp_path):
+    path = tmp_path / "erp.db"
+    shutil.copy(SAMPLE_DB, path)
+    return TranslationCache(str(path))
+
+
+@pytest.fixture
+def llm():
+    def use(sql: str) -> FixedLLM:
+        fixed = FixedLLM(sql)
+        set_llm(fixed)
+        return fixed
+
+    yield use
+    set_llm(StubLLM(latency_ms=0))
+
+
+def test_store_and_lookup_round_trip(cache):
+    assert cache.lookup("how many customers") is None
+    assert cache.store("How many  customers?", "SELECT COUNT(*) FROM customers")
+    # Same question after normalization; a different schema prompt is another key
+    assert cache.lookup("how many customers") == "SELECT COUNT(*) FROM customers"
+    assert cache.lookup("how many customers", context="other schema") is None
+    # Only SQL that compiles is kept
+    assert not cache.store("drop it", "DELETE FROM customers")
+    assert not cache.store("bad column", "SELECT no_such_column FROM customers")
+    assert cache.stats()["hits"] == 1
+
+
+def test_schema_change_revalidates_with_explain(cache):
+    cache.store("q keep", "SELECT id FROM customers")
+    with sqlite3.connect(cache.db_path) as conn:
+        conn.execute("CREATE TABLE scratch_t (x INTEGER)")
+    cache.store("q scratch", "SELECT x FROM scratch_t")
+    with sqlite3.connect(cache.db_path) as conn:
+        conn.execute("DROP TABLE scratch_t")  # bumps schema_version
+
+    assert cache.lookup("q keep") == "SELECT id FROM customers"
+    assert cache.lookup("q scratch") is None
+    assert cache.stats()["revalidated"] == 1 and cache.stats()["invalidated"] == 1
+    with sqlite3.connect(cache.db_path) as conn:
+        version = conn.execute("PRAGMA schema_version").fetchone()[0]
+        assert conn.execute("SELECT sql, schema_version FROM sql_translations").fetchall() == [
+            ("SELECT id FROM customers", version)
+        ]
+
+
+def test_clean_sql_only_unwraps_fences():
+    assert _clean_sql("SELECT name FROM customers") == "SELECT name FROM customers"
+    assert _clean_sql("```sql\nSELECT 1 AS ones\n```") == "SELECT 1 AS ones"
+    assert _clean_sql("```\nSELECT sql FROM sqls\n```") == "SELECT sql FROM sqls"
+
+
+def test_only_sql_that_ran_is_stored(llm):
+    question = f"customer count by mood {uuid.uuid4().hex[:8]}"
+    # Compiles, so EXPLAIN passes, but fails while running
+    llm("SELECT json_extract('not json', '$') AS mood")
+    assert text_to_sql_tool(question)["type"] == "error"
+    assert TRANSLATIONS.lookup(question, context=ERP_SCHEMA) is None
+
+    # Trips the governor's step limit
+    llm("SELECT COUNT(*) FROM order_items a, order_items b, order_items c")
+    assert text_to_sql_tool(question)["limit"] in ("vm_steps", "timeout")
+    assert TRANSLATIONS.lookup(question, context=ERP_SCHEMA) is None
+
+    llm("SELECT COUNT(*) AS n FROM customers")
+    assert text_to_sql_tool(question)["type"] == "table"
+    assert TRANSLATIONS.lookup(question, context=ERP_SCHEMA) == "SELECT COUNT(*) AS n FROM customers"
+
+
+def test_stored_sql_that_fails_is_evicted(llm):
+    from services.result_cache import RESULT_CACHE
+
+    question = f"overdue mood report {uuid.uuid4().hex[:8]}"
+    assert TRANSLATIONS.store(question, "SELECT json_extract('not json', '$') AS mood", context=ERP_SCHEMA)
+    fixed = llm("SELECT COUNT(*) AS n FROM invoices")
+    # Served from the translation, which fails and is dropped...
+    assert text_to_sql_tool(question)["type"] == "error" and fixed.calls == 0
+    assert TRANSLATIONS.lookup(question, context=ERP_SCHEMA) is None
+    # ...so the next ask goes back to the LLM
+    RESULT_CACHE.clear()
+    assert text_to_sql_tool(question)["type"] == "table" and fixed.calls == 1
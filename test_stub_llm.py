@@ -0,0 +1,39 @@
+from services.stub_llm import DEFAULT_SQL, StubLLM, scripted_response
+
+REACT_PROMPT = """Answer the following questions as best you can. You have access to the following tools:
+
+finance_get_unpaid_invoices: List unpaid invoices
+finance_sql_read: Finance read via text-to-SQL
+
+Use the following format:
+
+Question: the input question you must answer
+Thought: you should always think about what to do
+Action: the action to take, should be one of [finance_get_unpaid_invoices, finance_sql_read]
+Action Input: the input to the action
+
+Begin!
+
+Question: {question}
+Thought:"""
+
+
+def test_agent_prompt_gets_one_tool_call():
+    out = scripted_response(REACT_PROMPT.format(question="unpaid invoices over 5000 by region"))
+    assert "Action: finance_get_unpaid_invoices\nAction Input: unpaid invoices over 5000 by region" in out
+
+    # Only tools offered in the prompt are used; the text-to-SQL tool is the fallback
+    out = scripted_response(REACT_PROMPT.format(question="cash position by branch"))
+    assert "Action: finance_sql_read\n" in out
+
+
+def test_after_an_observation_it_finishes():
+    prompt = REACT_PROMPT.format(question="x") + " look\nAction: finance_sql_read\nAction Input: x\nObservation: []\nThought:"
+    assert "Final Answer:" in scripted_response(prompt)
+
+
+def test_sql_prompt_gets_a_select():
+    prompt = "You are an expert SQL generator...\nReturn ONLY a syntactically correct SQLite SELECT query without explanations:\n"
+    assert scripted_response(prompt + "Total sales by customer\n").startswith("SELECT c.id")
+    assert scripted_response(prompt + "weather tomorrow\n") == DEFAULT_SQL
+    assert StubLLM(latency_ms=0).invoke(prompt + "list orders\n").startswith("SELECT id, customer_id")
@@ -0,0 +1,48 @@
+import asyncio
+import threading
+import uuid
+
+from orchestrator.router_agent import RouterAgent
+from services import stub_llm
+from services.llm import set_llm
+from services.result_cache import RESULT_CACHE
+from services.text_to_sql import atext_to_sql_tool
+
+
+def _record_llm_threads(monkeypatch) -> dict:
+    """Thread names the stub LLM answered on, by prompt kind (agent or sql)."""
+    threads: dict = {}
+    scripted = stub_llm.scripted_response
+
+    def record(prompt):
+        kind = "agent" if "Action:" in prompt else "sql"
+        threads.setdefault(kind, set()).add(threading.current_thread().name)
+        return scripted(prompt)
+
+    monkeypatch.setattr(stub_llm, "scripted_response", record)
+    set_llm(stub_llm.StubLLM(latency_ms=0))
+    return threads
+
+
+def test_llm_fallback_stays_off_the_db_executor(monkeypatch):
+    threads = _record_llm_threads(monkeypatch)
+    question = f"payment totals by branch {uuid.uuid4().hex[:8]}"
+
+    out = asyncio.run(atext_to_sql_tool(question))
+    assert out["type"] == "table" and out["rows"]
+    assert threads["sql"] == {threading.current_thread().name}
+
+    # Stored translation: the next ask skips the LLM
+    threads.clear()
+    RESULT_CACHE.clear()
+    assert asyncio.run(atext_to_sql_tool(question))["rows"] == out["rows"]
+    assert "sql" not in threads
+
+
+def test_agent_sql_tool_awaits_the_llm_on_the_loop(monkeypatch):
+    threads = _record_llm_threads(monkeypatch)
+    question = f"payment totals by branch {uuid.uuid4().hex[:8]}"
+
+    out = asyncio.run(RouterAgent().aprocess_request("async-sql-test", question))
+    assert out["type"] == "table"
+    assert threads["sql"] and not any(name.startswith("erp-db") for name in threads["sql"])
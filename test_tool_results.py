@@ -0,0 +1,88 @@
+import asyncio
+import json
+
+from orchestrator.tool_results import collect, resolve, stash, summarize
+
+TABLE = {"type": "table", "headers": ["id", "name"], "rows": [(1, "a"), (2, "b")], "next_cursor": "c"}
+
+
+def test_stash_hands_the_agent_a_summary_and_keeps_the_payload():
+    with collect() as results:
+        line = stash(TABLE)
+        assert line == "[tool_result r1] table: 2 rows x 2 columns (id, name) (more pages)"
+        assert resolve(line) is TABLE
+        assert resolve(stash({"type": "text", "content": "hi"})) == {"type": "text", "content": "hi"}
+        assert len(results.results) == 2
+        # The agent's own words are not a tool result
+        assert resolve("Final answer: 2 invoices") is None
+        assert resolve("[tool_result r9] table: gone") is None
+    # Outside a turn there is nowhere to keep it: the old JSON string
+    assert json.loads(stash(TABLE))["rows"] == [[1, "a"], [2, "b"]]
+    assert resolve("[tool_result r1] table: 2 rows") is None
+
+
+def test_summary_of_errors_and_wide_tables():
+    assert summarize({"type": "error", "message": "no such table"}) == "error: no such table"
+    wide = {"type": "table", "headers": [f"c{i}" for i in range(10)], "rows": []}
+    assert summarize(wide).endswith("c6, c7, ...)")
+
+
+def test_agent_turn_returns_the_tool_payload_itself():
+    from orchestrator.router_agent import RouterAgent
+    from services.llm import set_llm
+    from services.stub_llm import StubLLM
+
+    set_llm(StubLLM(latency_ms=0))
+    agent = RouterAgent()
+    message = "which invoices are outstanding for our biggest accounts"
+    out = agent.process_request("tool-results-test", message)
+    assert out["type"] == "table" and out["headers"][0] == "Invoice ID" and out["rows"]
+    out = asyncio.run(agent.aprocess_request("tool-results-test", message))
+    assert out["type"] == "table" and out["rows"]
+
+
+def test_audit_rows_keep_the_summary_not_the_table():
+    from core.config import DB_PATH
+    from core.db import get_manager
+    from orchestrator.router_agent import RouterAgent
+    from services.audit import get_audit_writer
+    from services.governance import ensure_conversation
+    from services.llm import set_llm
+    from services.stub_llm import StubLLM
+
+    set_llm(StubLLM(latency_ms=0))
+    agent = RouterAgent()
+    conversation_id = ensure_conversation("audit-summary-test")
+    for message in ("which invoices are outstanding for our biggest accounts", "show unpaid invoices"):
+        out = agent.process_request("audit-summary-test", message)
+        assert out["type"] == "table" and out["rows"]
+        get_audit_writer().flush()
+        with get_manager(DB_PATH).reader() as conn:
+            content = conn.execute(
+                "SELECT content FROM messages WHERE conversation_id = ? ORDER BY id DESC LIMIT 1", (conversation_id,)
+            ).fetchone()[0]
+            output = conn.execute("SELECT output_json FROM tool_calls ORDER BY id DESC LIMIT 1").fetchone()[0]
+        assert json.loads(output) == content
+        record = json.loads(content)
+        assert record["type"] == "table" and record["summary"] == summarize(out) and "rows" not in record
+        # The last query read gives back the rows the user was shown (a paged
+        # read also has hidden key columns and a look-ahead row)
+        query = record["queries"][-1]
+        with get_manager(DB_PATH).reader() as conn:
+            rows = conn.execute(query["sql"], query["params"]).fetchall()
+        width = len(out["headers"])
+        assert [list(r[:width]) for r in rows[: len(out["rows"])]] == [list(r) for r in out["rows"]]
+
+
+def test_cached_text_to_sql_answer_keeps_its_query():
+    from services.query_log import trace_reads
+    from services.result_cache import RESULT_CACHE
+    from services.text_to_sql import text_to_sql_tool
+
+    RESULT_CACHE.clear()
+    with trace_reads() as first:
+        text_to_sql_tool("how many customers")
+    with trace_reads() as cached:
+        out = text_to_sql_tool("how many customers")
+    assert out["type"] == "table" and RESULT_CACHE.hits >= 1
+    assert first and cached[-1]["sql"] == first[-1]["sql"]
@@ -0,0 +1,54 @@
+import asyncio
+
+from core.db import run_db
+from core.tracing import Histogram, Trace, _current, render_metrics, span, traced
+
+
+def test_histogram_exposition_is_cumulative():
+    h = Histogram("t_seconds", "test", ["op"], buckets=(0.01, 0.1))
+    h.observe(("a",), 0.005)
+    h.observe(("a",), 0.05)
+    h.observe(("a",), 5)
+    lines = h.expose()
+    assert lines[:2] == ["# HELP t_seconds test", "# TYPE t_seconds histogram"]
+    assert 't_seconds_bucket{op="a",le="0.01"} 1' in lines
+    assert 't_seconds_bucket{op="a",le="0.1"} 2' in lines
+    assert 't_seconds_bucket{op="a",le="+Inf"} 3' in lines
+    assert 't_seconds_count{op="a"} 3' in lines
+
+
+def test_spans_reach_the_request_trace_across_run_db():
+    @traced("test.work")
+    def work():
+        return 1
+
+    async def request():
+        trace = Trace()
+        token = _current.set(trace)
+        try:
+            with span("test.outer"):
+                await run_db(work)
+                await run_db(work)
+        finally:
+            _current.reset(token)
+        return trace
+
+    trace = asyncio.run(request())
+    assert trace.spans["test.work"][0] == 2
+    header = trace.server_timing(0.5)
+    assert 'test.work;dur=' in header and 'desc="x2"' in header
+    assert header.endswith("total;dur=500.00")
+    assert 'erp_span_duration_seconds_count{span="test.work"}' in render_metrics()
+
+
+def test_metrics_endpoint_and_server_timing_header():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    client = TestClient(app)
+    resp = client.get("/health")
+    assert "total;dur=" in resp.headers["server-timing"]
+    body = client.get("/metrics").text
+    assert 'erp_http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in body
+    assert "# TYPE erp_chat_inflight gauge" in body
@@ -0,0 +1,66 @@
+import json
+
+import numpy as np
+
+from services.vector_store import HashingEmbedder, VectorStore
+
+
+def _unit(rng, n, dim=32):
+    v = rng.standard_normal((n, dim)).astype(np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def test_memmap_round_trip_and_incremental_save(tmp_path):
+    rng = np.random.default_rng(0)
+    vecs = _unit(rng, 50)
+    store = VectorStore(32, path=str(tmp_path), capacity=8)
+    store.upsert([f"k{i}" for i in range(50)], vecs, groups=["a" if i % 2 else "b" for i in range(50)])
+    store.delete(["k3"])
+    store.save({"last_seq": 7})
+
+    loaded, extra = VectorStore.load(str(tmp_path), 32)
+    assert extra == {"last_seq": 7} and len(loaded) == 49 and "k3" not in loaded.key_to_row
+    assert loaded.search(vecs[10], k=1)[0][0][0] == "k10"
+    assert loaded.search(vecs[11], k=3, group="b")[0][0][0] != "k11"
+    assert "keys" not in json.loads((tmp_path / "meta.json").read_text())
+
+    # An upsert appends to keys.jsonl; earlier lines stay as they are
+    before = (tmp_path / "keys.jsonl").read_bytes()
+    loaded.upsert(["k10", "new"], _unit(rng, 2))
+    loaded.save({"last_seq": 8})
+    after = (tmp_path / "keys.jsonl").read_bytes()
+    assert after.startswith(before) and after[len(before):] == b'"k10"\n"new"\n'
+
+    again, extra = VectorStore.load(str(tmp_path), 32)
+    assert extra == {"last_seq": 8} and len(again) == 50
+    assert again.key_to_row["k10"] == 50 and again.key_to_row["new"] == 51
+
+    # Compaction reorders rows: keys.jsonl is rewritten to match
+    again.compact()
+    again.save()
+    compacted, _ = VectorStore.load(str(tmp_path), 32)
+    assert compacted.count == 50 and compacted.keys == again.keys
+
+
+def test_ivf_recall_against_brute_force():
+    rng = np.random.default_rng(1)
+    centers = _unit(rng, 40)
+    vecs = centers[rng.integers(0, 40, 20_000)] + 0.15 * rng.standard_normal((20_000, 32)).astype(np.float32)
+    vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+    store = VectorStore(32, capacity=20_000, ivf_threshold=1000)
+    store.upsert([str(i) for i in range(len(vecs))], vecs)
+    # Queries from the data distribution, as real ones are
+    queries = vecs[rng.integers(0, len(vecs), 50)] + 0.1 * rng.standard_normal((50, 32)).astype(np.float32)
+    flat = store.search(queries, k=10)
+    store.build_index()
+    ivf = store.search(queries, k=10, nprobe=16)
+    recall = np.mean([len({k for k, _ in a} & {k for k, _ in b}) / 10 for a, b in zip(flat, ivf)])
+    assert recall >= 0.95
+
+
+def test_hashing_embedder_is_deterministic_and_normalised():
+    emb = HashingEmbedder(64)
+    a, b = emb.embed(["accounts receivable", "accounts receivable"])
+    assert np.allclose(a, b) and np.isclose(np.linalg.norm(a), 1.0)
+    near, far = emb.embed(["account receivables", "stock reorder level"])
+    assert a @ near > a @ far
@@ -17,6 +17,8 @@ if "messages" not in st.session_state:
     st.session_state.messages = []
 if "user_id" not in st.session_state:
     st.session_state.user_id = "user_001"
+if "loaded_cursors" not in st.session_state:
+    st.session_state.loaded_cursors = set()
 
 # --- Sidebar settings ---
 with st.sidebar:
@@ -26,11 +28,81 @@ with st.sidebar:
     )
     default_api = os.getenv("API_URL", "http://127.0.0.1:8000/api/chat")
     api_url = st.text_input("API URL", value=default_api)
+    stream_responses = st.checkbox("Stream progress", value=True)
 
 st.title("🤖 Agent-driven ERP System")
 st.caption("Chat with your ERP system using natural language")
 
 
+def load_more(cursor):
+    """Fetch the page after `cursor` and append it to the chat history."""
+    st.session_state.loaded_cursors.add(cursor)
+    try:
+        resp = requests.post(
+            api_url,
+            json={"user_id": st.session_state.user_id, "cursor": cursor},
+            timeout=30
+        )
+        resp.raise_for_status()
+        page = resp.json()
+    except Exception as e:
+        page = {"type": "error", "message": str(e)}
+    st.session_state.messages.append({"role": "assistant", "content": page})
+    st.rerun()
+
+
+def iter_sse(resp):
+    """Yield (event, data) from a text/event-stream response; data is parsed JSON."""
+    event, data_lines = "message", []
+    for line in resp.iter_lines(decode_unicode=True):
+        if line is None:
+            continue
+        if line == "":
+            if data_lines:
+                yield event, json.loads("\n".join(data_lines))
+            event, data_lines = "message", []
+        elif line.startswith(":"):
+            continue  # comment / keep-alive
+        elif line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data_lines.append(line[5:].lstrip())
+
+
+def stream_turn(prompt):
+    """
+    Post to /chat/stream and render progress as it arrives: the routing
+    decision and tool calls in a status box, partial LLM output below it.
+    Returns the final payload.
+    """
+    status = st.status("Routing...", expanded=False)
+    tokens = st.empty()
+    partial = ""
+    final = {"type": "error", "message": "Stream ended without a result."}
+    with requests.post(
+        api_url.rstrip("/") + "/stream",
+        json={"user_id": st.session_state.user_id, "message": prompt},
+        stream=True,
+        timeout=(5, 120),
+    ) as resp:
+        resp.raise_for_status()
+        for event, data in iter_sse(resp):
+            if event == "classification":
+                status.update(label=f"{data['module']} · {data['action']}")
+            elif event == "tool_start":
+                status.write(f"Running `{data['tool']}`...")
+            elif event == "tool_end":
+                status.write(f"`{data['tool']}` done")
+            elif event == "token":
+                partial += data.get("text", "")
+                tokens.markdown(f"```\n{partial}\n```")
+            elif event in ("final", "error"):
+                final = data
+    status.update(state="error" if final.get("type") == "error" else "complete")
+    tokens.empty()
+    return final
+
+
 def render_content(content):
     """
     Renders:
@@ -82,6 +154,12 @@ def render_content(content):
             else:
                 st.error("Table payload malformed; showing raw JSON.")
                 st.json(content)
+
+            next_cursor = content.get("next_cursor")
+            if next_cursor and next_cursor not in st.session_state.loaded_cursors:
+                st.caption(f"Showing {len(rows)} rows; more are available.")
+                if st.button("Load more", key=f"more-{next_cursor}"):
+                    load_more(next_cursor)
             return
 
         # Unknown dict type
@@ -138,19 +216,25 @@ if prompt := st.chat_input("What would you like to do?"):
         render_content(prompt)
 
     with st.chat_message("assistant"):
-        with st.spinner("Thinking..."):
+        if stream_responses:
             try:
-                resp = requests.post(
-                    api_url,
-                    json={"user_id": st.session_state.user_id, "message": prompt},
-                    timeout=30
-                )
-                resp.raise_for_status()
-                ai_response = resp.json()
+                ai_response = stream_turn(prompt)
             except Exception as e:
                 ai_response = {"type": "error", "message": str(e)}
+        else:
+            with st.spinner("Thinking..."):
+                try:
+                    resp = requests.post(
+                        api_url,
+                        json={"user_id": st.session_state.user_id, "message": prompt},
+                        timeout=30
+                    )
+                    resp.raise_for_status()
+                    ai_response = resp.json()
+                except Exception as e:
+                    ai_response = {"type": "error", "message": str(e)}
 
-            st.session_state.messages.append(
-                {"role": "assistant", "content": ai_response}
-            )
-            render_content(ai_response)
\ No newline at end of file
+        st.session_state.messages.append(
+            {"role": "assistant", "content": ai_response}
+        )
+        render_content(ai_response)
\ No newline at end of file